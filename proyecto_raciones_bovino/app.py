@@ -1,14 +1,40 @@
+import os
+import click
 from flask import Flask, jsonify
+from sqlalchemy import text
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_migrate import Migrate
+from werkzeug.serving import is_running_from_reloader
 from datetime import datetime
 from config import Config
 
 # Importar modelos (TODOS LOS MODELOS INTEGRADOS + NACIMIENTOS)
-from models import db, RolUsuario, Usuario, Hacienda, EstadoAnimal, Animal, CatalogoVacuna, VacunacionAnimal, Nacimiento
+from models import db, RolUsuario, Usuario, Hacienda, EstadoAnimal, CatalogoVacuna
 
 # Importar rutas (TODAS LAS RUTAS INTEGRADAS + NACIMIENTOS)
-from routes import auth_bp, usuarios_bp, haciendas_bp, animales_bp, vacunacion_bp, nacimientos_bp
+from routes import auth_bp, usuarios_bp, haciendas_bp, animales_bp, vacunacion_bp, nacimientos_bp, batch_bp, tareas_bp
+
+# Servicios de infraestructura
+from services.busqueda_service import BusquedaService
+from services.hierro_service import HierroService
+from services.indices_service import IndicesService
+from services.estadisticas_service import EstadisticasService
+from services.tareas_service import TareasService
+from services.resumen_service import ResumenService
+from services.estado_vacunacion_service import EstadoVacunacionService
+from services.alertas_service import AlertasService
+from services.tareas_pendientes_service import TareasPendientesService
+from services.genealogia_service import GenealogiaService
+from services.consanguinidad_service import ConsanguinidadService
+from services.instantaneas_service import InstantaneasService
+from services.versiones_service import VersionesService
+from services.cache_service import CacheService
+from services.invalidacion_service import InvalidacionService
+from services.referencias_service import ReferenciasService
+from services.auth_service import AuthService
+from services.coalescencia_service import CoalescenciaService
+from services.respuesta_service import RespuestaService
 
 def create_app():
     app = Flask(__name__)
@@ -16,8 +42,40 @@ def create_app():
     
     # Inicializar extensiones
     db.init_app(app)
+    Migrate(app, db)
     jwt = JWTManager(app)
     CORS(app, origins=Config.CORS_ORIGINS)
+    CacheService.iniciar(app)
+    AuthService.iniciar(app)
+    
+    # JSON rápido (Decimal/fechas nativos, streaming de listas grandes) y compresión
+    RespuestaService.iniciar(app)
+    
+    # Mantener el índice de búsqueda sincronizado con las escrituras
+    BusquedaService.registrar_eventos()
+    HierroService.registrar_eventos()
+    ResumenService.registrar_eventos()
+    EstadoVacunacionService.registrar_eventos()
+    TareasPendientesService.registrar_eventos()
+    GenealogiaService.registrar_eventos()
+    
+    # Bus de invalidación: versiones (ETag) y cache se suscriben a él
+    InvalidacionService.registrar_eventos()
+    VersionesService.registrar_eventos()
+    CoalescenciaService.registrar_eventos()
+    
+    # Tablas de referencia en memoria (estados, roles, vacunas, ubicaciones)
+    ReferenciasService.iniciar(app)
+    
+    # Alertas de vacunación materializadas (próximas dosis, vencidas, crías sin vacunar)
+    AlertasService.iniciar(app)
+    
+    # Pedigrí en memoria para consanguinidad y parentesco (crías nuevas se agregan al vuelo)
+    ConsanguinidadService.iniciar(app)
+    
+    # Instantáneas servidas por /api/health y /api/stats
+    InstantaneasService.registrar('salud', EstadisticasService.estadisticas_salud)
+    InstantaneasService.registrar('estadisticas', EstadisticasService.estadisticas_generales)
     
     # Registrar blueprints (TODOS LOS BLUEPRINTS + NACIMIENTOS)
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -26,6 +84,8 @@ def create_app():
     app.register_blueprint(animales_bp, url_prefix='/api/animales')
     app.register_blueprint(vacunacion_bp, url_prefix='/api/vacunacion')
     app.register_blueprint(nacimientos_bp, url_prefix='/api/nacimientos')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(tareas_bp, url_prefix='/api/tareas')
     
     # Manejador de errores JWT
     @jwt.expired_token_loader
@@ -44,6 +104,18 @@ def create_app():
             'code': 'TOKEN_INVALID'
         }), 401
     
+    @jwt.token_in_blocklist_loader
+    def token_revocado_callback(jwt_header, jwt_payload):
+        return AuthService.token_revocado(jwt_payload)
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({
+            'error': 'Token revocado. Inicie sesión nuevamente',
+            'status': 'error',
+            'code': 'TOKEN_REVOKED'
+        }), 401
+    
     @jwt.unauthorized_loader
     def missing_token_callback(error):
         return jsonify({
@@ -119,7 +191,9 @@ def create_app():
                     'estadisticas': 'GET /api/haciendas/estadisticas',
                     'activas': 'GET /api/haciendas/activas',
                     'por_departamento': 'GET /api/haciendas/por-departamento',
-                    'validar_nit': 'POST /api/haciendas/validar-nit'
+                    'validar_nit': 'POST /api/haciendas/validar-nit',
+                    'consanguinidad': 'GET /api/haciendas/{id}/consanguinidad',
+                    'plan_monta': 'GET /api/haciendas/{id}/plan-monta'
                 },
                 'animales': {
                     'listar': 'GET /api/animales/',
@@ -129,12 +203,17 @@ def create_app():
                     'cambiar_estado': 'PUT /api/animales/{id}/estado',
                     'eliminar': 'DELETE /api/animales/{id}',
                     'buscar': 'GET /api/animales/buscar',
+                    'hierro_similar': 'GET /api/animales/hierro-similar',
                     'estadisticas': 'GET /api/animales/estadisticas',
                     'por_hacienda': 'GET /api/animales/por-hacienda/{id}',
                     'estados': 'GET /api/animales/estados',
                     'hembras_reproductivas': 'GET /api/animales/hembras-reproductivas',
                     'preñadas': 'GET /api/animales/preñadas',
-                    'validar_hierro': 'POST /api/animales/validar-hierro'
+                    'validar_hierro': 'POST /api/animales/validar-hierro',
+                    'ancestros': 'GET /api/animales/{id}/ancestros',
+                    'descendientes': 'GET /api/animales/{id}/descendientes',
+                    'consanguinidad': 'GET /api/animales/{id}/consanguinidad',
+                    'parientes': 'GET /api/animales/{id}/parientes'
                 },
                 'vacunacion': {
                     'catalogo_vacunas': {
@@ -147,13 +226,22 @@ def create_app():
                         'listar': 'GET /api/vacunacion/aplicaciones/',
                         'registrar': 'POST /api/vacunacion/aplicaciones/',
                         'eliminar': 'DELETE /api/vacunacion/aplicaciones/{id}',
-                        'por_animal': 'GET /api/vacunacion/animal/{id}'
+                        'por_animal': 'GET /api/vacunacion/animal/{id}',
+                        'campana': 'POST /api/vacunacion/campanas'
+                    },
+                    'inventario': {
+                        'listar_lotes': 'GET /api/vacunacion/lotes/',
+                        'crear_lote': 'POST /api/vacunacion/lotes/',
+                        'alertas': 'GET /api/vacunacion/lotes/alertas'
                     },
                     'gestion': {
                         'proximas_dosis': 'GET /api/vacunacion/proximas-dosis',
                         'dosis_vencidas': 'GET /api/vacunacion/dosis-vencidas',
                         'estadisticas': 'GET /api/vacunacion/estadisticas',
-                        'calendario': 'GET /api/vacunacion/reporte/calendario-vacunacion'
+                        'calendario': 'GET /api/vacunacion/reporte/calendario-vacunacion',
+                        'jornadas': 'GET /api/vacunacion/reporte/jornadas',
+                        'cumplimiento': 'GET /api/vacunacion/reporte/cumplimiento',
+                        'cumplimiento_resumen': 'GET /api/vacunacion/reporte/cumplimiento/resumen'
                     }
                 },
                 'nacimientos': {
@@ -174,62 +262,72 @@ def create_app():
                     'reporte_resumen': 'GET /api/nacimientos/reporte/resumen',
                     'validar_animales': 'POST /api/nacimientos/validar-animales'
                 },
+                'tareas': {
+                    'por_hacienda': 'GET /api/tareas/por-hacienda/{id}'
+                },
                 'utilidades': {
+                    'batch': 'POST /api/batch',
                     'health': 'GET /api/health',
+                    'health_live': 'GET /api/health/live',
+                    'health_ready': 'GET /api/health/ready',
                     'stats': 'GET /api/stats'
                 }
             }
         }), 200
     
+    # Sondas de vida y disponibilidad (balanceador de carga)
+    @app.route('/api/health/live', methods=['GET'])
+    def health_live():
+        """El proceso responde; no toca la base de datos"""
+        return jsonify({
+            'status': 'OK',
+            'timestamp': datetime.now().isoformat()
+        }), 200
+    
+    @app.route('/api/health/ready', methods=['GET'])
+    def health_ready():
+        """El pool de conexiones entrega una conexión válida"""
+        try:
+            db.session.execute(text('SELECT 1'))
+            return jsonify({
+                'status': 'OK',
+                'timestamp': datetime.now().isoformat(),
+                'database': {
+                    'connected': True
+                }
+            }), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({
+                'status': 'ERROR',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat(),
+                'database': {
+                    'connected': False
+                }
+            }), 503
+    
     # Ruta de verificación de salud (CON TODAS LAS ESTADÍSTICAS + NACIMIENTOS)
+    # Los conteos vienen de una instantánea refrescada en segundo plano
     @app.route('/api/health', methods=['GET'])
     def health_check():
         try:
-            # Verificar conexión a la base de datos
-            total_usuarios = Usuario.query.count()
-            total_roles = RolUsuario.query.count()
-            total_haciendas = Hacienda.query.count()
-            usuarios_activos = Usuario.query.filter_by(activo=True).count()
-            haciendas_activas = Hacienda.query.filter_by(activo=True).count()
-            
-            # Estadísticas de animales
-            total_animales = Animal.query.count()
-            total_estados = EstadoAnimal.query.count()
-            animales_activos = Animal.query.join(EstadoAnimal).filter(
-                EstadoAnimal.nombre_estado == 'Activo'
-            ).count()
-            
-            # Estadísticas de vacunación
-            total_vacunas = CatalogoVacuna.query.count()
-            vacunas_activas = CatalogoVacuna.query.filter_by(activo=True).count()
-            total_vacunaciones = VacunacionAnimal.query.count()
-            
-            # Estadísticas de nacimientos (NUEVO)
-            total_nacimientos = Nacimiento.query.count()
-            nacimientos_ultimo_mes = Nacimiento.obtener_recientes(30)
-            crias_sin_vacunar = Nacimiento.obtener_crias_sin_vacunar()
+            database, instantanea = InstantaneasService.obtener(
+                'salud',
+                app.config['ESTADISTICAS_REFRESCO_SEGUNDOS'],
+                app.config['ESTADISTICAS_EDAD_MAXIMA_SEGUNDOS']
+            )
             
             return jsonify({
                 'status': 'OK',
                 'message': 'API funcionando correctamente',
                 'timestamp': datetime.now().isoformat(),
-                'database': {
-                    'connected': True,
-                    'usuarios_total': total_usuarios,
-                    'usuarios_activos': usuarios_activos,
-                    'roles': total_roles,
-                    'haciendas_total': total_haciendas,
-                    'haciendas_activas': haciendas_activas,
-                    'animales_total': total_animales,
-                    'animales_activos': animales_activos,
-                    'estados_animal': total_estados,
-                    'vacunas_total': total_vacunas,
-                    'vacunas_activas': vacunas_activas,
-                    'vacunaciones_total': total_vacunaciones,
-                    'nacimientos_total': total_nacimientos,
-                    'nacimientos_ultimo_mes': len(nacimientos_ultimo_mes),
-                    'crias_pendientes_vacunacion': len(crias_sin_vacunar)
-                },
+                'database': database,
+                'snapshot': instantanea,
+                'cache': CacheService.metricas(),
+                'coalescencia': CoalescenciaService.metricas(),
+                'alertas': AlertasService.metricas(),
+                'consanguinidad': ConsanguinidadService.metricas(),
                 'services': {
                     'auth': 'active',
                     'usuarios': 'active',
@@ -255,51 +353,120 @@ def create_app():
     @app.route('/api/stats', methods=['GET'])
     def stats():
         try:
-            stats_data = {
-                'usuarios': {
-                    'total': Usuario.query.count(),
-                    'activos': Usuario.query.filter_by(activo=True).count(),
-                    'inactivos': Usuario.query.filter_by(activo=False).count()
-                },
-                'roles': {
-                    'total': RolUsuario.query.count(),
-                    'activos': RolUsuario.query.filter_by(activo=True).count()
-                },
-                'haciendas': {
-                    'total': Hacienda.query.count(),
-                    'activas': Hacienda.query.filter_by(activo=True).count(),
-                    'inactivas': Hacienda.query.filter_by(activo=False).count()
-                },
-                'animales': {
-                    'total': Animal.query.count(),
-                    'machos': Animal.query.filter_by(sexo='Macho').count(),
-                    'hembras': Animal.query.filter_by(sexo='Hembra').count(),
-                    'preñadas': Animal.query.filter_by(sexo='Hembra', preñada=True).count()
-                },
-                'vacunacion': {
-                    'total_vacunas': CatalogoVacuna.query.count(),
-                    'vacunas_activas': CatalogoVacuna.query.filter_by(activo=True).count(),
-                    'total_vacunaciones': VacunacionAnimal.query.count()
-                },
-                'nacimientos': {
-                    'total_nacimientos': Nacimiento.query.count(),
-                    'nacimientos_ultimo_mes': len(Nacimiento.obtener_recientes(30)),
-                    'crias_sin_vacunar': len(Nacimiento.obtener_crias_sin_vacunar()),
-                    'nacimientos_este_año': Nacimiento.query.filter(
-                        Nacimiento.fecha_nacimiento >= datetime(datetime.now().year, 1, 1).date()
-                    ).count()
-                },
-                'timestamp': datetime.now().isoformat()
-            }
-            return jsonify(stats_data), 200
+            # Un bloque de agregación condicional por tabla, servido desde la instantánea
+            stats_data, instantanea = InstantaneasService.obtener(
+                'estadisticas',
+                app.config['ESTADISTICAS_REFRESCO_SEGUNDOS'],
+                app.config['ESTADISTICAS_EDAD_MAXIMA_SEGUNDOS']
+            )
+            return jsonify(dict(stats_data, snapshot=instantanea)), 200
         except Exception as e:
             return jsonify({
                 'error': f'Error obteniendo estadísticas: {str(e)}',
                 'status': 'error'
             }), 500
     
+    # Comandos de mantenimiento (flask <comando>)
+    @app.cli.command('reindexar-busqueda')
+    def reindexar_busqueda():
+        """Reconstruye el índice de búsqueda de texto"""
+        total = BusquedaService.reconstruir_indice()
+        print(f"✅ Índice de búsqueda reconstruido: {total} términos")
+    
+    @app.cli.command('verificar-indices')
+    def verificar_indices():
+        """Verifica con EXPLAIN que las consultas frecuentes usen sus índices"""
+        resultados = IndicesService.verificar_planes()
+        fallidas = [r for r in resultados if not r['usa_indice']]
+        
+        for resultado in resultados:
+            marca = '✅' if resultado['usa_indice'] else '❌'
+            print(f"{marca} {resultado['consulta']} -> {resultado['indice_esperado']}")
+            if not resultado['usa_indice']:
+                for fila in resultado['plan']:
+                    print(f"      {fila}")
+                if resultado.get('error'):
+                    print(f"      Error: {resultado['error']}")
+        
+        if fallidas:
+            raise SystemExit(1)
+    
+    @app.cli.command('reconciliar-resumen')
+    def reconciliar_resumen():
+        """Recalcula el resumen materializado de las haciendas"""
+        total = ResumenService.reconciliar()
+        print(f"✅ Resumen reconciliado: {total} haciendas")
+    
+    @app.cli.command('reconciliar-estado-vacunacion')
+    def reconciliar_estado_vacunacion():
+        """Reconstruye el estado de vacunación por animal y vacuna"""
+        total = EstadoVacunacionService.reconciliar()
+        print(f"✅ Estado de vacunación reconciliado: {total} pares animal/vacuna")
+    
+    @app.cli.command('materializar-alertas')
+    def materializar_alertas():
+        """Reconstruye la instantánea de alertas de vacunación"""
+        total = AlertasService.materializar()
+        print(f"✅ Alertas materializadas: {total} entradas")
+    
+    @app.cli.command('reconciliar-tareas-pendientes')
+    def reconciliar_tareas_pendientes():
+        """Reconstruye el índice de tareas pendientes por hacienda"""
+        total = TareasPendientesService.reconciliar()
+        print(f"✅ Tareas pendientes reconciliadas: {total} tareas")
+    
+    @app.cli.command('reconciliar-genealogia')
+    def reconciliar_genealogia():
+        """Reconstruye el cierre transitivo del pedigrí"""
+        total = GenealogiaService.reconciliar()
+        print(f"✅ Genealogía reconciliada: {total} pares ancestro/descendiente")
+    
+    # Tareas de mantenimiento en segundo plano (flask run, gunicorn o cualquier servidor WSGI)
+    if (app.config.get('TAREAS_PERIODICAS_HABILITADAS', True)
+            and not es_proceso_padre_del_recargador(app)
+            and not es_comando_de_la_cli()):
+        iniciar_tareas_periodicas(app)
+    
     return app
 
+def es_proceso_padre_del_recargador(app):
+    """Con el recargador de debug solo el proceso hijo (WERKZEUG_RUN_MAIN) sirve peticiones"""
+    return app.debug and not is_running_from_reloader()
+
+def es_comando_de_la_cli():
+    """Comando de `flask` que no sirve peticiones (db upgrade, reconciliar-*, verificar-indices...)"""
+    contexto = click.get_current_context(silent=True)
+    return contexto is not None and contexto.info_name != 'run'
+
+def iniciar_tareas_periodicas(app):
+    """Arranca las tareas de mantenimiento en segundo plano"""
+    TareasService.registrar(
+        app,
+        'reconciliar-resumen',
+        app.config['RESUMEN_RECONCILIACION_SEGUNDOS'],
+        ResumenService.reconciliar,
+        un_proceso=True
+    )
+    TareasService.registrar(
+        app,
+        'refrescar-instantaneas',
+        app.config['ESTADISTICAS_REFRESCO_SEGUNDOS'],
+        InstantaneasService.refrescar_todas,
+        ejecutar_al_iniciar=True
+    )
+    TareasService.registrar(
+        app,
+        'materializar-alertas',
+        app.config['ALERTAS_MATERIALIZACION_SEGUNDOS'],
+        AlertasService.materializar
+    )
+    TareasService.registrar(
+        app,
+        'reconciliar-tareas-pendientes',
+        app.config['TAREAS_PENDIENTES_RECONCILIACION_SEGUNDOS'],
+        TareasPendientesService.reconciliar
+    )
+
 def inicializar_datos_por_defecto():
     """Inicializa roles, usuario administrador y datos de ejemplo (COMPLETO + NACIMIENTOS)"""
     try:
@@ -325,12 +492,40 @@ def inicializar_datos_por_defecto():
         if Hacienda.crear_hacienda_ejemplo():
             print("✅ Hacienda de ejemplo creada/verificada")
         
+        # Construir el índice de búsqueda si la base de datos ya tenía registros
+        terminos = BusquedaService.reconstruir_si_vacio()
+        if terminos:
+            print(f"✅ Índice de búsqueda construido ({terminos} términos)")
+        
+        # Construir el resumen materializado de las haciendas
+        haciendas = ResumenService.reconciliar_si_vacio()
+        if haciendas:
+            print(f"✅ Resumen de haciendas construido ({haciendas} haciendas)")
+        
+        # Construir el estado de vacunación por animal y vacuna
+        pares = EstadoVacunacionService.reconciliar_si_vacio()
+        if pares:
+            print(f"✅ Estado de vacunación construido ({pares} pares animal/vacuna)")
+        
+        # Construir el índice de tareas pendientes por hacienda
+        tareas = TareasPendientesService.reconciliar_si_vacio()
+        if tareas:
+            print(f"✅ Índice de tareas pendientes construido ({tareas} tareas)")
+        
+        # Construir el cierre del pedigrí
+        pares_genealogia = GenealogiaService.reconciliar_si_vacio()
+        if pares_genealogia:
+            print(f"✅ Genealogía construida ({pares_genealogia} pares ancestro/descendiente)")
+        
         print("🎉 Inicialización completada exitosamente")
         
     except Exception as e:
         print(f"❌ Error en inicialización: {e}")
 
 if __name__ == '__main__':
+    # app.run(debug=True) usa el recargador: create_app debe saberlo para no arrancar
+    # las tareas periódicas en el proceso padre
+    os.environ['FLASK_DEBUG'] = '1'
     app = create_app()
     
     # Crear tablas y datos por defecto
@@ -355,6 +550,7 @@ if __name__ == '__main__':
     print("="*80)
     print("📍 API disponible en: http://localhost:5000")
     print("🏥 Health check: http://localhost:5000/api/health")
+    print("💓 Sondas: http://localhost:5000/api/health/live | /api/health/ready")
     print("📊 Estadísticas: http://localhost:5000/api/stats")
     print("📚 Documentación: http://localhost:5000")
     print("")
@@ -377,6 +573,7 @@ if __name__ == '__main__':
     print("   ➕ Crear: POST /api/animales/")
     print("   📊 Estadísticas: GET /api/animales/estadisticas")
     print("   🤱 Preñadas: GET /api/animales/preñadas")
+    print("   🌳 Ancestros: GET /api/animales/{id}/ancestros")
     print("")
     print("💉 SISTEMA DE VACUNACIÓN:")
     print("   📋 Catálogo: GET /api/vacunacion/vacunas/")
@@ -384,10 +581,14 @@ if __name__ == '__main__':
     print("   💉 Aplicaciones: GET /api/vacunacion/aplicaciones/")
     print("   📝 Registrar: POST /api/vacunacion/aplicaciones/")
     print("   🐄 Por Animal: GET /api/vacunacion/animal/{id}")
+    print("   🚜 Campaña: POST /api/vacunacion/campanas")
+    print("   📦 Lotes: GET /api/vacunacion/lotes/")
     print("   📅 Próximas: GET /api/vacunacion/proximas-dosis")
     print("   ⚠️ Vencidas: GET /api/vacunacion/dosis-vencidas")
     print("   📊 Estadísticas: GET /api/vacunacion/estadisticas")
     print("   📅 Calendario: GET /api/vacunacion/reporte/calendario-vacunacion")
+    print("   🚚 Jornadas: GET /api/vacunacion/reporte/jornadas")
+    print("   📑 Cumplimiento: GET /api/vacunacion/reporte/cumplimiento")
     print("")
     print("🍼 SISTEMA DE NACIMIENTOS (NUEVO):")
     print("   📋 Listar: GET /api/nacimientos/")
@@ -61,6 +61,75 @@ class Config:
     # Configuración de cache
     CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
+    CACHE_MAX_ENTRADAS = int(os.getenv('CACHE_MAX_ENTRADAS', 1000))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')  # CACHE_TYPE=redis
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'raciones:')
+    # Cache en memoria: cada cuánto se releen las versiones (versiones_tabla) que entran en
+    # la clave, para no servir resultados que otro proceso ya invalidó
+    CACHE_VERIFICACION_SEGUNDOS = int(os.getenv('CACHE_VERIFICACION_SEGUNDOS', 10))
+    
+    # Revocación de tokens: cada proceso relee las revocaciones de los demás (tabla
+    # tokens_revocados) como mucho cada tantos segundos
+    AUTH_REVOCACION_VERIFICACION_SEGUNDOS = int(os.getenv('AUTH_REVOCACION_VERIFICACION_SEGUNDOS', 30))
+    
+    # Configuración de tareas periódicas
+    TAREAS_PERIODICAS_HABILITADAS = os.getenv('TAREAS_PERIODICAS_HABILITADAS', 'true').lower() == 'true'
+    RESUMEN_RECONCILIACION_SEGUNDOS = int(os.getenv('RESUMEN_RECONCILIACION_SEGUNDOS', 3600))
+    
+    # Instantáneas de /api/health y /api/stats: refresco en segundo plano y edad
+    # a partir de la cual la petición la regenera (si la tarea no está corriendo)
+    ESTADISTICAS_REFRESCO_SEGUNDOS = int(os.getenv('ESTADISTICAS_REFRESCO_SEGUNDOS', 30))
+    ESTADISTICAS_EDAD_MAXIMA_SEGUNDOS = int(os.getenv('ESTADISTICAS_EDAD_MAXIMA_SEGUNDOS', 300))
+    
+    # Registro de tablas de referencia: cada cuánto se revisan cambios de otros procesos
+    REFERENCIAS_VERIFICACION_SEGUNDOS = int(os.getenv('REFERENCIAS_VERIFICACION_SEGUNDOS', 60))
+    
+    # Coalescencia de peticiones idénticas: espera máxima por el cálculo compartido
+    # y segundos que la respuesta se reutiliza después (0 = solo peticiones simultáneas)
+    COALESCENCIA_ESPERA_SEGUNDOS = int(os.getenv('COALESCENCIA_ESPERA_SEGUNDOS', 30))
+    COALESCENCIA_REUTILIZAR_SEGUNDOS = int(os.getenv('COALESCENCIA_REUTILIZAR_SEGUNDOS', 2))
+    
+    # Respuestas: compresión gzip/brotli negociada (brotli y orjson son opcionales:
+    # pip install brotli orjson) y streaming de respuestas con listas grandes
+    RESPUESTAS_COMPRESION_HABILITADA = os.getenv('RESPUESTAS_COMPRESION_HABILITADA', 'true').lower() == 'true'
+    RESPUESTAS_COMPRESION_MINIMO_BYTES = int(os.getenv('RESPUESTAS_COMPRESION_MINIMO_BYTES', 1024))
+    RESPUESTAS_NIVEL_GZIP = int(os.getenv('RESPUESTAS_NIVEL_GZIP', 5))
+    RESPUESTAS_STREAMING_MINIMO_ELEMENTOS = int(os.getenv('RESPUESTAS_STREAMING_MINIMO_ELEMENTOS', 1000))
+    
+    # /api/batch: operaciones por petición
+    BATCH_MAX_OPERACIONES = int(os.getenv('BATCH_MAX_OPERACIONES', 25))
+    
+    # Alertas de vacunación: reconstrucción completa (diaria), días de próximas dosis
+    # que se mantienen en memoria y revisión de escrituras hechas por otros procesos
+    ALERTAS_MATERIALIZACION_SEGUNDOS = int(os.getenv('ALERTAS_MATERIALIZACION_SEGUNDOS', 86400))
+    ALERTAS_DIAS_ANTICIPACION = int(os.getenv('ALERTAS_DIAS_ANTICIPACION', 30))
+    ALERTAS_VERIFICACION_SEGUNDOS = int(os.getenv('ALERTAS_VERIFICACION_SEGUNDOS', 60))
+    
+    # Índice de tareas pendientes: reconstrucción diaria (retira hembras fuera de edad reproductiva)
+    TAREAS_PENDIENTES_RECONCILIACION_SEGUNDOS = int(os.getenv('TAREAS_PENDIENTES_RECONCILIACION_SEGUNDOS', 86400))
+    
+    # Jornadas de vacunación: horizonte, ventana aceptable de cada dosis y dosis por visita
+    JORNADAS_DIAS_HORIZONTE = int(os.getenv('JORNADAS_DIAS_HORIZONTE', 60))
+    JORNADAS_DIAS_ANTES = int(os.getenv('JORNADAS_DIAS_ANTES', 7))
+    JORNADAS_DIAS_DESPUES = int(os.getenv('JORNADAS_DIAS_DESPUES', 14))
+    JORNADAS_CAPACIDAD_VISITA = int(os.getenv('JORNADAS_CAPACIDAD_VISITA', 300))
+    
+    # Inventario de lotes: dosis vigentes mínimas por hacienda y vacuna, aviso de vencimiento
+    # y animales por campaña de vacunación
+    INVENTARIO_STOCK_MINIMO = int(os.getenv('INVENTARIO_STOCK_MINIMO', 20))
+    INVENTARIO_DIAS_ALERTA_VENCIMIENTO = int(os.getenv('INVENTARIO_DIAS_ALERTA_VENCIMIENTO', 30))
+    VACUNACION_CAMPANA_MAX_ANIMALES = int(os.getenv('VACUNACION_CAMPANA_MAX_ANIMALES', 5000))
+    
+    # Genealogía: tope de generaciones al reconstruir el cierre del pedigrí
+    GENEALOGIA_PROFUNDIDAD_MAXIMA = int(os.getenv('GENEALOGIA_PROFUNDIDAD_MAXIMA', 64))
+    
+    # Consanguinidad: revisión de nacimientos registrados por otros procesos
+    CONSANGUINIDAD_VERIFICACION_SEGUNDOS = int(os.getenv('CONSANGUINIDAD_VERIFICACION_SEGUNDOS', 60))
+    
+    # Plan de monta: vacas por toro y consanguinidad esperada máxima de la cría
+    MONTA_MAX_VACAS_POR_TORO = int(os.getenv('MONTA_MAX_VACAS_POR_TORO', 40))
+    MONTA_CONSANGUINIDAD_MAXIMA = float(os.getenv('MONTA_CONSANGUINIDAD_MAXIMA', 0.0625))
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo"""
@@ -123,6 +192,10 @@ class TestingConfig(Config):
     
     # Cache simple para tests
     CACHE_TYPE = 'null'
+    COALESCENCIA_REUTILIZAR_SEGUNDOS = 0
+    
+    # Sin tareas en segundo plano durante los tests
+    TAREAS_PERIODICAS_HABILITADAS = False
 
 class DockerConfig(Config):
     """Configuración para contenedores Docker"""
@@ -0,0 +1,28 @@
+"""sufijos de identificadores en busqueda
+
+Los identificadores (hierro, NIT, registro, lote) ahora se indexan con sus sufijos.
+Vacía indice_busqueda para que se reconstruya al iniciar la aplicación
+(o con `flask reindexar-busqueda`).
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 06:12:41.530217
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('DELETE FROM indice_busqueda')
+
+
+def downgrade():
+    # El índice son datos derivados: se reconstruye con `flask reindexar-busqueda`
+    pass
@@ -13,6 +13,15 @@ from .nacimiento import Nacimiento
 from .nrc import NrcLactanciaBase, NrcProduccionLeche, NrcGestacion, NrcCeba
 from .ingredientes import Departamento, Municipio, ConsultaBromatologica, Ingrediente, CaracteristicaNutricional
 from .raciones import RacionLactancia, RacionCeba, DetalleRacionLactancia, DetalleRacionCeba
+from .busqueda import IndiceBusqueda
+from .resumen import ResumenHaciendaConteo, ResumenHacienda, ResumenHaciendaFecha
+from .versiones import VersionTabla
+from .estado_vacunacion import EstadoVacunacionAnimal
+from .tarea_pendiente import TareaPendiente
+from .lote_vacuna import LoteVacuna
+from .genealogia import GenealogiaCierre
+from .token_revocado import TokenRevocado
+from .turno_tarea import TurnoTarea
 # Hacer disponibles los modelos cuando se importe el paquete
 __all__ = [
     'db',
@@ -42,5 +51,34 @@ __all__ = [
     'RacionLactancia',
     'RacionCeba',
     'DetalleRacionLactancia',
-    'DetalleRacionCeba'
+    'DetalleRacionCeba',
+    
+    # Índice de búsqueda de texto
+    'IndiceBusqueda',
+    
+    # Resúmenes materializados
+    'ResumenHaciendaConteo',
+    'ResumenHacienda',
+    'ResumenHaciendaFecha',
+    
+    # Versiones de cambios (ETag)
+    'VersionTabla',
+    
+    # Estado de vacunación por animal y vacuna
+    'EstadoVacunacionAnimal',
+    
+    # Índice de tareas pendientes por hacienda
+    'TareaPendiente',
+    
+    # Inventario de lotes de vacuna
+    'LoteVacuna',
+    
+    # Cierre transitivo del pedigrí
+    'GenealogiaCierre',
+    
+    # Revocación de tokens compartida entre procesos
+    'TokenRevocado',
+    
+    # Turnos de las tareas periódicas de un solo proceso
+    'TurnoTarea'
 ]
\ No newline at end of file
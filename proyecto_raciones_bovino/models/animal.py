@@ -1,6 +1,6 @@
 from . import db
 from datetime import datetime, date, timedelta
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, and_, func, case, select
 
 class Animal(db.Model):
     """
@@ -27,9 +27,10 @@ class Animal(db.Model):
     observaciones = db.Column(db.Text)
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Constraint único para hierro por hacienda
+    # Constraint único para hierro por hacienda e índice para los filtros por hacienda
     __table_args__ = (
         db.UniqueConstraint('idhacienda', 'hierro', name='unique_hierro_hacienda'),
+        db.Index('ix_animales_hacienda_estado_sexo', 'idhacienda', 'idestado', 'sexo', 'preñada'),
     )
     
     # Relación con vacunaciones
@@ -53,6 +54,8 @@ class Animal(db.Model):
     
     def to_dict(self, include_sensitive=False, include_vacunacion=False, include_nacimientos=False):
         """Convierte el objeto a diccionario para JSON"""
+        from services.referencias_service import ReferenciasService
+
         data = {
             'idanimal': self.idanimal,
             'idhacienda': self.idhacienda,
@@ -72,15 +75,16 @@ class Animal(db.Model):
             'fecha_registro': self.fecha_registro.isoformat() if self.fecha_registro else None,
             # Información relacionada
             'hacienda_nombre': self.hacienda.nombre if self.hacienda else None,
-            'estado_nombre': self.estado.nombre_estado if self.estado else None,
+            'estado_nombre': ReferenciasService.nombre_estado(self.idestado),
             'edad_aproximada': self.calcular_edad()
         }
         
         # Incluir información de vacunación si se solicita
         if include_vacunacion:
-            data['estadisticas_vacunacion'] = self.estadisticas_vacunacion()
-            data['proximas_vacunas'] = len(self.obtener_proximas_vacunas(30))
-            data['total_vacunaciones'] = len(self.vacunaciones) if self.vacunaciones else 0
+            estadisticas = self.estadisticas_vacunacion()
+            data['estadisticas_vacunacion'] = estadisticas
+            data['proximas_vacunas'] = estadisticas['proximas_30_dias']
+            data['total_vacunaciones'] = estadisticas['total_vacunaciones']
         
         # NUEVA: Incluir información de nacimientos si se solicita
         if include_nacimientos:
@@ -372,9 +376,15 @@ class Animal(db.Model):
             )
         ).order_by(VacunacionAnimal.fecha_aplicacion.desc()).first()
     
-    def necesita_vacuna(self, idvacuna, dias_anticipacion=30):
-        """Verifica si el animal necesita una vacuna específica"""
-        ultima_vacunacion = self.obtener_ultima_vacunacion(idvacuna)
+    def necesita_vacuna(self, idvacuna, dias_anticipacion=30, ultima_vacunacion=None):
+        """
+        Verifica si el animal necesita una vacuna específica
+        ultima_vacunacion: fila de estado ya leída (evita la consulta)
+        """
+        from services.estado_vacunacion_service import EstadoVacunacionService
+        
+        if ultima_vacunacion is None:
+            ultima_vacunacion = EstadoVacunacionService.obtener(self.idanimal, idvacuna)
         
         if not ultima_vacunacion:
             return True, "Nunca ha sido vacunado"
@@ -398,32 +408,37 @@ class Animal(db.Model):
     
     def obtener_calendario_vacunacion(self, meses_adelante=12):
         """Obtiene el calendario de vacunación del animal"""
-        from .vacunacion_animal import VacunacionAnimal
-        from .catalogo_vacuna import CatalogoVacuna
+        from services.referencias_service import ReferenciasService
+        from services.estado_vacunacion_service import EstadoVacunacionService
         
         fecha_limite = date.today() + timedelta(days=meses_adelante * 30)
         
-        # Obtener todas las vacunas activas
-        vacunas_activas = CatalogoVacuna.obtener_activas()
+        # Vacunas activas, desde el registro de referencias
+        vacunas_activas = [
+            vacuna for vacuna in ReferenciasService.todos('catalogo_vacunas') if vacuna['activo']
+        ]
+        
+        # Última aplicación de cada vacuna: una sola lectura de la tabla de estado
+        estados = EstadoVacunacionService.por_animal(self.idanimal)
         
         calendario = []
         
         for vacuna in vacunas_activas:
-            ultima_vacunacion = self.obtener_ultima_vacunacion(vacuna.idvacuna)
+            ultima_vacunacion = estados.get(vacuna['idvacuna'])
             
             if ultima_vacunacion and ultima_vacunacion.proxima_dosis:
                 if ultima_vacunacion.proxima_dosis <= fecha_limite:
                     calendario.append({
-                        'vacuna': vacuna.to_dict(),
+                        'vacuna': dict(vacuna),
                         'fecha_programada': ultima_vacunacion.proxima_dosis.isoformat(),
-                        'ultima_aplicacion': ultima_vacunacion.fecha_aplicacion.isoformat(),
-                        'estado': self.necesita_vacuna(vacuna.idvacuna)[1],
+                        'ultima_aplicacion': ultima_vacunacion.fecha_ultima_aplicacion.isoformat(),
+                        'estado': self.necesita_vacuna(vacuna['idvacuna'], ultima_vacunacion=ultima_vacunacion)[1],
                         'urgencia': self._calcular_urgencia_vacuna(ultima_vacunacion.proxima_dosis)
                     })
             else:
                 # Animal nunca vacunado con esta vacuna
                 calendario.append({
-                    'vacuna': vacuna.to_dict(),
+                    'vacuna': dict(vacuna),
                     'fecha_programada': None,
                     'ultima_aplicacion': None,
                     'estado': 'Nunca vacunado',
@@ -458,61 +473,72 @@ class Animal(db.Model):
     def estadisticas_vacunacion(self):
         """Obtiene estadísticas de vacunación del animal"""
         from .vacunacion_animal import VacunacionAnimal
+        from services.referencias_service import ReferenciasService
+        from services.estado_vacunacion_service import EstadoVacunacionService
         
-        total_vacunaciones = VacunacionAnimal.query.filter_by(idanimal=self.idanimal).count()
-        
-        # Próximas en 30 días
-        proximas = len(self.obtener_proximas_vacunas(30))
-        
-        # Vencidas
-        vencidas = len(self.obtener_vacunas_vencidas())
+        hoy = date.today()
+        inicio_año = date(hoy.year, 1, 1)
         
-        # Última vacunación
-        ultima_vacunacion = VacunacionAnimal.query.filter_by(
-            idanimal=self.idanimal
-        ).order_by(VacunacionAnimal.fecha_aplicacion.desc()).first()
+        def contar(condicion):
+            return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
         
-        # Vacunas aplicadas este año
-        inicio_año = date(date.today().year, 1, 1)
-        vacunaciones_año = VacunacionAnimal.query.filter(
-            and_(
-                VacunacionAnimal.idanimal == self.idanimal,
-                VacunacionAnimal.fecha_aplicacion >= inicio_año
-            )
-        ).count()
+        # Total, próximas en 30 días, vencidas y del año en una sola pasada por el animal
+        conteos = db.session.execute(
+            select(
+                func.count(VacunacionAnimal.idvacunacion).label('total'),
+                contar(and_(
+                    VacunacionAnimal.proxima_dosis.isnot(None),
+                    VacunacionAnimal.proxima_dosis <= hoy + timedelta(days=30)
+                )).label('proximas'),
+                contar(and_(
+                    VacunacionAnimal.proxima_dosis.isnot(None),
+                    VacunacionAnimal.proxima_dosis < hoy
+                )).label('vencidas'),
+                contar(VacunacionAnimal.fecha_aplicacion >= inicio_año).label('este_año')
+            ).where(VacunacionAnimal.idanimal == self.idanimal)
+        ).one()
+        
+        # Última vacunación: la más reciente de las últimas aplicaciones por vacuna
+        ultima_vacunacion = max(
+            EstadoVacunacionService.por_animal(self.idanimal).values(),
+            key=lambda fila: (fila.fecha_ultima_aplicacion, fila.idvacunacion),
+            default=None
+        )
         
         return {
-            'total_vacunaciones': total_vacunaciones,
-            'proximas_30_dias': proximas,
-            'dosis_vencidas': vencidas,
-            'vacunaciones_este_año': vacunaciones_año,
+            'total_vacunaciones': conteos.total,
+            'proximas_30_dias': int(conteos.proximas),
+            'dosis_vencidas': int(conteos.vencidas),
+            'vacunaciones_este_año': int(conteos.este_año),
             'ultima_vacunacion': {
-                'fecha': ultima_vacunacion.fecha_aplicacion.isoformat() if ultima_vacunacion else None,
-                'vacuna': ultima_vacunacion.vacuna.nombre_vacuna if ultima_vacunacion and ultima_vacunacion.vacuna else None
+                'fecha': ultima_vacunacion.fecha_ultima_aplicacion.isoformat() if ultima_vacunacion else None,
+                'vacuna': ReferenciasService.nombre('catalogo_vacunas', ultima_vacunacion.idvacuna) if ultima_vacunacion else None
             }
         }
     
     def obtener_historial_vacunacion_completo(self):
         """Obtiene el historial completo de vacunación organizado por vacuna"""
         from .vacunacion_animal import VacunacionAnimal
-        from .catalogo_vacuna import CatalogoVacuna
+        from services.referencias_service import ReferenciasService
         
-        # Obtener todas las vacunaciones del animal
+        # Obtener todas las vacunaciones del animal; el orden por nombre de vacuna
+        # se aplica con el registro de referencias en lugar de unir el catálogo
         vacunaciones = VacunacionAnimal.query.filter_by(
             idanimal=self.idanimal
-        ).join(CatalogoVacuna).order_by(
-            CatalogoVacuna.nombre_vacuna,
+        ).order_by(
             VacunacionAnimal.fecha_aplicacion.desc()
         ).all()
+        vacunaciones.sort(key=lambda v: ReferenciasService.nombre('catalogo_vacunas', v.idvacuna).casefold())
         
         # Agrupar por vacuna
         historial = {}
         for vacunacion in vacunaciones:
-            vacuna_nombre = vacunacion.vacuna.nombre_vacuna
+            vacuna = ReferenciasService.vacuna(vacunacion.idvacuna)
+            vacuna_nombre = vacuna['nombre_vacuna']
             
             if vacuna_nombre not in historial:
                 historial[vacuna_nombre] = {
-                    'vacuna': vacunacion.vacuna.to_dict(),
+                    'vacuna': dict(vacuna),
                     'aplicaciones': [],
                     'total_aplicaciones': 0,
                     'ultima_aplicacion': None,
@@ -574,144 +600,23 @@ class Animal(db.Model):
     @staticmethod
     def obtener_estadisticas_hacienda(hacienda_id):
         """Obtiene estadísticas de animales por hacienda (ACTUALIZADO CON NACIMIENTOS)"""
-        total = Animal.query.filter_by(idhacienda=hacienda_id).count()
-        
-        # Por sexo
-        machos = Animal.query.filter_by(idhacienda=hacienda_id, sexo='Macho').count()
-        hembras = Animal.query.filter_by(idhacienda=hacienda_id, sexo='Hembra').count()
-        
-        # Por estado
-        por_estado = db.session.query(
-            Animal.idestado,
-            func.count(Animal.idanimal).label('cantidad')
-        ).filter_by(idhacienda=hacienda_id).group_by(Animal.idestado).all()
-        
-        # Hembras preñadas
-        preñadas = Animal.query.filter_by(
-            idhacienda=hacienda_id,
-            sexo='Hembra',
-            preñada=True
-        ).count()
-        
-        # Peso promedio
-        peso_promedio = db.session.query(
-            func.avg(Animal.peso_actual)
-        ).filter(
-            and_(Animal.idhacienda == hacienda_id, Animal.peso_actual.isnot(None))
-        ).scalar()
-        
-        # Estadísticas de vacunación
-        try:
-            from .vacunacion_animal import VacunacionAnimal
-            
-            total_vacunaciones = db.session.query(
-                func.count(VacunacionAnimal.idvacunacion)
-            ).join(Animal).filter(Animal.idhacienda == hacienda_id).scalar() or 0
-            
-            animales_al_dia = db.session.query(
-                func.count(func.distinct(Animal.idanimal))
-            ).outerjoin(VacunacionAnimal).filter(
-                and_(
-                    Animal.idhacienda == hacienda_id,
-                    or_(
-                        VacunacionAnimal.proxima_dosis.is_(None),
-                        VacunacionAnimal.proxima_dosis >= date.today()
-                    )
-                )
-            ).scalar() or 0
-            
-            proximas_vacunaciones = db.session.query(
-                func.count(VacunacionAnimal.idvacunacion)
-            ).join(Animal).filter(
-                and_(
-                    Animal.idhacienda == hacienda_id,
-                    VacunacionAnimal.proxima_dosis.isnot(None),
-                    VacunacionAnimal.proxima_dosis <= date.today() + timedelta(days=30),
-                    VacunacionAnimal.proxima_dosis >= date.today()
-                )
-            ).scalar() or 0
-            
-        except ImportError:
-            total_vacunaciones = 0
-            animales_al_dia = 0
-            proximas_vacunaciones = 0
-        
-        # NUEVAS ESTADÍSTICAS DE NACIMIENTOS
-        try:
-            from .nacimiento import Nacimiento
-            
-            # Total de nacimientos en la hacienda
-            total_nacimientos = db.session.query(
-                func.count(Nacimiento.idnacimiento)
-            ).join(Animal, Nacimiento.idanimal_cria == Animal.idanimal).filter(
-                Animal.idhacienda == hacienda_id
-            ).scalar() or 0
-            
-            # Nacimientos este año
-            inicio_año = date(date.today().year, 1, 1)
-            nacimientos_año = db.session.query(
-                func.count(Nacimiento.idnacimiento)
-            ).join(Animal, Nacimiento.idanimal_cria == Animal.idanimal).filter(
-                and_(
-                    Animal.idhacienda == hacienda_id,
-                    Nacimiento.fecha_nacimiento >= inicio_año
-                )
-            ).scalar() or 0
-            
-            # Crías sin vacunar
-            crias_sin_vacunar = db.session.query(
-                func.count(Nacimiento.idnacimiento)
-            ).join(Animal, Nacimiento.idanimal_cria == Animal.idanimal).filter(
-                and_(
-                    Animal.idhacienda == hacienda_id,
-                    Nacimiento.vacunas_aplicadas == False,
-                    Nacimiento.fecha_nacimiento <= date.today() - timedelta(days=90)
-                )
-            ).scalar() or 0
-            
-        except ImportError:
-            total_nacimientos = 0
-            nacimientos_año = 0
-            crias_sin_vacunar = 0
-        
-        return {
-            'total_animales': total,
-            'machos': machos,
-            'hembras': hembras,
-            'preñadas': preñadas,
-            'peso_promedio': float(peso_promedio) if peso_promedio else 0,
-            'por_estado': [
-                {'idestado': estado, 'cantidad': cantidad}
-                for estado, cantidad in por_estado
-            ],
-            'vacunacion': {
-                'total_vacunaciones': total_vacunaciones,
-                'animales_al_dia': animales_al_dia,
-                'proximas_vacunaciones': proximas_vacunaciones
-            },
-            'nacimientos': {
-                'total_nacimientos': total_nacimientos,
-                'nacimientos_este_año': nacimientos_año,
-                'crias_pendientes_vacunacion': crias_sin_vacunar
-            }
-        }
+        # Consultas de agregación condicional: una por tabla en lugar de una por contador
+        from services.estadisticas_service import EstadisticasService
+        return EstadisticasService.estadisticas_hacienda(hacienda_id)
     
     @staticmethod
     def buscar_general(termino, hacienda_id=None):
-        """Búsqueda general en múltiples campos"""
-        query = Animal.query
-        
-        if hacienda_id:
-            query = query.filter(Animal.idhacienda == hacienda_id)
-        
-        return query.filter(
-            or_(
-                Animal.hierro.ilike(f'%{termino}%'),
-                Animal.raza.ilike(f'%{termino}%'),
-                Animal.preñada_por.ilike(f'%{termino}%'),
-                Animal.observaciones.ilike(f'%{termino}%')
-            )
-        ).all()
+        """Búsqueda general en múltiples campos (usa el índice de búsqueda)"""
+        from .busqueda import IndiceBusqueda
+        
+        puntajes = IndiceBusqueda.buscar_puntajes('animal', termino, hacienda_id)
+        if not puntajes:
+            return []
+        
+        animales = Animal.query.filter(Animal.idanimal.in_(puntajes.keys())).all()
+        return IndiceBusqueda.ordenar_por_puntaje(
+            animales, puntajes, lambda a: a.idanimal, desempate=lambda a: a.idanimal
+        )
     
     @staticmethod
     def validar_hierro(hierro, hacienda_id, animal_id=None):
@@ -0,0 +1,133 @@
+from . import db
+from sqlalchemy import select, case, and_, or_, false
+import re
+import unicodedata
+
+class IndiceBusqueda(db.Model):
+    """
+    Modelo para la tabla indice_busqueda
+    Índice invertido mantenido por la aplicación: un término normalizado por fila
+    """
+    __tablename__ = 'indice_busqueda'
+
+    # Campos de la tabla
+    idindice = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entidad = db.Column(db.String(20), nullable=False)
+    identidad = db.Column(db.Integer, nullable=False)
+    idhacienda = db.Column(db.Integer)
+    campo = db.Column(db.String(30), nullable=False)
+    termino = db.Column(db.String(60), nullable=False)
+    peso = db.Column(db.SmallInteger, default=1)
+
+    # Índices para búsqueda por prefijo y para mantenimiento por documento
+    __table_args__ = (
+        db.Index('ix_indice_busqueda_termino', 'entidad', 'termino'),
+        db.Index('ix_indice_busqueda_hacienda', 'entidad', 'idhacienda', 'termino'),
+        db.Index('ix_indice_busqueda_documento', 'entidad', 'identidad'),
+    )
+
+    LONGITUD_TERMINO = 60
+
+    def __repr__(self):
+        return f'<IndiceBusqueda {self.entidad}:{self.identidad} - {self.termino}>'
+
+    @staticmethod
+    def normalizar(texto):
+        """Normaliza texto: minúsculas y sin tildes (Cesárea -> cesarea)"""
+        if texto is None:
+            return ''
+        texto = unicodedata.normalize('NFKD', str(texto))
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return texto.lower().strip()
+
+    @staticmethod
+    def tokenizar(texto, identificador=False):
+        """
+        Divide un texto en términos normalizados
+
+        Para campos identificadores (hierro, NIT, registro) también se incluye
+        la forma compacta sin separadores y sus sufijos, para que la búsqueda por
+        prefijo encuentre cualquier parte del código ('001' encuentra 'LE-001'):
+        'LE-01' -> ['le', '01', 'le01', 'e01', '1']
+        """
+        normalizado = IndiceBusqueda.normalizar(texto)
+        if not normalizado:
+            return []
+
+        terminos = [t for t in re.split(r'[^a-z0-9]+', normalizado) if t]
+
+        if identificador:
+            compacto = re.sub(r'[^a-z0-9]+', '', normalizado)
+            terminos.extend(compacto[inicio:] for inicio in range(len(compacto)))
+
+        # Eliminar duplicados conservando el orden
+        vistos = set()
+        resultado = []
+        for termino in terminos:
+            termino = termino[:IndiceBusqueda.LONGITUD_TERMINO]
+            if termino not in vistos:
+                vistos.add(termino)
+                resultado.append(termino)
+
+        return resultado
+
+    @staticmethod
+    def consulta(entidad, termino, hacienda_id=None, campos=None, con_puntaje=True):
+        """
+        Construye la consulta de búsqueda sobre el índice
+
+        Cada término de la búsqueda debe coincidir (por prefijo) con algún término
+        del documento; el puntaje suma el peso del mejor campo de cada término y
+        premia las coincidencias exactas.
+        """
+        terminos = IndiceBusqueda.tokenizar(termino)
+        if not terminos:
+            return select(IndiceBusqueda.identidad).where(false())
+
+        puntajes = [
+            db.func.max(case(
+                (IndiceBusqueda.termino == t, IndiceBusqueda.peso + 1),
+                (IndiceBusqueda.termino.like(f'{t}%'), IndiceBusqueda.peso),
+                else_=0
+            ))
+            for t in terminos
+        ]
+
+        columnas = [IndiceBusqueda.identidad.label('identidad')]
+        if con_puntaje:
+            columnas.append(sum(puntajes[1:], puntajes[0]).label('puntaje'))
+
+        query = select(*columnas).where(
+            IndiceBusqueda.entidad == entidad,
+            or_(*[IndiceBusqueda.termino.like(f'{t}%') for t in terminos])
+        )
+
+        if hacienda_id:
+            query = query.where(IndiceBusqueda.idhacienda == hacienda_id)
+
+        if campos:
+            query = query.where(IndiceBusqueda.campo.in_(campos))
+
+        return query.group_by(IndiceBusqueda.identidad).having(
+            and_(*[p > 0 for p in puntajes])
+        )
+
+    @staticmethod
+    def subconsulta_ids(entidad, termino, hacienda_id=None, campos=None):
+        """Subconsulta con los ids que coinciden, para usar en filtros IN"""
+        return IndiceBusqueda.consulta(entidad, termino, hacienda_id, campos, con_puntaje=False)
+
+    @staticmethod
+    def buscar_puntajes(entidad, termino, hacienda_id=None, campos=None):
+        """Obtiene {id: puntaje} de los documentos que coinciden"""
+        filas = db.session.execute(
+            IndiceBusqueda.consulta(entidad, termino, hacienda_id, campos)
+        ).all()
+        return {fila.identidad: int(fila.puntaje) for fila in filas}
+
+    @staticmethod
+    def ordenar_por_puntaje(objetos, puntajes, clave, desempate=None):
+        """Ordena objetos por puntaje descendente (y opcionalmente por un desempate)"""
+        if desempate:
+            objetos = sorted(objetos, key=desempate, reverse=True)
+        return sorted(objetos, key=lambda o: puntajes.get(clave(o), 0), reverse=True)
@@ -0,0 +1,56 @@
+from . import db
+from datetime import date, timedelta
+
+class EstadoVacunacionAnimal(db.Model):
+    """
+    Modelo para la tabla estado_vacunacion_animales
+    Última aplicación de cada vacuna por animal, mantenida con los eventos de
+    escritura de VacunacionAnimal. El estado (vigente/proxima/vencida) depende de
+    la fecha de hoy y se deriva al leer; 'nunca' es la ausencia de fila.
+    """
+    __tablename__ = 'estado_vacunacion_animales'
+
+    idanimal = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    idvacuna = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    # Última aplicación (por fecha; a igual fecha, el último registro)
+    idvacunacion = db.Column(db.Integer, nullable=False)
+    fecha_ultima_aplicacion = db.Column(db.Date, nullable=False)
+    proxima_dosis = db.Column(db.Date)
+    total_aplicaciones = db.Column(db.Integer, nullable=False, default=0)
+
+    # Próximas dosis de todos los animales en orden de fecha
+    __table_args__ = (
+        db.Index('ix_estado_vacunacion_proxima_dosis', 'proxima_dosis', 'idanimal'),
+    )
+
+    ESTADOS = ('vigente', 'proxima', 'vencida', 'nunca')
+
+    def __repr__(self):
+        return f'<EstadoVacunacionAnimal {self.idanimal}/{self.idvacuna}: {self.proxima_dosis}>'
+
+    @staticmethod
+    def estado_de(proxima_dosis, dias_anticipacion=30, hoy=None):
+        """Estado de una vacuna aplicada según su próxima dosis"""
+        hoy = hoy or date.today()
+
+        if proxima_dosis is None or proxima_dosis > hoy + timedelta(days=dias_anticipacion):
+            return 'vigente'
+        if proxima_dosis < hoy:
+            return 'vencida'
+        return 'proxima'
+
+    def estado(self, dias_anticipacion=30):
+        return EstadoVacunacionAnimal.estado_de(self.proxima_dosis, dias_anticipacion)
+
+    def to_dict(self):
+        """Convierte el objeto a diccionario para JSON"""
+        return {
+            'idanimal': self.idanimal,
+            'idvacuna': self.idvacuna,
+            'idvacunacion': self.idvacunacion,
+            'fecha_ultima_aplicacion': self.fecha_ultima_aplicacion.isoformat() if self.fecha_ultima_aplicacion else None,
+            'proxima_dosis': self.proxima_dosis.isoformat() if self.proxima_dosis else None,
+            'total_aplicaciones': self.total_aplicaciones,
+            'estado': self.estado()
+        }
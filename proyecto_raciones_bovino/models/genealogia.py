@@ -0,0 +1,23 @@
+from . import db
+
+class GenealogiaCierre(db.Model):
+    """
+    Modelo para la tabla genealogia_cierre
+    Cierre transitivo del pedigrí: una fila por ancestro, descendiente y número de
+    generaciones entre ambos, con la cantidad de caminos (por madre o por padre) que
+    los unen. Se mantiene con los eventos de escritura de Nacimiento.
+    """
+    __tablename__ = 'genealogia_cierre'
+
+    idancestro = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    profundidad = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    iddescendiente = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    caminos = db.Column(db.Integer, nullable=False, default=1)
+
+    # La PK resuelve la descendencia hasta N generaciones; este índice, la ascendencia
+    __table_args__ = (
+        db.Index('ix_genealogia_descendiente', 'iddescendiente', 'profundidad', 'idancestro'),
+    )
+
+    def __repr__(self):
+        return f'<GenealogiaCierre {self.idancestro} -> {self.iddescendiente} ({self.profundidad})>'
@@ -1,6 +1,6 @@
 from . import db
 from datetime import datetime
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 import re
 
 class Hacienda(db.Model):
@@ -114,12 +114,12 @@ class Hacienda(db.Model):
     def obtener_animales_activos(self):
         """Obtiene todos los animales activos de la hacienda"""
         from .animal import Animal
-        from .estado_animal import EstadoAnimal
+        from services.referencias_service import ReferenciasService
         
-        return Animal.query.join(EstadoAnimal).filter(
+        return Animal.query.filter(
             and_(
                 Animal.idhacienda == self.idhacienda,
-                EstadoAnimal.nombre_estado == 'Activo'
+                Animal.idestado.in_([ReferenciasService.id_estado('Activo')])
             )
         ).all()
     
@@ -174,16 +174,17 @@ class Hacienda(db.Model):
     
     @staticmethod
     def buscar_general(termino):
-        """Búsqueda general en múltiples campos"""
-        return Hacienda.query.filter(
-            or_(
-                Hacienda.nombre.ilike(f'%{termino}%'),
-                Hacienda.propietario.ilike(f'%{termino}%'),
-                Hacienda.nit.ilike(f'%{termino}%'),
-                Hacienda.municipio.ilike(f'%{termino}%'),
-                Hacienda.departamento.ilike(f'%{termino}%')
-            )
-        ).all()
+        """Búsqueda general en múltiples campos (usa el índice de búsqueda)"""
+        from .busqueda import IndiceBusqueda
+        
+        puntajes = IndiceBusqueda.buscar_puntajes('hacienda', termino)
+        if not puntajes:
+            return []
+        
+        haciendas = Hacienda.query.filter(Hacienda.idhacienda.in_(puntajes.keys())).all()
+        return IndiceBusqueda.ordenar_por_puntaje(
+            haciendas, puntajes, lambda h: h.idhacienda, desempate=lambda h: h.idhacienda
+        )
     
     @staticmethod
     def obtener_estadisticas():
@@ -76,11 +76,13 @@ class Municipio(db.Model):
         return f'<Municipio {self.nombre_municipio} - {self.departamento.nombre_departamento if self.departamento else "N/A"}>'
     
     def to_dict(self):
+        from services.referencias_service import ReferenciasService
+        
         return {
             'idmunicipio': self.idmunicipio,
             'iddepartamento': self.iddepartamento,
             'nombre_municipio': self.nombre_municipio,
-            'departamento': self.departamento.nombre_departamento if self.departamento else None
+            'departamento': ReferenciasService.nombre_departamento(self.iddepartamento)
         }
 
 
@@ -105,6 +107,8 @@ class ConsultaBromatologica(db.Model):
         return f'<ConsultaBromatologica {self.idconsulta} - {self.municipio.nombre_municipio if self.municipio else "N/A"}>'
     
     def to_dict(self):
+        from services.referencias_service import ReferenciasService
+        
         return {
             'idconsulta': self.idconsulta,
             'iddepartamento': self.iddepartamento,
@@ -113,8 +117,8 @@ class ConsultaBromatologica(db.Model):
             'laboratorio': self.laboratorio,
             'observaciones': self.observaciones,
             'activo': self.activo,
-            'departamento': self.departamento.nombre_departamento if self.departamento else None,
-            'municipio': self.municipio.nombre_municipio if self.municipio else None,
+            'departamento': ReferenciasService.nombre_departamento(self.iddepartamento),
+            'municipio': ReferenciasService.nombre_municipio(self.idmunicipio),
             'total_caracteristicas': len(self.caracteristicas) if self.caracteristicas else 0
         }
 
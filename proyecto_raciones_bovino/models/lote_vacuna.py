@@ -0,0 +1,85 @@
+from . import db
+from datetime import datetime, date
+
+class LoteVacuna(db.Model):
+    """
+    Modelo para la tabla lotes_vacuna
+    Inventario de vacunas por hacienda: cada lote tiene su código, fecha de vencimiento
+    y dosis disponibles. Las vacunaciones descuentan dosis del lote que vence primero.
+    """
+    __tablename__ = 'lotes_vacuna'
+
+    # Campos de la tabla
+    idlote = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    idhacienda = db.Column(db.Integer, db.ForeignKey('haciendas.idhacienda'), nullable=False)
+    idvacuna = db.Column(db.Integer, db.ForeignKey('catalogo_vacunas.idvacuna'), nullable=False)
+    codigo = db.Column(db.String(50), nullable=False)
+    fecha_vencimiento = db.Column(db.Date, nullable=False)
+    cantidad_inicial = db.Column(db.Integer, nullable=False)
+    cantidad_disponible = db.Column(db.Integer, nullable=False)
+    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Un código por hacienda y vacuna; lotes de una vacuna en orden de vencimiento (FEFO)
+    __table_args__ = (
+        db.UniqueConstraint('idhacienda', 'idvacuna', 'codigo', name='uq_lotes_vacuna_codigo'),
+        db.CheckConstraint('cantidad_disponible >= 0', name='ck_lotes_vacuna_disponible'),
+        db.Index('ix_lotes_vacuna_hacienda_vacuna_vencimiento', 'idhacienda', 'idvacuna', 'fecha_vencimiento'),
+    )
+
+    # Relaciones
+    hacienda = db.relationship('Hacienda', backref=db.backref('lotes_vacuna', lazy=True, cascade='all, delete-orphan'))
+    vacunaciones = db.relationship('VacunacionAnimal', backref='lote', lazy=True)
+
+    def __repr__(self):
+        return f'<LoteVacuna {self.codigo}: {self.cantidad_disponible}/{self.cantidad_inicial}>'
+
+    def esta_vencido(self, fecha=None):
+        return self.fecha_vencimiento < (fecha or date.today())
+
+    def dias_para_vencer(self):
+        return (self.fecha_vencimiento - date.today()).days
+
+    def to_dict(self):
+        """Convierte el objeto a diccionario para JSON"""
+        from services.referencias_service import ReferenciasService
+
+        return {
+            'idlote': self.idlote,
+            'idhacienda': self.idhacienda,
+            'idvacuna': self.idvacuna,
+            'nombre_vacuna': ReferenciasService.nombre('catalogo_vacunas', self.idvacuna),
+            'codigo': self.codigo,
+            'fecha_vencimiento': self.fecha_vencimiento.isoformat() if self.fecha_vencimiento else None,
+            'cantidad_inicial': self.cantidad_inicial,
+            'cantidad_disponible': self.cantidad_disponible,
+            'fecha_registro': self.fecha_registro.isoformat() if self.fecha_registro else None,
+            'dias_para_vencer': self.dias_para_vencer() if self.fecha_vencimiento else None,
+            'vencido': self.esta_vencido() if self.fecha_vencimiento else None
+        }
+
+    @staticmethod
+    def validar_datos(datos):
+        """Valida los datos de un lote nuevo"""
+        errores = []
+
+        for campo in ('idhacienda', 'idvacuna', 'codigo', 'fecha_vencimiento', 'cantidad'):
+            if datos.get(campo) in (None, ''):
+                errores.append(f'{campo.replace("_", " ").capitalize()} es requerido')
+
+        if datos.get('fecha_vencimiento'):
+            try:
+                datetime.strptime(str(datos['fecha_vencimiento']), '%Y-%m-%d')
+            except ValueError:
+                errores.append('Formato de fecha de vencimiento inválido (YYYY-MM-DD)')
+
+        if datos.get('cantidad') not in (None, ''):
+            try:
+                if int(datos['cantidad']) <= 0:
+                    errores.append('La cantidad debe ser mayor que cero')
+            except (ValueError, TypeError):
+                errores.append('La cantidad debe ser un número entero')
+
+        if datos.get('codigo') and len(str(datos['codigo']).strip()) > 50:
+            errores.append('El código del lote no puede exceder 50 caracteres')
+
+        return errores
@@ -1,6 +1,6 @@
 from . import db
 from datetime import datetime, date, timedelta
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_, func
 
 class Nacimiento(db.Model):
     """
@@ -23,6 +23,13 @@ class Nacimiento(db.Model):
     observaciones = db.Column(db.Text)
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Índices para recientes/crías sin vacunar y para consultas por madre o padre
+    __table_args__ = (
+        db.Index('ix_nacimientos_fecha', 'fecha_nacimiento', 'vacunas_aplicadas'),
+        db.Index('ix_nacimientos_madre_fecha', 'idanimal_madre', 'fecha_nacimiento'),
+        db.Index('ix_nacimientos_padre_fecha', 'idanimal_padre', 'fecha_nacimiento'),
+    )
+    
     # RELACIONES CORREGIDAS: Solo la relación con la cría
     # Las relaciones 'madre' y 'padre' se crean automáticamente desde Animal.py via backref
     cria = db.relationship('Animal', foreign_keys=[idanimal_cria], lazy=True)
@@ -226,8 +233,9 @@ class Nacimiento(db.Model):
         # Nacimientos recientes (30 días)
         nacimientos_recientes = len(Nacimiento.obtener_recientes(30, hacienda_id))
         
-        # Crías pendientes de vacunar
-        crias_sin_vacunar = len(Nacimiento.obtener_crias_sin_vacunar(hacienda_id))
+        # Crías pendientes de vacunar (desde la instantánea de alertas)
+        from services.alertas_service import AlertasService
+        crias_sin_vacunar = AlertasService.totales(hacienda_id)['crias_sin_vacunar']
         
         # Peso promedio al nacer
         peso_promedio = db.session.query(
@@ -265,27 +273,28 @@ class Nacimiento(db.Model):
     
     @staticmethod
     def buscar_general(termino, hacienda_id=None):
-        """Búsqueda general en nacimientos"""
-        from .animal import Animal
+        """Búsqueda general en nacimientos (usa el índice de búsqueda)"""
+        from .busqueda import IndiceBusqueda
         
-        query = Nacimiento.query.join(
-            Animal, Nacimiento.idanimal_cria == Animal.idanimal
-        )
+        # Coincidencias en los campos propios del nacimiento
+        puntajes = IndiceBusqueda.buscar_puntajes('nacimiento', termino, hacienda_id)
         
-        if hacienda_id:
-            query = query.filter(Animal.idhacienda == hacienda_id)
-        
-        # Buscar en varios campos
-        query = query.filter(
-            or_(
-                Nacimiento.numero_registro.ilike(f'%{termino}%'),
-                Animal.hierro.ilike(f'%{termino}%'),
-                Nacimiento.observaciones.ilike(f'%{termino}%'),
-                Nacimiento.complicaciones.ilike(f'%{termino}%')
-            )
-        )
+        # Coincidencias por hierro de la cría
+        crias = IndiceBusqueda.consulta('animal', termino, hacienda_id, campos=['hierro']).subquery()
+        por_hierro = db.session.query(
+            Nacimiento.idnacimiento, crias.c.puntaje
+        ).join(crias, Nacimiento.idanimal_cria == crias.c.identidad).all()
         
-        return query.order_by(Nacimiento.fecha_nacimiento.desc()).all()
+        for idnacimiento, puntaje in por_hierro:
+            puntajes[idnacimiento] = max(puntajes.get(idnacimiento, 0), int(puntaje))
+        
+        if not puntajes:
+            return []
+        
+        nacimientos = Nacimiento.query.filter(Nacimiento.idnacimiento.in_(puntajes.keys())).all()
+        return IndiceBusqueda.ordenar_por_puntaje(
+            nacimientos, puntajes, lambda n: n.idnacimiento, desempate=lambda n: n.fecha_nacimiento
+        )
     
     @staticmethod
     def validar_datos_nacimiento(datos):
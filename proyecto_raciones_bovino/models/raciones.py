@@ -63,6 +63,11 @@ class RacionLactancia(db.Model):
     calculado_por = db.Column(db.Integer, db.ForeignKey('usuarios.idusuario'))
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Índice para el historial de raciones por animal
+    __table_args__ = (
+        db.Index('ix_raciones_lactancia_animal_fecha', 'idanimal', 'fecha_calculo'),
+    )
+    
     # Relaciones
     detalles = db.relationship('DetalleRacionLactancia', backref='racion_lactancia', lazy=True, cascade='all, delete-orphan')
     
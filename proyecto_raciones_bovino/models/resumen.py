@@ -0,0 +1,65 @@
+from . import db
+
+class ResumenHaciendaConteo(db.Model):
+    """
+    Modelo para la tabla resumen_hacienda_conteos
+    Cubo de conteos de animales por hacienda, estado, sexo, raza y preñez,
+    mantenido incrementalmente con los eventos de escritura de Animal
+    """
+    __tablename__ = 'resumen_hacienda_conteos'
+
+    # Clave del cubo
+    idhacienda = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    idestado = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sexo = db.Column(db.String(10), primary_key=True)
+    raza = db.Column(db.String(50), primary_key=True, default='')  # '' = sin especificar
+    preñada = db.Column(db.Boolean, primary_key=True, default=False)
+
+    # Medidas
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    suma_peso = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    con_peso = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResumenHaciendaConteo {self.idhacienda} {self.idestado}/{self.sexo}/{self.raza}: {self.cantidad}>'
+
+class ResumenHacienda(db.Model):
+    """
+    Modelo para la tabla resumen_haciendas
+    Totales por hacienda de vacunaciones y nacimientos
+    """
+    __tablename__ = 'resumen_haciendas'
+
+    idhacienda = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total_vacunaciones = db.Column(db.Integer, nullable=False, default=0)
+    total_nacimientos = db.Column(db.Integer, nullable=False, default=0)
+    fecha_reconciliacion = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<ResumenHacienda {self.idhacienda}>'
+
+    def to_dict(self):
+        """Convierte el objeto a diccionario para JSON"""
+        return {
+            'idhacienda': self.idhacienda,
+            'total_vacunaciones': self.total_vacunaciones,
+            'total_nacimientos': self.total_nacimientos,
+            'fecha_reconciliacion': self.fecha_reconciliacion.isoformat() if self.fecha_reconciliacion else None
+        }
+
+class ResumenHaciendaFecha(db.Model):
+    """
+    Modelo para la tabla resumen_hacienda_fechas
+    Conteos por hacienda, indicador y fecha de los datos que dependen del día actual
+    (próximas dosis, animales al día, nacimientos, crías sin vacunar): el resumen suma
+    los rangos relativos a hoy sin consultar las tablas base
+    """
+    __tablename__ = 'resumen_hacienda_fechas'
+
+    idhacienda = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    indicador = db.Column(db.String(20), primary_key=True)  # proxima_dosis, al_dia_hasta, nacimiento, cria_sin_vacunar
+    fecha = db.Column(db.Date, primary_key=True)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResumenHaciendaFecha {self.idhacienda} {self.indicador} {self.fecha}: {self.cantidad}>'
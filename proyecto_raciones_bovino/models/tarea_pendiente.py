@@ -0,0 +1,52 @@
+from . import db
+from datetime import date
+
+class TareaPendiente(db.Model):
+    """
+    Modelo para la tabla tareas_pendientes
+    Índice de trabajo pendiente por hacienda: próximas dosis, vacunas iniciales de
+    crías, partos esperados y hembras aptas para monta. Se mantiene con los eventos
+    de escritura de vacunaciones, nacimientos y animales.
+    """
+    __tablename__ = 'tareas_pendientes'
+
+    # Una tarea por animal, tipo y referencia (idvacuna, idnacimiento o 0)
+    idanimal = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tipo = db.Column(db.String(20), primary_key=True)
+    referencia = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0)
+
+    idhacienda = db.Column(db.Integer, nullable=False)
+    fecha_vencimiento = db.Column(db.Date, nullable=False)
+    prioridad = db.Column(db.SmallInteger, nullable=False)
+
+    # Rango por hacienda y fecha, ya ordenado como se lista
+    __table_args__ = (
+        db.Index('ix_tareas_pendientes_hacienda_fecha', 'idhacienda', 'fecha_vencimiento', 'prioridad'),
+    )
+
+    # tipo -> (prioridad, descripción); 1 es la más urgente
+    TIPOS = {
+        'parto_esperado': (1, 'Parto esperado'),
+        'dosis_vacuna': (2, 'Próxima dosis de vacuna'),
+        'vacuna_cria': (2, 'Vacunas iniciales de la cría'),
+        'apta_monta': (3, 'Hembra apta para monta')
+    }
+
+    def __repr__(self):
+        return f'<TareaPendiente {self.tipo} animal={self.idanimal}: {self.fecha_vencimiento}>'
+
+    def to_dict(self):
+        """Convierte el objeto a diccionario para JSON"""
+        dias_restantes = (self.fecha_vencimiento - date.today()).days
+
+        return {
+            'idanimal': self.idanimal,
+            'idhacienda': self.idhacienda,
+            'tipo': self.tipo,
+            'descripcion': TareaPendiente.TIPOS.get(self.tipo, (None, self.tipo))[1],
+            'referencia': self.referencia or None,
+            'fecha_vencimiento': self.fecha_vencimiento.isoformat(),
+            'prioridad': self.prioridad,
+            'dias_restantes': dias_restantes,
+            'vencida': dias_restantes < 0
+        }
@@ -0,0 +1,22 @@
+from . import db
+
+class TokenRevocado(db.Model):
+    """
+    Modelo para la tabla tokens_revocados
+    Última revocación de tokens de cada usuario (desactivación, cambio de rol, eliminación).
+    Cada proceso la relee como mucho cada AUTH_REVOCACION_VERIFICACION_SEGUNDOS; la fila
+    vence cuando ya expiraron los tokens de acceso emitidos antes de ella.
+    """
+    __tablename__ = 'tokens_revocados'
+
+    # Sin llave foránea: también se revocan los tokens de usuarios eliminados
+    idusuario = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    revocado_en = db.Column(db.Numeric(16, 3, asdecimal=False), nullable=False)  # segundos epoch
+    expira = db.Column(db.Numeric(16, 3, asdecimal=False), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_tokens_revocados_expira', 'expira'),
+    )
+
+    def __repr__(self):
+        return f'<TokenRevocado usuario={self.idusuario} en={self.revocado_en}>'
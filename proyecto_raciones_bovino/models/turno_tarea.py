@@ -0,0 +1,15 @@
+from . import db
+
+class TurnoTarea(db.Model):
+    """
+    Modelo para la tabla turnos_tareas
+    Última ejecución de cada tarea periódica que corre en un solo proceso: en cada
+    intervalo la ejecuta el proceso que logra adelantar la marca, los demás la saltan
+    """
+    __tablename__ = 'turnos_tareas'
+
+    nombre = db.Column(db.String(64), primary_key=True)
+    ejecutada_en = db.Column(db.Numeric(16, 3, asdecimal=False), nullable=False)  # segundos epoch
+
+    def __repr__(self):
+        return f'<TurnoTarea {self.nombre} en={self.ejecutada_en}>'
@@ -21,6 +21,16 @@ class Usuario(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     activo = db.Column(db.Boolean, default=False)
     
+    # Permisos de cada rol; viajan como claims en el token de acceso
+    PERMISOS_POR_ROL = {
+        'Administrador': (
+            'gestionar_usuarios', 'ver_estadisticas', 'gestionar_haciendas',
+            'registrar_datos', 'eliminar_datos'
+        ),
+        'Instructor': ('gestionar_haciendas', 'registrar_datos'),
+        'Aprendiz': ()
+    }
+    
     def __repr__(self):
         return f'<Usuario {self.nombres} {self.apellidos}>'
     
@@ -44,7 +54,7 @@ class Usuario(db.Model):
             'telefono': self.telefono,
             'direccion': self.direccion,
             'activo': self.activo,
-            'rol': self.rol.nombre_rol if self.rol else None,
+            'rol': self.nombre_rol(),
             'nombre_completo': f"{self.nombres} {self.apellidos}"
         }
         
@@ -54,17 +64,30 @@ class Usuario(db.Model):
         
         return data
     
+    def nombre_rol(self):
+        """Nombre del rol, tomado del registro de referencias (sin cargar la relación)"""
+        from services.referencias_service import ReferenciasService
+        return ReferenciasService.nombre_rol(self.idrol)
+    
+    def permisos(self):
+        """Permisos del usuario según su rol"""
+        return list(Usuario.PERMISOS_POR_ROL.get(self.nombre_rol(), ()))
+    
+    def tiene_permiso(self, permiso):
+        """Verifica si el rol del usuario incluye el permiso"""
+        return permiso in Usuario.PERMISOS_POR_ROL.get(self.nombre_rol(), ())
+    
     def es_administrador(self):
         """Verifica si el usuario tiene rol de administrador"""
-        return self.rol and self.rol.nombre_rol == 'Administrador'
+        return self.nombre_rol() == 'Administrador'
     
     def es_instructor(self):
         """Verifica si el usuario tiene rol de instructor"""
-        return self.rol and self.rol.nombre_rol == 'Instructor'
+        return self.nombre_rol() == 'Instructor'
     
     def es_aprendiz(self):
         """Verifica si el usuario tiene rol de aprendiz"""
-        return self.rol and self.rol.nombre_rol == 'Aprendiz'
+        return self.nombre_rol() == 'Aprendiz'
     
     def puede_gestionar_usuarios(self):
         """Verifica si el usuario puede gestionar otros usuarios"""
@@ -16,15 +16,24 @@ class VacunacionAnimal(db.Model):
     fecha_aplicacion = db.Column(db.Date, nullable=False)
     dosis = db.Column(db.String(50))
     lote_vacuna = db.Column(db.String(50))
+    idlote = db.Column(db.Integer, db.ForeignKey('lotes_vacuna.idlote'))  # Lote del inventario, si la hacienda lo lleva
     veterinario = db.Column(db.String(100))
     observaciones = db.Column(db.Text)
     proxima_dosis = db.Column(db.Date)
     
+    # Índices para próximas/vencidas y para la última dosis por vacuna
+    __table_args__ = (
+        db.Index('ix_vacunacion_proxima_dosis', 'proxima_dosis', 'idanimal'),
+        db.Index('ix_vacunacion_animal_vacuna_fecha', 'idanimal', 'idvacuna', 'fecha_aplicacion'),
+    )
+    
     def __repr__(self):
         return f'<VacunacionAnimal {self.animal.hierro if self.animal else "N/A"} - {self.vacuna.nombre_vacuna if self.vacuna else "N/A"}>'
     
     def to_dict(self, include_related=True):
         """Convierte el objeto a diccionario para JSON"""
+        from services.referencias_service import ReferenciasService
+
         data = {
             'idvacunacion': self.idvacunacion,
             'idanimal': self.idanimal,
@@ -32,6 +41,7 @@ class VacunacionAnimal(db.Model):
             'fecha_aplicacion': self.fecha_aplicacion.isoformat() if self.fecha_aplicacion else None,
             'dosis': self.dosis,
             'lote_vacuna': self.lote_vacuna,
+            'idlote': self.idlote,
             'veterinario': self.veterinario,
             'observaciones': self.observaciones,
             'proxima_dosis': self.proxima_dosis.isoformat() if self.proxima_dosis else None
@@ -47,12 +57,13 @@ class VacunacionAnimal(db.Model):
                     'hacienda_nombre': self.animal.hacienda.nombre if self.animal.hacienda else None
                 }
             
-            # Información de la vacuna
-            if self.vacuna:
+            # Información de la vacuna (registro de referencias, sin cargar la relación)
+            vacuna = ReferenciasService.vacuna(self.idvacuna)
+            if vacuna:
                 data['vacuna'] = {
-                    'nombre_vacuna': self.vacuna.nombre_vacuna,
-                    'descripcion': self.vacuna.descripcion,
-                    'frecuencia_dias': self.vacuna.frecuencia_dias
+                    'nombre_vacuna': vacuna['nombre_vacuna'],
+                    'descripcion': vacuna['descripcion'],
+                    'frecuencia_dias': vacuna['frecuencia_dias']
                 }
             
             # Información adicional calculada
@@ -76,11 +87,14 @@ class VacunacionAnimal(db.Model):
     
     def estado_proxima_dosis(self):
         """Determina el estado de la próxima dosis"""
-        if not self.proxima_dosis:
+        return VacunacionAnimal.clasificar_proxima_dosis(self.dias_para_proxima_dosis())
+    
+    @staticmethod
+    def clasificar_proxima_dosis(dias_restantes):
+        """Estado de una próxima dosis según los días que faltan (None: sin programar)"""
+        if dias_restantes is None:
             return 'sin_programar'
         
-        dias_restantes = self.dias_para_proxima_dosis()
-        
         if dias_restantes < 0:
             return 'vencida'
         elif dias_restantes <= 7:
@@ -92,8 +106,11 @@ class VacunacionAnimal(db.Model):
     
     def calcular_proxima_dosis_automatica(self):
         """Calcula automáticamente la fecha de próxima dosis basada en la frecuencia"""
-        if self.vacuna and self.vacuna.frecuencia_dias and self.fecha_aplicacion:
-            return self.fecha_aplicacion + timedelta(days=self.vacuna.frecuencia_dias)
+        from services.referencias_service import ReferenciasService
+        
+        vacuna = ReferenciasService.vacuna(self.idvacuna)
+        if vacuna and vacuna['frecuencia_dias'] and self.fecha_aplicacion:
+            return self.fecha_aplicacion + timedelta(days=vacuna['frecuencia_dias'])
         return None
     
     def actualizar_proxima_dosis_automatica(self):
@@ -219,10 +236,11 @@ class VacunacionAnimal(db.Model):
             CatalogoVacuna.idvacuna, CatalogoVacuna.nombre_vacuna
         ).order_by(func.count(VacunacionAnimal.idvacunacion).desc()).limit(10).all()
         
-        # Próximas dosis
-        proximas_7_dias = len(VacunacionAnimal.obtener_proximas_dosis(7, hacienda_id))
-        proximas_30_dias = len(VacunacionAnimal.obtener_proximas_dosis(30, hacienda_id))
-        vencidas = len(VacunacionAnimal.obtener_vencidas(hacienda_id))
+        # Próximas dosis (desde la instantánea de alertas)
+        from services.alertas_service import AlertasService
+        proximas_7_dias = AlertasService.contar_proximas_dosis(7, hacienda_id)
+        proximas_30_dias = AlertasService.contar_proximas_dosis(30, hacienda_id)
+        vencidas = AlertasService.totales(hacienda_id)['dosis_vencidas']
         
         return {
             'total_vacunaciones': total_vacunaciones,
@@ -248,26 +266,40 @@ class VacunacionAnimal(db.Model):
     
     @staticmethod
     def buscar_general(termino, hacienda_id=None):
-        """Búsqueda general en vacunaciones"""
+        """Búsqueda general en vacunaciones (usa el índice de búsqueda)"""
         from .animal import Animal
-        from .catalogo_vacuna import CatalogoVacuna
+        from .busqueda import IndiceBusqueda
         
-        query = VacunacionAnimal.query.join(Animal).join(CatalogoVacuna)
+        # Coincidencias en los campos propios de la vacunación
+        puntajes = IndiceBusqueda.buscar_puntajes('vacunacion', termino, hacienda_id)
+        
+        # Coincidencias por hierro del animal
+        animales = IndiceBusqueda.consulta('animal', termino, hacienda_id, campos=['hierro']).subquery()
+        por_hierro = db.session.query(
+            VacunacionAnimal.idvacunacion, animales.c.puntaje
+        ).join(animales, VacunacionAnimal.idanimal == animales.c.identidad).all()
+        
+        # Coincidencias por nombre de la vacuna
+        vacunas = IndiceBusqueda.consulta('vacuna', termino, campos=['nombre_vacuna']).subquery()
+        query_vacunas = db.session.query(
+            VacunacionAnimal.idvacunacion, vacunas.c.puntaje
+        ).join(vacunas, VacunacionAnimal.idvacuna == vacunas.c.identidad)
         
         if hacienda_id:
-            query = query.filter(Animal.idhacienda == hacienda_id)
-        
-        query = query.filter(
-            or_(
-                Animal.hierro.ilike(f'%{termino}%'),
-                CatalogoVacuna.nombre_vacuna.ilike(f'%{termino}%'),
-                VacunacionAnimal.veterinario.ilike(f'%{termino}%'),
-                VacunacionAnimal.lote_vacuna.ilike(f'%{termino}%'),
-                VacunacionAnimal.observaciones.ilike(f'%{termino}%')
-            )
-        )
+            query_vacunas = query_vacunas.join(Animal).filter(Animal.idhacienda == hacienda_id)
         
-        return query.order_by(VacunacionAnimal.fecha_aplicacion.desc()).all()
+        for idvacunacion, puntaje in por_hierro + query_vacunas.all():
+            puntajes[idvacunacion] = max(puntajes.get(idvacunacion, 0), int(puntaje))
+        
+        if not puntajes:
+            return []
+        
+        vacunaciones = VacunacionAnimal.query.filter(
+            VacunacionAnimal.idvacunacion.in_(puntajes.keys())
+        ).all()
+        return IndiceBusqueda.ordenar_por_puntaje(
+            vacunaciones, puntajes, lambda v: v.idvacunacion, desempate=lambda v: v.fecha_aplicacion
+        )
     
     @staticmethod
     def validar_datos_vacunacion(datos):
@@ -0,0 +1,17 @@
+from . import db
+
+class VersionTabla(db.Model):
+    """
+    Modelo para la tabla versiones_tabla
+    Contador de cambios por partición (una hacienda, o '*' para escrituras sin hacienda);
+    se incrementa en cada flush que escribe en la partición y alimenta los ETag de los
+    listados. La versión de la tabla completa es la suma de sus particiones
+    """
+    __tablename__ = 'versiones_tabla'
+
+    tabla = db.Column(db.String(64), primary_key=True)
+    particion = db.Column(db.String(32), primary_key=True, default='')
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersionTabla {self.tabla}[{self.particion}]: {self.version}>'
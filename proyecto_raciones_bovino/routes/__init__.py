@@ -7,6 +7,8 @@ from .haciendas import haciendas_bp
 from .animales import animales_bp
 from .vacunacion import vacunacion_bp
 from .nacimientos import nacimientos_bp
+from .batch import batch_bp
+from .tareas import tareas_bp
 
 # Hacer disponibles los blueprints cuando se importe el paquete
 __all__ = [
@@ -15,5 +17,7 @@ __all__ = [
     'haciendas_bp',
     'animales_bp',
     'vacunacion_bp',
-    'nacimientos_bp'
+    'nacimientos_bp',
+    'batch_bp',
+    'tareas_bp'
 ]
\ No newline at end of file
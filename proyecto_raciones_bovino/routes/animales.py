@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.animal_service import AnimalService
+from services.genealogia_service import GenealogiaService
+from services.consanguinidad_service import ConsanguinidadService
+from services.versiones_service import VersionesService
+from services.coalescencia_service import CoalescenciaService
 
 # Crear blueprint para animales
 animales_bp = Blueprint('animales', __name__)
@@ -181,6 +185,108 @@ def eliminar_animal(animal_id):
             'status': 'error'
         }), 500
 
+@animales_bp.route('/<int:animal_id>/ancestros', methods=['GET'])
+@jwt_required()
+def obtener_ancestros(animal_id):
+    """
+    Ascendencia del animal hasta N generaciones
+    ---
+    Parámetro opcional 'profundidad' (todas las generaciones si no se indica)
+    """
+    try:
+        profundidad = request.args.get('profundidad', type=int)
+        if profundidad is not None and profundidad < 1:
+            return jsonify({
+                'error': 'La profundidad debe ser mayor que cero',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = GenealogiaService.obtener_ancestros(animal_id, profundidad)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener ancestros: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@animales_bp.route('/<int:animal_id>/descendientes', methods=['GET'])
+@jwt_required()
+def obtener_descendientes(animal_id):
+    """
+    Descendencia del animal hasta N generaciones
+    ---
+    Parámetro opcional 'profundidad' (todas las generaciones si no se indica)
+    """
+    try:
+        profundidad = request.args.get('profundidad', type=int)
+        if profundidad is not None and profundidad < 1:
+            return jsonify({
+                'error': 'La profundidad debe ser mayor que cero',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = GenealogiaService.obtener_descendientes(animal_id, profundidad)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener descendientes: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@animales_bp.route('/<int:animal_id>/consanguinidad', methods=['GET'])
+@jwt_required()
+def obtener_consanguinidad(animal_id):
+    """
+    Coeficiente de consanguinidad del animal y de sus progenitores
+    """
+    try:
+        resultado, codigo = ConsanguinidadService.obtener_consanguinidad(animal_id)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener consanguinidad: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@animales_bp.route('/<int:animal_id>/parientes', methods=['GET'])
+@jwt_required()
+def obtener_parientes(animal_id):
+    """
+    Parientes del animal, de mayor a menor coeficiente de parentesco
+    ---
+    Filtros opcionales: hacienda_id, sexo y minimo (parentesco mayor que)
+    """
+    try:
+        pagina = request.args.get('pagina', 1, type=int)
+        por_pagina = min(max(request.args.get('limite', 50, type=int), 1), 100)
+        minimo = request.args.get('minimo', 0.0, type=float)
+        sexo = request.args.get('sexo', '').strip() or None
+        
+        if sexo and sexo not in ('Macho', 'Hembra'):
+            return jsonify({
+                'error': 'Sexo no válido. Opciones: Macho, Hembra',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = ConsanguinidadService.obtener_parientes(
+            animal_id,
+            hacienda_id=request.args.get('hacienda_id', type=int),
+            sexo=sexo,
+            minimo=minimo,
+            pagina=max(pagina, 1),
+            por_pagina=por_pagina
+        )
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener parientes: {str(e)}',
+            'status': 'error'
+        }), 500
+
 @animales_bp.route('/buscar', methods=['GET'])
 @jwt_required()
 def buscar_animales():
@@ -208,8 +314,40 @@ def buscar_animales():
             'status': 'error'
         }), 500
 
+@animales_bp.route('/hierro-similar', methods=['GET'])
+@jwt_required()
+def buscar_hierro_similar():
+    """
+    Búsqueda aproximada de hierros en una hacienda
+    ---
+    Tolera errores de digitación (caracteres cambiados, faltantes o transpuestos)
+    """
+    try:
+        hacienda_id = request.args.get('hacienda_id', type=int)
+        hierro = request.args.get('hierro', '').strip()
+        max_distancia = request.args.get('max_distancia', 2, type=int)
+        limite = min(request.args.get('limite', 10, type=int), 50)
+        
+        if not hacienda_id or not hierro:
+            return jsonify({
+                'error': 'Se requieren los parámetros hacienda_id y hierro',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = AnimalService.buscar_hierros_similares(
+            hacienda_id, hierro, max_distancia, limite
+        )
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error en búsqueda de hierros similares: {str(e)}',
+            'status': 'error'
+        }), 500
+
 @animales_bp.route('/estadisticas', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer('animales', 'estados_animal', 'haciendas', 'vacunacion_animales', 'nacimientos')
 def obtener_estadisticas():
     """
     Obtiene estadísticas de animales
@@ -229,6 +367,7 @@ def obtener_estadisticas():
 
 @animales_bp.route('/por-hacienda/<int:hacienda_id>', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('animales:hacienda_id', 'haciendas:hacienda_id', 'estados_animal')
 def listar_animales_por_hacienda(hacienda_id):
     """
     Lista animales de una hacienda específica
@@ -267,6 +406,7 @@ def listar_animales_por_hacienda(hacienda_id):
 
 @animales_bp.route('/estados', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('estados_animal')
 def obtener_estados():
     """
     Obtiene todos los estados de animal disponibles
@@ -61,6 +61,7 @@ def registrar():
 
 @auth_bp.route('/registrar-admin', methods=['POST'])
 @jwt_required()
+@AuthService.requiere('gestionar_usuarios', mensaje='Solo administradores pueden usar este endpoint')
 def registrar_admin():
     """
     Endpoint para que administradores registren usuarios
@@ -69,17 +70,6 @@ def registrar_admin():
     """
     try:
         current_user_id = get_jwt_identity()
-        
-        # Verificar que el usuario actual es administrador
-        from models import Usuario
-        current_user = Usuario.query.get(current_user_id)
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden usar este endpoint',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
-        
         data = request.get_json()
         
         if not data:
@@ -0,0 +1,36 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services.batch_service import BatchService
+
+# Crear blueprint para operaciones en lote
+batch_bp = Blueprint('batch', __name__)
+
+# ===============================
+#  EJECUTAR VARIAS OPERACIONES
+# ===============================
+
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+def ejecutar_batch():
+    """
+    Ejecuta varias operaciones de la API en una sola petición
+    Body: {
+        "atomico": true,
+        "operaciones": [
+            {"id": "cria", "metodo": "POST", "ruta": "/api/animales/", "cuerpo": {...}},
+            {"metodo": "POST", "ruta": "/api/nacimientos/",
+             "cuerpo": {"idanimal_cria": "${cria.animal.idanimal}", ...}}
+        ]
+    }
+    Cada operación se autentica con el mismo token de esta petición.
+    """
+    try:
+        datos = request.get_json()
+        resultado, codigo = BatchService.ejecutar(datos, request.headers.get('Authorization'))
+        return jsonify(resultado), codigo
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al procesar el batch: {str(e)}',
+            'status': 'error'
+        }), 500
@@ -4,6 +4,10 @@ import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.hacienda_service import HaciendaService
+from services.resumen_service import ResumenService
+from services.consanguinidad_service import ConsanguinidadService
+from services.monta_service import MontaService
+from services.coalescencia_service import CoalescenciaService
 
 # Crear blueprint para haciendas
 haciendas_bp = Blueprint('haciendas', __name__)
@@ -790,6 +794,7 @@ def buscar_haciendas():
 
 @haciendas_bp.route('/estadisticas', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer('haciendas', 'animales')
 def obtener_estadisticas():
     """
     CONSULTAR: Obtiene estadísticas de haciendas - MEJORADO
@@ -928,6 +933,10 @@ def validar_nit():
 # NUEVO ENDPOINT: Resumen completo de hacienda
 @haciendas_bp.route('/<int:hacienda_id>/resumen', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer(
+    'haciendas', 'animales', 'resumen_hacienda_conteos', 'resumen_haciendas',
+    'vacunacion_animales', 'nacimientos', 'estados_animal'
+)
 def obtener_resumen_hacienda(hacienda_id):
     """
     CONSULTAR: Obtiene un resumen completo de la hacienda con todas las estadísticas
@@ -942,43 +951,12 @@ def obtener_resumen_hacienda(hacienda_id):
                 'status': 'error'
             }), 404
         
-        # Datos básicos de la hacienda
-        resumen = hacienda.to_dict()
-        
-        # Estadísticas de animales
+        # Resumen materializado (conteos por estado, sexo, raza y preñez)
         try:
-            resumen['estadisticas_animales'] = hacienda.obtener_estadisticas_animales()
-            resumen['animales_por_estado'] = hacienda.contar_animales_por_estado()
-            
-            # Información detallada de animales
-            animales_activos = hacienda.obtener_animales_activos()
-            resumen['total_animales_activos'] = len(animales_activos)
-            
-            # Conteos por categorías
-            machos = sum(1 for a in animales_activos if a.sexo == 'Macho')
-            hembras = sum(1 for a in animales_activos if a.sexo == 'Hembra')
-            preñadas = sum(1 for a in animales_activos if a.sexo == 'Hembra' and a.preñada)
-            
-            resumen['resumen_reproductivo'] = {
-                'machos': machos,
-                'hembras': hembras,
-                'hembras_preñadas': preñadas,
-                'hembras_vacias': hembras - preñadas,
-                'porcentaje_preñez': round((preñadas / hembras * 100), 1) if hembras > 0 else 0
-            }
-            
-            # Distribución por razas
-            razas = {}
-            for animal in animales_activos:
-                raza = animal.raza or 'Sin especificar'
-                razas[raza] = razas.get(raza, 0) + 1
-            
-            resumen['distribucion_razas'] = [
-                {'raza': raza, 'cantidad': cantidad}
-                for raza, cantidad in razas.items()
-            ]
+            resumen = ResumenService.obtener_resumen(hacienda)
             
         except Exception as e:
+            resumen = hacienda.to_dict()
             resumen['estadisticas_animales'] = {}
             resumen['animales_por_estado'] = {}
             resumen['total_animales_activos'] = 0
@@ -995,7 +973,7 @@ def obtener_resumen_hacienda(hacienda_id):
         
         return jsonify({
             'resumen': resumen,
-            'fecha_consulta': datetime.now().isoformat(),
+            'fecha_consulta': datetime.datetime.now().isoformat(),
             'status': 'success'
         }), 200
         
@@ -1003,4 +981,60 @@ def obtener_resumen_hacienda(hacienda_id):
         return jsonify({
             'error': f'Error al obtener resumen: {str(e)}',
             'status': 'error'
+        }), 500
+
+@haciendas_bp.route('/<int:hacienda_id>/consanguinidad', methods=['GET'])
+@jwt_required()
+def obtener_consanguinidad_hacienda(hacienda_id):
+    """
+    CONSULTAR: Consanguinidad de los animales activos de la hacienda (promedio, rangos y los más consanguíneos)
+    """
+    try:
+        limite = min(max(request.args.get('limite', 10, type=int), 1), 100)
+        
+        resultado, codigo = ConsanguinidadService.obtener_resumen_hacienda(hacienda_id, limite)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener consanguinidad: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@haciendas_bp.route('/<int:hacienda_id>/plan-monta', methods=['GET'])
+@jwt_required()
+def plan_monta(hacienda_id):
+    """
+    CONSULTAR: Plan de monta de las hembras aptas con los toros de la hacienda
+    Query params: toros (ids adicionales separados por coma), maximo_por_toro,
+    objetivo (cruce|pura), consanguinidad_maxima
+    """
+    try:
+        try:
+            toros = [int(toro) for toro in request.args.get('toros', '').split(',') if toro.strip()]
+        except ValueError:
+            return jsonify({
+                'error': 'El parámetro toros debe ser una lista de ids separados por coma',
+                'status': 'error',
+                'code': 'INVALID_SIRES'
+            }), 400
+        
+        maximo_por_toro = request.args.get('maximo_por_toro', type=int)
+        if maximo_por_toro is not None:
+            maximo_por_toro = min(max(maximo_por_toro, 1), 500)
+        consanguinidad_maxima = request.args.get('consanguinidad_maxima', type=float)
+        
+        resultado, codigo = MontaService.planificar(
+            hacienda_id,
+            toros_adicionales=toros,
+            maximo_por_toro=maximo_por_toro,
+            objetivo=request.args.get('objetivo', 'cruce'),
+            consanguinidad_maxima=consanguinidad_maxima
+        )
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al planificar la monta: {str(e)}',
+            'status': 'error'
         }), 500
\ No newline at end of file
@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.ingredientes_service import IngredientesService
+from services.versiones_service import VersionesService
 
 # Crear blueprint para ingredientes
 ingredientes_bp = Blueprint('ingredientes', __name__)
@@ -12,6 +13,7 @@ ingredientes_bp = Blueprint('ingredientes', __name__)
 
 @ingredientes_bp.route('/departamentos/', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('departamentos')
 def listar_departamentos():
     """
     Lista todos los departamentos
@@ -27,6 +29,7 @@ def listar_departamentos():
 
 @ingredientes_bp.route('/departamentos/<int:departamento_id>/municipios', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('departamentos', 'municipios')
 def obtener_municipios_por_departamento(departamento_id):
     """
     Obtiene municipios de un departamento específico
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.nacimiento_service import NacimientoService
+from services.versiones_service import VersionesService
+from services.coalescencia_service import CoalescenciaService
+from services.referencias_service import ReferenciasService
 
 # Crear blueprint para nacimientos
 nacimientos_bp = Blueprint('nacimientos', __name__)
@@ -303,6 +306,7 @@ def buscar_nacimientos():
 
 @nacimientos_bp.route('/estadisticas', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer('nacimientos', 'animales')
 def obtener_estadisticas_nacimientos():
     """
     Obtiene estadísticas de nacimientos
@@ -321,16 +325,13 @@ def obtener_estadisticas_nacimientos():
 
 @nacimientos_bp.route('/tipos-parto', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional()
 def obtener_tipos_parto():
     """
     Obtiene los tipos de parto disponibles
     """
     try:
-        tipos = [
-            {'valor': 'Natural', 'nombre': 'Natural'},
-            {'valor': 'Asistido', 'nombre': 'Asistido'},
-            {'valor': 'Cesarea', 'nombre': 'Cesárea'}
-        ]
+        tipos = ReferenciasService.tipos_parto()
         
         return jsonify({
             'tipos_parto': tipos,
@@ -359,11 +360,17 @@ def validar_animales_nacimiento():
             }), 400
         
         from models.nacimiento import Nacimiento
+        from services.genealogia_service import GenealogiaService
         errores = Nacimiento.verificar_animales_compatibles(
             data['idanimal_cria'],
             data['idanimal_madre'],
             data.get('idanimal_padre')
         )
+        errores += GenealogiaService.verificar_progenitores(
+            data['idanimal_cria'],
+            data['idanimal_madre'],
+            data.get('idanimal_padre')
+        )
         
         if errores:
             return jsonify({
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services.tareas_pendientes_service import TareasPendientesService
+from datetime import datetime, date, timedelta
+
+# Crear blueprint para tareas pendientes
+tareas_bp = Blueprint('tareas', __name__)
+
+# ===============================
+# ENDPOINTS DE TAREAS PENDIENTES
+# ===============================
+
+@tareas_bp.route('/por-hacienda/<int:hacienda_id>', methods=['GET'])
+@jwt_required()
+def listar_tareas_hacienda(hacienda_id):
+    """
+    Lista lo que hay que hacer en una hacienda: próximas dosis, vacunas de crías,
+    partos esperados y hembras aptas para monta, por fecha y prioridad
+    Query params: desde, hasta (YYYY-MM-DD), dias (ventana desde hoy, por defecto 7;
+    incluye las atrasadas), tipo, pagina, limite
+    """
+    try:
+        try:
+            desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date() if request.args.get('desde') else None
+            hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date() if request.args.get('hasta') else None
+        except ValueError:
+            return jsonify({
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD',
+                'status': 'error',
+                'code': 'INVALID_DATE'
+            }), 400
+
+        if hasta is None:
+            dias = min(max(request.args.get('dias', 7, type=int), 0), 365)
+            hasta = date.today() + timedelta(days=dias)
+
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('limite', 50, type=int), 1), 100)
+
+        resultado, codigo = TareasPendientesService.listar_por_hacienda(
+            hacienda_id, desde, hasta, request.args.get('tipo'), pagina, por_pagina
+        )
+        return jsonify(resultado), codigo
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al listar tareas pendientes: {str(e)}',
+            'status': 'error'
+        }), 500
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Usuario, RolUsuario
+from models import db, Usuario
+from services.versiones_service import VersionesService
+from services.referencias_service import ReferenciasService
+from services.auth_service import AuthService
 
 # Crear blueprint para usuarios
 usuarios_bp = Blueprint('usuarios', __name__)
@@ -92,6 +95,7 @@ def actualizar_perfil():
 
 @usuarios_bp.route('/usuarios', methods=['GET'])
 @jwt_required()
+@AuthService.requiere('gestionar_usuarios', mensaje='Solo administradores pueden ver la lista de usuarios')
 def get_usuarios():
     """
     Obtiene lista de usuarios (solo administradores)
@@ -99,16 +103,6 @@ def get_usuarios():
     Lista todos los usuarios del sistema
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden ver la lista de usuarios',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
-        
         # Obtener parámetros de filtro
         activo = request.args.get('activo')  # true/false
         rol = request.args.get('rol')  # nombre del rol
@@ -117,13 +111,13 @@ def get_usuarios():
         buscar = request.args.get('buscar', '').strip()
         
         # Construir query
-        query = Usuario.query.join(RolUsuario)
+        query = Usuario.query
         
         if activo is not None:
             query = query.filter(Usuario.activo == (activo.lower() == 'true'))
         
         if rol:
-            query = query.filter(RolUsuario.nombre_rol == rol)
+            query = query.filter(Usuario.idrol.in_([ReferenciasService.id_rol(rol)]))
         
         if buscar:
             query = query.filter(
@@ -159,6 +153,7 @@ def get_usuarios():
 
 @usuarios_bp.route('/usuarios/<int:usuario_id>/toggle-estado', methods=['PUT'])
 @jwt_required()
+@AuthService.requiere('gestionar_usuarios', mensaje='Solo administradores pueden cambiar estado de usuarios')
 def toggle_estado_usuario(usuario_id):
     """
     Activa/desactiva un usuario (solo administradores)
@@ -167,14 +162,6 @@ def toggle_estado_usuario(usuario_id):
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden cambiar estado de usuarios',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
         
         # No puede desactivarse a sí mismo
         if current_user_id == usuario_id:
@@ -194,6 +181,10 @@ def toggle_estado_usuario(usuario_id):
         usuario.activo = not usuario.activo
         db.session.commit()
         
+        # Los tokens ya emitidos dejan de valer al desactivar la cuenta
+        if not usuario.activo:
+            AuthService.revocar_tokens(usuario.idusuario)
+        
         estado_texto = 'activado' if usuario.activo else 'desactivado'
         
         return jsonify({
@@ -211,6 +202,7 @@ def toggle_estado_usuario(usuario_id):
 
 @usuarios_bp.route('/usuarios/<int:usuario_id>', methods=['PUT'])
 @jwt_required()
+@AuthService.requiere('gestionar_usuarios', mensaje='Solo administradores pueden actualizar otros usuarios')
 def actualizar_usuario(usuario_id):
     """
     Actualiza un usuario específico (solo administradores)
@@ -218,16 +210,6 @@ def actualizar_usuario(usuario_id):
     Permite a administradores actualizar cualquier usuario
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden actualizar otros usuarios',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
-        
         usuario = Usuario.query.get(usuario_id)
         if not usuario:
             return jsonify({
@@ -245,17 +227,21 @@ def actualizar_usuario(usuario_id):
         # Campos que se pueden actualizar
         campos_permitidos = ['nombres', 'apellidos', 'telefono', 'direccion', 'idrol']
         actualizado = False
+        revocar = False
         
         for campo in campos_permitidos:
             if campo in data and data[campo] is not None:
                 if campo == 'idrol':
                     # Verificar que el rol existe
-                    rol = RolUsuario.query.get(data[campo])
+                    rol = ReferenciasService.obtener('rol_usuario', data[campo])
                     if not rol:
                         return jsonify({
                             'error': 'Rol no encontrado',
                             'status': 'error'
                         }), 404
+                    if str(usuario.idrol) != str(data[campo]):
+                        # El rol y los permisos van en el token: obligar a renovarlo
+                        revocar = True
                     setattr(usuario, campo, data[campo])
                 else:
                     valor = str(data[campo]).strip() if data[campo] else None
@@ -265,6 +251,9 @@ def actualizar_usuario(usuario_id):
         if actualizado:
             db.session.commit()
         
+        if revocar:
+            AuthService.revocar_tokens(usuario.idusuario)
+        
         return jsonify({
             'message': f'Usuario {usuario.nombres} {usuario.apellidos} actualizado exitosamente',
             'usuario': usuario.to_dict(),
@@ -280,6 +269,7 @@ def actualizar_usuario(usuario_id):
 
 @usuarios_bp.route('/usuarios/<int:usuario_id>', methods=['DELETE'])
 @jwt_required()
+@AuthService.requiere('gestionar_usuarios', mensaje='Solo administradores pueden eliminar usuarios')
 def eliminar_usuario(usuario_id):
     """
     Elimina un usuario (solo administradores)
@@ -288,14 +278,6 @@ def eliminar_usuario(usuario_id):
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden eliminar usuarios',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
         
         # No puede eliminarse a sí mismo
         if current_user_id == usuario_id:
@@ -314,6 +296,7 @@ def eliminar_usuario(usuario_id):
         nombre_usuario = f"{usuario.nombres} {usuario.apellidos}"
         db.session.delete(usuario)
         db.session.commit()
+        AuthService.revocar_tokens(usuario_id)
         
         return jsonify({
             'message': f'Usuario {nombre_usuario} eliminado exitosamente',
@@ -329,6 +312,7 @@ def eliminar_usuario(usuario_id):
 
 @usuarios_bp.route('/roles', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('rol_usuario')
 def get_roles():
     """
     Obtiene lista de roles disponibles
@@ -336,9 +320,9 @@ def get_roles():
     Lista todos los roles del sistema
     """
     try:
-        roles = RolUsuario.query.filter_by(activo=True).all()
+        roles = [rol for rol in ReferenciasService.todos('rol_usuario') if rol['activo']]
         return jsonify({
-            'roles': [rol.to_dict() for rol in roles],
+            'roles': [dict(rol) for rol in roles],
             'status': 'success'
         }), 200
         
@@ -350,6 +334,7 @@ def get_roles():
 
 @usuarios_bp.route('/estadisticas', methods=['GET'])
 @jwt_required()
+@AuthService.requiere('ver_estadisticas', mensaje='Solo administradores pueden ver estadísticas')
 def get_estadisticas():
     """
     Obtiene estadísticas del sistema (solo administradores)
@@ -357,16 +342,6 @@ def get_estadisticas():
     Retorna estadísticas generales del sistema
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = Usuario.query.get(current_user_id)
-        
-        if not current_user or not current_user.es_administrador():
-            return jsonify({
-                'error': 'Solo administradores pueden ver estadísticas',
-                'status': 'error',
-                'code': 'ACCESS_DENIED'
-            }), 403
-        
         estadisticas = Usuario.obtener_estadisticas()
         
         return jsonify({
@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, date, timedelta
 from services.vacunacion_service import VacunacionService
+from services.jornadas_service import JornadasService
+from services.cumplimiento_service import CumplimientoService
+from services.inventario_vacunas_service import InventarioVacunasService
+from services.versiones_service import VersionesService
+from services.coalescencia_service import CoalescenciaService
+from datetime import datetime
 
 # Crear blueprint para vacunación
 vacunacion_bp = Blueprint('vacunacion', __name__)
@@ -12,6 +17,7 @@ vacunacion_bp = Blueprint('vacunacion', __name__)
 
 @vacunacion_bp.route('/vacunas/', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('catalogo_vacunas')
 def listar_vacunas():
     """
     Lista vacunas del catálogo con filtros y paginación
@@ -94,6 +100,7 @@ def actualizar_vacuna(vacuna_id):
 
 @vacunacion_bp.route('/vacunas/activas', methods=['GET'])
 @jwt_required()
+@VersionesService.condicional('catalogo_vacunas')
 def obtener_vacunas_activas():
     """
     Obtiene solo las vacunas activas
@@ -265,6 +272,7 @@ def obtener_dosis_vencidas():
 
 @vacunacion_bp.route('/estadisticas', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer('vacunacion_animales', 'animales', 'catalogo_vacunas')
 def obtener_estadisticas_vacunacion():
     """
     Obtiene estadísticas de vacunación
@@ -281,71 +289,253 @@ def obtener_estadisticas_vacunacion():
             'status': 'error'
         }), 500
 
+@vacunacion_bp.route('/campanas', methods=['POST'])
+@jwt_required()
+def registrar_campaña():
+    """
+    Registra una campaña de vacunación en una hacienda: una vacuna para varios
+    animales (los indicados o todos los activos), con las dosis asignadas de los lotes
+    Body: idhacienda, idvacuna, fecha_aplicacion, animales (opcional), idlote, dosis,
+    veterinario, observaciones, proxima_dosis
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'error': 'No se proporcionaron datos',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = VacunacionService.registrar_campaña(data, current_user_id)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al registrar la campaña de vacunación: {str(e)}',
+            'status': 'error'
+        }), 500
+
+# ===============================
+# ENDPOINTS DEL INVENTARIO DE LOTES
+# ===============================
+
+@vacunacion_bp.route('/lotes/', methods=['GET'])
+@jwt_required()
+def listar_lotes():
+    """
+    Lista lotes de vacuna en orden de vencimiento
+    Query params: hacienda_id, idvacuna, disponibles (true: con dosis y sin vencer), pagina, limite
+    """
+    try:
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('limite', 50, type=int), 1), 100)
+        
+        resultado, codigo = InventarioVacunasService.listar_lotes(
+            request.args.get('hacienda_id', type=int),
+            request.args.get('idvacuna', type=int),
+            request.args.get('disponibles', '').lower() == 'true',
+            pagina,
+            por_pagina
+        )
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al listar lotes: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@vacunacion_bp.route('/lotes/', methods=['POST'])
+@jwt_required()
+def crear_lote():
+    """
+    Registra un lote de vacuna en una hacienda
+    Body: idhacienda, idvacuna, codigo, fecha_vencimiento, cantidad
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'error': 'No se proporcionaron datos',
+                'status': 'error'
+            }), 400
+        
+        resultado, codigo = InventarioVacunasService.crear_lote(data, current_user_id)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al registrar lote: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@vacunacion_bp.route('/lotes/alertas', methods=['GET'])
+@jwt_required()
+def alertas_inventario():
+    """
+    Alertas del inventario: stock bajo por hacienda y vacuna y lotes por vencer
+    Query params: hacienda_id
+    """
+    try:
+        resultado, codigo = InventarioVacunasService.obtener_alertas(request.args.get('hacienda_id', type=int))
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al obtener alertas de inventario: {str(e)}',
+            'status': 'error'
+        }), 500
+
 # ===============================
 # ENDPOINTS DE REPORTES
 # ===============================
 
 @vacunacion_bp.route('/reporte/calendario-vacunacion', methods=['GET'])
 @jwt_required()
+@CoalescenciaService.coalescer('vacunacion_animales', 'animales', 'catalogo_vacunas')
 def obtener_calendario_vacunacion():
     """
-    Obtiene calendario de vacunación (próximas y vencidas)
+    Obtiene calendario de vacunación: última dosis de cada animal activo y vacuna,
+    agrupada en urgentes (vencidas o próximos 7 días), cercanas (8-30), programadas
+    (31-60) y sin_vacunar (nunca aplicadas)
+    Query params: hacienda_id, grupo (paginar un solo grupo), pagina, limite
     """
     try:
         hacienda_id = request.args.get('hacienda_id', type=int)
+        grupo = request.args.get('grupo')
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('limite', 50, type=int), 1), 100)
         
-        # Obtener próximas dosis (próximos 60 días)
-        proximas, _ = VacunacionService.obtener_proximas_dosis(60, hacienda_id)
-        
-        # Obtener dosis vencidas
-        vencidas, _ = VacunacionService.obtener_vencidas(hacienda_id)
-        
-        # Organizar por urgencia
-        urgentes = []  # Vencidas o próximas 7 días
-        cercanas = []  # Próximas 8-30 días
-        programadas = []  # Próximas 31-60 días
-        
-        hoy = date.today()
-        limite_urgente = hoy + timedelta(days=7)
-        limite_cercano = hoy + timedelta(days=30)
-        
-        # Clasificar vencidas como urgentes
-        if vencidas['status'] == 'success':
-            urgentes.extend(vencidas['dosis_vencidas'])
-        
-        # Clasificar próximas por urgencia
-        if proximas['status'] == 'success':
-            for vacunacion in proximas['proximas_dosis']:
-                if vacunacion.get('proxima_dosis'):
-                    try:
-                        fecha_proxima = datetime.strptime(vacunacion['proxima_dosis'], '%Y-%m-%d').date()
-                        if fecha_proxima <= limite_urgente:
-                            urgentes.append(vacunacion)
-                        elif fecha_proxima <= limite_cercano:
-                            cercanas.append(vacunacion)
-                        else:
-                            programadas.append(vacunacion)
-                    except:
-                        programadas.append(vacunacion)
+        resultado, codigo = VacunacionService.obtener_calendario_vacunacion(
+            hacienda_id, grupo, pagina, por_pagina
+        )
+        return jsonify(resultado), codigo
         
+    except Exception as e:
         return jsonify({
-            'calendario': {
-                'urgentes': urgentes,
-                'cercanas': cercanas,
-                'programadas': programadas
-            },
-            'resumen': {
-                'total_urgentes': len(urgentes),
-                'total_cercanas': len(cercanas),
-                'total_programadas': len(programadas)
-            },
-            'hacienda_id': hacienda_id,
-            'fecha_consulta': hoy.isoformat(),
-            'status': 'success'
-        }), 200
+            'error': f'Error al obtener calendario de vacunación: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@vacunacion_bp.route('/reporte/jornadas', methods=['GET'])
+@jwt_required()
+def planificar_jornadas():
+    """
+    Planifica las visitas de vacunación: agrupa las dosis pendientes de cada hacienda
+    en el menor número de fechas, respetando la ventana de cada dosis y la capacidad
+    Query params: hacienda_id, dias (horizonte), antes, despues (ventana en días),
+    capacidad (dosis por visita), pagina, limite (haciendas por página)
+    """
+    try:
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('limite', 20, type=int), 1), 100)
+        
+        resultado, codigo = JornadasService.planificar_jornadas(
+            hacienda_id=request.args.get('hacienda_id', type=int),
+            dias=request.args.get('dias', type=int),
+            antes=request.args.get('antes', type=int),
+            despues=request.args.get('despues', type=int),
+            capacidad=request.args.get('capacidad', type=int),
+            pagina=pagina,
+            por_pagina=por_pagina
+        )
+        return jsonify(resultado), codigo
         
     except Exception as e:
         return jsonify({
-            'error': f'Error al obtener calendario de vacunación: {str(e)}',
+            'error': f'Error al planificar jornadas de vacunación: {str(e)}',
+            'status': 'error'
+        }), 500
+
+def _parametros_cumplimiento():
+    """Ciclos (separados por coma), fecha de corte, hacienda y departamento del reporte"""
+    ciclos = [ciclo.strip() for ciclo in request.args.get('ciclo', '').split(',') if ciclo.strip()]
+    fecha_corte = request.args.get('fecha_corte')
+    corte = datetime.strptime(fecha_corte, '%Y-%m-%d').date() if fecha_corte else None
+    return ciclos, corte, request.args.get('hacienda_id', type=int), request.args.get('departamento')
+
+@vacunacion_bp.route('/reporte/cumplimiento', methods=['GET'])
+@jwt_required()
+def reporte_cumplimiento():
+    """
+    Detalle de cumplimiento sanitario por ciclo oficial (aftosa, brucelosis): una fila
+    por animal con su estado de cobertura, enviada en streaming
+    Query params: formato (csv|ndjson), ciclo, fecha_corte, hacienda_id, departamento
+    """
+    try:
+        formato = request.args.get('formato', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            return jsonify({
+                'error': 'Formato no válido. Opciones: csv, ndjson',
+                'status': 'error',
+                'code': 'INVALID_FORMAT'
+            }), 400
+        
+        try:
+            ciclos, corte, hacienda_id, departamento = _parametros_cumplimiento()
+        except ValueError:
+            return jsonify({
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD',
+                'status': 'error',
+                'code': 'INVALID_DATE'
+            }), 400
+        
+        ciclos = CumplimientoService.validar_ciclos(ciclos)
+        if ciclos is None:
+            return jsonify({
+                'error': f'Ciclo no válido. Opciones: {", ".join(CumplimientoService.CICLOS)}',
+                'status': 'error',
+                'code': 'INVALID_CYCLE'
+            }), 400
+        
+        corte = corte or datetime.now().date()
+        filas = CumplimientoService.filas(ciclos, corte, hacienda_id, departamento)
+        
+        if formato == 'csv':
+            respuesta = Response(
+                stream_with_context(CumplimientoService.generar_csv(filas)), mimetype='text/csv'
+            )
+            respuesta.headers['Content-Disposition'] = (
+                f'attachment; filename=cumplimiento_{"_".join(ciclos)}_{corte.isoformat()}.csv'
+            )
+        else:
+            respuesta = Response(
+                stream_with_context(CumplimientoService.generar_ndjson(filas)), mimetype='application/x-ndjson'
+            )
+        return respuesta
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al generar el reporte de cumplimiento: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@vacunacion_bp.route('/reporte/cumplimiento/resumen', methods=['GET'])
+@jwt_required()
+def resumen_cumplimiento():
+    """
+    Cobertura por ciclo oficial, consolidada por departamento y municipio
+    Query params: ciclo, fecha_corte, hacienda_id, departamento
+    """
+    try:
+        try:
+            ciclos, corte, hacienda_id, departamento = _parametros_cumplimiento()
+        except ValueError:
+            return jsonify({
+                'error': 'Formato de fecha inválido. Use YYYY-MM-DD',
+                'status': 'error',
+                'code': 'INVALID_DATE'
+            }), 400
+        
+        resultado, codigo = CumplimientoService.obtener_resumen(ciclos, corte, hacienda_id, departamento)
+        return jsonify(resultado), codigo
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al generar el resumen de cumplimiento: {str(e)}',
             'status': 'error'
         }), 500
\ No newline at end of file
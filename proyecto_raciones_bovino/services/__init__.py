@@ -6,6 +6,29 @@ from .animal_service import AnimalService
 from .hacienda_service import HaciendaService
 from .vacunacion_service import VacunacionService
 from .nacimiento_service import NacimientoService
+from .busqueda_service import BusquedaService
+from .hierro_service import HierroService
+from .indices_service import IndicesService
+from .estadisticas_service import EstadisticasService
+from .tareas_service import TareasService
+from .resumen_service import ResumenService
+from .instantaneas_service import InstantaneasService
+from .versiones_service import VersionesService
+from .cache_service import CacheService
+from .invalidacion_service import InvalidacionService
+from .referencias_service import ReferenciasService
+from .coalescencia_service import CoalescenciaService
+from .respuesta_service import RespuestaService
+from .batch_service import BatchService
+from .estado_vacunacion_service import EstadoVacunacionService
+from .alertas_service import AlertasService
+from .tareas_pendientes_service import TareasPendientesService
+from .jornadas_service import JornadasService
+from .cumplimiento_service import CumplimientoService
+from .inventario_vacunas_service import InventarioVacunasService
+from .genealogia_service import GenealogiaService
+from .consanguinidad_service import ConsanguinidadService
+from .monta_service import MontaService
 
 # Hacer disponibles los servicios cuando se importe el paquete
 __all__ = [
@@ -13,5 +36,28 @@ __all__ = [
     'AnimalService',
     'HaciendaService',
     'VacunacionService',
-    'NacimientoService'
+    'NacimientoService',
+    'BusquedaService',
+    'HierroService',
+    'IndicesService',
+    'EstadisticasService',
+    'TareasService',
+    'ResumenService',
+    'InstantaneasService',
+    'VersionesService',
+    'CacheService',
+    'InvalidacionService',
+    'ReferenciasService',
+    'CoalescenciaService',
+    'RespuestaService',
+    'BatchService',
+    'EstadoVacunacionService',
+    'AlertasService',
+    'TareasPendientesService',
+    'JornadasService',
+    'CumplimientoService',
+    'InventarioVacunasService',
+    'GenealogiaService',
+    'ConsanguinidadService',
+    'MontaService'
 ]
\ No newline at end of file
@@ -0,0 +1,652 @@
+from models import db, Animal, Hacienda, Nacimiento, VacunacionAnimal, EstadoVacunacionAnimal, VersionTabla
+from services.invalidacion_service import InvalidacionService
+from services.referencias_service import ReferenciasService
+from sqlalchemy import select, or_
+from sqlalchemy.orm import aliased
+from datetime import date, datetime, timedelta
+import heapq
+import itertools
+import threading
+import time
+
+class _Instantanea:
+    """Alertas materializadas, clasificadas para un día"""
+
+    def __init__(self, dia, dias_anticipacion):
+        self.dia = dia
+        self.dias_anticipacion = dias_anticipacion
+        self.entradas = {}    # clave -> entrada
+        self.haciendas = {}   # idhacienda -> grupo -> {clave: entrada}
+        self.por_animal = {}  # idanimal -> claves de las entradas en que aparece
+        self.cola = []        # (fecha de transición, secuencia, clave, entrada)
+        self.secuencia = itertools.count()
+        self.generado_en = datetime.now()
+
+class AlertasService:
+    """
+    Instantánea de alertas de vacunación por hacienda
+    Dosis vencidas, dosis próximas (última aplicación de cada vacuna por animal) y crías
+    sin vacunar se materializan una vez al día. Un montículo con la fecha en que cada
+    entrada cambia de grupo las mueve al pasar los días sin volver a consultar; los
+    commits marcan los animales y haciendas a recargar y el parche se aplica en la
+    siguiente lectura. Las escrituras de otros procesos se detectan con las versiones
+    de tabla, revisadas como mucho cada ALERTAS_VERIFICACION_SEGUNDOS.
+    """
+
+    # Tablas cuyas escrituras cambian las alertas
+    TABLAS = ('vacunacion_animales', 'nacimientos', 'animales', 'haciendas')
+
+    GRUPOS = ('dosis_vencidas', 'dosis_proximas', 'crias_sin_vacunar', 'crias_pendientes')
+
+    # Edad a la que una cría sin vacunar pasa a ser alerta
+    DIAS_VACUNACION_CRIAS = 90
+
+    # Animales por consulta al recargar
+    LOTE_RECARGA = 500
+
+    _instantanea = None
+    _generacion = 0
+    _animales_pendientes = set()
+    _haciendas_pendientes = set()
+    _recarga_completa = False
+    _versiones = None
+    _verificado_en = 0
+    _dias_anticipacion = 30
+    _intervalo_verificacion = 60
+    _metricas = {'materializaciones': 0, 'parches': 0, 'transiciones': 0}
+    _lock = threading.Lock()              # instantánea
+    _lock_pendientes = threading.Lock()   # marcas de los commits (no espera a las consultas)
+    _lock_materializacion = threading.Lock()
+    _eventos_registrados = False
+
+    @staticmethod
+    def iniciar(app):
+        """Lee la configuración y se suscribe al bus de invalidación"""
+        AlertasService._dias_anticipacion = app.config.get('ALERTAS_DIAS_ANTICIPACION', 30)
+        AlertasService._intervalo_verificacion = app.config.get('ALERTAS_VERIFICACION_SEGUNDOS', 60)
+        AlertasService._registrar_eventos()
+
+    # ===============================
+    # CONSULTAS BASE
+    # ===============================
+
+    @staticmethod
+    def _consultar_dosis(conexion, hasta, *condiciones):
+        """Última aplicación de cada par (animal, vacuna) con próxima dosis hasta una fecha"""
+        estado = EstadoVacunacionAnimal
+
+        return conexion.execute(
+            select(
+                VacunacionAnimal.idvacunacion,
+                estado.idanimal,
+                estado.idvacuna,
+                VacunacionAnimal.fecha_aplicacion,
+                VacunacionAnimal.dosis,
+                VacunacionAnimal.lote_vacuna,
+                VacunacionAnimal.idlote,
+                VacunacionAnimal.veterinario,
+                VacunacionAnimal.observaciones,
+                estado.proxima_dosis,
+                Animal.hierro,
+                Animal.sexo,
+                Animal.raza,
+                Animal.idhacienda,
+                Hacienda.nombre.label('hacienda_nombre')
+            ).select_from(estado).join(
+                VacunacionAnimal, VacunacionAnimal.idvacunacion == estado.idvacunacion
+            ).join(
+                Animal, Animal.idanimal == estado.idanimal
+            ).outerjoin(
+                Hacienda, Hacienda.idhacienda == Animal.idhacienda
+            ).where(
+                estado.proxima_dosis.isnot(None),
+                estado.proxima_dosis <= hasta,
+                *condiciones
+            )
+        ).mappings().all()
+
+    @staticmethod
+    def _consultar_crias(conexion, *condiciones, haciendas=None):
+        """
+        Nacimientos con vacunas pendientes, con los datos de la cría, la madre y el padre
+        haciendas: solo los que tienen a la cría, la madre o el padre en esas haciendas
+        """
+        madre = aliased(Animal)
+        padre = aliased(Animal)
+        hacienda_madre = aliased(Hacienda)
+        hacienda_padre = aliased(Hacienda)
+
+        if haciendas:
+            condiciones += (or_(
+                Animal.idhacienda.in_(haciendas),
+                madre.idhacienda.in_(haciendas),
+                padre.idhacienda.in_(haciendas)
+            ),)
+
+        return conexion.execute(
+            select(
+                *Nacimiento.__table__.c,
+                Animal.hierro.label('cria_hierro'),
+                Animal.sexo.label('cria_sexo'),
+                Animal.raza.label('cria_raza'),
+                Animal.idhacienda,
+                Hacienda.nombre.label('cria_hacienda_nombre'),
+                madre.hierro.label('madre_hierro'),
+                madre.raza.label('madre_raza'),
+                madre.numero_partos.label('madre_numero_partos'),
+                madre.idhacienda.label('madre_idhacienda'),
+                hacienda_madre.nombre.label('madre_hacienda_nombre'),
+                padre.hierro.label('padre_hierro'),
+                padre.raza.label('padre_raza'),
+                padre.idhacienda.label('padre_idhacienda'),
+                hacienda_padre.nombre.label('padre_hacienda_nombre')
+            ).select_from(Nacimiento).join(
+                Animal, Animal.idanimal == Nacimiento.idanimal_cria
+            ).outerjoin(
+                Hacienda, Hacienda.idhacienda == Animal.idhacienda
+            ).outerjoin(
+                madre, madre.idanimal == Nacimiento.idanimal_madre
+            ).outerjoin(
+                hacienda_madre, hacienda_madre.idhacienda == madre.idhacienda
+            ).outerjoin(
+                padre, padre.idanimal == Nacimiento.idanimal_padre
+            ).outerjoin(
+                hacienda_padre, hacienda_padre.idhacienda == padre.idhacienda
+            ).where(
+                Nacimiento.vacunas_aplicadas == False,
+                *condiciones
+            )
+        ).mappings().all()
+
+    @staticmethod
+    def _leer_versiones(conexion):
+        filas = conexion.execute(
+            select(VersionTabla.tabla, VersionTabla.particion, VersionTabla.version).where(
+                VersionTabla.tabla.in_(AlertasService.TABLAS)
+            )
+        ).all()
+        return {(tabla, particion): version for tabla, particion, version in filas}
+
+    # ===============================
+    # ENTRADAS Y GRUPOS
+    # ===============================
+
+    @staticmethod
+    def _clasificar(tipo, fecha, dia):
+        """(grupo, fecha en que la entrada cambia de grupo o None si ya no cambia)"""
+        if tipo == 'dosis':
+            if fecha < dia:
+                return 'dosis_vencidas', None
+            return 'dosis_proximas', fecha + timedelta(days=1)
+
+        alerta = fecha + timedelta(days=AlertasService.DIAS_VACUNACION_CRIAS)
+        if alerta <= dia:
+            return 'crias_sin_vacunar', None
+        return 'crias_pendientes', alerta
+
+    @staticmethod
+    def _ubicar(instantanea, entrada):
+        """Pone la entrada en su grupo del día y programa su siguiente transición"""
+        grupo, transicion = AlertasService._clasificar(entrada['tipo'], entrada['fecha'], instantanea.dia)
+        grupos = instantanea.haciendas.setdefault(entrada['idhacienda'], {})
+
+        if entrada.get('grupo'):
+            grupos[entrada['grupo']].pop(entrada['clave'], None)
+
+        entrada['grupo'] = grupo
+        grupos.setdefault(grupo, {})[entrada['clave']] = entrada
+
+        if transicion is not None:
+            heapq.heappush(
+                instantanea.cola,
+                (transicion, next(instantanea.secuencia), entrada['clave'], entrada)
+            )
+
+    @staticmethod
+    def _agregar(instantanea, tipo, fila):
+        datos = dict(fila)
+        if tipo == 'dosis':
+            clave = ('dosis', datos['idanimal'], datos['idvacuna'])
+            fecha = datos['proxima_dosis']
+            animales = (datos['idanimal'],)
+        else:
+            clave = ('cria', datos['idnacimiento'])
+            fecha = datos['fecha_nacimiento']
+            animales = tuple(
+                idanimal for idanimal in (datos['idanimal_cria'], datos['idanimal_madre'], datos['idanimal_padre'])
+                if idanimal is not None
+            )
+
+        AlertasService._quitar(instantanea, clave)
+
+        entrada = {
+            'clave': clave,
+            'tipo': tipo,
+            'fecha': fecha,
+            'idhacienda': datos['idhacienda'],
+            'animales': animales,
+            'grupo': None,
+            'datos': datos
+        }
+        instantanea.entradas[clave] = entrada
+        for idanimal in animales:
+            instantanea.por_animal.setdefault(idanimal, set()).add(clave)
+
+        AlertasService._ubicar(instantanea, entrada)
+
+    @staticmethod
+    def _quitar(instantanea, clave):
+        """Saca una entrada; su transición pendiente en la cola queda descartada"""
+        entrada = instantanea.entradas.pop(clave, None)
+        if entrada is None:
+            return
+
+        instantanea.haciendas[entrada['idhacienda']][entrada['grupo']].pop(clave, None)
+        for idanimal in entrada['animales']:
+            claves = instantanea.por_animal.get(idanimal)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del instantanea.por_animal[idanimal]
+
+    # ===============================
+    # MATERIALIZACIÓN
+    # ===============================
+
+    @staticmethod
+    def materializar():
+        """Reconstruye la instantánea completa (tarea diaria); retorna el número de entradas"""
+        with AlertasService._lock_materializacion:
+            return AlertasService._construir()
+
+    @staticmethod
+    def _construir():
+        dia = date.today()
+        instantanea = _Instantanea(dia, AlertasService._dias_anticipacion)
+
+        # Lo marcado hasta aquí queda cubierto por la lectura completa; lo que se
+        # confirme durante la construcción se vuelve a aplicar como parche
+        AlertasService._tomar_pendientes()
+        AlertasService._recarga_completa = False
+
+        try:
+            # Conexión propia: solo datos confirmados, nunca escrituras pendientes de la sesión
+            with db.engine.connect() as conexion:
+                versiones = AlertasService._leer_versiones(conexion)
+                dosis = AlertasService._consultar_dosis(conexion, dia + timedelta(days=instantanea.dias_anticipacion))
+                crias = AlertasService._consultar_crias(conexion)
+        except Exception:
+            with AlertasService._lock_pendientes:
+                AlertasService._recarga_completa = True
+            raise
+
+        for fila in dosis:
+            AlertasService._agregar(instantanea, 'dosis', fila)
+        for fila in crias:
+            AlertasService._agregar(instantanea, 'cria', fila)
+
+        with AlertasService._lock_pendientes:
+            AlertasService._versiones = versiones
+            AlertasService._verificado_en = time.monotonic()
+
+        with AlertasService._lock:
+            AlertasService._instantanea = instantanea
+            AlertasService._generacion += 1
+            AlertasService._metricas['materializaciones'] += 1
+
+        return len(instantanea.entradas)
+
+    @staticmethod
+    def _avanzar(instantanea, hoy, conexion):
+        """Cambio de día: mueve las entradas cuya transición llegó y carga las dosis que entran en la ventana"""
+        limite_anterior = instantanea.dia + timedelta(days=instantanea.dias_anticipacion)
+        nuevas = AlertasService._consultar_dosis(
+            conexion,
+            hoy + timedelta(days=instantanea.dias_anticipacion),
+            EstadoVacunacionAnimal.proxima_dosis > limite_anterior
+        )
+
+        instantanea.dia = hoy
+        while instantanea.cola and instantanea.cola[0][0] <= hoy:
+            _, _, clave, entrada = heapq.heappop(instantanea.cola)
+            if instantanea.entradas.get(clave) is not entrada:
+                continue
+            AlertasService._ubicar(instantanea, entrada)
+            AlertasService._metricas['transiciones'] += 1
+
+        for fila in nuevas:
+            AlertasService._agregar(instantanea, 'dosis', fila)
+
+    @staticmethod
+    def _recargar(instantanea, conexion, animales, haciendas):
+        """Vuelve a leer las entradas de los animales y haciendas modificados"""
+        hasta = instantanea.dia + timedelta(days=instantanea.dias_anticipacion)
+
+        if haciendas:
+            # Entradas de la hacienda y crías cuya madre o padre está en ella
+            for entrada in list(instantanea.entradas.values()):
+                relacionadas = {entrada['idhacienda']}
+                if entrada['tipo'] == 'cria':
+                    relacionadas |= {entrada['datos']['madre_idhacienda'], entrada['datos']['padre_idhacienda']}
+                if relacionadas & haciendas:
+                    AlertasService._quitar(instantanea, entrada['clave'])
+
+            filtro = list(haciendas)
+            for fila in AlertasService._consultar_dosis(conexion, hasta, Animal.idhacienda.in_(filtro)):
+                AlertasService._agregar(instantanea, 'dosis', fila)
+            for fila in AlertasService._consultar_crias(conexion, haciendas=filtro):
+                AlertasService._agregar(instantanea, 'cria', fila)
+
+        animales = sorted(animales)
+        for inicio in range(0, len(animales), AlertasService.LOTE_RECARGA):
+            lote = animales[inicio:inicio + AlertasService.LOTE_RECARGA]
+
+            for idanimal in lote:
+                for clave in list(instantanea.por_animal.get(idanimal, ())):
+                    AlertasService._quitar(instantanea, clave)
+
+            for fila in AlertasService._consultar_dosis(conexion, hasta, EstadoVacunacionAnimal.idanimal.in_(lote)):
+                AlertasService._agregar(instantanea, 'dosis', fila)
+            for fila in AlertasService._consultar_crias(conexion, or_(
+                Nacimiento.idanimal_cria.in_(lote),
+                Nacimiento.idanimal_madre.in_(lote),
+                Nacimiento.idanimal_padre.in_(lote)
+            )):
+                AlertasService._agregar(instantanea, 'cria', fila)
+
+    # ===============================
+    # SINCRONIZACIÓN
+    # ===============================
+
+    @staticmethod
+    def _al_confirmar(cambios):
+        """Suscriptor del bus: marca lo que hay que recargar (sin consultar durante el commit)"""
+        if not cambios['tablas'] & set(AlertasService.TABLAS):
+            return
+
+        with AlertasService._lock_pendientes:
+            AlertasService._animales_pendientes |= cambios['animales']
+            AlertasService._haciendas_pendientes |= cambios['haciendas'].get('haciendas', set())
+            if 'haciendas' in cambios['tablas_globales']:
+                AlertasService._recarga_completa = True
+
+    @staticmethod
+    def _tomar_pendientes():
+        """Retorna y limpia los animales y haciendas marcados"""
+        with AlertasService._lock_pendientes:
+            pendientes = (AlertasService._animales_pendientes, AlertasService._haciendas_pendientes)
+            AlertasService._animales_pendientes = set()
+            AlertasService._haciendas_pendientes = set()
+        return pendientes
+
+    @staticmethod
+    def _devolver_pendientes(animales, haciendas):
+        """Vuelve a marcar un parche que no se pudo aplicar"""
+        with AlertasService._lock_pendientes:
+            AlertasService._animales_pendientes |= animales
+            AlertasService._haciendas_pendientes |= haciendas
+
+    @staticmethod
+    def _registrar_eventos():
+        if AlertasService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(AlertasService._al_confirmar)
+
+        AlertasService._eventos_registrados = True
+
+    @staticmethod
+    def _verificar_versiones():
+        """Marca las haciendas cuya versión cambió en otro proceso (una consulta por intervalo)"""
+        ahora = time.monotonic()
+        if ahora - AlertasService._verificado_en < AlertasService._intervalo_verificacion:
+            return
+        AlertasService._verificado_en = ahora
+
+        try:
+            with db.engine.connect() as conexion:
+                versiones = AlertasService._leer_versiones(conexion)
+        except Exception as e:
+            print(f"❌ Error verificando versiones de las alertas: {e}")
+            return
+
+        with AlertasService._lock_pendientes:
+            anteriores = AlertasService._versiones or {}
+            for (tabla, particion), version in versiones.items():
+                if version == anteriores.get((tabla, particion), 0):
+                    continue
+                if particion == '*':
+                    AlertasService._recarga_completa = True
+                elif particion.isdigit():
+                    AlertasService._haciendas_pendientes.add(int(particion))
+            AlertasService._versiones = versiones
+
+    @staticmethod
+    def _vigente():
+        """Instantánea del día con los parches pendientes aplicados"""
+        AlertasService._verificar_versiones()
+        hoy = date.today()
+
+        instantanea = AlertasService._instantanea
+        generacion = AlertasService._generacion
+        completa = (
+            instantanea is None
+            or AlertasService._recarga_completa
+            or instantanea.dia > hoy
+            or instantanea.dias_anticipacion != AlertasService._dias_anticipacion
+        )
+
+        if completa:
+            with AlertasService._lock_materializacion:
+                # Otro hilo pudo materializarla mientras se esperaba
+                if AlertasService._generacion == generacion:
+                    AlertasService._construir()
+
+        with AlertasService._lock:
+            instantanea = AlertasService._instantanea
+            animales, haciendas = AlertasService._tomar_pendientes()
+            if instantanea.dia == hoy and not animales and not haciendas:
+                return instantanea
+
+            try:
+                with db.engine.connect() as conexion:
+                    if instantanea.dia != hoy:
+                        AlertasService._avanzar(instantanea, hoy, conexion)
+                    if animales or haciendas:
+                        AlertasService._recargar(instantanea, conexion, animales, haciendas)
+                        AlertasService._metricas['parches'] += 1
+            except Exception:
+                AlertasService._devolver_pendientes(animales, haciendas)
+                raise
+
+            return instantanea
+
+    @staticmethod
+    def _entradas(instantanea, grupos, hacienda_id=None):
+        """Entradas de los grupos (de una hacienda o de todas); llamar con el lock tomado"""
+        if hacienda_id:
+            particiones = [instantanea.haciendas.get(hacienda_id, {})]
+        else:
+            particiones = list(instantanea.haciendas.values())
+
+        return [
+            entrada
+            for particion in particiones
+            for grupo in grupos
+            for entrada in particion.get(grupo, {}).values()
+        ]
+
+    # ===============================
+    # FORMATO DE SALIDA
+    # ===============================
+
+    @staticmethod
+    def _item_dosis(datos, hoy):
+        """Mismo formato que VacunacionAnimal.to_dict()"""
+        item = {
+            'idvacunacion': datos['idvacunacion'],
+            'idanimal': datos['idanimal'],
+            'idvacuna': datos['idvacuna'],
+            'fecha_aplicacion': datos['fecha_aplicacion'].isoformat() if datos['fecha_aplicacion'] else None,
+            'dosis': datos['dosis'],
+            'lote_vacuna': datos['lote_vacuna'],
+            'idlote': datos['idlote'],
+            'veterinario': datos['veterinario'],
+            'observaciones': datos['observaciones'],
+            'proxima_dosis': datos['proxima_dosis'].isoformat(),
+            'animal': {
+                'hierro': datos['hierro'],
+                'sexo': datos['sexo'],
+                'raza': datos['raza'],
+                'hacienda_nombre': datos['hacienda_nombre']
+            }
+        }
+
+        vacuna = ReferenciasService.vacuna(datos['idvacuna'])
+        if vacuna:
+            item['vacuna'] = {
+                'nombre_vacuna': vacuna['nombre_vacuna'],
+                'descripcion': vacuna['descripcion'],
+                'frecuencia_dias': vacuna['frecuencia_dias']
+            }
+
+        dias_restantes = (datos['proxima_dosis'] - hoy).days
+        item['dias_desde_aplicacion'] = (hoy - datos['fecha_aplicacion']).days if datos['fecha_aplicacion'] else None
+        item['estado_proxima_dosis'] = VacunacionAnimal.clasificar_proxima_dosis(dias_restantes)
+        item['dias_para_proxima'] = dias_restantes
+        return item
+
+    @staticmethod
+    def _item_cria(datos, hoy):
+        """Mismo formato que Nacimiento.to_dict()"""
+        item = {
+            'idnacimiento': datos['idnacimiento'],
+            'idanimal_cria': datos['idanimal_cria'],
+            'idanimal_madre': datos['idanimal_madre'],
+            'idanimal_padre': datos['idanimal_padre'],
+            'fecha_nacimiento': datos['fecha_nacimiento'].isoformat(),
+            'peso_nacimiento': float(datos['peso_nacimiento']) if datos['peso_nacimiento'] else None,
+            'tipo_parto': datos['tipo_parto'],
+            'complicaciones': datos['complicaciones'],
+            'numero_registro': datos['numero_registro'],
+            'vacunas_aplicadas': datos['vacunas_aplicadas'],
+            'observaciones': datos['observaciones'],
+            'fecha_registro': datos['fecha_registro'].isoformat() if datos['fecha_registro'] else None,
+            'cria': {
+                'hierro': datos['cria_hierro'],
+                'sexo': datos['cria_sexo'],
+                'raza': datos['cria_raza'],
+                'hacienda_nombre': datos['cria_hacienda_nombre']
+            }
+        }
+
+        if datos['madre_hierro'] is not None:
+            item['madre'] = {
+                'hierro': datos['madre_hierro'],
+                'raza': datos['madre_raza'],
+                'numero_partos': datos['madre_numero_partos'],
+                'hacienda_nombre': datos['madre_hacienda_nombre']
+            }
+
+        if datos['padre_hierro'] is not None:
+            item['padre'] = {
+                'hierro': datos['padre_hierro'],
+                'raza': datos['padre_raza'],
+                'hacienda_nombre': datos['padre_hacienda_nombre']
+            }
+
+        item['edad_dias'] = (hoy - datos['fecha_nacimiento']).days
+        item['estado_vacunacion'] = 'Pendientes'
+        return item
+
+    # ===============================
+    # CONSULTA
+    # ===============================
+
+    @staticmethod
+    def _filas_proximas_dosis(dias_adelante, hacienda_id=None):
+        """Dosis con próxima fecha hasta dentro de N días (incluye las vencidas), por fecha"""
+        instantanea = AlertasService._vigente()
+        hoy = instantanea.dia
+        hasta = hoy + timedelta(days=dias_adelante)
+
+        with AlertasService._lock:
+            filas = [
+                entrada['datos']
+                for entrada in AlertasService._entradas(instantanea, ('dosis_vencidas', 'dosis_proximas'), hacienda_id)
+                if entrada['fecha'] <= hasta
+            ]
+
+        # Más allá de la ventana en memoria: rango del índice de próximas dosis
+        if dias_adelante > instantanea.dias_anticipacion:
+            condiciones = [EstadoVacunacionAnimal.proxima_dosis > hoy + timedelta(days=instantanea.dias_anticipacion)]
+            if hacienda_id:
+                condiciones.append(Animal.idhacienda == hacienda_id)
+            with db.engine.connect() as conexion:
+                filas += [dict(fila) for fila in AlertasService._consultar_dosis(conexion, hasta, *condiciones)]
+
+        filas.sort(key=lambda datos: (datos['proxima_dosis'], datos['idvacunacion']))
+        return hoy, filas
+
+    @staticmethod
+    def proximas_dosis(dias_adelante=30, hacienda_id=None):
+        """Próximas dosis (y vencidas) hasta dentro de N días"""
+        hoy, filas = AlertasService._filas_proximas_dosis(dias_adelante, hacienda_id)
+        return [AlertasService._item_dosis(datos, hoy) for datos in filas]
+
+    @staticmethod
+    def contar_proximas_dosis(dias_adelante=30, hacienda_id=None):
+        return len(AlertasService._filas_proximas_dosis(dias_adelante, hacienda_id)[1])
+
+    @staticmethod
+    def dosis_vencidas(hacienda_id=None):
+        """Dosis cuya próxima fecha ya pasó, por fecha"""
+        instantanea = AlertasService._vigente()
+        with AlertasService._lock:
+            filas = [entrada['datos'] for entrada in AlertasService._entradas(instantanea, ('dosis_vencidas',), hacienda_id)]
+
+        filas.sort(key=lambda datos: (datos['proxima_dosis'], datos['idvacunacion']))
+        return [AlertasService._item_dosis(datos, instantanea.dia) for datos in filas]
+
+    @staticmethod
+    def crias_sin_vacunar(hacienda_id=None):
+        """Crías de más de 90 días sin vacunas iniciales, de la más antigua a la más reciente"""
+        instantanea = AlertasService._vigente()
+        with AlertasService._lock:
+            filas = [entrada['datos'] for entrada in AlertasService._entradas(instantanea, ('crias_sin_vacunar',), hacienda_id)]
+
+        filas.sort(key=lambda datos: (datos['fecha_nacimiento'], datos['idnacimiento']))
+        return [AlertasService._item_cria(datos, instantanea.dia) for datos in filas]
+
+    @staticmethod
+    def totales(hacienda_id=None):
+        """Conteos de cada grupo de alertas (sin construir los registros)"""
+        instantanea = AlertasService._vigente()
+        with AlertasService._lock:
+            if hacienda_id:
+                particiones = [instantanea.haciendas.get(hacienda_id, {})]
+            else:
+                particiones = list(instantanea.haciendas.values())
+
+            totales = {
+                grupo: sum(len(particion.get(grupo, {})) for particion in particiones)
+                for grupo in AlertasService.GRUPOS
+            }
+
+        totales['dias_anticipacion'] = instantanea.dias_anticipacion
+        return totales
+
+    @staticmethod
+    def metricas():
+        """Estado de la instantánea (para el health check)"""
+        with AlertasService._lock:
+            instantanea = AlertasService._instantanea
+            return dict(
+                AlertasService._metricas,
+                dia=instantanea.dia.isoformat() if instantanea else None,
+                generado_en=instantanea.generado_en.isoformat() if instantanea else None,
+                entradas=len(instantanea.entradas) if instantanea else 0,
+                cola=len(instantanea.cola) if instantanea else 0,
+                parches_pendientes=len(AlertasService._animales_pendientes) + len(AlertasService._haciendas_pendientes)
+            )
@@ -1,4 +1,9 @@
-from models import db, Animal, EstadoAnimal, Hacienda, Usuario
+from models import db, Animal, EstadoAnimal, Hacienda, IndiceBusqueda
+from services.cache_service import CacheService
+from services.hierro_service import HierroService
+from services.estadisticas_service import EstadisticasService
+from services.referencias_service import ReferenciasService
+from services.auth_service import AuthService
 from datetime import datetime, date
 import re
 
@@ -114,7 +119,7 @@ class AnimalService:
         """Crea un nuevo animal"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear animales',
@@ -141,7 +146,7 @@ class AnimalService:
             
             # Validar que el estado existe
             estado_id = datos.get('idestado', 1)  # Por defecto 'Activo'
-            estado = EstadoAnimal.query.get(estado_id)
+            estado = ReferenciasService.obtener('estados_animal', estado_id)
             if not estado:
                 return {
                     'error': 'Estado de animal no válido',
@@ -245,7 +250,7 @@ class AnimalService:
     def listar_animales(filtros=None, pagina=1, por_pagina=50):
         """Lista animales con filtros y paginación"""
         try:
-            query = Animal.query.join(Hacienda).join(EstadoAnimal)
+            query = Animal.query.join(Hacienda).filter(Animal.idestado.isnot(None))
             
             # Aplicar filtros
             if filtros:
@@ -268,9 +273,12 @@ class AnimalService:
                     termino = filtros['buscar']
                     query = query.filter(
                         db.or_(
-                            Animal.hierro.ilike(f'%{termino}%'),
-                            Animal.raza.ilike(f'%{termino}%'),
-                            Hacienda.nombre.ilike(f'%{termino}%')
+                            Animal.idanimal.in_(IndiceBusqueda.subconsulta_ids(
+                                'animal', termino, campos=['hierro', 'raza']
+                            )),
+                            Animal.idhacienda.in_(IndiceBusqueda.subconsulta_ids(
+                                'hacienda', termino, campos=['nombre']
+                            ))
                         )
                     )
             
@@ -307,7 +315,7 @@ class AnimalService:
         """Actualiza un animal existente"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden actualizar animales',
@@ -405,7 +413,7 @@ class AnimalService:
         """Cambia el estado de un animal"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden cambiar estado de animales',
@@ -423,7 +431,7 @@ class AnimalService:
                 }, 404
             
             # Verificar que el estado existe
-            estado = EstadoAnimal.query.get(estado_id)
+            estado = ReferenciasService.obtener('estados_animal', estado_id)
             if not estado:
                 return {
                     'error': 'Estado no válido',
@@ -436,7 +444,7 @@ class AnimalService:
             db.session.commit()
             
             return {
-                'message': f'Estado del animal "{animal.hierro}" cambiado a "{estado.nombre_estado}"',
+                'message': f'Estado del animal "{animal.hierro}" cambiado a "{estado["nombre_estado"]}"',
                 'status': 'success',
                 'animal': animal.to_dict(),
                 'cambiado_por': f'{usuario.nombres} {usuario.apellidos}'
@@ -455,7 +463,7 @@ class AnimalService:
         """Elimina un animal"""
         try:
             # Verificar permisos del usuario (solo administradores)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden eliminar animales',
@@ -491,6 +499,11 @@ class AnimalService:
             }, 500
     
     @staticmethod
+    @CacheService.cacheado(
+        'estadisticas_animales',
+        tablas=('animales', 'estados_animal', 'haciendas', 'vacunacion_animales', 'nacimientos'),
+        particion='hacienda_id'
+    )
     def obtener_estadisticas_animales(hacienda_id=None):
         """Obtiene estadísticas de animales"""
         try:
@@ -498,12 +511,8 @@ class AnimalService:
                 # Estadísticas de una hacienda específica
                 estadisticas = Animal.obtener_estadisticas_hacienda(hacienda_id)
             else:
-                # Estadísticas globales
-                total = Animal.query.count()
-                
-                # Por sexo
-                machos = Animal.query.filter_by(sexo='Macho').count()
-                hembras = Animal.query.filter_by(sexo='Hembra').count()
+                # Estadísticas globales (totales en una sola consulta)
+                totales = EstadisticasService.estadisticas_animales_globales()
                 
                 # Por estado
                 por_estado = db.session.query(
@@ -511,9 +520,6 @@ class AnimalService:
                     db.func.count(Animal.idanimal).label('cantidad')
                 ).join(Animal).group_by(EstadoAnimal.nombre_estado).all()
                 
-                # Hembras preñadas
-                preñadas = Animal.query.filter_by(sexo='Hembra', preñada=True).count()
-                
                 # Por hacienda
                 por_hacienda = db.session.query(
                     Hacienda.nombre,
@@ -521,10 +527,7 @@ class AnimalService:
                 ).join(Animal).group_by(Hacienda.nombre).all()
                 
                 estadisticas = {
-                    'total_animales': total,
-                    'machos': machos,
-                    'hembras': hembras,
-                    'preñadas': preñadas,
+                    **totales,
                     'por_estado': [
                         {'estado': estado, 'cantidad': cantidad}
                         for estado, cantidad in por_estado
@@ -574,14 +577,60 @@ class AnimalService:
                 'code': 'INTERNAL_ERROR'
             }, 500
     
+    @staticmethod
+    def buscar_hierros_similares(hacienda_id, hierro, max_distancia=2, limite=10):
+        """Búsqueda tolerante a errores de digitación del hierro en una hacienda"""
+        try:
+            if not hierro or not hierro.strip():
+                return {
+                    'error': 'Hierro es requerido',
+                    'status': 'error',
+                    'code': 'MISSING_HIERRO'
+                }, 400
+            
+            if max_distancia < 0 or max_distancia > HierroService.DISTANCIA_MAXIMA:
+                return {
+                    'error': f'La distancia máxima debe estar entre 0 y {HierroService.DISTANCIA_MAXIMA}',
+                    'status': 'error',
+                    'code': 'INVALID_DISTANCE'
+                }, 400
+            
+            hacienda = Hacienda.query.get(hacienda_id)
+            if not hacienda:
+                return {
+                    'error': 'Hacienda no encontrada',
+                    'status': 'error',
+                    'code': 'HACIENDA_NOT_FOUND'
+                }, 404
+            
+            coincidencias = HierroService.buscar_similares(
+                hacienda_id, hierro.strip(), max_distancia, limite
+            )
+            
+            return {
+                'coincidencias': coincidencias,
+                'total': len(coincidencias),
+                'existe_exacto': any(c['distancia'] == 0 for c in coincidencias),
+                'hierro_buscado': hierro.strip(),
+                'hacienda_id': hacienda_id,
+                'status': 'success'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'error': f'Error en búsqueda de hierros similares: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+    
     @staticmethod
     def obtener_estados_animal():
         """Obtiene todos los estados de animal disponibles"""
         try:
-            estados = EstadoAnimal.query.all()
+            estados = ReferenciasService.todos('estados_animal')
             
             return {
-                'estados': [estado.to_dict() for estado in estados],
+                'estados': [dict(estado) for estado in estados],
                 'status': 'success'
             }, 200
             
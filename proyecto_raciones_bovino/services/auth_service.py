@@ -1,14 +1,57 @@
-from models import db, Usuario, RolUsuario
-from flask_jwt_extended import create_access_token, create_refresh_token
+from models import db, Usuario, RolUsuario, TokenRevocado
+from services.cache_service import CacheService
+from flask import jsonify, current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt, get_jwt_identity
+from functools import wraps
+from sqlalchemy import select, delete
 from datetime import datetime
+import threading
+import time
 import re
 
+class UsuarioToken:
+    """
+    Usuario reconstruido a partir de los claims del token de acceso
+    Ofrece lo que los servicios usan para autorizar y firmar respuestas sin consultar la base de datos
+    """
+
+    def __init__(self, usuario_id, claims):
+        self.idusuario = usuario_id
+        self.nombres = claims.get('nombres', '')
+        self.apellidos = claims.get('apellidos', '')
+        self.email = claims.get('email')
+        self.rol = claims.get('rol')
+        self._permisos = tuple(claims.get('permisos', ()))
+
+    def permisos(self):
+        return list(self._permisos)
+
+    def tiene_permiso(self, permiso):
+        return permiso in self._permisos
+
+    def nombre_rol(self):
+        return self.rol
+
+    def es_administrador(self):
+        return self.rol == 'Administrador'
+
+    def es_instructor(self):
+        return self.rol == 'Instructor'
+
+    def es_aprendiz(self):
+        return self.rol == 'Aprendiz'
+
 class AuthService:
     """
     Servicio de autenticación simplificado
     Maneja login y registro directo de usuarios
     """
     
+    _denegados = {}  # idusuario -> (revocado_en, expira): tokens revocados
+    _lock = threading.Lock()
+    _verificado_en = None  # monotonic de la última lectura de tokens_revocados
+    _intervalo_verificacion = 30
+    
     @staticmethod
     def validar_email(email):
         """Valida formato de email"""
@@ -109,11 +152,7 @@ class AuthService:
             # Crear tokens JWT
             access_token = create_access_token(
                 identity=usuario.idusuario,
-                additional_claims={
-                    'rol': usuario.rol.nombre_rol,
-                    'email': usuario.email,
-                    'nombre_completo': f"{usuario.nombres} {usuario.apellidos}"
-                }
+                additional_claims=AuthService.claims_usuario(usuario)
             )
             refresh_token = create_refresh_token(identity=usuario.idusuario)
             
@@ -255,7 +294,7 @@ class AuthService:
             
             # Si fue creado por un admin, incluir esa información
             if creado_por_id:
-                creador = Usuario.query.get(creado_por_id)
+                creador = AuthService.usuario_actual(creado_por_id)
                 if creador:
                     respuesta['creado_por'] = f'{creador.nombres} {creador.apellidos}'
             
@@ -293,11 +332,7 @@ class AuthService:
             # Crear nuevo token de acceso
             new_token = create_access_token(
                 identity=usuario.idusuario,
-                additional_claims={
-                    'rol': usuario.rol.nombre_rol,
-                    'email': usuario.email,
-                    'nombre_completo': f"{usuario.nombres} {usuario.apellidos}"
-                }
+                additional_claims=AuthService.claims_usuario(usuario)
             )
             
             return {
@@ -368,4 +403,162 @@ class AuthService:
                 'error': f'Error al cambiar contraseña: {str(e)}',
                 'status': 'error',
                 'code': 'INTERNAL_ERROR'
-            }, 500
\ No newline at end of file
+            }, 500
+    
+    # ===============================
+    # CLAIMS Y PERMISOS
+    # ===============================
+    
+    @staticmethod
+    def claims_usuario(usuario):
+        """Claims del token de acceso: rol y permisos para autorizar sin consultar el usuario"""
+        return {
+            'rol': usuario.nombre_rol(),
+            'permisos': usuario.permisos(),
+            'email': usuario.email,
+            'nombres': usuario.nombres,
+            'apellidos': usuario.apellidos,
+            'nombre_completo': f"{usuario.nombres} {usuario.apellidos}",
+            # iat va en segundos enteros; esto distingue tokens emitidos en el mismo segundo que una revocación
+            'emitido_en': round(time.time(), 3)
+        }
+    
+    @staticmethod
+    def usuario_actual(usuario_id):
+        """
+        Usuario que hace la petición
+        Si el token actual pertenece a usuario_id y trae permisos se arma desde los claims;
+        si no (tokens anteriores, llamadas fuera de una petición) se consulta la base de datos.
+        """
+        try:
+            claims = get_jwt()
+        except RuntimeError:
+            claims = {}
+        
+        if claims.get('permisos') is not None and str(claims.get('sub')) == str(usuario_id):
+            return UsuarioToken(usuario_id, claims)
+        
+        return Usuario.query.get(usuario_id)
+    
+    @staticmethod
+    def requiere(*permisos, mensaje='No tiene permisos para realizar esta acción'):
+        """
+        Decorador de autorización por permisos del token
+        Uso: @AuthService.requiere('gestionar_usuarios'); va debajo de @jwt_required().
+        """
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                usuario = AuthService.usuario_actual(get_jwt_identity())
+                
+                if not usuario or not all(usuario.tiene_permiso(permiso) for permiso in permisos):
+                    return jsonify({
+                        'error': mensaje,
+                        'status': 'error',
+                        'code': 'ACCESS_DENIED'
+                    }), 403
+                
+                return vista(*args, **kwargs)
+            
+            return envoltura
+        
+        return decorador
+    
+    # ===============================
+    # REVOCACIÓN DE TOKENS
+    # ===============================
+    
+    @staticmethod
+    def iniciar(app):
+        """Intervalo con el que cada proceso relee las revocaciones hechas por los demás"""
+        AuthService._intervalo_verificacion = app.config.get('AUTH_REVOCACION_VERIFICACION_SEGUNDOS', 30)
+    
+    @staticmethod
+    def _denegar(usuario_id, revocado_en, expira):
+        """Registra la revocación en el proceso (conserva la más reciente) y limpia las vencidas"""
+        with AuthService._lock:
+            ahora = time.time()
+            denegados = {
+                idusuario: entrada for idusuario, entrada in AuthService._denegados.items()
+                if entrada[1] > ahora
+            }
+            anterior = denegados.get(str(usuario_id))
+            if anterior is None or anterior[0] < revocado_en:
+                denegados[str(usuario_id)] = (revocado_en, expira)
+            AuthService._denegados = denegados
+    
+    @staticmethod
+    def revocar_tokens(usuario_id):
+        """
+        Invalida los tokens emitidos hasta ahora para el usuario (desactivación, cambio de rol)
+        La entrada dura lo que un token de acceso: después ya habrán expirado, y la
+        renovación vuelve a validar el usuario contra la base de datos. Se guarda en
+        tokens_revocados para que los demás procesos la vean en su próxima verificación.
+        """
+        revocado_en = time.time()
+        duracion = int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+        expira = revocado_en + duracion
+        
+        AuthService._denegar(usuario_id, revocado_en, expira)
+        
+        try:
+            db.session.execute(delete(TokenRevocado).where(TokenRevocado.expira <= revocado_en))
+            db.session.merge(TokenRevocado(idusuario=int(usuario_id), revocado_en=revocado_en, expira=expira))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error registrando la revocación del usuario {usuario_id}: {e}")
+        
+        # Con un cache compartido la revocación llega a los demás procesos sin esperar la verificación
+        backend = CacheService.backend_compartido()
+        if backend is not None:
+            try:
+                backend.guardar(f'denegado:usuario={usuario_id}', repr(revocado_en).encode(), duracion)
+            except Exception as e:
+                print(f"❌ Error publicando la revocación del usuario {usuario_id}: {e}")
+    
+    @staticmethod
+    def _verificar_revocaciones():
+        """Relee las revocaciones vigentes de tokens_revocados (una consulta por intervalo)"""
+        ahora = time.monotonic()
+        if AuthService._verificado_en is not None and ahora - AuthService._verificado_en < AuthService._intervalo_verificacion:
+            return
+        AuthService._verificado_en = ahora
+        
+        try:
+            with db.engine.connect() as conexion:
+                filas = conexion.execute(
+                    select(TokenRevocado.idusuario, TokenRevocado.revocado_en, TokenRevocado.expira).where(
+                        TokenRevocado.expira > time.time()
+                    )
+                ).all()
+        except Exception as e:
+            print(f"❌ Error verificando revocaciones de tokens: {e}")
+            return
+        
+        for idusuario, revocado_en, expira in filas:
+            AuthService._denegar(idusuario, float(revocado_en), float(expira))
+    
+    @staticmethod
+    def token_revocado(payload):
+        """True si el token se emitió antes de la última revocación de su usuario"""
+        usuario_id = str(payload.get('sub'))
+        emitido_en = payload.get('emitido_en', payload.get('iat', 0))
+        
+        AuthService._verificar_revocaciones()
+        
+        entrada = AuthService._denegados.get(usuario_id)
+        if entrada is not None and entrada[1] > time.time() and emitido_en < entrada[0]:
+            return True
+        
+        backend = CacheService.backend_compartido()
+        if backend is not None:
+            try:
+                revocado_en = backend.obtener(f'denegado:usuario={usuario_id}')
+            except Exception as e:
+                print(f"❌ Error consultando revocaciones: {e}")
+                return False
+            if revocado_en is not None and emitido_en < float(revocado_en):
+                return True
+        
+        return False
@@ -0,0 +1,275 @@
+from models import db
+from services.invalidacion_service import InvalidacionService
+from flask import current_app
+from sqlalchemy.orm import Session
+import re
+
+class ReferenciaInvalida(Exception):
+    """Referencia ${...} a un resultado que no existe o que falló"""
+
+class BatchService:
+    """
+    Ejecución de varias operaciones de la API en una sola petición (/api/batch)
+    Cada operación se despacha dentro del proceso por las mismas rutas y servicios,
+    con el token de la petición original. Los valores ${id.campo.subcampo} en la ruta
+    o el cuerpo se reemplazan por el resultado de una operación anterior.
+
+    atomico=True: todas las operaciones comparten una transacción; el commit de cada
+    servicio solo libera un savepoint y la primera operación fallida revierte todo.
+    atomico=False: cada operación confirma por su cuenta y las demás siguen.
+    """
+
+    PATRON_REFERENCIA = re.compile(r'\$\{([^}]+)\}')
+    METODOS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+    # ===============================
+    # VALIDACIÓN
+    # ===============================
+
+    @staticmethod
+    def validar_operaciones(datos):
+        """Retorna (operaciones normalizadas, None) o (None, mensaje de error)"""
+        if not isinstance(datos, dict) or not isinstance(datos.get('operaciones'), list):
+            return None, 'Se requiere una lista de operaciones'
+
+        operaciones = datos['operaciones']
+        maximo = current_app.config.get('BATCH_MAX_OPERACIONES', 25)
+        if not operaciones:
+            return None, 'La lista de operaciones está vacía'
+        if len(operaciones) > maximo:
+            return None, f'Máximo {maximo} operaciones por petición'
+
+        normalizadas = []
+        ids = set()
+        for posicion, operacion in enumerate(operaciones):
+            if not isinstance(operacion, dict):
+                return None, f'La operación {posicion} debe ser un objeto'
+
+            id_operacion = str(operacion.get('id', posicion))
+            metodo = str(operacion.get('metodo', 'GET')).upper()
+            ruta = operacion.get('ruta')
+
+            if id_operacion in ids:
+                return None, f'Id de operación repetido: {id_operacion}'
+            if metodo not in BatchService.METODOS:
+                return None, f'Método no permitido en la operación {id_operacion}: {metodo}'
+            if not isinstance(ruta, str) or not ruta.startswith('/api/'):
+                return None, f'La ruta de la operación {id_operacion} debe empezar por /api/'
+            if ruta.split('?')[0].rstrip('/') == '/api/batch':
+                return None, 'No se permiten operaciones batch anidadas'
+
+            ids.add(id_operacion)
+            normalizadas.append({
+                'id': id_operacion,
+                'metodo': metodo,
+                'ruta': ruta,
+                'cuerpo': operacion.get('cuerpo')
+            })
+
+        return normalizadas, None
+
+    # ===============================
+    # REFERENCIAS
+    # ===============================
+
+    @staticmethod
+    def _valor_referencia(expresion, resultados):
+        partes = expresion.strip().split('.')
+        resultado = resultados.get(partes[0])
+        if resultado is None:
+            raise ReferenciaInvalida(f'La operación {partes[0]} no existe o no se ha ejecutado')
+        if resultado['status'] >= 400:
+            raise ReferenciaInvalida(f'La operación {partes[0]} falló')
+
+        valor = resultado['cuerpo']
+        for parte in partes[1:]:
+            if isinstance(valor, dict) and parte in valor:
+                valor = valor[parte]
+            elif isinstance(valor, list) and parte.isdigit() and int(parte) < len(valor):
+                valor = valor[int(parte)]
+            else:
+                raise ReferenciaInvalida(f'No existe el campo {expresion} en el resultado')
+        return valor
+
+    @staticmethod
+    def resolver(valor, resultados):
+        """
+        Reemplaza las referencias ${...} en cadenas, listas y dicts
+        Una cadena que es solo la referencia toma el valor con su tipo (p. ej. un id entero).
+        """
+        if isinstance(valor, dict):
+            return {clave: BatchService.resolver(v, resultados) for clave, v in valor.items()}
+        if isinstance(valor, list):
+            return [BatchService.resolver(v, resultados) for v in valor]
+        if not isinstance(valor, str) or '${' not in valor:
+            return valor
+
+        completa = BatchService.PATRON_REFERENCIA.fullmatch(valor)
+        if completa:
+            return BatchService._valor_referencia(completa.group(1), resultados)
+
+        return BatchService.PATRON_REFERENCIA.sub(
+            lambda coincidencia: str(BatchService._valor_referencia(coincidencia.group(1), resultados)),
+            valor
+        )
+
+    # ===============================
+    # EJECUCIÓN
+    # ===============================
+
+    @staticmethod
+    def _despachar(metodo, ruta, cuerpo, autorizacion):
+        """Ejecuta una operación por el despacho normal de Flask (hooks, JWT y manejadores)"""
+        headers = {'Accept': 'application/json'}
+        if autorizacion:
+            headers['Authorization'] = autorizacion
+
+        opciones = {'json': cuerpo} if cuerpo is not None else {}
+
+        # Comparte el contexto de aplicación (y por tanto la sesión) con la petición batch
+        with current_app.test_request_context(ruta, method=metodo, headers=headers, **opciones):
+            try:
+                respuesta = current_app.full_dispatch_request()
+            except Exception as e:
+                db.session.rollback()
+                return 500, {
+                    'error': f'Error interno del servidor: {str(e)}',
+                    'status': 'error',
+                    'code': 'INTERNAL_ERROR'
+                }
+
+            if respuesta.is_json:
+                return respuesta.status_code, respuesta.get_json(silent=True)
+            return respuesta.status_code, respuesta.get_data(as_text=True)
+
+    @staticmethod
+    def _ejecutar_operaciones(operaciones, autorizacion, atomico):
+        resultados = {}
+        salida = []
+        fallida = None
+
+        for operacion in operaciones:
+            if atomico and fallida is not None:
+                status, cuerpo = 424, {
+                    'error': f'No ejecutada: la operación {fallida} falló y se revirtió el batch',
+                    'status': 'error',
+                    'code': 'NOT_EXECUTED'
+                }
+            else:
+                try:
+                    ruta = BatchService.resolver(operacion['ruta'], resultados)
+                    cuerpo_operacion = BatchService.resolver(operacion['cuerpo'], resultados)
+                except ReferenciaInvalida as e:
+                    status, cuerpo = 424, {'error': str(e), 'status': 'error', 'code': 'INVALID_REFERENCE'}
+                else:
+                    status, cuerpo = BatchService._despachar(
+                        operacion['metodo'], str(ruta), cuerpo_operacion, autorizacion
+                    )
+
+                    # Independientes: lo que un servicio haya dejado a medias no pasa a la siguiente
+                    if not atomico:
+                        db.session.rollback()
+
+                if status >= 400 and fallida is None:
+                    fallida = operacion['id']
+
+            resultados[operacion['id']] = {'status': status, 'cuerpo': cuerpo}
+            salida.append({
+                'id': operacion['id'],
+                'metodo': operacion['metodo'],
+                'ruta': operacion['ruta'],
+                'status': status,
+                'cuerpo': cuerpo
+            })
+
+        return salida, fallida
+
+    @staticmethod
+    def _iniciar_transaccion(conexion):
+        """
+        Transacción externa del batch; retorna (transacción, aislamiento previo del driver)
+        pysqlite no envía BEGIN hasta la primera escritura: el SAVEPOINT del primer commit
+        de un servicio quedaría como transacción externa y liberarlo confirmaría. En SQLite
+        el driver pasa a modo manual y el BEGIN se emite explícitamente.
+        """
+        if conexion.dialect.name != 'sqlite':
+            return conexion.begin(), None
+
+        driver = conexion.connection.dbapi_connection
+        aislamiento = driver.isolation_level
+        driver.isolation_level = None
+        transaccion = conexion.begin()
+        conexion.exec_driver_sql('BEGIN')
+        return transaccion, aislamiento
+
+    @staticmethod
+    def ejecutar(datos, autorizacion):
+        """Ejecuta el batch; retorna (dict, status)"""
+        operaciones, error = BatchService.validar_operaciones(datos)
+        if error:
+            return {'error': error, 'status': 'error', 'code': 'INVALID_BATCH'}, 400
+
+        atomico = bool(datos.get('atomico', True))
+
+        if not atomico:
+            salida, fallida = BatchService._ejecutar_operaciones(operaciones, autorizacion, False)
+            return BatchService._respuesta(salida, atomico, confirmado=None), 200
+
+        # Sesión unida a una transacción externa: los commit de los servicios solo
+        # liberan savepoints y los rollback de error revierten solo su operación
+        conexion = db.engine.connect()
+        transaccion, aislamiento = BatchService._iniciar_transaccion(conexion)
+        sesion = Session(bind=conexion, join_transaction_mode='create_savepoint', query_cls=db.Query)
+        sesion.info['diferir_publicacion'] = True
+
+        original = db.session.registry()
+        db.session.registry.set(sesion)
+        try:
+            salida, fallida = BatchService._ejecutar_operaciones(operaciones, autorizacion, True)
+
+            if fallida is None:
+                sesion.commit()
+                transaccion.commit()
+                diferidas = sesion.info.pop('invalidaciones_diferidas', None)
+                if diferidas:
+                    InvalidacionService.publicar(diferidas)
+            else:
+                transaccion.rollback()
+
+        except Exception as e:
+            transaccion.rollback()
+            return {
+                'error': f'Error al ejecutar el batch: {str(e)}',
+                'status': 'error',
+                'code': 'BATCH_ERROR'
+            }, 500
+
+        finally:
+            db.session.registry.set(original)
+            sesion.close()
+            if aislamiento is not None:
+                conexion.connection.dbapi_connection.isolation_level = aislamiento
+            conexion.close()
+
+        if fallida is not None:
+            respuesta = BatchService._respuesta(salida, atomico, confirmado=False)
+            respuesta['error'] = f'La operación {fallida} falló; no se confirmó ningún cambio'
+            respuesta['code'] = 'BATCH_ROLLED_BACK'
+            return respuesta, 409
+
+        return BatchService._respuesta(salida, atomico, confirmado=True), 200
+
+    @staticmethod
+    def _respuesta(salida, atomico, confirmado):
+        exitosas = sum(1 for resultado in salida if resultado['status'] < 400)
+        respuesta = {
+            'status': 'success' if exitosas == len(salida) else 'error',
+            'atomico': atomico,
+            'resultados': salida,
+            'total': len(salida),
+            'exitosas': exitosas,
+            'fallidas': len(salida) - exitosas
+        }
+        if confirmado is not None:
+            respuesta['confirmado'] = confirmado
+        return respuesta
@@ -0,0 +1,246 @@
+from models import db, Animal, Hacienda, Nacimiento, VacunacionAnimal, CatalogoVacuna, IndiceBusqueda
+from sqlalchemy import event, inspect, select, delete, insert, update
+
+class BusquedaService:
+    """
+    Servicio del índice de búsqueda de texto
+    Mantiene sincronizado el índice invertido con las escrituras y permite reconstruirlo
+    """
+
+    # entidad -> {campo: (peso, es_identificador)}
+    CAMPOS_INDEXADOS = {
+        'animal': {
+            'hierro': (3, True),
+            'raza': (2, False),
+            'preñada_por': (1, False),
+            'observaciones': (1, False)
+        },
+        'hacienda': {
+            'nombre': (3, False),
+            'nit': (3, True),
+            'propietario': (2, False),
+            'municipio': (1, False),
+            'departamento': (1, False)
+        },
+        'nacimiento': {
+            'numero_registro': (3, True),
+            'tipo_parto': (2, False),
+            'complicaciones': (1, False),
+            'observaciones': (1, False)
+        },
+        'vacunacion': {
+            'lote_vacuna': (3, True),
+            'veterinario': (2, False),
+            'observaciones': (1, False)
+        },
+        'vacuna': {
+            'nombre_vacuna': (3, False),
+            'descripcion': (1, False)
+        }
+    }
+
+    # entidad -> (modelo, atributo id, atributo que determina la hacienda)
+    ENTIDADES = {
+        'animal': (Animal, 'idanimal', 'idhacienda'),
+        'hacienda': (Hacienda, 'idhacienda', 'idhacienda'),
+        'nacimiento': (Nacimiento, 'idnacimiento', 'idanimal_cria'),
+        'vacunacion': (VacunacionAnimal, 'idvacunacion', 'idanimal'),
+        'vacuna': (CatalogoVacuna, 'idvacuna', None)
+    }
+
+    _eventos_registrados = False
+
+    # ===============================
+    # CONSTRUCCIÓN DE DOCUMENTOS
+    # ===============================
+
+    @staticmethod
+    def filas_documento(entidad, objeto, idhacienda=None):
+        """Genera las filas del índice para un objeto"""
+        _, atributo_id, _ = BusquedaService.ENTIDADES[entidad]
+        identidad = getattr(objeto, atributo_id)
+        filas = []
+
+        for campo, (peso, identificador) in BusquedaService.CAMPOS_INDEXADOS[entidad].items():
+            for termino in IndiceBusqueda.tokenizar(getattr(objeto, campo), identificador):
+                filas.append({
+                    'entidad': entidad,
+                    'identidad': identidad,
+                    'idhacienda': idhacienda,
+                    'campo': campo,
+                    'termino': termino,
+                    'peso': peso
+                })
+
+        return filas
+
+    @staticmethod
+    def _hacienda_documento(connection, entidad, objeto):
+        """Obtiene la hacienda a la que pertenece un documento"""
+        _, _, atributo_hacienda = BusquedaService.ENTIDADES[entidad]
+        if atributo_hacienda is None:
+            return None
+
+        valor = getattr(objeto, atributo_hacienda)
+        if atributo_hacienda == 'idhacienda' or valor is None:
+            return valor
+
+        # Nacimientos y vacunaciones heredan la hacienda del animal
+        return connection.execute(
+            select(Animal.idhacienda).where(Animal.idanimal == valor)
+        ).scalar()
+
+    # ===============================
+    # SINCRONIZACIÓN CON LAS ESCRITURAS
+    # ===============================
+
+    @staticmethod
+    def _escribir_documento(connection, entidad, objeto):
+        """Reemplaza las filas del índice de un documento"""
+        _, atributo_id, _ = BusquedaService.ENTIDADES[entidad]
+
+        connection.execute(
+            delete(IndiceBusqueda.__table__).where(
+                IndiceBusqueda.entidad == entidad,
+                IndiceBusqueda.identidad == getattr(objeto, atributo_id)
+            )
+        )
+
+        filas = BusquedaService.filas_documento(
+            entidad, objeto, BusquedaService._hacienda_documento(connection, entidad, objeto)
+        )
+        if filas:
+            connection.execute(insert(IndiceBusqueda.__table__), filas)
+
+    @staticmethod
+    def _trasladar_documentos(connection, idanimal, idhacienda):
+        """Actualiza la hacienda de los documentos que dependen de un animal"""
+        dependientes = [
+            ('nacimiento', select(Nacimiento.idnacimiento).where(Nacimiento.idanimal_cria == idanimal)),
+            ('vacunacion', select(VacunacionAnimal.idvacunacion).where(VacunacionAnimal.idanimal == idanimal))
+        ]
+        for entidad, ids in dependientes:
+            connection.execute(
+                update(IndiceBusqueda.__table__).where(
+                    IndiceBusqueda.entidad == entidad,
+                    IndiceBusqueda.identidad.in_(ids)
+                ).values(idhacienda=idhacienda)
+            )
+
+    @staticmethod
+    def _crear_manejadores(entidad):
+        """Crea los manejadores de eventos de una entidad"""
+        _, atributo_id, atributo_hacienda = BusquedaService.ENTIDADES[entidad]
+        campos_vigilados = list(BusquedaService.CAMPOS_INDEXADOS[entidad].keys())
+        if atributo_hacienda:
+            campos_vigilados.append(atributo_hacienda)
+
+        def al_insertar(mapper, connection, objeto):
+            BusquedaService._escribir_documento(connection, entidad, objeto)
+
+        def al_actualizar(mapper, connection, objeto):
+            # Solo reindexar si cambió algún campo indexado o la hacienda
+            estado = inspect(objeto)
+            if any(estado.attrs[campo].history.has_changes() for campo in campos_vigilados):
+                BusquedaService._escribir_documento(connection, entidad, objeto)
+
+            # Un animal trasladado arrastra sus nacimientos y vacunaciones
+            if entidad == 'animal' and estado.attrs.idhacienda.history.has_changes():
+                BusquedaService._trasladar_documentos(connection, objeto.idanimal, objeto.idhacienda)
+
+        def al_eliminar(mapper, connection, objeto):
+            connection.execute(
+                delete(IndiceBusqueda.__table__).where(
+                    IndiceBusqueda.entidad == entidad,
+                    IndiceBusqueda.identidad == getattr(objeto, atributo_id)
+                )
+            )
+
+        return al_insertar, al_actualizar, al_eliminar
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos que mantienen el índice sincronizado"""
+        if BusquedaService._eventos_registrados:
+            return
+
+        for entidad, (modelo, _, _) in BusquedaService.ENTIDADES.items():
+            al_insertar, al_actualizar, al_eliminar = BusquedaService._crear_manejadores(entidad)
+            event.listen(modelo, 'after_insert', al_insertar)
+            event.listen(modelo, 'after_update', al_actualizar)
+            event.listen(modelo, 'after_delete', al_eliminar)
+
+        BusquedaService._eventos_registrados = True
+
+    @staticmethod
+    def indexar_objetos(entidad, objetos):
+        """
+        Indexa objetos escritos por fuera del ORM (inserciones masivas)
+        Debe llamarse dentro de la misma transacción que la escritura
+        """
+        connection = db.session.connection()
+        for objeto in objetos:
+            BusquedaService._escribir_documento(connection, entidad, objeto)
+
+    # ===============================
+    # RECONSTRUCCIÓN DEL ÍNDICE
+    # ===============================
+
+    @staticmethod
+    def reconstruir_indice(entidades=None, tamano_lote=1000):
+        """Reconstruye el índice completo (o de las entidades indicadas)"""
+        entidades = entidades or list(BusquedaService.ENTIDADES.keys())
+        total_terminos = 0
+
+        try:
+            for entidad in entidades:
+                modelo, atributo_id, atributo_hacienda = BusquedaService.ENTIDADES[entidad]
+                columna_id = getattr(modelo, atributo_id)
+
+                db.session.execute(
+                    delete(IndiceBusqueda.__table__).where(IndiceBusqueda.entidad == entidad)
+                )
+
+                # Recorrer por lotes usando el id como cursor
+                ultimo_id = 0
+                while True:
+                    if atributo_hacienda in (None, 'idhacienda'):
+                        query = db.session.query(modelo)
+                    else:
+                        query = db.session.query(modelo, Animal.idhacienda).join(
+                            Animal, getattr(modelo, atributo_hacienda) == Animal.idanimal
+                        )
+
+                    lote = query.filter(columna_id > ultimo_id).order_by(columna_id).limit(tamano_lote).all()
+                    if not lote:
+                        break
+
+                    filas = []
+                    for registro in lote:
+                        if isinstance(registro, modelo):
+                            objeto = registro
+                            idhacienda = getattr(objeto, atributo_hacienda) if atributo_hacienda else None
+                        else:
+                            objeto, idhacienda = registro
+                        filas.extend(BusquedaService.filas_documento(entidad, objeto, idhacienda))
+
+                    if filas:
+                        db.session.execute(insert(IndiceBusqueda.__table__), filas)
+                        total_terminos += len(filas)
+
+                    ultimo_id = getattr(objeto, atributo_id)
+                    db.session.expunge_all()
+
+            db.session.commit()
+            return total_terminos
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def reconstruir_si_vacio():
+        """Construye el índice la primera vez (base de datos existente sin índice)"""
+        if db.session.query(IndiceBusqueda.idindice).first() is None:
+            return BusquedaService.reconstruir_indice()
+        return 0
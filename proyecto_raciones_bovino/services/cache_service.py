@@ -0,0 +1,437 @@
+from models import db, VersionTabla
+from services.invalidacion_service import InvalidacionService
+from sqlalchemy import select
+from collections import OrderedDict
+from functools import wraps
+from datetime import date
+import inspect as inspeccion
+import threading
+import pickle
+import time
+
+# ===============================
+# BACKENDS
+# ===============================
+
+class CacheMemoria:
+    """
+    Cache en memoria del proceso con desalojo LRU y expiración por TTL
+    Limita tanto el número de entradas como el total de bytes almacenados
+    """
+
+    compartido = False
+
+    def __init__(self, max_entradas=1000, max_bytes=32 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._contadores = {}  # generaciones de los espacios: no expiran ni se desalojan
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.desalojos = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave in self._contadores:
+                return str(self._contadores[clave]).encode()
+
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+
+            expira, valor = entrada
+            if expira is not None and expira < time.monotonic():
+                self._quitar(clave)
+                return None
+
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, timeout=None):
+        expira = time.monotonic() + timeout if timeout else None
+
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+
+            # Una entrada más grande que todo el cache no se guarda
+            if len(valor) > self.max_bytes:
+                return
+
+            self._datos[clave] = (expira, valor)
+            self._bytes += len(valor)
+
+            while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+                clave_antigua = next(iter(self._datos))
+                self._quitar(clave_antigua)
+                self.desalojos += 1
+
+    def incrementar(self, clave):
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + 1
+            return self._contadores[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+            # Las generaciones se conservan para no reutilizar claves anteriores
+
+    def _quitar(self, clave):
+        _, valor = self._datos.pop(clave)
+        self._bytes -= len(valor)
+
+    def estado(self):
+        with self._lock:
+            return {
+                'tipo': 'memoria',
+                'entradas': len(self._datos),
+                'bytes': self._bytes,
+                'max_entradas': self.max_entradas,
+                'max_bytes': self.max_bytes,
+                'desalojos': self.desalojos
+            }
+
+class CacheRedis:
+    """
+    Cache compartido entre procesos sobre Redis
+    Redis aplica el TTL y el desalojo (configurar maxmemory-policy allkeys-lru)
+    """
+
+    compartido = True
+
+    def __init__(self, url, prefijo='raciones:'):
+        import redis
+        self.cliente = redis.Redis.from_url(url)
+        self.prefijo = prefijo
+
+    def obtener(self, clave):
+        return self.cliente.get(self.prefijo + clave)
+
+    def guardar(self, clave, valor, timeout=None):
+        self.cliente.set(self.prefijo + clave, valor, ex=timeout or None)
+
+    def incrementar(self, clave):
+        return self.cliente.incr(self.prefijo + clave)
+
+    def limpiar(self):
+        for clave in self.cliente.scan_iter(match=self.prefijo + '*'):
+            self.cliente.delete(clave)
+
+    def estado(self):
+        info = self.cliente.info('memory')
+        return {
+            'tipo': 'redis',
+            'bytes': info.get('used_memory'),
+            'max_bytes': info.get('maxmemory')
+        }
+
+class CacheNulo:
+    """Backend que no guarda nada (tests, CACHE_TYPE='null')"""
+
+    compartido = False
+
+    def obtener(self, clave):
+        return None
+
+    def guardar(self, clave, valor, timeout=None):
+        pass
+
+    def incrementar(self, clave):
+        return 0
+
+    def limpiar(self):
+        pass
+
+    def estado(self):
+        return {'tipo': 'null'}
+
+# ===============================
+# SERVICIO
+# ===============================
+
+class CacheService:
+    """
+    Cache de resultados de servicios (CACHE_TYPE / CACHE_DEFAULT_TIMEOUT)
+
+    Los resultados se agrupan en espacios; cada espacio declara las tablas de las que
+    depende y el bus de invalidación lo invalida cuando una transacción confirmada
+    escribe en ellas (solo las haciendas afectadas si el espacio está particionado).
+    La invalidación incrementa la generación, que forma parte de la clave.
+    Con el cache en memoria las generaciones son del proceso: la clave lleva además las
+    versiones de las tablas (versiones_tabla), releídas cada CACHE_VERIFICACION_SEGUNDOS,
+    para que las escrituras de otros procesos también la cambien.
+    """
+
+    _backend = None
+    _timeout_defecto = 300
+    _espacios = {}  # espacio -> (tablas de las que depende, argumento de partición)
+    _metricas = {}
+    _lock = threading.Lock()
+    _eventos_registrados = False
+    _versiones = {}  # (tabla, partición) -> versión, leídas de versiones_tabla
+    _verificado_en = None
+    _intervalo_verificacion = 10
+
+    @staticmethod
+    def iniciar(app):
+        """Crea el backend según la configuración de la aplicación"""
+        tipo = app.config.get('CACHE_TYPE', 'simple')
+        CacheService._timeout_defecto = app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+        CacheService._intervalo_verificacion = app.config.get('CACHE_VERIFICACION_SEGUNDOS', 10)
+
+        if tipo == 'null':
+            CacheService._backend = CacheNulo()
+        elif tipo == 'redis':
+            try:
+                CacheService._backend = CacheRedis(
+                    app.config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+                    app.config.get('CACHE_KEY_PREFIX', 'raciones:')
+                )
+            except ImportError:
+                print("❌ CACHE_TYPE=redis requiere el paquete 'redis'; se usa el cache en memoria")
+                CacheService._backend = None
+
+        if CacheService._backend is None or tipo in ('simple', 'memoria'):
+            CacheService._backend = CacheMemoria(
+                app.config.get('CACHE_MAX_ENTRADAS', 1000),
+                app.config.get('CACHE_MAX_BYTES', 32 * 1024 * 1024)
+            )
+
+        CacheService._registrar_eventos()
+
+    # ===============================
+    # ESPACIOS E INVALIDACIÓN
+    # ===============================
+
+    @staticmethod
+    def _generacion(nombre):
+        valor = CacheService._backend.obtener(f'gen:{nombre}')
+        return int(valor) if valor is not None else 0
+
+    @staticmethod
+    def _incrementar(nombre):
+        CacheService._backend.incrementar(f'gen:{nombre}')
+
+    @staticmethod
+    def invalidar(espacio, haciendas=None):
+        """
+        Invalida un espacio completo, o solo las haciendas indicadas
+        (más las entradas sin hacienda, que agregan sobre todas)
+        """
+        if CacheService._backend is None:
+            return
+
+        if haciendas is None:
+            CacheService._incrementar(espacio)
+        else:
+            for idhacienda in haciendas:
+                CacheService._incrementar(f'{espacio}:hacienda={idhacienda}')
+            CacheService._incrementar(f'{espacio}:todas')
+
+        CacheService._contar(espacio, 'invalidaciones')
+
+    @staticmethod
+    def invalidar_tablas(tablas):
+        """Invalida completos los espacios que dependen de alguna de las tablas"""
+        tablas = set(tablas)
+        for espacio, (dependencias, _) in list(CacheService._espacios.items()):
+            if dependencias & tablas:
+                CacheService.invalidar(espacio)
+
+    @staticmethod
+    def backend_compartido():
+        """Backend visible para todos los procesos (Redis), o None si el cache es local"""
+        backend = CacheService._backend
+        return backend if backend is not None and backend.compartido else None
+
+    @staticmethod
+    def limpiar():
+        """Vacía el cache completo"""
+        if CacheService._backend is not None:
+            CacheService._backend.limpiar()
+
+    @staticmethod
+    def _al_confirmar(cambios):
+        """Suscriptor del bus: invalida por hacienda cuando se puede, completo si no"""
+        for espacio, (dependencias, particion) in list(CacheService._espacios.items()):
+            escritas = dependencias & cambios['tablas']
+            if not escritas:
+                continue
+
+            if particion is None or escritas & cambios['tablas_globales']:
+                CacheService.invalidar(espacio)
+                continue
+
+            haciendas = set()
+            for tabla in escritas:
+                haciendas |= cambios['haciendas'].get(tabla, set())
+            CacheService.invalidar(espacio, haciendas)
+
+    @staticmethod
+    def _registrar_eventos():
+        if CacheService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(CacheService._al_confirmar)
+
+        CacheService._eventos_registrados = True
+
+    # ===============================
+    # VERSIONES DE OTROS PROCESOS
+    # ===============================
+
+    @staticmethod
+    def _verificar_versiones():
+        """Relee las versiones de las tablas de los espacios (una consulta por intervalo)"""
+        ahora = time.monotonic()
+        if CacheService._verificado_en is not None and ahora - CacheService._verificado_en < CacheService._intervalo_verificacion:
+            return
+        CacheService._verificado_en = ahora
+
+        tablas = set()
+        for dependencias, _ in list(CacheService._espacios.values()):
+            tablas |= dependencias
+
+        try:
+            with db.engine.connect() as conexion:
+                filas = conexion.execute(
+                    select(VersionTabla.tabla, VersionTabla.particion, VersionTabla.version).where(
+                        VersionTabla.tabla.in_(sorted(tablas))
+                    )
+                ).all()
+        except Exception as e:
+            print(f"❌ Error verificando versiones del cache: {e}")
+            return
+
+        CacheService._versiones = {(tabla, particion): version for tabla, particion, version in filas}
+
+    @staticmethod
+    def _version_tablas(espacio, idhacienda):
+        """Versión de las dependencias del espacio: la partición de la hacienda, o la tabla completa"""
+        CacheService._verificar_versiones()
+        versiones = CacheService._versiones
+        dependencias = CacheService._espacios[espacio][0]
+
+        if idhacienda:
+            particiones = (str(idhacienda), '*')
+            return sum(
+                versiones.get((tabla, particion), 0)
+                for tabla in dependencias for particion in particiones
+            )
+        return sum(version for (tabla, _), version in versiones.items() if tabla in dependencias)
+
+    # ===============================
+    # DECORADOR
+    # ===============================
+
+    @staticmethod
+    def _clave(espacio, particion, funcion, firma, args, kwargs):
+        """Clave estable: mismos argumentos (posicionales, nombrados o por defecto) -> misma clave"""
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        parametros = ','.join(f'{nombre}={valor!r}' for nombre, valor in sorted(argumentos.arguments.items()))
+
+        idhacienda = argumentos.arguments.get(particion) if particion is not None else None
+        generaciones = [CacheService._generacion(espacio)]
+        if particion is not None:
+            generaciones.append(CacheService._generacion(
+                f'{espacio}:hacienda={idhacienda}' if idhacienda else f'{espacio}:todas'
+            ))
+        if isinstance(CacheService._backend, CacheMemoria):
+            generaciones.append(CacheService._version_tablas(espacio, idhacienda))
+        generacion = '.'.join(str(valor) for valor in generaciones)
+
+        # La fecha entra en la clave porque varios conteos dependen de hoy
+        return f'{espacio}:{generacion}:{funcion.__qualname__}({parametros}):{date.today().isoformat()}'
+
+    @staticmethod
+    def cacheado(espacio, tablas=(), particion=None, timeout=None):
+        """
+        Decorador para métodos de servicio que retornan (dict, status)
+        Solo se guardan las respuestas 200; tablas son las dependencias del espacio.
+        particion es el argumento con el id de hacienda: una escritura en otra hacienda
+        no invalida esas entradas.
+        """
+        CacheService._espacios[espacio] = (
+            set(tablas) | CacheService._espacios.get(espacio, (set(), None))[0],
+            particion
+        )
+
+        def decorador(funcion):
+            firma = inspeccion.signature(funcion)
+
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                backend = CacheService._backend
+                if backend is None:
+                    return funcion(*args, **kwargs)
+
+                try:
+                    clave = CacheService._clave(espacio, particion, funcion, firma, args, kwargs)
+                    guardado = backend.obtener(clave)
+                except Exception as e:
+                    print(f"❌ Error leyendo el cache ({espacio}): {e}")
+                    return funcion(*args, **kwargs)
+
+                if guardado is not None:
+                    CacheService._contar(espacio, 'aciertos')
+                    return pickle.loads(guardado)
+
+                CacheService._contar(espacio, 'fallos')
+                resultado = funcion(*args, **kwargs)
+
+                if isinstance(resultado, tuple) and len(resultado) == 2 and resultado[1] == 200:
+                    try:
+                        backend.guardar(
+                            clave,
+                            pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL),
+                            timeout if timeout is not None else CacheService._timeout_defecto
+                        )
+                    except Exception as e:
+                        print(f"❌ Error guardando en el cache ({espacio}): {e}")
+
+                return resultado
+
+            return envoltura
+
+        return decorador
+
+    # ===============================
+    # MÉTRICAS
+    # ===============================
+
+    @staticmethod
+    def _contar(espacio, metrica):
+        with CacheService._lock:
+            contadores = CacheService._metricas.setdefault(
+                espacio, {'aciertos': 0, 'fallos': 0, 'invalidaciones': 0}
+            )
+            contadores[metrica] += 1
+
+    @staticmethod
+    def metricas():
+        """Aciertos, fallos y tasa de aciertos por espacio, más el estado del backend"""
+        with CacheService._lock:
+            espacios = {}
+            for espacio, contadores in CacheService._metricas.items():
+                consultas = contadores['aciertos'] + contadores['fallos']
+                espacios[espacio] = dict(
+                    contadores,
+                    tasa_aciertos=round(contadores['aciertos'] / consultas, 3) if consultas else 0
+                )
+
+        aciertos = sum(c['aciertos'] for c in espacios.values())
+        consultas = aciertos + sum(c['fallos'] for c in espacios.values())
+
+        try:
+            backend = CacheService._backend.estado() if CacheService._backend else {'tipo': 'sin iniciar'}
+        except Exception as e:
+            backend = {'error': str(e)}
+
+        return {
+            'backend': backend,
+            'tasa_aciertos': round(aciertos / consultas, 3) if consultas else 0,
+            'espacios': espacios
+        }
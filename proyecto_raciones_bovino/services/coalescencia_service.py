@@ -0,0 +1,174 @@
+from services.invalidacion_service import InvalidacionService
+from services.respuesta_service import formato_negociado
+from flask import request, make_response, current_app
+from functools import wraps
+import threading
+import time
+
+class _Vuelo:
+    """Cálculo en curso de una petición; las idénticas que llegan mientras tanto lo esperan"""
+
+    def __init__(self, tablas):
+        self.tablas = tablas
+        self.listo = threading.Event()
+        self.respuesta = None  # (cuerpo, status, headers) si se puede compartir
+        self.vigente = True    # False si un commit lo invalidó mientras corría
+
+class CoalescenciaService:
+    """
+    Coalescencia de peticiones idénticas concurrentes (singleflight)
+    La primera petición de una clave (endpoint + argumentos de la ruta + query string)
+    ejecuta la vista; las que llegan mientras tanto esperan y reciben la misma respuesta.
+    Opcionalmente la respuesta se reutiliza unos segundos; un commit que escribe en
+    las tablas declaradas descarta tanto la reutilización como el cálculo en curso.
+    """
+
+    _vuelos = {}        # clave -> _Vuelo en curso
+    _reutilizables = {} # clave -> (expira, respuesta, tablas)
+    _metricas = {'ejecutadas': 0, 'compartidas': 0, 'reutilizadas': 0}
+    _lock = threading.Lock()
+    _eventos_registrados = False
+
+    # ===============================
+    # INVALIDACIÓN
+    # ===============================
+
+    @staticmethod
+    def _al_confirmar(cambios):
+        """Suscriptor del bus: las peticiones nuevas no se unen a cálculos anteriores al commit"""
+        tablas = cambios['tablas']
+        with CoalescenciaService._lock:
+            for clave, vuelo in list(CoalescenciaService._vuelos.items()):
+                if vuelo.tablas & tablas:
+                    vuelo.vigente = False
+                    del CoalescenciaService._vuelos[clave]
+
+            for clave, (_, _, dependencias) in list(CoalescenciaService._reutilizables.items()):
+                if dependencias & tablas:
+                    del CoalescenciaService._reutilizables[clave]
+
+    @staticmethod
+    def registrar_eventos():
+        if CoalescenciaService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(CoalescenciaService._al_confirmar)
+
+        CoalescenciaService._eventos_registrados = True
+
+    # ===============================
+    # DECORADOR
+    # ===============================
+
+    @staticmethod
+    def _clave():
+        """Endpoint, parámetros normalizados (el orden de la query string no importa) y formato"""
+        argumentos_ruta = sorted((request.view_args or {}).items())
+        parametros = sorted(request.args.items(multi=True))
+        return f'{request.endpoint}|{argumentos_ruta!r}|{parametros!r}|{formato_negociado()}'
+
+    @staticmethod
+    def _construir(respuesta):
+        cuerpo, status, headers = respuesta
+        return make_response(cuerpo, status, headers)
+
+    @staticmethod
+    def _contar(metrica):
+        with CoalescenciaService._lock:
+            CoalescenciaService._metricas[metrica] += 1
+
+    @staticmethod
+    def coalescer(*tablas, reutilizar_segundos=None):
+        """
+        Decorador de vistas GET costosas
+        tablas: dependencias cuyo commit invalida la respuesta compartida.
+        reutilizar_segundos: reutilización tras terminar (None -> COALESCENCIA_REUTILIZAR_SEGUNDOS).
+        Va debajo de @jwt_required(): la autenticación se sigue haciendo por petición.
+        """
+        dependencias = set(tablas)
+
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                clave = CoalescenciaService._clave()
+                reutilizar = (
+                    reutilizar_segundos if reutilizar_segundos is not None
+                    else current_app.config.get('COALESCENCIA_REUTILIZAR_SEGUNDOS', 0)
+                )
+
+                with CoalescenciaService._lock:
+                    guardada = CoalescenciaService._reutilizables.get(clave)
+                    if guardada is not None and guardada[0] > time.monotonic():
+                        CoalescenciaService._metricas['reutilizadas'] += 1
+                        return CoalescenciaService._construir(guardada[1])
+
+                    vuelo = CoalescenciaService._vuelos.get(clave)
+                    lider = vuelo is None
+                    if lider:
+                        vuelo = _Vuelo(dependencias)
+                        CoalescenciaService._vuelos[clave] = vuelo
+
+                if not lider:
+                    espera = current_app.config.get('COALESCENCIA_ESPERA_SEGUNDOS', 30)
+                    if vuelo.listo.wait(espera) and vuelo.respuesta is not None:
+                        CoalescenciaService._contar('compartidas')
+                        return CoalescenciaService._construir(vuelo.respuesta)
+
+                    # El cálculo compartido falló o tardó demasiado: se hace aparte
+                    return vista(*args, **kwargs)
+
+                try:
+                    CoalescenciaService._contar('ejecutadas')
+                    respuesta = make_response(vista(*args, **kwargs))
+
+                    # Los errores del servidor no se comparten: cada petición reintenta
+                    if respuesta.status_code < 500 and not respuesta.is_streamed:
+                        vuelo.respuesta = (
+                            respuesta.get_data(),
+                            respuesta.status_code,
+                            list(respuesta.headers.items())
+                        )
+
+                        if reutilizar and respuesta.status_code == 200:
+                            CoalescenciaService._guardar(clave, vuelo, reutilizar)
+
+                    return respuesta
+
+                finally:
+                    with CoalescenciaService._lock:
+                        if CoalescenciaService._vuelos.get(clave) is vuelo:
+                            del CoalescenciaService._vuelos[clave]
+                    vuelo.listo.set()
+
+            return envoltura
+
+        return decorador
+
+    @staticmethod
+    def _guardar(clave, vuelo, reutilizar):
+        ahora = time.monotonic()
+        with CoalescenciaService._lock:
+            # Un commit durante el cálculo deja la respuesta sin reutilizar
+            if not vuelo.vigente:
+                return
+
+            CoalescenciaService._reutilizables = {
+                otra: entrada for otra, entrada in CoalescenciaService._reutilizables.items()
+                if entrada[0] > ahora
+            }
+            CoalescenciaService._reutilizables[clave] = (ahora + reutilizar, vuelo.respuesta, vuelo.tablas)
+
+    # ===============================
+    # MÉTRICAS
+    # ===============================
+
+    @staticmethod
+    def metricas():
+        """Peticiones ejecutadas, compartidas con una en curso y reutilizadas"""
+        with CoalescenciaService._lock:
+            return dict(
+                CoalescenciaService._metricas,
+                en_curso=len(CoalescenciaService._vuelos),
+                reutilizables=len(CoalescenciaService._reutilizables)
+            )
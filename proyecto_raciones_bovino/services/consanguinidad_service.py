@@ -0,0 +1,562 @@
+from models import db, Animal, Hacienda, Nacimiento
+from services.invalidacion_service import InvalidacionService
+from sqlalchemy import select, func
+from collections import OrderedDict
+from datetime import datetime
+import heapq
+import threading
+import time
+
+class _Pedigri:
+    """
+    Pedigrí del hato en orden de generaciones (los padres antes que las crías)
+    Las posiciones empiezan en 1; la posición 0 es el progenitor desconocido.
+    """
+
+    def __init__(self):
+        self.ids = [None]
+        self.posicion = {}         # idanimal -> posición
+        self.padre = [0]
+        self.madre = [0]
+        self.generacion = [0]
+        self.F = [-1.0]            # Consanguinidad; -1 en la posición 0 simplifica D
+        self.D = [0.0]             # Varianza mendeliana: 0.5 - 0.25 (F padre + F madre)
+        self.hermanos = {}         # (progenitor, progenitor) -> F de sus crías
+        self.filas = OrderedDict() # posición -> fila de relación aditiva (las más recientes)
+        self.ultimo_nacimiento = 0
+        self.huella = (0, 0, 0)
+        self.generado_en = datetime.now()
+
+    def __len__(self):
+        return len(self.ids) - 1
+
+    def progenitores(self, posicion):
+        return self.padre[posicion], self.madre[posicion]
+
+class ConsanguinidadService:
+    """
+    Consanguinidad y parentesco del hato
+    El pedigrí se arma una vez desde los nacimientos, en orden de generaciones, y se
+    guarda en arreglos por posición. La consanguinidad de cada animal sale del método
+    de Meuwissen y Luo (solo recorre sus ancestros, con un montículo por posición; los
+    hermanos completos la reutilizan) y una fila de parentesco, del método indirecto
+    de Colleau (ancestros hacia atrás y una pasada hacia adelante). Las crías nuevas se
+    agregan al final sin recalcular nada; otros cambios reconstruyen el pedigrí.
+    """
+
+    # Filas de parentesco que se conservan en memoria
+    FILAS_EN_CACHE = 128
+
+    # Rangos de consanguinidad del resumen por hacienda
+    RANGOS = (
+        ('sin_consanguinidad', 0.0),
+        ('baja', 0.0625),       # Hasta primos hermanos
+        ('media', 0.125),       # Hasta medio hermanos
+        ('alta', 0.25),         # Hasta hermanos completos o padre-hija
+        ('muy_alta', None)
+    )
+
+    _pedigri = None
+    _pendiente = False
+    _verificado_en = 0
+    _intervalo_verificacion = 60
+    _metricas = {'construcciones': 0, 'crias_agregadas': 0, 'filas_calculadas': 0}
+    _lock = threading.Lock()
+    _eventos_registrados = False
+
+    @staticmethod
+    def iniciar(app):
+        """Lee la configuración y se suscribe al bus de invalidación"""
+        ConsanguinidadService._intervalo_verificacion = app.config.get('CONSANGUINIDAD_VERIFICACION_SEGUNDOS', 60)
+        ConsanguinidadService._registrar_eventos()
+
+    # ===============================
+    # CÁLCULO
+    # ===============================
+
+    @staticmethod
+    def _consanguinidad(pedigri, posicion):
+        """Meuwissen y Luo: F = suma de L^2 * D sobre el animal y sus ancestros, menos 1"""
+        padre, madre = pedigri.progenitores(posicion)
+        if not padre or not madre:
+            return 0.0
+
+        clave = (padre, madre) if padre < madre else (madre, padre)
+        conocida = pedigri.hermanos.get(clave)
+        if conocida is not None:
+            return conocida
+
+        D, padres, madres = pedigri.D, pedigri.padre, pedigri.madre
+        empujar, sacar = heapq.heappush, heapq.heappop
+
+        F = D[posicion] - 1.0
+        aporte = {}
+        cola = []
+        for progenitor in clave:
+            if progenitor not in aporte:
+                empujar(cola, -progenitor)
+            aporte[progenitor] = aporte.get(progenitor, 0.0) + 0.5
+
+        # Del ancestro más reciente al más antiguo: su aporte ya está completo al sacarlo
+        while cola:
+            ancestro = -sacar(cola)
+            valor = aporte.pop(ancestro)
+            F += valor * valor * D[ancestro]
+
+            mitad = 0.5 * valor
+            for progenitor in (padres[ancestro], madres[ancestro]):
+                if not progenitor:
+                    continue
+                if progenitor in aporte:
+                    aporte[progenitor] += mitad
+                else:
+                    aporte[progenitor] = mitad
+                    empujar(cola, -progenitor)
+
+        pedigri.hermanos[clave] = F
+        return F
+
+    @staticmethod
+    def _ubicar(pedigri, idanimal, padre=0, madre=0, generacion=0):
+        """Agrega un animal al final del pedigrí (sus progenitores ya deben estar)"""
+        posicion = len(pedigri.ids)
+        pedigri.ids.append(idanimal)
+        pedigri.posicion[idanimal] = posicion
+        pedigri.padre.append(padre)
+        pedigri.madre.append(madre)
+        pedigri.generacion.append(generacion)
+        pedigri.D.append(0.5 - 0.25 * (pedigri.F[padre] + pedigri.F[madre]))
+        pedigri.F.append(0.0)
+        pedigri.F[posicion] = ConsanguinidadService._consanguinidad(pedigri, posicion)
+
+        # Las filas en memoria se extienden con la nueva posición
+        for fila in pedigri.filas.values():
+            fila.append(0.5 * (fila[padre] + fila[madre]))
+
+        return posicion
+
+    @staticmethod
+    def _fila(pedigri, posicion):
+        """
+        Colleau: relación aditiva del animal con todo el hato
+        w = D (T' e) sobre sus ancestros y luego a = T w en una pasada hacia adelante
+        """
+        fila = pedigri.filas.get(posicion)
+        if fila is not None:
+            pedigri.filas.move_to_end(posicion)
+            return fila
+
+        fila = [0.0] * len(pedigri.ids)
+        aporte = {posicion: 1.0}
+        cola = [-posicion]
+        while cola:
+            ancestro = -heapq.heappop(cola)
+            valor = aporte.pop(ancestro)
+            fila[ancestro] = valor * pedigri.D[ancestro]
+
+            mitad = 0.5 * valor
+            for progenitor in pedigri.progenitores(ancestro):
+                if not progenitor:
+                    continue
+                if progenitor in aporte:
+                    aporte[progenitor] += mitad
+                else:
+                    aporte[progenitor] = mitad
+                    heapq.heappush(cola, -progenitor)
+            inicio = ancestro
+
+        padres, madres = pedigri.padre, pedigri.madre
+        for actual in range(inicio, len(fila)):
+            fila[actual] += 0.5 * (fila[padres[actual]] + fila[madres[actual]])
+
+        pedigri.filas[posicion] = fila
+        if len(pedigri.filas) > ConsanguinidadService.FILAS_EN_CACHE:
+            pedigri.filas.popitem(last=False)
+        ConsanguinidadService._metricas['filas_calculadas'] += 1
+        return fila
+
+    # ===============================
+    # CONSTRUCCIÓN E INCREMENTOS
+    # ===============================
+
+    @staticmethod
+    def _consultar_nacimientos(conexion, desde=0):
+        return conexion.execute(
+            select(
+                Nacimiento.idnacimiento,
+                Nacimiento.idanimal_cria,
+                Nacimiento.idanimal_madre,
+                Nacimiento.idanimal_padre
+            ).where(Nacimiento.idnacimiento > desde).order_by(Nacimiento.idnacimiento)
+        ).all()
+
+    @staticmethod
+    def _huella(conexion):
+        """Conteo y sumas de los nacimientos: detecta cambios que no son crías nuevas"""
+        fila = conexion.execute(
+            select(
+                func.count(),
+                func.sum(Nacimiento.idanimal_cria * Nacimiento.idanimal_madre),
+                func.sum(Nacimiento.idanimal_cria * func.coalesce(Nacimiento.idanimal_padre, 0))
+            ).select_from(Nacimiento)
+        ).one()
+        return tuple(int(valor or 0) for valor in fila)
+
+    @staticmethod
+    def _sumar_huella(pedigri, cria, madre, padre):
+        total, madres, padres = pedigri.huella
+        pedigri.huella = (total + 1, madres + cria * madre, padres + cria * (padre or 0))
+
+    @staticmethod
+    def _construir(conexion):
+        """Pedigrí completo: generación por generación desde los animales sin padres registrados"""
+        pedigri = _Pedigri()
+        nacimientos = ConsanguinidadService._consultar_nacimientos(conexion)
+
+        progenitores = {}
+        hijos = {}
+        for idnacimiento, cria, madre, padre in nacimientos:
+            progenitores[cria] = (padre, madre)
+            pedigri.ultimo_nacimiento = max(pedigri.ultimo_nacimiento, idnacimiento)
+            ConsanguinidadService._sumar_huella(pedigri, cria, madre, padre)
+
+        faltantes = {}
+        for cria, pareja in progenitores.items():
+            conocidos = {progenitor for progenitor in pareja if progenitor}
+            faltantes[cria] = len(conocidos)
+            for progenitor in conocidos:
+                hijos.setdefault(progenitor, []).append(cria)
+
+        animales = set(progenitores) | set(hijos)
+        nivel = sorted(animal for animal in animales if not faltantes.get(animal))
+        generacion = 0
+        while nivel:
+            siguiente = []
+            for animal in nivel:
+                padre, madre = progenitores.get(animal, (None, None))
+                ConsanguinidadService._ubicar(
+                    pedigri,
+                    animal,
+                    pedigri.posicion.get(padre, 0),
+                    pedigri.posicion.get(madre, 0),
+                    generacion
+                )
+                for hijo in hijos.get(animal, ()):
+                    faltantes[hijo] -= 1
+                    if not faltantes[hijo]:
+                        siguiente.append(hijo)
+            nivel = sorted(siguiente)
+            generacion += 1
+
+        # Un ciclo en los datos deja animales sin ubicar: entran sin progenitores
+        sin_ubicar = sorted(animales - set(pedigri.posicion))
+        if sin_ubicar:
+            print(f"⚠️ Pedigrí con ciclos: {len(sin_ubicar)} animales se toman como fundadores")
+            for animal in sin_ubicar:
+                ConsanguinidadService._ubicar(pedigri, animal)
+
+        ConsanguinidadService._metricas['construcciones'] += 1
+        return pedigri
+
+    @staticmethod
+    def _agregar_cria(pedigri, cria, madre, padre):
+        """Agrega una cría nueva al final; False si la cría ya estaba (hay que reconstruir)"""
+        if cria in pedigri.posicion:
+            return False
+
+        for progenitor in (padre, madre):
+            if progenitor and progenitor not in pedigri.posicion:
+                ConsanguinidadService._ubicar(pedigri, progenitor)
+
+        posicion_padre = pedigri.posicion.get(padre, 0)
+        posicion_madre = pedigri.posicion[madre]
+        ConsanguinidadService._ubicar(
+            pedigri,
+            cria,
+            posicion_padre,
+            posicion_madre,
+            1 + max(pedigri.generacion[posicion_padre], pedigri.generacion[posicion_madre])
+        )
+        ConsanguinidadService._metricas['crias_agregadas'] += 1
+        return True
+
+    @staticmethod
+    def _sincronizar(pedigri, conexion):
+        """Agrega los nacimientos nuevos; False si hubo otros cambios"""
+        for idnacimiento, cria, madre, padre in ConsanguinidadService._consultar_nacimientos(
+            conexion, pedigri.ultimo_nacimiento
+        ):
+            if not ConsanguinidadService._agregar_cria(pedigri, cria, madre, padre):
+                return False
+            pedigri.ultimo_nacimiento = idnacimiento
+            ConsanguinidadService._sumar_huella(pedigri, cria, madre, padre)
+
+        return ConsanguinidadService._huella(conexion) == pedigri.huella
+
+    @staticmethod
+    def _al_confirmar(cambios):
+        """Suscriptor del bus: la próxima lectura revisa los nacimientos"""
+        if 'nacimientos' in cambios['tablas']:
+            ConsanguinidadService._pendiente = True
+
+    @staticmethod
+    def _registrar_eventos():
+        if ConsanguinidadService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(ConsanguinidadService._al_confirmar)
+
+        ConsanguinidadService._eventos_registrados = True
+
+    @staticmethod
+    def _vigente():
+        """Pedigrí al día; llamar con el lock tomado"""
+        ahora = time.monotonic()
+        pedigri = ConsanguinidadService._pedigri
+        revisar = (
+            ConsanguinidadService._pendiente
+            or ahora - ConsanguinidadService._verificado_en >= ConsanguinidadService._intervalo_verificacion
+        )
+        if pedigri is not None and not revisar:
+            return pedigri
+
+        # Conexión propia: solo nacimientos confirmados
+        ConsanguinidadService._pendiente = False
+        with db.engine.connect() as conexion:
+            if pedigri is None or not ConsanguinidadService._sincronizar(pedigri, conexion):
+                pedigri = ConsanguinidadService._construir(conexion)
+
+        ConsanguinidadService._pedigri = pedigri
+        ConsanguinidadService._verificado_en = ahora
+        return pedigri
+
+    # ===============================
+    # API DEL MOTOR
+    # ===============================
+
+    @staticmethod
+    def coeficientes(idanimales):
+        """Consanguinidad de cada animal (0 si no tiene progenitores registrados)"""
+        with ConsanguinidadService._lock:
+            pedigri = ConsanguinidadService._vigente()
+            return {
+                idanimal: pedigri.F[pedigri.posicion[idanimal]] if idanimal in pedigri.posicion else 0.0
+                for idanimal in idanimales
+            }
+
+    @staticmethod
+    def parentescos(idanimal, otros=None):
+        """
+        Coeficiente de parentesco (coancestría) del animal con otros, o con todo el
+        pedigrí si no se indican; también es la consanguinidad de una cría de ambos
+        """
+        with ConsanguinidadService._lock:
+            pedigri = ConsanguinidadService._vigente()
+            posicion = pedigri.posicion.get(idanimal)
+
+            if posicion is None:
+                # Sin registros genealógicos: solo emparentado consigo mismo
+                return {otro: (0.5 if otro == idanimal else 0.0) for otro in (otros or [])}
+
+            fila = ConsanguinidadService._fila(pedigri, posicion)
+            if otros is None:
+                return {
+                    pedigri.ids[otra]: 0.5 * valor
+                    for otra, valor in enumerate(fila) if otra and valor
+                }
+            return {
+                otro: 0.5 * fila[pedigri.posicion[otro]] if otro in pedigri.posicion else 0.0
+                for otro in otros
+            }
+
+    @staticmethod
+    def metricas():
+        """Estado del pedigrí en memoria (para el health check)"""
+        with ConsanguinidadService._lock:
+            pedigri = ConsanguinidadService._pedigri
+            return dict(
+                ConsanguinidadService._metricas,
+                animales=len(pedigri) if pedigri else 0,
+                generaciones=max(pedigri.generacion) + 1 if pedigri and len(pedigri) else 0,
+                filas_en_cache=len(pedigri.filas) if pedigri else 0,
+                generado_en=pedigri.generado_en.isoformat() if pedigri else None
+            )
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    @staticmethod
+    def _datos_animal(animal):
+        return {'idanimal': animal.idanimal, 'hierro': animal.hierro, 'sexo': animal.sexo}
+
+    @staticmethod
+    def obtener_consanguinidad(animal_id):
+        """Consanguinidad del animal y de sus progenitores"""
+        try:
+            animal = db.session.get(Animal, animal_id)
+            if not animal:
+                return {
+                    'error': 'Animal no encontrado',
+                    'status': 'error',
+                    'code': 'NOT_FOUND'
+                }, 404
+
+            nacimiento = Nacimiento.query.filter_by(idanimal_cria=animal_id).first()
+            madre = nacimiento.idanimal_madre if nacimiento else None
+            padre = nacimiento.idanimal_padre if nacimiento else None
+
+            coeficientes = ConsanguinidadService.coeficientes([animal_id] + [p for p in (madre, padre) if p])
+            with ConsanguinidadService._lock:
+                pedigri = ConsanguinidadService._pedigri
+                posicion = pedigri.posicion.get(animal_id)
+                generaciones = pedigri.generacion[posicion] if posicion else 0
+
+            return {
+                'animal': ConsanguinidadService._datos_animal(animal),
+                'coeficiente_consanguinidad': round(coeficientes[animal_id], 6),
+                'generaciones_conocidas': generaciones,
+                'madre': {
+                    'idanimal': madre,
+                    'coeficiente_consanguinidad': round(coeficientes[madre], 6)
+                } if madre else None,
+                'padre': {
+                    'idanimal': padre,
+                    'coeficiente_consanguinidad': round(coeficientes[padre], 6)
+                } if padre else None,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al calcular consanguinidad: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+
+    @staticmethod
+    def obtener_parientes(animal_id, hacienda_id=None, sexo=None, minimo=0.0, pagina=1, por_pagina=50):
+        """Parientes del animal de mayor a menor parentesco (una fila del motor)"""
+        try:
+            animal = db.session.get(Animal, animal_id)
+            if not animal:
+                return {
+                    'error': 'Animal no encontrado',
+                    'status': 'error',
+                    'code': 'NOT_FOUND'
+                }, 404
+
+            parientes = ConsanguinidadService.parentescos(animal_id)
+            parientes.pop(animal_id, None)
+
+            if hacienda_id or sexo:
+                condiciones = []
+                if hacienda_id:
+                    condiciones.append(Animal.idhacienda == hacienda_id)
+                if sexo:
+                    condiciones.append(Animal.sexo == sexo)
+                permitidos = set(db.session.execute(select(Animal.idanimal).where(*condiciones)).scalars())
+                parientes = {otro: valor for otro, valor in parientes.items() if otro in permitidos}
+
+            ordenados = sorted(
+                ((otro, valor) for otro, valor in parientes.items() if valor > minimo),
+                key=lambda par: (-par[1], par[0])
+            )
+            total = len(ordenados)
+            pagina_items = ordenados[(pagina - 1) * por_pagina:pagina * por_pagina]
+
+            datos = {
+                fila.idanimal: fila for fila in db.session.execute(
+                    select(Animal.idanimal, Animal.hierro, Animal.sexo, Animal.idhacienda).where(
+                        Animal.idanimal.in_([otro for otro, _ in pagina_items])
+                    )
+                )
+            } if pagina_items else {}
+
+            total_paginas = (total + por_pagina - 1) // por_pagina
+            return {
+                'animal': ConsanguinidadService._datos_animal(animal),
+                'parientes': [
+                    {
+                        'idanimal': otro,
+                        'hierro': datos[otro].hierro if otro in datos else None,
+                        'sexo': datos[otro].sexo if otro in datos else None,
+                        'idhacienda': datos[otro].idhacienda if otro in datos else None,
+                        'parentesco': round(valor, 6)
+                    }
+                    for otro, valor in pagina_items
+                ],
+                'total': total,
+                'pagina_actual': pagina,
+                'total_paginas': total_paginas,
+                'por_pagina': por_pagina,
+                'tiene_siguiente': pagina < total_paginas,
+                'tiene_anterior': pagina > 1,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al calcular parentescos: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+
+    @staticmethod
+    def _rango(coeficiente):
+        for nombre, limite in ConsanguinidadService.RANGOS:
+            if limite is None or coeficiente <= limite:
+                return nombre
+
+    @staticmethod
+    def obtener_resumen_hacienda(hacienda_id, limite=10):
+        """Consanguinidad de los animales activos de una hacienda: promedio, rangos y los más consanguíneos"""
+        try:
+            from services.referencias_service import ReferenciasService
+
+            if not db.session.get(Hacienda, hacienda_id):
+                return {
+                    'error': 'Hacienda no encontrada',
+                    'status': 'error',
+                    'code': 'HACIENDA_NOT_FOUND'
+                }, 404
+
+            animales = db.session.execute(
+                select(Animal.idanimal, Animal.hierro, Animal.sexo).where(
+                    Animal.idhacienda == hacienda_id,
+                    Animal.idestado == ReferenciasService.id_estado('Activo')
+                )
+            ).all()
+            coeficientes = ConsanguinidadService.coeficientes([fila.idanimal for fila in animales])
+
+            rangos = dict.fromkeys((nombre for nombre, _ in ConsanguinidadService.RANGOS), 0)
+            for coeficiente in coeficientes.values():
+                rangos[ConsanguinidadService._rango(coeficiente)] += 1
+
+            mayores = sorted(animales, key=lambda fila: (-coeficientes[fila.idanimal], fila.idanimal))[:limite]
+
+            return {
+                'hacienda_id': hacienda_id,
+                'total_animales': len(animales),
+                'promedio': round(sum(coeficientes.values()) / len(animales), 6) if animales else None,
+                'maximo': round(max(coeficientes.values()), 6) if animales else None,
+                'rangos': rangos,
+                'mas_consanguineos': [
+                    {
+                        'idanimal': fila.idanimal,
+                        'hierro': fila.hierro,
+                        'sexo': fila.sexo,
+                        'coeficiente_consanguinidad': round(coeficientes[fila.idanimal], 6)
+                    }
+                    for fila in mayores if coeficientes[fila.idanimal] > 0
+                ],
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al calcular la consanguinidad de la hacienda: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
@@ -0,0 +1,282 @@
+from models import db, Animal, Hacienda, EstadoVacunacionAnimal
+from services.referencias_service import ReferenciasService
+from sqlalchemy import select, case, literal, func, and_
+from datetime import date, timedelta
+import csv
+import io
+import json
+
+class CumplimientoService:
+    """
+    Reporte de cumplimiento sanitario por ciclos oficiales de vacunación
+    La cobertura de cada ciclo es un LEFT JOIN de los animales que le aplican con la
+    tabla de estado de vacunación: cubierto si la última aplicación cae dentro de la
+    ventana del ciclo (frecuencia de la vacuna hasta la fecha de corte). El detalle se
+    lee con un cursor del lado del servidor y se escribe fila a fila (CSV o NDJSON);
+    los consolidados por departamento y municipio son un GROUP BY.
+    """
+
+    # Ciclos oficiales: vacuna del catálogo y animales a los que aplica
+    CICLOS = {
+        'aftosa': {
+            'vacuna': 'Aftosa',
+            'descripcion': 'Fiebre aftosa, todo el hato',
+            'sexo': None,
+            'edad_minima_dias': None,
+            'edad_maxima_dias': None
+        },
+        'brucelosis': {
+            'vacuna': 'Brucelosis',
+            'descripcion': 'Brucelosis, terneras de 3 a 8 meses',
+            'sexo': 'Hembra',
+            'edad_minima_dias': 90,
+            'edad_maxima_dias': 240
+        }
+    }
+
+    ESTADOS = ('cubierto', 'vencido', 'sin_vacunar')
+
+    COLUMNAS = (
+        'ciclo', 'departamento', 'municipio', 'idhacienda', 'hacienda', 'idanimal', 'hierro',
+        'sexo', 'fecha_nacimiento', 'fecha_ultima_aplicacion', 'estado'
+    )
+
+    # Filas por lectura del cursor y por fragmento de la respuesta
+    LOTE = 1000
+
+    # ===============================
+    # CONSULTAS POR CICLO
+    # ===============================
+
+    @staticmethod
+    def validar_ciclos(ciclos):
+        """Lista de ciclos pedidos (todos si no se indica), o None si alguno no existe"""
+        if not ciclos:
+            return list(CumplimientoService.CICLOS)
+        if any(ciclo not in CumplimientoService.CICLOS for ciclo in ciclos):
+            return None
+        return list(ciclos)
+
+    @staticmethod
+    def _condiciones(ciclo, corte, hacienda_id, departamento):
+        """Animales activos a los que aplica el ciclo en la fecha de corte"""
+        definicion = CumplimientoService.CICLOS[ciclo]
+        condiciones = [Animal.idestado == ReferenciasService.id_estado('Activo')]
+
+        if definicion['sexo']:
+            condiciones.append(Animal.sexo == definicion['sexo'])
+        if definicion['edad_minima_dias'] is not None:
+            condiciones.append(Animal.fecha_nacimiento <= corte - timedelta(days=definicion['edad_minima_dias']))
+        if definicion['edad_maxima_dias'] is not None:
+            condiciones.append(Animal.fecha_nacimiento >= corte - timedelta(days=definicion['edad_maxima_dias']))
+        if hacienda_id:
+            condiciones.append(Animal.idhacienda == hacienda_id)
+        if departamento:
+            condiciones.append(Hacienda.departamento == departamento)
+
+        return condiciones
+
+    @staticmethod
+    def _estado(ciclo, corte):
+        """CASE con el estado de cobertura del ciclo y el join con la tabla de estado"""
+        vacuna = ReferenciasService.vacuna(
+            ReferenciasService.buscar_id('catalogo_vacunas', CumplimientoService.CICLOS[ciclo]['vacuna'])
+        )
+        if vacuna is None:
+            raise ValueError(f"La vacuna del ciclo '{ciclo}' no está en el catálogo")
+
+        inicio = corte - timedelta(days=vacuna['frecuencia_dias'] or 365)
+        ultima = EstadoVacunacionAnimal.fecha_ultima_aplicacion
+        estado = case(
+            (ultima.is_(None), literal('sin_vacunar')),
+            (and_(ultima >= inicio, ultima <= corte), literal('cubierto')),
+            else_=literal('vencido')
+        )
+
+        union = and_(
+            EstadoVacunacionAnimal.idanimal == Animal.idanimal,
+            EstadoVacunacionAnimal.idvacuna == vacuna['idvacuna']
+        )
+        return estado, union
+
+    @staticmethod
+    def _consulta_detalle(ciclo, corte, hacienda_id, departamento):
+        estado, union = CumplimientoService._estado(ciclo, corte)
+        return select(
+            literal(ciclo).label('ciclo'),
+            Hacienda.departamento,
+            Hacienda.municipio,
+            Hacienda.idhacienda,
+            Hacienda.nombre.label('hacienda'),
+            Animal.idanimal,
+            Animal.hierro,
+            Animal.sexo,
+            Animal.fecha_nacimiento,
+            EstadoVacunacionAnimal.fecha_ultima_aplicacion,
+            estado.label('estado')
+        ).select_from(Animal).join(
+            Hacienda, Hacienda.idhacienda == Animal.idhacienda
+        ).outerjoin(
+            EstadoVacunacionAnimal, union
+        ).where(
+            *CumplimientoService._condiciones(ciclo, corte, hacienda_id, departamento)
+        ).order_by(
+            Hacienda.departamento, Hacienda.municipio, Hacienda.idhacienda, Animal.idanimal
+        )
+
+    @staticmethod
+    def _consulta_totales(ciclo, corte, hacienda_id, departamento):
+        estado, union = CumplimientoService._estado(ciclo, corte)
+        return select(
+            Hacienda.departamento,
+            Hacienda.municipio,
+            func.count().label('total'),
+            func.count(func.distinct(Hacienda.idhacienda)).label('haciendas'),
+            *[
+                func.sum(case((estado == nombre, 1), else_=0)).label(nombre)
+                for nombre in CumplimientoService.ESTADOS
+            ]
+        ).select_from(Animal).join(
+            Hacienda, Hacienda.idhacienda == Animal.idhacienda
+        ).outerjoin(
+            EstadoVacunacionAnimal, union
+        ).where(
+            *CumplimientoService._condiciones(ciclo, corte, hacienda_id, departamento)
+        ).group_by(
+            Hacienda.departamento, Hacienda.municipio
+        )
+
+    # ===============================
+    # DETALLE EN STREAMING
+    # ===============================
+
+    @staticmethod
+    def filas(ciclos, corte, hacienda_id=None, departamento=None):
+        """
+        Filas del detalle, ciclo por ciclo
+        Las consultas se arman antes de empezar a leer (un ciclo sin vacuna en el
+        catálogo falla aquí y no a mitad de la respuesta).
+        """
+        consultas = [
+            CumplimientoService._consulta_detalle(ciclo, corte, hacienda_id, departamento)
+            for ciclo in ciclos
+        ]
+        return CumplimientoService._leer(consultas)
+
+    @staticmethod
+    def _leer(consultas):
+        """Cursor del lado del servidor en una conexión propia (no retiene la sesión)"""
+        with db.engine.connect() as conexion:
+            conexion = conexion.execution_options(stream_results=True, yield_per=CumplimientoService.LOTE)
+            for consulta in consultas:
+                for fila in conexion.execute(consulta).mappings():
+                    yield {
+                        **fila,
+                        'fecha_nacimiento': fila['fecha_nacimiento'].isoformat() if fila['fecha_nacimiento'] else None,
+                        'fecha_ultima_aplicacion': (
+                            fila['fecha_ultima_aplicacion'].isoformat() if fila['fecha_ultima_aplicacion'] else None
+                        )
+                    }
+
+    @staticmethod
+    def generar_csv(filas):
+        """Fragmentos CSV (cabecera y lotes de filas); la memoria no crece con el reporte"""
+        salida = io.StringIO()
+        escritor = csv.writer(salida)
+        escritor.writerow(CumplimientoService.COLUMNAS)
+
+        for numero, fila in enumerate(filas, 1):
+            escritor.writerow([fila[columna] for columna in CumplimientoService.COLUMNAS])
+            if numero % CumplimientoService.LOTE == 0:
+                yield salida.getvalue().encode('utf-8')
+                salida.seek(0)
+                salida.truncate()
+
+        yield salida.getvalue().encode('utf-8')
+
+    @staticmethod
+    def generar_ndjson(filas):
+        """Fragmentos NDJSON: un objeto por línea, en lotes"""
+        lote = []
+        for fila in filas:
+            lote.append(json.dumps(fila, ensure_ascii=False))
+            if len(lote) == CumplimientoService.LOTE:
+                yield ('\n'.join(lote) + '\n').encode('utf-8')
+                lote = []
+
+        if lote:
+            yield ('\n'.join(lote) + '\n').encode('utf-8')
+
+    # ===============================
+    # CONSOLIDADOS
+    # ===============================
+
+    @staticmethod
+    def _totales_vacios():
+        return {**dict.fromkeys(CumplimientoService.ESTADOS, 0), 'total': 0, 'haciendas': 0}
+
+    @staticmethod
+    def _porcentaje(totales):
+        totales['cobertura'] = round(totales['cubierto'] * 100 / totales['total'], 2) if totales['total'] else None
+        return totales
+
+    @staticmethod
+    def obtener_resumen(ciclos=None, corte=None, hacienda_id=None, departamento=None):
+        """Cobertura por ciclo, departamento y municipio (un GROUP BY por ciclo)"""
+        try:
+            ciclos = CumplimientoService.validar_ciclos(ciclos)
+            if ciclos is None:
+                return {
+                    'error': f'Ciclo no válido. Opciones: {", ".join(CumplimientoService.CICLOS)}',
+                    'status': 'error',
+                    'code': 'INVALID_CYCLE'
+                }, 400
+
+            corte = corte or date.today()
+            resumen = {}
+
+            for ciclo in ciclos:
+                general = CumplimientoService._totales_vacios()
+                departamentos = {}
+
+                for fila in db.session.execute(
+                    CumplimientoService._consulta_totales(ciclo, corte, hacienda_id, departamento)
+                ).mappings():
+                    nodo = departamentos.setdefault(fila['departamento'] or 'Sin departamento', {
+                        **CumplimientoService._totales_vacios(), 'municipios': {}
+                    })
+                    municipio = {
+                        campo: int(fila[campo] or 0)
+                        for campo in (*CumplimientoService.ESTADOS, 'total', 'haciendas')
+                    }
+                    nodo['municipios'][fila['municipio'] or 'Sin municipio'] = CumplimientoService._porcentaje(municipio)
+
+                    # Una hacienda está en un solo municipio: los conteos se suman hacia arriba
+                    for totales in (general, nodo):
+                        for campo, cantidad in municipio.items():
+                            if campo != 'cobertura':
+                                totales[campo] += cantidad
+
+                for nodo in departamentos.values():
+                    CumplimientoService._porcentaje(nodo)
+
+                resumen[ciclo] = {
+                    'descripcion': CumplimientoService.CICLOS[ciclo]['descripcion'],
+                    'totales': CumplimientoService._porcentaje(general),
+                    'departamentos': departamentos
+                }
+
+            return {
+                'ciclos': resumen,
+                'fecha_corte': corte.isoformat(),
+                'hacienda_id': hacienda_id,
+                'departamento': departamento,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al generar el resumen de cumplimiento: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
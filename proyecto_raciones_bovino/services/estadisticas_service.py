@@ -0,0 +1,312 @@
+from models import db, Usuario, RolUsuario, Hacienda, Animal, EstadoAnimal, CatalogoVacuna, VacunacionAnimal, Nacimiento
+from services.referencias_service import ReferenciasService
+from services.alertas_service import AlertasService
+from sqlalchemy import select, func, case, and_, or_, true
+from datetime import date, datetime, timedelta
+
+class EstadisticasService:
+    """
+    Motor de estadísticas para los tableros
+    Cada bloque es una sola consulta de agregación condicional (SUM(CASE ...)) sobre
+    una tabla; los bloques se combinan en una única ida y vuelta a la base de datos.
+    """
+
+    # ===============================
+    # UTILIDADES
+    # ===============================
+
+    @staticmethod
+    def contar_si(condicion):
+        """COUNT condicional portable (MySQL no soporta FILTER)"""
+        return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+    @staticmethod
+    def ejecutar_bloques(*bloques):
+        """
+        Ejecuta varios bloques (consultas de una fila) en una sola sentencia
+        Retorna un dict con todas las columnas etiquetadas de los bloques
+        """
+        subconsultas = [bloque.subquery() for bloque in bloques]
+
+        origen = subconsultas[0]
+        for subconsulta in subconsultas[1:]:
+            origen = origen.join(subconsulta, true())
+
+        columnas = [columna for subconsulta in subconsultas for columna in subconsulta.c]
+        fila = db.session.execute(select(*columnas).select_from(origen)).mappings().one()
+        return dict(fila)
+
+    # ===============================
+    # BLOQUES POR TABLA
+    # ===============================
+
+    @staticmethod
+    def bloque_usuarios():
+        """Totales de usuarios"""
+        return select(
+            func.count(Usuario.idusuario).label('usuarios_total'),
+            EstadisticasService.contar_si(Usuario.activo == True).label('usuarios_activos'),
+            EstadisticasService.contar_si(Usuario.activo == False).label('usuarios_inactivos')
+        )
+
+    @staticmethod
+    def bloque_roles():
+        """Totales de roles"""
+        return select(
+            func.count(RolUsuario.idrol).label('roles_total'),
+            EstadisticasService.contar_si(RolUsuario.activo == True).label('roles_activos')
+        )
+
+    @staticmethod
+    def bloque_haciendas():
+        """Totales de haciendas"""
+        return select(
+            func.count(Hacienda.idhacienda).label('haciendas_total'),
+            EstadisticasService.contar_si(Hacienda.activo == True).label('haciendas_activas'),
+            EstadisticasService.contar_si(Hacienda.activo == False).label('haciendas_inactivas')
+        )
+
+    @staticmethod
+    def bloque_animales(hacienda_id=None):
+        """Totales de animales por sexo, preñadas y peso promedio"""
+        query = select(
+            func.count(Animal.idanimal).label('animales_total'),
+            EstadisticasService.contar_si(Animal.sexo == 'Macho').label('animales_machos'),
+            EstadisticasService.contar_si(Animal.sexo == 'Hembra').label('animales_hembras'),
+            EstadisticasService.contar_si(
+                and_(Animal.sexo == 'Hembra', Animal.preñada == True)
+            ).label('animales_preñadas'),
+            func.avg(Animal.peso_actual).label('animales_peso_promedio')
+        )
+
+        if hacienda_id:
+            query = query.where(Animal.idhacienda == hacienda_id)
+
+        return query
+
+    @staticmethod
+    def bloque_animales_activos():
+        """Animales en estado Activo"""
+        return select(
+            func.count(Animal.idanimal).label('animales_activos')
+        ).where(
+            Animal.idestado.in_([ReferenciasService.id_estado('Activo')])
+        )
+
+    @staticmethod
+    def bloque_estados():
+        """Total de estados de animal"""
+        return select(
+            func.count(EstadoAnimal.idestado).label('estados_total')
+        )
+
+    @staticmethod
+    def bloque_vacunacion_hacienda(hacienda_id):
+        """Vacunaciones de una hacienda: total, animales al día y próximas 30 días"""
+        hoy = date.today()
+
+        return select(
+            func.count(VacunacionAnimal.idvacunacion).label('vacunacion_total'),
+            func.count(func.distinct(case(
+                (or_(
+                    VacunacionAnimal.proxima_dosis.is_(None),
+                    VacunacionAnimal.proxima_dosis >= hoy
+                ), Animal.idanimal),
+                else_=None
+            ))).label('vacunacion_animales_al_dia'),
+            EstadisticasService.contar_si(and_(
+                VacunacionAnimal.proxima_dosis.isnot(None),
+                VacunacionAnimal.proxima_dosis <= hoy + timedelta(days=30),
+                VacunacionAnimal.proxima_dosis >= hoy
+            )).label('vacunacion_proximas')
+        ).select_from(Animal).outerjoin(
+            VacunacionAnimal, VacunacionAnimal.idanimal == Animal.idanimal
+        ).where(Animal.idhacienda == hacienda_id)
+
+    @staticmethod
+    def bloque_catalogo_vacunas():
+        """Totales del catálogo de vacunas"""
+        return select(
+            func.count(CatalogoVacuna.idvacuna).label('vacunas_total'),
+            EstadisticasService.contar_si(CatalogoVacuna.activo == True).label('vacunas_activas')
+        )
+
+    @staticmethod
+    def bloque_vacunaciones():
+        """Total de vacunaciones aplicadas"""
+        return select(
+            func.count(VacunacionAnimal.idvacunacion).label('vacunaciones_total')
+        )
+
+    @staticmethod
+    def bloque_nacimientos(hacienda_id=None, crias_sin_vacunar=True):
+        """
+        Nacimientos: total, último mes, este año y crías pendientes de vacunación
+        crias_sin_vacunar=False omite el conteo de crías (se lee de la instantánea de alertas)
+        """
+        hoy = date.today()
+
+        columnas = [
+            func.count(Nacimiento.idnacimiento).label('nacimientos_total'),
+            EstadisticasService.contar_si(
+                Nacimiento.fecha_nacimiento >= hoy - timedelta(days=30)
+            ).label('nacimientos_ultimo_mes'),
+            EstadisticasService.contar_si(
+                Nacimiento.fecha_nacimiento >= date(hoy.year, 1, 1)
+            ).label('nacimientos_este_año')
+        ]
+
+        if crias_sin_vacunar:
+            columnas.append(EstadisticasService.contar_si(and_(
+                Nacimiento.vacunas_aplicadas == False,
+                Nacimiento.fecha_nacimiento <= hoy - timedelta(days=90)
+            )).label('nacimientos_crias_sin_vacunar'))
+
+        query = select(*columnas)
+
+        if hacienda_id:
+            query = query.join(
+                Animal, Nacimiento.idanimal_cria == Animal.idanimal
+            ).where(Animal.idhacienda == hacienda_id)
+
+        return query
+
+    # ===============================
+    # TABLEROS
+    # ===============================
+
+    @staticmethod
+    def estadisticas_hacienda(hacienda_id):
+        """Estadísticas de animales, vacunación y nacimientos de una hacienda"""
+        datos = EstadisticasService.ejecutar_bloques(
+            EstadisticasService.bloque_animales(hacienda_id),
+            EstadisticasService.bloque_vacunacion_hacienda(hacienda_id),
+            EstadisticasService.bloque_nacimientos(hacienda_id)
+        )
+
+        # El desglose por estado es un GROUP BY aparte
+        por_estado = db.session.query(
+            Animal.idestado,
+            func.count(Animal.idanimal).label('cantidad')
+        ).filter_by(idhacienda=hacienda_id).group_by(Animal.idestado).all()
+
+        peso_promedio = datos['animales_peso_promedio']
+
+        return {
+            'total_animales': int(datos['animales_total']),
+            'machos': int(datos['animales_machos']),
+            'hembras': int(datos['animales_hembras']),
+            'preñadas': int(datos['animales_preñadas']),
+            'peso_promedio': float(peso_promedio) if peso_promedio else 0,
+            'por_estado': [
+                {'idestado': estado, 'cantidad': cantidad}
+                for estado, cantidad in por_estado
+            ],
+            'vacunacion': {
+                'total_vacunaciones': int(datos['vacunacion_total']),
+                'animales_al_dia': int(datos['vacunacion_animales_al_dia']),
+                'proximas_vacunaciones': int(datos['vacunacion_proximas'])
+            },
+            'nacimientos': {
+                'total_nacimientos': int(datos['nacimientos_total']),
+                'nacimientos_este_año': int(datos['nacimientos_este_año']),
+                'crias_pendientes_vacunacion': int(datos['nacimientos_crias_sin_vacunar'])
+            }
+        }
+
+    @staticmethod
+    def estadisticas_animales_globales():
+        """Totales globales de animales (sin desgloses)"""
+        datos = EstadisticasService.ejecutar_bloques(EstadisticasService.bloque_animales())
+
+        return {
+            'total_animales': int(datos['animales_total']),
+            'machos': int(datos['animales_machos']),
+            'hembras': int(datos['animales_hembras']),
+            'preñadas': int(datos['animales_preñadas'])
+        }
+
+    @staticmethod
+    def estadisticas_generales():
+        """Estadísticas públicas del sistema (/api/stats) en una sola consulta"""
+        datos = EstadisticasService.ejecutar_bloques(
+            EstadisticasService.bloque_usuarios(),
+            EstadisticasService.bloque_roles(),
+            EstadisticasService.bloque_haciendas(),
+            EstadisticasService.bloque_animales(),
+            EstadisticasService.bloque_catalogo_vacunas(),
+            EstadisticasService.bloque_vacunaciones(),
+            EstadisticasService.bloque_nacimientos(crias_sin_vacunar=False)
+        )
+        alertas = AlertasService.totales()
+
+        return {
+            'usuarios': {
+                'total': int(datos['usuarios_total']),
+                'activos': int(datos['usuarios_activos']),
+                'inactivos': int(datos['usuarios_inactivos'])
+            },
+            'roles': {
+                'total': int(datos['roles_total']),
+                'activos': int(datos['roles_activos'])
+            },
+            'haciendas': {
+                'total': int(datos['haciendas_total']),
+                'activas': int(datos['haciendas_activas']),
+                'inactivas': int(datos['haciendas_inactivas'])
+            },
+            'animales': {
+                'total': int(datos['animales_total']),
+                'machos': int(datos['animales_machos']),
+                'hembras': int(datos['animales_hembras']),
+                'preñadas': int(datos['animales_preñadas'])
+            },
+            'vacunacion': {
+                'total_vacunas': int(datos['vacunas_total']),
+                'vacunas_activas': int(datos['vacunas_activas']),
+                'total_vacunaciones': int(datos['vacunaciones_total'])
+            },
+            'nacimientos': {
+                'total_nacimientos': int(datos['nacimientos_total']),
+                'nacimientos_ultimo_mes': int(datos['nacimientos_ultimo_mes']),
+                'crias_sin_vacunar': alertas['crias_sin_vacunar'],
+                'nacimientos_este_año': int(datos['nacimientos_este_año'])
+            },
+            'timestamp': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def estadisticas_salud():
+        """Conteos del health check (/api/health) en una sola consulta"""
+        datos = EstadisticasService.ejecutar_bloques(
+            EstadisticasService.bloque_usuarios(),
+            EstadisticasService.bloque_roles(),
+            EstadisticasService.bloque_haciendas(),
+            EstadisticasService.bloque_animales(),
+            EstadisticasService.bloque_animales_activos(),
+            EstadisticasService.bloque_estados(),
+            EstadisticasService.bloque_catalogo_vacunas(),
+            EstadisticasService.bloque_vacunaciones(),
+            EstadisticasService.bloque_nacimientos(crias_sin_vacunar=False)
+        )
+        alertas = AlertasService.totales()
+
+        return {
+            'connected': True,
+            'usuarios_total': int(datos['usuarios_total']),
+            'usuarios_activos': int(datos['usuarios_activos']),
+            'roles': int(datos['roles_total']),
+            'haciendas_total': int(datos['haciendas_total']),
+            'haciendas_activas': int(datos['haciendas_activas']),
+            'animales_total': int(datos['animales_total']),
+            'animales_activos': int(datos['animales_activos']),
+            'estados_animal': int(datos['estados_total']),
+            'vacunas_total': int(datos['vacunas_total']),
+            'vacunas_activas': int(datos['vacunas_activas']),
+            'vacunaciones_total': int(datos['vacunaciones_total']),
+            'nacimientos_total': int(datos['nacimientos_total']),
+            'nacimientos_ultimo_mes': int(datos['nacimientos_ultimo_mes']),
+            'crias_pendientes_vacunacion': alertas['crias_sin_vacunar'],
+            'dosis_vencidas': alertas['dosis_vencidas'],
+            'dosis_proximas': alertas['dosis_proximas']
+        }
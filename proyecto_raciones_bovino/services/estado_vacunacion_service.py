@@ -0,0 +1,207 @@
+from models import db, VacunacionAnimal, EstadoVacunacionAnimal
+from services.tareas_pendientes_service import TareasPendientesService
+from sqlalchemy import event, inspect, select, delete, insert, func
+
+class EstadoVacunacionService:
+    """
+    Servicio del estado de vacunación por (animal, vacuna)
+    Cada inserción, modificación o borrado de una vacunación recalcula la fila de su
+    par (animal, vacuna) en la misma transacción del flush; el calendario y las
+    consultas de estado leen esa tabla con un solo rango por animal. Las escrituras
+    en bloque (session.info['vacunacion_masiva']) se saltan ese recálculo por fila y
+    reconstruyen después todos sus pares con recalcular_pares.
+    """
+
+    # Campos de la vacunación que cambian la última aplicación de su par
+    CAMPOS = ('idanimal', 'idvacuna', 'fecha_aplicacion', 'proxima_dosis')
+
+    _eventos_registrados = False
+
+    # ===============================
+    # MANTENIMIENTO EN ESCRITURA
+    # ===============================
+
+    @staticmethod
+    def recalcular(connection, idanimal, idvacuna):
+        """Recalcula la fila de un par desde vacunacion_animales (o la borra si ya no hay)"""
+        if idanimal is None or idvacuna is None:
+            return
+
+        tabla = EstadoVacunacionAnimal.__table__
+        filtro = (VacunacionAnimal.idanimal == idanimal, VacunacionAnimal.idvacuna == idvacuna)
+
+        ultima = connection.execute(
+            select(
+                VacunacionAnimal.idvacunacion,
+                VacunacionAnimal.fecha_aplicacion,
+                VacunacionAnimal.proxima_dosis
+            ).where(*filtro).order_by(
+                VacunacionAnimal.fecha_aplicacion.desc(),
+                VacunacionAnimal.idvacunacion.desc()
+            ).limit(1)
+        ).first()
+
+        connection.execute(delete(tabla).where(tabla.c.idanimal == idanimal, tabla.c.idvacuna == idvacuna))
+
+        # La próxima dosis del par es también una tarea pendiente de su hacienda
+        TareasPendientesService.sincronizar_vacuna(
+            connection, idanimal, idvacuna, ultima.proxima_dosis if ultima is not None else None
+        )
+
+        if ultima is None:
+            return
+
+        total = connection.execute(select(func.count(VacunacionAnimal.idvacunacion)).where(*filtro)).scalar()
+        connection.execute(insert(tabla).values(
+            idanimal=idanimal,
+            idvacuna=idvacuna,
+            idvacunacion=ultima.idvacunacion,
+            fecha_ultima_aplicacion=ultima.fecha_aplicacion,
+            proxima_dosis=ultima.proxima_dosis,
+            total_aplicaciones=total
+        ))
+
+    @staticmethod
+    def _ultimas_aplicaciones(*condiciones):
+        """Última aplicación y total de aplicaciones de cada par (funciones de ventana)"""
+        particion = (VacunacionAnimal.idanimal, VacunacionAnimal.idvacuna)
+        numeradas = select(
+            VacunacionAnimal.idanimal,
+            VacunacionAnimal.idvacuna,
+            VacunacionAnimal.idvacunacion,
+            VacunacionAnimal.fecha_aplicacion.label('fecha_ultima_aplicacion'),
+            VacunacionAnimal.proxima_dosis,
+            func.count().over(partition_by=particion).label('total_aplicaciones'),
+            func.row_number().over(
+                partition_by=particion,
+                order_by=(VacunacionAnimal.fecha_aplicacion.desc(), VacunacionAnimal.idvacunacion.desc())
+            ).label('posicion')
+        ).where(*condiciones).subquery()
+
+        return select(
+            numeradas.c.idanimal,
+            numeradas.c.idvacuna,
+            numeradas.c.idvacunacion,
+            numeradas.c.fecha_ultima_aplicacion,
+            numeradas.c.proxima_dosis,
+            numeradas.c.total_aplicaciones
+        ).where(numeradas.c.posicion == 1)
+
+    @staticmethod
+    def recalcular_pares(connection, idanimales, idvacuna):
+        """
+        Recalcula en bloque los pares de una vacuna con varios animales (campañas)
+        Un DELETE y un INSERT ... SELECT para el estado, y lo mismo para sus tareas pendientes
+        """
+        if not idanimales:
+            return
+
+        idanimales = sorted(idanimales)
+        tabla = EstadoVacunacionAnimal.__table__
+
+        connection.execute(delete(tabla).where(tabla.c.idvacuna == idvacuna, tabla.c.idanimal.in_(idanimales)))
+        connection.execute(insert(tabla).from_select(
+            ['idanimal', 'idvacuna', 'idvacunacion', 'fecha_ultima_aplicacion', 'proxima_dosis', 'total_aplicaciones'],
+            EstadoVacunacionService._ultimas_aplicaciones(
+                VacunacionAnimal.idvacuna == idvacuna, VacunacionAnimal.idanimal.in_(idanimales)
+            )
+        ))
+
+        TareasPendientesService.sincronizar_vacunas(connection, idanimales, idvacuna)
+
+    @staticmethod
+    def _pares(objeto):
+        """Pares (animal, vacuna) actual y anterior de una vacunación"""
+        estado = inspect(objeto)
+        actual = (objeto.idanimal, objeto.idvacuna)
+
+        anterior = []
+        for campo in ('idanimal', 'idvacuna'):
+            historial = estado.attrs[campo].history
+            anterior.append(historial.deleted[0] if historial.deleted else getattr(objeto, campo))
+
+        return {actual, tuple(anterior)}
+
+    @staticmethod
+    def _vacunacion_escrita(mapper, connection, objeto):
+        if inspect(objeto).session.info.get('vacunacion_masiva'):
+            return
+        for idanimal, idvacuna in EstadoVacunacionService._pares(objeto):
+            EstadoVacunacionService.recalcular(connection, idanimal, idvacuna)
+
+    @staticmethod
+    def _vacunacion_actualizada(mapper, connection, objeto):
+        estado = inspect(objeto)
+        if not any(estado.attrs[campo].history.has_changes() for campo in EstadoVacunacionService.CAMPOS):
+            return
+        EstadoVacunacionService._vacunacion_escrita(mapper, connection, objeto)
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos que mantienen la tabla de estado sincronizada"""
+        if EstadoVacunacionService._eventos_registrados:
+            return
+
+        # Una vacunación que cambia de animal o de vacuna recalcula también el par anterior
+        for atributo in (VacunacionAnimal.idanimal, VacunacionAnimal.idvacuna):
+            event.listen(atributo, 'set', EstadoVacunacionService._al_asignar, active_history=True)
+
+        event.listen(VacunacionAnimal, 'after_insert', EstadoVacunacionService._vacunacion_escrita)
+        event.listen(VacunacionAnimal, 'after_update', EstadoVacunacionService._vacunacion_actualizada)
+        event.listen(VacunacionAnimal, 'after_delete', EstadoVacunacionService._vacunacion_escrita)
+
+        EstadoVacunacionService._eventos_registrados = True
+
+    # ===============================
+    # RECONCILIACIÓN
+    # ===============================
+
+    @staticmethod
+    def reconciliar():
+        """
+        Reconstruye la tabla completa desde vacunacion_animales
+        Corrige desviaciones por escrituras hechas por fuera del ORM
+        """
+        try:
+            filas = [
+                dict(fila) for fila in db.session.execute(EstadoVacunacionService._ultimas_aplicaciones()).mappings()
+            ]
+
+            db.session.execute(delete(EstadoVacunacionAnimal.__table__))
+            if filas:
+                db.session.execute(insert(EstadoVacunacionAnimal.__table__), filas)
+
+            db.session.commit()
+            return len(filas)
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def reconciliar_si_vacio():
+        """Construye la tabla si está vacía y ya hay vacunaciones (bases de datos existentes)"""
+        if db.session.query(EstadoVacunacionAnimal.idanimal).first() is not None:
+            return 0
+        if db.session.query(VacunacionAnimal.idvacunacion).first() is None:
+            return 0
+        return EstadoVacunacionService.reconciliar()
+
+    # ===============================
+    # LECTURA
+    # ===============================
+
+    @staticmethod
+    def por_animal(idanimal):
+        """Filas de estado de un animal: idvacuna -> EstadoVacunacionAnimal (un rango de la PK)"""
+        filas = EstadoVacunacionAnimal.query.filter(EstadoVacunacionAnimal.idanimal == idanimal).all()
+        return {fila.idvacuna: fila for fila in filas}
+
+    @staticmethod
+    def obtener(idanimal, idvacuna):
+        return db.session.get(EstadoVacunacionAnimal, (idanimal, idvacuna))
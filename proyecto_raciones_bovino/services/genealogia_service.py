@@ -0,0 +1,345 @@
+from models import db, Animal, Nacimiento, GenealogiaCierre
+from flask import current_app
+from sqlalchemy import event, inspect, select, insert, update, delete, union_all, bindparam, func, exists, literal
+from collections import Counter
+
+class GenealogiaService:
+    """
+    Cierre transitivo del pedigrí (genealogia_cierre)
+    Cada nacimiento aporta las aristas madre -> cría y padre -> cría. Al agregar o quitar
+    una arista p -> c se combinan los ancestros de p con los descendientes de c y se suma
+    o resta la cantidad de caminos de cada par, en la misma transacción del flush. La
+    ascendencia o descendencia de un animal hasta N generaciones es un rango de índice.
+    """
+
+    # Tope de generaciones al reconstruir (un ciclo en los datos no la deja terminar)
+    PROFUNDIDAD_MAXIMA = 64
+
+    # Pares por consulta al leer las filas existentes
+    LOTE = 500
+
+    CAMPOS_NACIMIENTO = ('idanimal_cria', 'idanimal_madre', 'idanimal_padre')
+
+    _eventos_registrados = False
+
+    # ===============================
+    # MANTENIMIENTO INCREMENTAL
+    # ===============================
+
+    @staticmethod
+    def _aristas(idcria, idmadre, idpadre):
+        return [(progenitor, idcria) for progenitor in (idmadre, idpadre) if progenitor and idcria]
+
+    @staticmethod
+    def _combinar(connection, progenitor, cria):
+        """Caminos que pasan por la arista progenitor -> cría: {(ancestro, descendiente, profundidad): caminos}"""
+        tabla = GenealogiaCierre.__table__
+
+        ancestros = [(progenitor, 0, 1)] + list(connection.execute(
+            select(tabla.c.idancestro, tabla.c.profundidad, tabla.c.caminos).where(
+                tabla.c.iddescendiente == progenitor
+            )
+        ))
+        descendientes = [(cria, 0, 1)] + list(connection.execute(
+            select(tabla.c.iddescendiente, tabla.c.profundidad, tabla.c.caminos).where(
+                tabla.c.idancestro == cria
+            )
+        ))
+
+        caminos = Counter()
+        for idancestro, profundidad_ancestro, caminos_ancestro in ancestros:
+            for iddescendiente, profundidad_descendiente, caminos_descendiente in descendientes:
+                clave = (idancestro, iddescendiente, profundidad_ancestro + profundidad_descendiente + 1)
+                caminos[clave] += caminos_ancestro * caminos_descendiente
+        return caminos
+
+    @staticmethod
+    def _existentes(connection, claves):
+        """Caminos ya registrados de las claves dadas, leídos por lotes de ancestros y descendientes"""
+        tabla = GenealogiaCierre.__table__
+        ancestros = sorted({clave[0] for clave in claves})
+        descendientes = sorted({clave[1] for clave in claves})
+        existentes = {}
+
+        for inicio in range(0, len(descendientes), GenealogiaService.LOTE):
+            for fila in connection.execute(
+                select(tabla.c.idancestro, tabla.c.iddescendiente, tabla.c.profundidad, tabla.c.caminos).where(
+                    tabla.c.idancestro.in_(ancestros),
+                    tabla.c.iddescendiente.in_(descendientes[inicio:inicio + GenealogiaService.LOTE])
+                )
+            ):
+                clave = (fila.idancestro, fila.iddescendiente, fila.profundidad)
+                if clave in claves:
+                    existentes[clave] = fila.caminos
+
+        return existentes
+
+    @staticmethod
+    def _aplicar(connection, progenitor, cria, signo):
+        """Suma (signo 1) o resta (signo -1) los caminos de una arista"""
+        tabla = GenealogiaCierre.__table__
+        caminos = GenealogiaService._combinar(connection, progenitor, cria)
+        existentes = GenealogiaService._existentes(connection, caminos)
+
+        nuevos, cambios, eliminados = [], [], []
+        for (idancestro, iddescendiente, profundidad), cantidad in caminos.items():
+            clave = {'b_ancestro': idancestro, 'b_descendiente': iddescendiente, 'b_profundidad': profundidad}
+            anterior = existentes.get((idancestro, iddescendiente, profundidad))
+
+            if anterior is None:
+                if signo > 0:
+                    nuevos.append({
+                        'idancestro': idancestro,
+                        'iddescendiente': iddescendiente,
+                        'profundidad': profundidad,
+                        'caminos': cantidad
+                    })
+            elif anterior + signo * cantidad > 0:
+                cambios.append({**clave, 'b_caminos': anterior + signo * cantidad})
+            else:
+                eliminados.append(clave)
+
+        por_clave = (
+            tabla.c.idancestro == bindparam('b_ancestro'),
+            tabla.c.iddescendiente == bindparam('b_descendiente'),
+            tabla.c.profundidad == bindparam('b_profundidad')
+        )
+        if nuevos:
+            connection.execute(insert(tabla), nuevos)
+        if cambios:
+            connection.execute(update(tabla).where(*por_clave).values(caminos=bindparam('b_caminos')), cambios)
+        if eliminados:
+            connection.execute(delete(tabla).where(*por_clave), eliminados)
+
+    @staticmethod
+    def _anterior(estado, campo):
+        """Valor del campo antes del flush (el actual si no cambió)"""
+        historial = estado.attrs[campo].history
+        if historial.deleted:
+            return historial.deleted[0]
+        return estado.attrs[campo].value
+
+    @staticmethod
+    def _nacimiento_insertado(mapper, connection, objeto):
+        for progenitor, cria in GenealogiaService._aristas(objeto.idanimal_cria, objeto.idanimal_madre, objeto.idanimal_padre):
+            GenealogiaService._aplicar(connection, progenitor, cria, 1)
+
+    @staticmethod
+    def _nacimiento_actualizado(mapper, connection, objeto):
+        estado = inspect(objeto)
+        if not any(estado.attrs[campo].history.has_changes() for campo in GenealogiaService.CAMPOS_NACIMIENTO):
+            return
+
+        anteriores = GenealogiaService._aristas(*(
+            GenealogiaService._anterior(estado, campo) for campo in GenealogiaService.CAMPOS_NACIMIENTO
+        ))
+        actuales = GenealogiaService._aristas(objeto.idanimal_cria, objeto.idanimal_madre, objeto.idanimal_padre)
+
+        # Primero se quitan las aristas viejas: los caminos que se suman no deben pasar por ellas
+        for progenitor, cria in anteriores:
+            if (progenitor, cria) not in actuales:
+                GenealogiaService._aplicar(connection, progenitor, cria, -1)
+        for progenitor, cria in actuales:
+            if (progenitor, cria) not in anteriores:
+                GenealogiaService._aplicar(connection, progenitor, cria, 1)
+
+    @staticmethod
+    def _nacimiento_eliminado(mapper, connection, objeto):
+        estado = inspect(objeto)
+        for progenitor, cria in GenealogiaService._aristas(*(
+            GenealogiaService._anterior(estado, campo) for campo in GenealogiaService.CAMPOS_NACIMIENTO
+        )):
+            GenealogiaService._aplicar(connection, progenitor, cria, -1)
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos de escritura de nacimientos"""
+        if GenealogiaService._eventos_registrados:
+            return
+
+        for campo in GenealogiaService.CAMPOS_NACIMIENTO:
+            event.listen(getattr(Nacimiento, campo), 'set', GenealogiaService._al_asignar, active_history=True)
+
+        event.listen(Nacimiento, 'after_insert', GenealogiaService._nacimiento_insertado)
+        event.listen(Nacimiento, 'after_update', GenealogiaService._nacimiento_actualizado)
+        event.listen(Nacimiento, 'after_delete', GenealogiaService._nacimiento_eliminado)
+
+        GenealogiaService._eventos_registrados = True
+
+    # ===============================
+    # RECONCILIACIÓN
+    # ===============================
+
+    @staticmethod
+    def _consulta_aristas():
+        return union_all(
+            select(Nacimiento.idanimal_madre.label('progenitor'), Nacimiento.idanimal_cria.label('cria')),
+            select(Nacimiento.idanimal_padre.label('progenitor'), Nacimiento.idanimal_cria.label('cria')).where(
+                Nacimiento.idanimal_padre.isnot(None)
+            )
+        ).subquery('aristas')
+
+    @staticmethod
+    def reconciliar():
+        """
+        Reconstruye el cierre desde los nacimientos, una generación por sentencia
+        (INSERT ... SELECT de la generación anterior unida con las aristas)
+        """
+        try:
+            tabla = GenealogiaCierre.__table__
+            columnas = ['idancestro', 'iddescendiente', 'profundidad', 'caminos']
+            profundidad_maxima = current_app.config.get(
+                'GENEALOGIA_PROFUNDIDAD_MAXIMA', GenealogiaService.PROFUNDIDAD_MAXIMA
+            )
+
+            db.session.execute(delete(tabla))
+
+            aristas = GenealogiaService._consulta_aristas()
+            generacion = db.session.execute(insert(tabla).from_select(columnas, select(
+                aristas.c.progenitor, aristas.c.cria, literal(1), func.count()
+            ).group_by(aristas.c.progenitor, aristas.c.cria)))
+
+            total = generacion.rowcount
+            profundidad = 1
+            while generacion.rowcount and profundidad < profundidad_maxima:
+                aristas = GenealogiaService._consulta_aristas()
+                generacion = db.session.execute(insert(tabla).from_select(columnas, select(
+                    tabla.c.idancestro, aristas.c.cria, literal(profundidad + 1), func.sum(tabla.c.caminos)
+                ).join(
+                    aristas, aristas.c.progenitor == tabla.c.iddescendiente
+                ).where(
+                    tabla.c.profundidad == profundidad
+                ).group_by(tabla.c.idancestro, aristas.c.cria)))
+
+                total += generacion.rowcount
+                profundidad += 1
+
+            if generacion.rowcount:
+                print(f"⚠️ La genealogía supera {profundidad_maxima} generaciones; revise nacimientos con ciclos")
+
+            db.session.commit()
+            return total
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def reconciliar_si_vacio():
+        """Construye el cierre si está vacío y ya hay nacimientos (bases de datos existentes)"""
+        if db.session.query(GenealogiaCierre.idancestro).first() is not None:
+            return 0
+        if db.session.query(Nacimiento.idnacimiento).first() is None:
+            return 0
+        return GenealogiaService.reconciliar()
+
+    # ===============================
+    # VALIDACIÓN
+    # ===============================
+
+    @staticmethod
+    def es_descendiente(idanimal, candidatos):
+        """Alguno de los candidatos desciende del animal (o es el mismo)"""
+        candidatos = [candidato for candidato in candidatos if candidato]
+        if not idanimal or not candidatos:
+            return False
+        if idanimal in candidatos:
+            return True
+
+        return db.session.execute(select(exists().where(
+            GenealogiaCierre.idancestro == idanimal,
+            GenealogiaCierre.iddescendiente.in_(candidatos)
+        ))).scalar()
+
+    @staticmethod
+    def verificar_progenitores(idcria, idmadre, idpadre=None):
+        """Errores de compatibilidad si un progenitor es descendiente de la cría (ciclo en el pedigrí)"""
+        errores = []
+        if GenealogiaService.es_descendiente(idcria, [idmadre]):
+            errores.append('La madre no puede ser descendiente de la cría')
+        if GenealogiaService.es_descendiente(idcria, [idpadre]):
+            errores.append('El padre no puede ser descendiente de la cría')
+        return errores
+
+    # ===============================
+    # CONSULTA
+    # ===============================
+
+    @staticmethod
+    def _listar(animal_id, profundidad, ascendente):
+        """Una consulta sobre un rango de índice: PK para descendencia, ix_genealogia_descendiente para ascendencia"""
+        try:
+            animal = db.session.get(Animal, animal_id)
+            if not animal:
+                return {
+                    'error': 'Animal no encontrado',
+                    'status': 'error',
+                    'code': 'NOT_FOUND'
+                }, 404
+
+            if ascendente:
+                origen, pariente = GenealogiaCierre.iddescendiente, GenealogiaCierre.idancestro
+            else:
+                origen, pariente = GenealogiaCierre.idancestro, GenealogiaCierre.iddescendiente
+
+            consulta = select(
+                pariente.label('idanimal'),
+                GenealogiaCierre.profundidad,
+                GenealogiaCierre.caminos,
+                Animal.hierro,
+                Animal.sexo,
+                Animal.raza,
+                Animal.idhacienda,
+                Animal.fecha_nacimiento
+            ).join(
+                Animal, Animal.idanimal == pariente
+            ).where(origen == animal_id)
+
+            if profundidad:
+                consulta = consulta.where(GenealogiaCierre.profundidad <= profundidad)
+
+            parientes = []
+            generaciones = Counter()
+            for fila in db.session.execute(consulta.order_by(GenealogiaCierre.profundidad, pariente)):
+                generaciones[fila.profundidad] += 1
+                parientes.append({
+                    'idanimal': fila.idanimal,
+                    'hierro': fila.hierro,
+                    'sexo': fila.sexo,
+                    'raza': fila.raza,
+                    'idhacienda': fila.idhacienda,
+                    'fecha_nacimiento': fila.fecha_nacimiento.isoformat() if fila.fecha_nacimiento else None,
+                    'profundidad': fila.profundidad,
+                    'caminos': fila.caminos
+                })
+
+            return {
+                'animal': {'idanimal': animal.idanimal, 'hierro': animal.hierro, 'sexo': animal.sexo},
+                'ancestros' if ascendente else 'descendientes': parientes,
+                'total': len(parientes),
+                'generaciones': {str(nivel): cantidad for nivel, cantidad in sorted(generaciones.items())},
+                'profundidad': profundidad,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al consultar la genealogía: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+
+    @staticmethod
+    def obtener_ancestros(animal_id, profundidad=None):
+        """Ancestros del animal hasta 'profundidad' generaciones (todas si no se indica)"""
+        return GenealogiaService._listar(animal_id, profundidad, ascendente=True)
+
+    @staticmethod
+    def obtener_descendientes(animal_id, profundidad=None):
+        """Descendientes del animal hasta 'profundidad' generaciones (todas si no se indica)"""
+        return GenealogiaService._listar(animal_id, profundidad, ascendente=False)
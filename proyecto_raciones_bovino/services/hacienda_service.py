@@ -1,4 +1,6 @@
-from models import db, Hacienda, Usuario
+from models import db, Hacienda, IndiceBusqueda
+from services.cache_service import CacheService
+from services.auth_service import AuthService
 from datetime import datetime
 import re
 
@@ -81,7 +83,7 @@ class HaciendaService:
         """Crea una nueva hacienda"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear haciendas',
@@ -187,12 +189,9 @@ class HaciendaService:
                 if filtros.get('buscar'):
                     termino = filtros['buscar']
                     query = query.filter(
-                        db.or_(
-                            Hacienda.nombre.ilike(f'%{termino}%'),
-                            Hacienda.propietario.ilike(f'%{termino}%'),
-                            Hacienda.nit.ilike(f'%{termino}%'),
-                            Hacienda.municipio.ilike(f'%{termino}%')
-                        )
+                        Hacienda.idhacienda.in_(IndiceBusqueda.subconsulta_ids(
+                            'hacienda', termino, campos=['nombre', 'propietario', 'nit', 'municipio']
+                        ))
                     )
             
             # Ordenar por nombre
@@ -228,7 +227,7 @@ class HaciendaService:
         """Actualiza una hacienda existente"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden actualizar haciendas',
@@ -299,7 +298,7 @@ class HaciendaService:
         """Activa o desactiva una hacienda"""
         try:
             # Verificar permisos del usuario (solo administradores)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden cambiar el estado de haciendas',
@@ -342,7 +341,7 @@ class HaciendaService:
         """Elimina una hacienda (solo si no tiene datos relacionados)"""
         try:
             # Verificar permisos del usuario (solo administradores)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden eliminar haciendas',
@@ -386,6 +385,7 @@ class HaciendaService:
             }, 500
     
     @staticmethod
+    @CacheService.cacheado('estadisticas_haciendas', tablas=('haciendas', 'animales'))
     def obtener_estadisticas():
         """Obtiene estadísticas de haciendas"""
         try:
@@ -0,0 +1,286 @@
+from models import db, Animal, IndiceBusqueda
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+import re
+import threading
+import time
+
+def distancia_transposicion(a, b, maximo=None):
+    """
+    Distancia de edición que cuenta la transposición de dos caracteres vecinos como un error
+    Si se indica un máximo, corta en cuanto la distancia lo supera (retorna maximo + 1)
+    """
+    if a == b:
+        return 0
+    if maximo is not None and abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+
+    anterior_2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            actual[j] = min(
+                anterior[j] + 1,
+                actual[j - 1] + 1,
+                anterior[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if anterior_2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                actual[j] = min(actual[j], anterior_2[j - 2] + 1)
+        if maximo is not None and min(actual) > maximo:
+            return maximo + 1
+        anterior_2, anterior = anterior, actual
+
+    return anterior[-1]
+
+def variantes_borrado(clave, distancia):
+    """Cadenas que resultan de borrar hasta `distancia` caracteres -> número mínimo de borrados"""
+    variantes = {clave: 0}
+    frontera = {clave}
+    for borrados in range(1, distancia + 1):
+        siguiente = set()
+        for texto in frontera:
+            if len(texto) > 1:
+                for i in range(len(texto)):
+                    variante = texto[:i] + texto[i + 1:]
+                    if variante not in variantes:
+                        variantes[variante] = borrados
+                        siguiente.add(variante)
+        frontera = siguiente
+    return variantes
+
+class IndiceBorrados:
+    """
+    Índice de vecindad por borrados (symmetric delete)
+
+    Dos claves a distancia de edición <= k comparten al menos una variante
+    obtenida borrando hasta k caracteres de cada una, así que la consulta
+    solo genera las variantes del hierro buscado y las busca en un diccionario.
+    """
+
+    def __init__(self, distancia_maxima):
+        self.distancia_maxima = distancia_maxima
+        self.variantes = {}  # variante -> {clave: borrados}
+        self.animales = {}   # clave -> {idanimal: hierro}
+
+    def insertar(self, clave, idanimal, hierro):
+        """Agrega un hierro al índice"""
+        if clave not in self.animales:
+            self.animales[clave] = {}
+            for variante, borrados in variantes_borrado(clave, self.distancia_maxima).items():
+                self.variantes.setdefault(variante, {})[clave] = borrados
+        self.animales[clave][idanimal] = hierro
+
+    def quitar(self, clave, idanimal):
+        """Quita un animal; si la clave queda sin animales se eliminan sus variantes"""
+        animales = self.animales.get(clave)
+        if animales is None:
+            return
+        animales.pop(idanimal, None)
+        if animales:
+            return
+
+        del self.animales[clave]
+        for variante in variantes_borrado(clave, self.distancia_maxima):
+            claves = self.variantes.get(variante)
+            if claves is not None:
+                claves.pop(clave, None)
+                if not claves:
+                    del self.variantes[variante]
+
+    def candidatas(self, clave, distancia):
+        """Claves que pueden estar a distancia <= distancia (deben verificarse)"""
+        resultado = set()
+        for variante in variantes_borrado(clave, distancia):
+            for candidata, borrados in self.variantes.get(variante, {}).items():
+                if borrados <= distancia and abs(len(candidata) - len(clave)) <= distancia:
+                    resultado.add(candidata)
+        return resultado
+
+    def animales_de(self, clave):
+        """Animales que usan una clave"""
+        return dict(self.animales.get(clave, {}))
+
+class HierroService:
+    """
+    Servicio de búsqueda aproximada de hierros
+    Mantiene un índice por hacienda, construido bajo demanda y actualizado al confirmar cambios
+    """
+
+    # Máxima distancia de edición soportada por el índice
+    DISTANCIA_MAXIMA = 2
+
+    # Segundos tras los cuales un índice se reconstruye (cambios hechos por otros procesos)
+    EDAD_MAXIMA_INDICE = 600
+
+    _indices = {}
+    _lock = threading.Lock()
+    _eventos_registrados = False
+
+    @staticmethod
+    def clave_hierro(hierro):
+        """Clave de comparación: sin tildes, minúsculas y sin separadores"""
+        normalizado = IndiceBusqueda.normalizar(hierro)
+        compacto = re.sub(r'[^a-z0-9]+', '', normalizado)
+        return compacto or normalizado
+
+    # ===============================
+    # CONSTRUCCIÓN Y CONSULTA
+    # ===============================
+
+    @staticmethod
+    def _construir_indice(hacienda_id):
+        """Construye el índice de una hacienda desde la base de datos"""
+        indice = IndiceBorrados(HierroService.DISTANCIA_MAXIMA)
+        filas = db.session.execute(
+            select(Animal.idanimal, Animal.hierro).where(Animal.idhacienda == hacienda_id)
+        ).all()
+        for idanimal, hierro in filas:
+            indice.insertar(HierroService.clave_hierro(hierro), idanimal, hierro)
+        return indice
+
+    @staticmethod
+    def _obtener_indice(hacienda_id):
+        """Obtiene el índice de la hacienda, construyéndolo si no existe o si está vencido"""
+        with HierroService._lock:
+            entrada = HierroService._indices.get(hacienda_id)
+
+        if entrada and time.monotonic() - entrada[1] <= HierroService.EDAD_MAXIMA_INDICE:
+            return entrada[0]
+
+        indice = HierroService._construir_indice(hacienda_id)
+        with HierroService._lock:
+            HierroService._indices[hacienda_id] = (indice, time.monotonic())
+        return indice
+
+    @staticmethod
+    def buscar_similares(hacienda_id, hierro, max_distancia=2, limite=10):
+        """
+        Busca los hierros más parecidos en una hacienda
+        Retorna lista de dicts {idanimal, hierro, distancia} ordenada por distancia
+        """
+        clave = HierroService.clave_hierro(hierro)
+        if not clave:
+            return []
+
+        max_distancia = max(0, min(max_distancia, HierroService.DISTANCIA_MAXIMA))
+        indice = HierroService._obtener_indice(hacienda_id)
+
+        # Buscar por anillos de distancia creciente; al completar el límite no hace
+        # falta verificar los candidatos más lejanos
+        resultados = []
+        verificadas = set()
+        for distancia in range(max_distancia + 1):
+            with HierroService._lock:
+                candidatas = indice.candidatas(clave, distancia) - verificadas
+                animales_por_clave = {c: indice.animales_de(c) for c in candidatas}
+
+            for candidata, animales in animales_por_clave.items():
+                if distancia_transposicion(clave, candidata, distancia) <= distancia:
+                    verificadas.add(candidata)
+                    for idanimal, hierro_animal in animales.items():
+                        resultados.append({
+                            'idanimal': idanimal,
+                            'hierro': hierro_animal,
+                            'distancia': distancia
+                        })
+
+            if len(resultados) >= limite:
+                break
+
+        resultados.sort(key=lambda r: (r['distancia'], r['hierro']))
+        return resultados[:limite]
+
+    # ===============================
+    # MANTENIMIENTO INCREMENTAL
+    # ===============================
+
+    @staticmethod
+    def _registrar_cambio(objeto, operacion):
+        """Guarda un cambio pendiente en la sesión; se aplica al confirmar la transacción"""
+        sesion = object_session(objeto)
+        if sesion is not None:
+            sesion.info.setdefault('hierros_pendientes', []).append(operacion)
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def _al_insertar(mapper, connection, objeto):
+        HierroService._registrar_cambio(
+            objeto, ('agregar', objeto.idhacienda, objeto.idanimal, objeto.hierro)
+        )
+
+    @staticmethod
+    def _al_actualizar(mapper, connection, objeto):
+        estado = inspect(objeto)
+        historial_hierro = estado.attrs.hierro.history
+        historial_hacienda = estado.attrs.idhacienda.history
+        if not historial_hierro.has_changes() and not historial_hacienda.has_changes():
+            return
+
+        hierro_anterior = historial_hierro.deleted[0] if historial_hierro.deleted else objeto.hierro
+        hacienda_anterior = historial_hacienda.deleted[0] if historial_hacienda.deleted else objeto.idhacienda
+
+        HierroService._registrar_cambio(
+            objeto, ('quitar', hacienda_anterior, objeto.idanimal, hierro_anterior)
+        )
+        HierroService._registrar_cambio(
+            objeto, ('agregar', objeto.idhacienda, objeto.idanimal, objeto.hierro)
+        )
+
+    @staticmethod
+    def _al_eliminar(mapper, connection, objeto):
+        HierroService._registrar_cambio(
+            objeto, ('quitar', objeto.idhacienda, objeto.idanimal, objeto.hierro)
+        )
+
+    @staticmethod
+    def _al_confirmar(sesion):
+        """Aplica los cambios confirmados a los índices ya construidos"""
+        operaciones = sesion.info.pop('hierros_pendientes', None)
+        if not operaciones:
+            return
+
+        with HierroService._lock:
+            for operacion, hacienda_id, idanimal, hierro in operaciones:
+                entrada = HierroService._indices.get(hacienda_id)
+                if not entrada or not hierro:
+                    continue
+                indice = entrada[0]
+                if operacion == 'agregar':
+                    indice.insertar(HierroService.clave_hierro(hierro), idanimal, hierro)
+                else:
+                    indice.quitar(HierroService.clave_hierro(hierro), idanimal)
+
+    @staticmethod
+    def _al_revertir(sesion):
+        """Descarta los cambios de una transacción revertida"""
+        sesion.info.pop('hierros_pendientes', None)
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos que mantienen los índices sincronizados"""
+        if HierroService._eventos_registrados:
+            return
+
+        # Cargar el valor anterior al asignar, aunque el atributo esté expirado,
+        # para poder quitar la clave vieja del índice
+        for atributo in (Animal.hierro, Animal.idhacienda):
+            event.listen(atributo, 'set', HierroService._al_asignar, active_history=True)
+
+        event.listen(Animal, 'after_insert', HierroService._al_insertar)
+        event.listen(Animal, 'after_update', HierroService._al_actualizar)
+        event.listen(Animal, 'after_delete', HierroService._al_eliminar)
+        event.listen(Session, 'after_commit', HierroService._al_confirmar)
+        event.listen(Session, 'after_rollback', HierroService._al_revertir)
+
+        HierroService._eventos_registrados = True
+
+    @staticmethod
+    def limpiar():
+        """Descarta todos los índices (se reconstruyen en la siguiente consulta)"""
+        with HierroService._lock:
+            HierroService._indices.clear()
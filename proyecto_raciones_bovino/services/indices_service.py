@@ -0,0 +1,164 @@
+from models import db, Animal, Nacimiento, VacunacionAnimal, EstadoVacunacionAnimal, RacionLactancia, TareaPendiente, LoteVacuna, GenealogiaCierre
+from sqlalchemy import select, func
+from datetime import date, timedelta
+
+class IndicesService:
+    """
+    Servicio de verificación de índices
+    Ejecuta EXPLAIN sobre las consultas frecuentes y comprueba que usen el índice esperado
+    """
+
+    @staticmethod
+    def consultas_frecuentes():
+        """Lista de (nombre, índice esperado, consulta) de los caminos de acceso críticos"""
+        hoy = date.today()
+
+        return [
+            (
+                'vacunacion.proximas_dosis',
+                'ix_vacunacion_proxima_dosis',
+                select(VacunacionAnimal.idvacunacion).where(
+                    VacunacionAnimal.proxima_dosis.isnot(None),
+                    VacunacionAnimal.proxima_dosis <= hoy + timedelta(days=30)
+                ).order_by(VacunacionAnimal.proxima_dosis)
+            ),
+            (
+                'vacunacion.ultima_dosis',
+                'ix_vacunacion_animal_vacuna_fecha',
+                select(func.max(VacunacionAnimal.fecha_aplicacion)).where(
+                    VacunacionAnimal.idanimal == 1,
+                    VacunacionAnimal.idvacuna == 1
+                )
+            ),
+            (
+                'vacunacion.calendario',
+                'ix_estado_vacunacion_proxima_dosis',
+                select(EstadoVacunacionAnimal.idanimal).where(
+                    EstadoVacunacionAnimal.proxima_dosis <= hoy + timedelta(days=7)
+                ).order_by(EstadoVacunacionAnimal.proxima_dosis)
+            ),
+            (
+                'nacimientos.recientes',
+                'ix_nacimientos_fecha',
+                select(Nacimiento.idnacimiento).where(
+                    Nacimiento.fecha_nacimiento >= hoy - timedelta(days=30)
+                ).order_by(Nacimiento.fecha_nacimiento.desc())
+            ),
+            (
+                'nacimientos.por_madre',
+                'ix_nacimientos_madre_fecha',
+                select(Nacimiento.idnacimiento).where(
+                    Nacimiento.idanimal_madre == 1
+                ).order_by(Nacimiento.fecha_nacimiento.desc())
+            ),
+            (
+                'nacimientos.por_padre',
+                'ix_nacimientos_padre_fecha',
+                select(Nacimiento.idnacimiento).where(
+                    Nacimiento.idanimal_padre == 1
+                ).order_by(Nacimiento.fecha_nacimiento.desc())
+            ),
+            (
+                'animales.filtro_hacienda',
+                'ix_animales_hacienda_estado_sexo',
+                select(Animal.idanimal).where(
+                    Animal.idhacienda == 1,
+                    Animal.idestado == 1,
+                    Animal.sexo == 'Hembra',
+                    Animal.preñada == True
+                )
+            ),
+            (
+                'tareas.por_hacienda',
+                'ix_tareas_pendientes_hacienda_fecha',
+                select(TareaPendiente.idanimal).where(
+                    TareaPendiente.idhacienda == 1,
+                    TareaPendiente.fecha_vencimiento <= hoy + timedelta(days=7)
+                ).order_by(TareaPendiente.fecha_vencimiento, TareaPendiente.prioridad)
+            ),
+            (
+                'inventario.lotes_fefo',
+                'ix_lotes_vacuna_hacienda_vacuna_vencimiento',
+                select(LoteVacuna.idlote).where(
+                    LoteVacuna.idhacienda == 1,
+                    LoteVacuna.idvacuna == 1,
+                    LoteVacuna.fecha_vencimiento >= hoy
+                )
+            ),
+            (
+                'genealogia.ancestros',
+                'ix_genealogia_descendiente',
+                select(GenealogiaCierre.idancestro).where(
+                    GenealogiaCierre.iddescendiente == 1,
+                    GenealogiaCierre.profundidad <= 3
+                )
+            ),
+            (
+                'genealogia.descendientes',
+                'PRIMARY',
+                select(GenealogiaCierre.iddescendiente).where(
+                    GenealogiaCierre.idancestro == 1,
+                    GenealogiaCierre.profundidad <= 3
+                )
+            ),
+            (
+                'raciones_lactancia.historial',
+                'ix_raciones_lactancia_animal_fecha',
+                select(RacionLactancia.idracion_lactancia).where(
+                    RacionLactancia.idanimal == 1
+                ).order_by(RacionLactancia.fecha_calculo.desc())
+            )
+        ]
+
+    @staticmethod
+    def explicar(consulta):
+        """Ejecuta EXPLAIN de una consulta y retorna las filas del plan como texto"""
+        conexion = db.session.connection()
+        dialecto = conexion.dialect
+        compilada = consulta.compile(dialect=dialecto)
+
+        prefijo = 'EXPLAIN QUERY PLAN ' if dialecto.name == 'sqlite' else 'EXPLAIN '
+        if compilada.positional:
+            parametros = tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+        else:
+            parametros = compilada.params
+
+        filas = conexion.exec_driver_sql(prefijo + str(compilada), parametros).all()
+        return [' | '.join(str(valor) for valor in fila) for fila in filas]
+
+    @staticmethod
+    def nombres_indice(indice, consulta, dialecto):
+        """
+        Nombres con los que el plan puede mostrar el índice: 'PRIMARY' es el nombre de
+        la clave primaria en MySQL; SQLite la muestra como sqlite_autoindex_<tabla>_N
+        """
+        if indice != 'PRIMARY' or dialecto != 'sqlite':
+            return [indice]
+        return ['PRIMARY KEY'] + [f'sqlite_autoindex_{tabla.name}_' for tabla in consulta.get_final_froms()]
+
+    @staticmethod
+    def verificar_planes():
+        """Verifica que cada consulta frecuente use su índice"""
+        resultados = []
+        dialecto = db.session.get_bind().dialect.name
+
+        for nombre, indice, consulta in IndicesService.consultas_frecuentes():
+            try:
+                plan = IndicesService.explicar(consulta)
+                nombres = IndicesService.nombres_indice(indice, consulta, dialecto)
+                resultados.append({
+                    'consulta': nombre,
+                    'indice_esperado': indice,
+                    'usa_indice': any(nombre_indice in fila for fila in plan for nombre_indice in nombres),
+                    'plan': plan
+                })
+            except Exception as e:
+                resultados.append({
+                    'consulta': nombre,
+                    'indice_esperado': indice,
+                    'usa_indice': False,
+                    'plan': [],
+                    'error': str(e)
+                })
+
+        return resultados
@@ -1,5 +1,7 @@
 # services/ingredientes_service.py
-from models import db, Departamento, Municipio, ConsultaBromatologica, Ingrediente, CaracteristicaNutricional, Usuario
+from models import db, Departamento, Municipio, ConsultaBromatologica, Ingrediente, CaracteristicaNutricional
+from services.cache_service import CacheService
+from services.auth_service import AuthService
 from datetime import datetime, date
 import re
 
@@ -62,7 +64,7 @@ class IngredientesService:
         """Crea un nuevo municipio"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear municipios',
@@ -129,7 +131,7 @@ class IngredientesService:
         """Crea una nueva consulta bromatológica"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear consultas',
@@ -241,7 +243,7 @@ class IngredientesService:
         """Crea un nuevo ingrediente"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear ingredientes',
@@ -377,7 +379,7 @@ class IngredientesService:
         """Actualiza un ingrediente existente"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden actualizar ingredientes',
@@ -441,7 +443,7 @@ class IngredientesService:
         """Crea una nueva característica nutricional"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear análisis',
@@ -625,6 +627,7 @@ class IngredientesService:
         return errores
     
     @staticmethod
+    @CacheService.cacheado('estadisticas_ingredientes', tablas=('ingredientes', 'caracteristicas_nutricionales'))
     def obtener_estadisticas_ingredientes():
         """Obtiene estadísticas generales de ingredientes"""
         try:
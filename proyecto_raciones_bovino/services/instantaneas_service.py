@@ -0,0 +1,109 @@
+from models import db
+from datetime import datetime
+import threading
+import time
+
+class InstantaneasService:
+    """
+    Instantáneas de consultas costosas (health check, estadísticas públicas)
+    Una tarea periódica las refresca en segundo plano; las peticiones solo leen la última
+    copia junto con su antigüedad.
+    """
+
+    _instantaneas = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def registrar(nombre, funcion):
+        """Registra la función que genera una instantánea"""
+        with InstantaneasService._lock:
+            InstantaneasService._instantaneas.setdefault(nombre, {
+                'funcion': funcion,
+                'datos': None,
+                'generado_en': None,
+                'generado_monotonic': None,
+                'duracion': None,
+                'error': None,
+                'generacion': 0,
+                'lock': threading.Lock()
+            })
+
+    @staticmethod
+    def refrescar(nombre, esperar=True):
+        """
+        Regenera una instantánea
+        Si otro hilo ya la está regenerando y esperar es False, no hace nada.
+        """
+        instantanea = InstantaneasService._instantaneas[nombre]
+        generacion = instantanea['generacion']
+
+        if not instantanea['lock'].acquire(blocking=esperar):
+            return False
+
+        try:
+            # Otro hilo la regeneró mientras se esperaba el lock
+            if instantanea['generacion'] != generacion:
+                return True
+
+            inicio = time.monotonic()
+            try:
+                datos = instantanea['funcion']()
+            except Exception as e:
+                db.session.rollback()
+                instantanea['error'] = str(e)
+                raise
+
+            instantanea['datos'] = datos
+            instantanea['generado_en'] = datetime.now()
+            instantanea['generado_monotonic'] = time.monotonic()
+            instantanea['duracion'] = instantanea['generado_monotonic'] - inicio
+            instantanea['error'] = None
+            instantanea['generacion'] += 1
+            return True
+
+        finally:
+            instantanea['lock'].release()
+
+    @staticmethod
+    def refrescar_todas():
+        """Regenera todas las instantáneas registradas (tarea periódica)"""
+        errores = []
+        for nombre in list(InstantaneasService._instantaneas.keys()):
+            try:
+                InstantaneasService.refrescar(nombre, esperar=False)
+            except Exception as e:
+                errores.append(f'{nombre}: {e}')
+
+        if errores:
+            raise RuntimeError('; '.join(errores))
+
+    @staticmethod
+    def obtener(nombre, intervalo_segundos, edad_maxima_segundos):
+        """
+        Retorna (datos, metadatos) de una instantánea
+
+        Si no existe o supera la edad máxima (por ejemplo, sin la tarea periódica
+        corriendo) se regenera en la petición; mientras otro hilo la regenera se
+        sirve la copia anterior.
+        """
+        instantanea = InstantaneasService._instantaneas[nombre]
+
+        if instantanea['datos'] is None:
+            InstantaneasService.refrescar(nombre)
+        elif time.monotonic() - instantanea['generado_monotonic'] > edad_maxima_segundos:
+            try:
+                InstantaneasService.refrescar(nombre, esperar=False)
+            except Exception:
+                # Se sirve la copia anterior; el error queda en los metadatos
+                pass
+
+        edad = time.monotonic() - instantanea['generado_monotonic']
+
+        return instantanea['datos'], {
+            'generado_en': instantanea['generado_en'].isoformat(),
+            'edad_segundos': round(edad, 1),
+            'intervalo_refresco_segundos': intervalo_segundos,
+            # Más de dos intervalos sin refrescar: la tarea periódica se atrasó o falló
+            'desactualizado': edad > 2 * intervalo_segundos,
+            'ultimo_error': instantanea['error']
+        }
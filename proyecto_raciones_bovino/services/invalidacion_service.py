@@ -0,0 +1,214 @@
+from models import Animal, Nacimiento, VacunacionAnimal
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+class InvalidacionService:
+    """
+    Bus de invalidación basado en los eventos de la sesión
+    En cada flush recoge las tablas escritas y las haciendas y animales afectados
+    (valores actuales y anteriores); al confirmar la transacción publica el lote
+    acumulado a los suscriptores. Un rollback descarta el lote sin publicar nada.
+
+    Los suscriptores reciben un dict de cambios:
+        tablas           tablas escritas
+        haciendas        tabla -> ids de hacienda afectados
+        tablas_globales  tablas con escrituras sin hacienda conocida (invalidar completo)
+        animales         ids de animal afectados
+        etiquetas        'tabla', 'tabla:hacienda=N', 'hacienda=N', 'animal=N'
+    """
+
+    # Atributos que relacionan cada registro con un animal (la hacienda se hereda de él)
+    ATRIBUTOS_ANIMAL = ('idanimal_cria', 'idanimal')
+
+    _suscriptores_flush = []
+    _suscriptores_confirmacion = []
+    _eventos_registrados = False
+
+    # ===============================
+    # SUSCRIPCIÓN
+    # ===============================
+
+    @staticmethod
+    def suscribir(funcion, al_confirmar=True):
+        """
+        Suscribe una función a los cambios
+        al_confirmar=True: funcion(cambios) tras el commit, con el lote de toda la transacción
+        al_confirmar=False: funcion(session, cambios) en cada flush, dentro de la transacción
+        """
+        suscriptores = (
+            InvalidacionService._suscriptores_confirmacion if al_confirmar
+            else InvalidacionService._suscriptores_flush
+        )
+        if funcion not in suscriptores:
+            suscriptores.append(funcion)
+
+    # ===============================
+    # RECOLECCIÓN DE CAMBIOS
+    # ===============================
+
+    @staticmethod
+    def cambios_vacios():
+        return {
+            'tablas': set(),
+            'haciendas': {},
+            'tablas_globales': set(),
+            'animales': set(),
+            'etiquetas': set()
+        }
+
+    @staticmethod
+    def _valores(estado, atributo):
+        """Valores actual y anterior de un atributo, sin disparar cargas"""
+        historial = estado.attrs[atributo].history
+        valores = set(historial.added or ()) | set(historial.unchanged or ()) | set(historial.deleted or ())
+        return {valor for valor in valores if valor is not None}
+
+    @staticmethod
+    def _recolectar(session):
+        """Cambios del flush en curso (new/dirty/deleted aún reflejan el estado previo)"""
+        cambios = InvalidacionService.cambios_vacios()
+        modificados = [objeto for objeto in session.dirty if session.is_modified(objeto, include_collections=False)]
+
+        # tabla -> ids de animal cuya hacienda hay que resolver
+        pendientes = {}
+        haciendas_de_animal = {}
+
+        for objeto in list(session.new) + list(session.deleted) + modificados:
+            tabla_modelo = getattr(objeto, '__table__', None)
+            if tabla_modelo is None:
+                continue
+
+            tabla = tabla_modelo.name
+            estado = inspect(objeto)
+            atributos = estado.mapper.attrs.keys()
+            cambios['tablas'].add(tabla)
+
+            if 'idhacienda' in atributos:
+                haciendas = InvalidacionService._valores(estado, 'idhacienda')
+                if haciendas:
+                    cambios['haciendas'].setdefault(tabla, set()).update(haciendas)
+                else:
+                    cambios['tablas_globales'].add(tabla)
+
+                if isinstance(objeto, Animal):
+                    cambios['animales'].update(InvalidacionService._valores(estado, 'idanimal'))
+                    for idanimal in InvalidacionService._valores(estado, 'idanimal'):
+                        haciendas_de_animal.setdefault(idanimal, set()).update(haciendas)
+                continue
+
+            atributo_animal = next((a for a in InvalidacionService.ATRIBUTOS_ANIMAL if a in atributos), None)
+            if atributo_animal is None:
+                cambios['tablas_globales'].add(tabla)
+                continue
+
+            animales = InvalidacionService._valores(estado, atributo_animal)
+            cambios['animales'].update(animales)
+            if animales:
+                pendientes.setdefault(tabla, set()).update(animales)
+            else:
+                cambios['tablas_globales'].add(tabla)
+
+        # Resolver la hacienda de los animales que no venían en el flush, en una consulta
+        faltantes = set().union(*pendientes.values()) - set(haciendas_de_animal) if pendientes else set()
+        if faltantes:
+            filas = session.connection().execute(
+                select(Animal.idanimal, Animal.idhacienda).where(Animal.idanimal.in_(faltantes))
+            ).all()
+            for idanimal, idhacienda in filas:
+                haciendas_de_animal.setdefault(idanimal, set()).add(idhacienda)
+
+        for tabla, animales in pendientes.items():
+            for idanimal in animales:
+                haciendas = haciendas_de_animal.get(idanimal)
+                if haciendas:
+                    cambios['haciendas'].setdefault(tabla, set()).update(haciendas)
+                else:
+                    # Animal ya borrado: no se sabe a qué hacienda pertenecía
+                    cambios['tablas_globales'].add(tabla)
+
+        InvalidacionService._etiquetar(cambios)
+        return cambios
+
+    @staticmethod
+    def _etiquetar(cambios):
+        etiquetas = cambios['etiquetas']
+        etiquetas.update(cambios['tablas'])
+        for tabla, haciendas in cambios['haciendas'].items():
+            for idhacienda in haciendas:
+                etiquetas.add(f'{tabla}:hacienda={idhacienda}')
+                etiquetas.add(f'hacienda={idhacienda}')
+        etiquetas.update(f'animal={idanimal}' for idanimal in cambios['animales'])
+
+    @staticmethod
+    def _acumular(destino, cambios):
+        destino['tablas'] |= cambios['tablas']
+        destino['tablas_globales'] |= cambios['tablas_globales']
+        destino['animales'] |= cambios['animales']
+        destino['etiquetas'] |= cambios['etiquetas']
+        for tabla, haciendas in cambios['haciendas'].items():
+            destino['haciendas'].setdefault(tabla, set()).update(haciendas)
+
+    # ===============================
+    # EVENTOS DE LA SESIÓN
+    # ===============================
+
+    @staticmethod
+    def _al_hacer_flush(session, contexto):
+        cambios = InvalidacionService._recolectar(session)
+        if not cambios['tablas']:
+            return
+
+        for funcion in InvalidacionService._suscriptores_flush:
+            funcion(session, cambios)
+
+        pendientes = session.info.setdefault('invalidaciones_pendientes', InvalidacionService.cambios_vacios())
+        InvalidacionService._acumular(pendientes, cambios)
+
+    @staticmethod
+    def _al_confirmar(session):
+        cambios = session.info.pop('invalidaciones_pendientes', None)
+        if not cambios:
+            return
+
+        # Sesión unida a una transacción externa (p. ej. /api/batch atómico): su commit
+        # solo libera un savepoint, así que el lote espera al commit real
+        if session.info.get('diferir_publicacion'):
+            diferidas = session.info.setdefault('invalidaciones_diferidas', InvalidacionService.cambios_vacios())
+            InvalidacionService._acumular(diferidas, cambios)
+            return
+
+        InvalidacionService.publicar(cambios)
+
+    @staticmethod
+    def publicar(cambios):
+        """Entrega un lote de cambios ya confirmados a los suscriptores"""
+        for funcion in InvalidacionService._suscriptores_confirmacion:
+            try:
+                funcion(cambios)
+            except Exception as e:
+                print(f"❌ Error publicando invalidaciones en {funcion.__qualname__}: {e}")
+
+    @staticmethod
+    def _al_revertir(session):
+        session.info.pop('invalidaciones_pendientes', None)
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos de la sesión que alimentan el bus"""
+        if InvalidacionService._eventos_registrados:
+            return
+
+        # Un registro que cambia de hacienda o de animal invalida también el anterior
+        for atributo in (Animal.idhacienda, Nacimiento.idanimal_cria, VacunacionAnimal.idanimal):
+            event.listen(atributo, 'set', InvalidacionService._al_asignar, active_history=True)
+
+        event.listen(Session, 'after_flush', InvalidacionService._al_hacer_flush)
+        event.listen(Session, 'after_commit', InvalidacionService._al_confirmar)
+        event.listen(Session, 'after_rollback', InvalidacionService._al_revertir)
+
+        InvalidacionService._eventos_registrados = True
@@ -0,0 +1,311 @@
+from models import db, Hacienda, CatalogoVacuna, LoteVacuna
+from services.referencias_service import ReferenciasService
+from services.auth_service import AuthService
+from flask import current_app
+from sqlalchemy import select, update, exists, case, func
+from datetime import datetime, date, timedelta
+import heapq
+
+class StockInsuficiente(Exception):
+    """No hay dosis vigentes suficientes en los lotes de la hacienda"""
+
+    def __init__(self, disponibles, solicitadas):
+        super().__init__(f'Stock insuficiente: {disponibles} dosis disponibles de {solicitadas} solicitadas')
+        self.disponibles = disponibles
+        self.solicitadas = solicitadas
+
+class InventarioVacunasService:
+    """
+    Inventario de lotes de vacuna por hacienda
+    Las dosis se asignan primero del lote que vence antes (FEFO). Los lotes candidatos
+    se leen con bloqueo de fila (SELECT ... FOR UPDATE) y el descuento de todos los
+    lotes tocados es un solo UPDATE, dentro de la transacción de la vacunación.
+    """
+
+    STOCK_MINIMO = 20           # Dosis vigentes por hacienda y vacuna
+    DIAS_ALERTA_VENCIMIENTO = 30
+
+    # ===============================
+    # ASIGNACIÓN FEFO
+    # ===============================
+
+    @staticmethod
+    def usa_inventario(idhacienda, idvacuna):
+        """La hacienda lleva inventario de esa vacuna (tiene al menos un lote registrado)"""
+        return db.session.execute(
+            select(exists().where(LoteVacuna.idhacienda == idhacienda, LoteVacuna.idvacuna == idvacuna))
+        ).scalar()
+
+    @staticmethod
+    def asignar(idhacienda, idvacuna, cantidad, fecha=None, idlote=None):
+        """
+        Descuenta 'cantidad' dosis de los lotes vigentes a la fecha, el que vence primero antes
+        Retorna [{idlote, codigo, fecha_vencimiento, cantidad}] en orden de asignación y
+        lanza StockInsuficiente sin modificar nada si no alcanza. No confirma la transacción.
+        """
+        fecha = fecha or date.today()
+        condiciones = [
+            LoteVacuna.idhacienda == idhacienda,
+            LoteVacuna.idvacuna == idvacuna,
+            LoteVacuna.cantidad_disponible > 0,
+            LoteVacuna.fecha_vencimiento >= fecha
+        ]
+        if idlote is not None:
+            condiciones.append(LoteVacuna.idlote == idlote)
+
+        # Bloqueo de fila: otra asignación concurrente sobre estos lotes espera al commit
+        candidatos = [
+            (fila.fecha_vencimiento, fila.idlote, fila.codigo, fila.cantidad_disponible)
+            for fila in db.session.execute(
+                select(
+                    LoteVacuna.idlote,
+                    LoteVacuna.codigo,
+                    LoteVacuna.fecha_vencimiento,
+                    LoteVacuna.cantidad_disponible
+                ).where(*condiciones).with_for_update()
+            )
+        ]
+
+        disponibles = sum(candidato[3] for candidato in candidatos)
+        if disponibles < cantidad:
+            raise StockInsuficiente(disponibles, cantidad)
+
+        # Montículo por vencimiento: solo se extraen los lotes que se alcanzan a usar
+        heapq.heapify(candidatos)
+        asignaciones = []
+        restantes = cantidad
+        while restantes > 0:
+            fecha_vencimiento, id_lote, codigo, cantidad_lote = heapq.heappop(candidatos)
+            tomadas = min(cantidad_lote, restantes)
+            asignaciones.append({
+                'idlote': id_lote,
+                'codigo': codigo,
+                'fecha_vencimiento': fecha_vencimiento,
+                'cantidad': tomadas
+            })
+            restantes -= tomadas
+
+        # Un solo UPDATE para todos los lotes tocados
+        tabla = LoteVacuna.__table__
+        descuentos = {asignacion['idlote']: asignacion['cantidad'] for asignacion in asignaciones}
+        db.session.execute(
+            update(tabla).where(tabla.c.idlote.in_(descuentos)).values(
+                cantidad_disponible=tabla.c.cantidad_disponible - case(descuentos, value=tabla.c.idlote)
+            )
+        )
+
+        return asignaciones
+
+    @staticmethod
+    def por_dosis(asignaciones):
+        """Lote de cada dosis, en el orden de asignación"""
+        for asignacion in asignaciones:
+            for _ in range(asignacion['cantidad']):
+                yield asignacion
+
+    @staticmethod
+    def devolver(idlote, cantidad=1):
+        """Reintegra dosis a un lote (vacunación eliminada); no confirma la transacción"""
+        tabla = LoteVacuna.__table__
+        db.session.execute(
+            update(tabla).where(tabla.c.idlote == idlote).values(
+                cantidad_disponible=tabla.c.cantidad_disponible + cantidad
+            )
+        )
+
+    # ===============================
+    # ALERTAS DE STOCK
+    # ===============================
+
+    @staticmethod
+    def _umbral():
+        return current_app.config.get('INVENTARIO_STOCK_MINIMO', InventarioVacunasService.STOCK_MINIMO)
+
+    @staticmethod
+    def alertas(hacienda_id=None, idvacuna=None):
+        """
+        Stock bajo (dosis vigentes por hacienda y vacuna bajo el umbral) y lotes con
+        dosis que vencen pronto, con un GROUP BY y un rango del índice de vencimiento
+        """
+        hoy = date.today()
+        umbral = InventarioVacunasService._umbral()
+        dias_vencimiento = current_app.config.get(
+            'INVENTARIO_DIAS_ALERTA_VENCIMIENTO', InventarioVacunasService.DIAS_ALERTA_VENCIMIENTO
+        )
+
+        condiciones = []
+        if hacienda_id:
+            condiciones.append(LoteVacuna.idhacienda == hacienda_id)
+        if idvacuna:
+            condiciones.append(LoteVacuna.idvacuna == idvacuna)
+
+        vigentes = func.sum(case((LoteVacuna.fecha_vencimiento >= hoy, LoteVacuna.cantidad_disponible), else_=0))
+        stock_bajo = [
+            {
+                'idhacienda': fila.idhacienda,
+                'idvacuna': fila.idvacuna,
+                'nombre_vacuna': ReferenciasService.nombre('catalogo_vacunas', fila.idvacuna),
+                'dosis_vigentes': int(fila.dosis_vigentes or 0),
+                'stock_minimo': umbral
+            }
+            for fila in db.session.execute(
+                select(
+                    LoteVacuna.idhacienda, LoteVacuna.idvacuna, vigentes.label('dosis_vigentes')
+                ).where(*condiciones).group_by(
+                    LoteVacuna.idhacienda, LoteVacuna.idvacuna
+                ).having(vigentes < umbral).order_by(vigentes, LoteVacuna.idhacienda, LoteVacuna.idvacuna)
+            )
+        ]
+
+        por_vencer = [
+            lote.to_dict() for lote in LoteVacuna.query.filter(
+                *condiciones,
+                LoteVacuna.cantidad_disponible > 0,
+                LoteVacuna.fecha_vencimiento >= hoy,
+                LoteVacuna.fecha_vencimiento <= hoy + timedelta(days=dias_vencimiento)
+            ).order_by(LoteVacuna.fecha_vencimiento, LoteVacuna.idlote).all()
+        ]
+
+        return {'stock_bajo': stock_bajo, 'por_vencer': por_vencer}
+
+    @staticmethod
+    def alertas_tras_asignar(idhacienda, idvacuna):
+        """Alerta de stock bajo de un par (hacienda, vacuna) tras descontar dosis"""
+        stock_bajo = InventarioVacunasService.alertas(idhacienda, idvacuna)['stock_bajo']
+        for alerta in stock_bajo:
+            print(
+                f"⚠️ Stock bajo de {alerta['nombre_vacuna']} en la hacienda {idhacienda}: "
+                f"{alerta['dosis_vigentes']} dosis vigentes (mínimo {alerta['stock_minimo']})"
+            )
+        return stock_bajo
+
+    @staticmethod
+    def obtener_alertas(hacienda_id=None):
+        try:
+            return {
+                **InventarioVacunasService.alertas(hacienda_id),
+                'hacienda_id': hacienda_id,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al obtener alertas de inventario: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+
+    # ===============================
+    # GESTIÓN DE LOTES
+    # ===============================
+
+    @staticmethod
+    def crear_lote(datos, usuario_id):
+        """Registra un lote de vacuna recibido en una hacienda"""
+        try:
+            usuario = AuthService.usuario_actual(usuario_id)
+            if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
+                return {
+                    'error': 'Solo administradores e instructores pueden registrar lotes de vacuna',
+                    'status': 'error',
+                    'code': 'ACCESS_DENIED'
+                }, 403
+
+            errores = LoteVacuna.validar_datos(datos)
+            if errores:
+                return {
+                    'error': 'Errores de validación',
+                    'status': 'error',
+                    'code': 'VALIDATION_ERROR',
+                    'details': errores
+                }, 400
+
+            if not db.session.get(Hacienda, datos['idhacienda']):
+                return {
+                    'error': 'Hacienda no encontrada',
+                    'status': 'error',
+                    'code': 'HACIENDA_NOT_FOUND'
+                }, 404
+
+            if not db.session.get(CatalogoVacuna, datos['idvacuna']):
+                return {
+                    'error': 'Vacuna no encontrada',
+                    'status': 'error',
+                    'code': 'VACCINE_NOT_FOUND'
+                }, 404
+
+            codigo = str(datos['codigo']).strip()
+            if LoteVacuna.query.filter_by(
+                idhacienda=datos['idhacienda'], idvacuna=datos['idvacuna'], codigo=codigo
+            ).first():
+                return {
+                    'error': 'Ya existe un lote con ese código para esta vacuna en la hacienda',
+                    'status': 'error',
+                    'code': 'DUPLICATE_LOT'
+                }, 409
+
+            cantidad = int(datos['cantidad'])
+            lote = LoteVacuna(
+                idhacienda=datos['idhacienda'],
+                idvacuna=datos['idvacuna'],
+                codigo=codigo,
+                fecha_vencimiento=datetime.strptime(str(datos['fecha_vencimiento']), '%Y-%m-%d').date(),
+                cantidad_inicial=cantidad,
+                cantidad_disponible=cantidad
+            )
+
+            db.session.add(lote)
+            db.session.commit()
+
+            return {
+                'message': f'Lote {codigo} registrado con {cantidad} dosis',
+                'status': 'success',
+                'lote': lote.to_dict()
+            }, 201
+
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'error': f'Error al registrar lote: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+
+    @staticmethod
+    def listar_lotes(hacienda_id=None, idvacuna=None, solo_disponibles=False, pagina=1, por_pagina=50):
+        """Lotes en orden FEFO (vacuna y vencimiento)"""
+        try:
+            query = LoteVacuna.query
+
+            if hacienda_id:
+                query = query.filter(LoteVacuna.idhacienda == hacienda_id)
+            if idvacuna:
+                query = query.filter(LoteVacuna.idvacuna == idvacuna)
+            if solo_disponibles:
+                query = query.filter(
+                    LoteVacuna.cantidad_disponible > 0,
+                    LoteVacuna.fecha_vencimiento >= date.today()
+                )
+
+            query = query.order_by(
+                LoteVacuna.idhacienda, LoteVacuna.idvacuna, LoteVacuna.fecha_vencimiento, LoteVacuna.idlote
+            )
+            paginacion = query.paginate(page=pagina, per_page=por_pagina, error_out=False)
+
+            return {
+                'lotes': [lote.to_dict() for lote in paginacion.items],
+                'total': paginacion.total,
+                'pagina_actual': pagina,
+                'total_paginas': paginacion.pages,
+                'por_pagina': por_pagina,
+                'tiene_siguiente': paginacion.has_next,
+                'tiene_anterior': paginacion.has_prev,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al listar lotes: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
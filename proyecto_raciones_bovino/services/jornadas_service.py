@@ -0,0 +1,245 @@
+from models import db, Animal, Hacienda, CatalogoVacuna, EstadoVacunacionAnimal
+from services.referencias_service import ReferenciasService
+from services.cache_service import CacheService
+from flask import current_app
+from sqlalchemy import select, exists, and_
+from datetime import date, timedelta
+import heapq
+
+class JornadasService:
+    """
+    Planificador de jornadas de vacunación por hacienda
+    Cada dosis pendiente (próxima dosis de la tabla de estado o vacuna activa nunca
+    aplicada) tiene una ventana aceptable alrededor de su fecha. Las ventanas de una
+    hacienda se cubren con el menor número de visitas mediante un barrido voraz:
+    cada visita se fija en el último día que todavía cubre la dosis más urgente y
+    toma, hasta la capacidad, las dosis disponibles con la ventana que cierra antes.
+    """
+
+    DIAS_HORIZONTE = 60
+    DIAS_ANTES = 7
+    DIAS_DESPUES = 14
+    CAPACIDAD_VISITA = 300
+
+    # ===============================
+    # DOSIS PENDIENTES
+    # ===============================
+
+    @staticmethod
+    def _filtro_animales(hacienda_id):
+        condiciones = [Animal.idestado == ReferenciasService.id_estado('Activo')]
+        if hacienda_id:
+            condiciones.append(Animal.idhacienda == hacienda_id)
+        return condiciones
+
+    @staticmethod
+    def _dosis_pendientes(hacienda_id, vacunas, hasta):
+        """
+        Dosis por hacienda: (fecha objetivo, idanimal, hierro, idvacuna)
+        Las nunca aplicadas tienen fecha objetivo None (se aplican cuanto antes).
+        """
+        estado = EstadoVacunacionAnimal
+        por_hacienda = {}
+
+        programadas = select(
+            Animal.idhacienda, estado.proxima_dosis, Animal.idanimal, Animal.hierro, estado.idvacuna
+        ).join(
+            Animal, Animal.idanimal == estado.idanimal
+        ).where(
+            estado.proxima_dosis <= hasta,
+            estado.idvacuna.in_(vacunas),
+            *JornadasService._filtro_animales(hacienda_id)
+        )
+
+        sin_vacunar = select(
+            Animal.idhacienda, Animal.idanimal, Animal.hierro, CatalogoVacuna.idvacuna
+        ).join(
+            CatalogoVacuna, CatalogoVacuna.activo == True
+        ).where(
+            ~exists().where(and_(
+                estado.idanimal == Animal.idanimal,
+                estado.idvacuna == CatalogoVacuna.idvacuna
+            )),
+            *JornadasService._filtro_animales(hacienda_id)
+        )
+
+        for idhacienda, fecha, idanimal, hierro, idvacuna in db.session.execute(programadas):
+            por_hacienda.setdefault(idhacienda, []).append((fecha, idanimal, hierro, idvacuna))
+
+        for idhacienda, idanimal, hierro, idvacuna in db.session.execute(sin_vacunar):
+            por_hacienda.setdefault(idhacienda, []).append((None, idanimal, hierro, idvacuna))
+
+        return por_hacienda
+
+    # ===============================
+    # PLANIFICACIÓN
+    # ===============================
+
+    @staticmethod
+    def _ventana(fecha, hoy, antes, despues):
+        """Ventana aceptable de una dosis, recortada a partir de hoy"""
+        if fecha is None:
+            return hoy, hoy + timedelta(days=despues)
+        inicio = max(fecha - timedelta(days=antes), hoy)
+        fin = max(fecha + timedelta(days=despues), hoy)
+        return inicio, fin
+
+    @staticmethod
+    def planificar(dosis, hoy, antes, despues, capacidad):
+        """
+        Agrupa las dosis de una hacienda en visitas (O(n log n))
+        Sin límite de capacidad el resultado es el mínimo de visitas; con capacidad,
+        las dosis que no caben en su ventana pasan a la visita siguiente marcadas
+        fuera de ventana. Retorna [(fecha, [(dosis, fin de ventana)])].
+        """
+        intervalos = sorted(
+            (*JornadasService._ventana(item[0], hoy, antes, despues), posicion)
+            for posicion, item in enumerate(dosis)
+        )
+
+        visitas = []
+        disponibles = []  # (fin, posición) de ventanas ya abiertas
+        siguiente = 0
+        ultima = None
+
+        while siguiente < len(intervalos) or disponibles:
+            if not disponibles:
+                inicio, fin, posicion = intervalos[siguiente]
+                heapq.heappush(disponibles, (fin, posicion))
+                siguiente += 1
+
+            # Abrir todas las ventanas que empiezan antes de que cierre la más urgente
+            while siguiente < len(intervalos) and intervalos[siguiente][0] <= disponibles[0][0]:
+                inicio, fin, posicion = intervalos[siguiente]
+                heapq.heappush(disponibles, (fin, posicion))
+                siguiente += 1
+
+            fecha = disponibles[0][0]
+            if ultima is not None and fecha <= ultima:
+                # La capacidad no alcanzó: una visita por día a partir de la anterior
+                fecha = ultima + timedelta(days=1)
+                while siguiente < len(intervalos) and intervalos[siguiente][0] <= fecha:
+                    inicio, fin, posicion = intervalos[siguiente]
+                    heapq.heappush(disponibles, (fin, posicion))
+                    siguiente += 1
+
+            asignadas = []
+            while disponibles and len(asignadas) < capacidad:
+                fin, posicion = heapq.heappop(disponibles)
+                asignadas.append((dosis[posicion], fin))
+
+            visitas.append((fecha, asignadas))
+            ultima = fecha
+
+        return visitas
+
+    @staticmethod
+    def _visita(fecha, asignadas, hoy):
+        """Visita con el listado de animales y las vacunas a aplicar a cada uno"""
+        animales = {}
+        fuera_de_ventana = 0
+
+        for (objetivo, idanimal, hierro, idvacuna), fin in asignadas:
+            animal = animales.setdefault(idanimal, {'idanimal': idanimal, 'hierro': hierro, 'vacunas': []})
+            vacuna = ReferenciasService.vacuna(idvacuna)
+            atrasada = fin < fecha
+            fuera_de_ventana += atrasada
+
+            animal['vacunas'].append({
+                'idvacuna': idvacuna,
+                'nombre_vacuna': vacuna['nombre_vacuna'] if vacuna else None,
+                'proxima_dosis': objetivo.isoformat() if objetivo else None,
+                'estado': 'nunca' if objetivo is None else ('vencida' if objetivo < hoy else 'programada'),
+                'fuera_de_ventana': atrasada
+            })
+
+        return {
+            'fecha': fecha.isoformat(),
+            'dias_desde_hoy': (fecha - hoy).days,
+            'total_dosis': len(asignadas),
+            'total_animales': len(animales),
+            'dosis_fuera_de_ventana': fuera_de_ventana,
+            'animales': sorted(animales.values(), key=lambda animal: (animal['hierro'] or '', animal['idanimal']))
+        }
+
+    @staticmethod
+    @CacheService.cacheado(
+        'jornadas_vacunacion',
+        tablas=('vacunacion_animales', 'animales', 'catalogo_vacunas', 'haciendas'),
+        particion='hacienda_id'
+    )
+    def planificar_jornadas(hacienda_id=None, dias=None, antes=None, despues=None, capacidad=None,
+                            pagina=1, por_pagina=20):
+        """
+        Plan de visitas de vacunación por hacienda para los próximos 'dias'
+        Incluye las dosis vencidas y las combinaciones animal × vacuna activa nunca
+        aplicadas. Las haciendas se paginan por número de dosis pendientes.
+        """
+        try:
+            configuracion = current_app.config
+            dias = dias if dias is not None else configuracion.get('JORNADAS_DIAS_HORIZONTE', JornadasService.DIAS_HORIZONTE)
+            antes = antes if antes is not None else configuracion.get('JORNADAS_DIAS_ANTES', JornadasService.DIAS_ANTES)
+            despues = despues if despues is not None else configuracion.get('JORNADAS_DIAS_DESPUES', JornadasService.DIAS_DESPUES)
+            capacidad = capacidad or configuracion.get('JORNADAS_CAPACIDAD_VISITA', JornadasService.CAPACIDAD_VISITA)
+
+            if min(dias, antes, despues) < 0 or capacidad < 1:
+                return {
+                    'error': 'Los días deben ser positivos y la capacidad mayor que cero',
+                    'status': 'error',
+                    'code': 'INVALID_PARAMETERS'
+                }, 400
+
+            hoy = date.today()
+            vacunas = [vacuna['idvacuna'] for vacuna in ReferenciasService.todos('catalogo_vacunas') if vacuna['activo']]
+            pendientes = JornadasService._dosis_pendientes(hacienda_id, vacunas, hoy + timedelta(days=dias))
+
+            # Haciendas con más dosis primero
+            orden = sorted(pendientes, key=lambda idhacienda: (-len(pendientes[idhacienda]), idhacienda))
+            total = len(orden)
+            pagina_haciendas = orden[(pagina - 1) * por_pagina:pagina * por_pagina]
+
+            nombres = dict(db.session.execute(
+                select(Hacienda.idhacienda, Hacienda.nombre).where(Hacienda.idhacienda.in_(pagina_haciendas))
+            ).all()) if pagina_haciendas else {}
+
+            haciendas = []
+            for idhacienda in pagina_haciendas:
+                visitas = [
+                    JornadasService._visita(fecha, asignadas, hoy)
+                    for fecha, asignadas in JornadasService.planificar(
+                        pendientes[idhacienda], hoy, antes, despues, capacidad
+                    )
+                ]
+                haciendas.append({
+                    'idhacienda': idhacienda,
+                    'nombre': nombres.get(idhacienda),
+                    'total_dosis': len(pendientes[idhacienda]),
+                    'total_visitas': len(visitas),
+                    'dosis_fuera_de_ventana': sum(visita['dosis_fuera_de_ventana'] for visita in visitas),
+                    'visitas': visitas
+                })
+
+            return {
+                'haciendas': haciendas,
+                'parametros': {
+                    'dias': dias,
+                    'dias_antes': antes,
+                    'dias_despues': despues,
+                    'capacidad_visita': capacidad
+                },
+                'total': total,
+                'pagina_actual': pagina,
+                'total_paginas': -(-total // por_pagina),
+                'por_pagina': por_pagina,
+                'tiene_siguiente': pagina * por_pagina < total,
+                'tiene_anterior': pagina > 1,
+                'fecha_consulta': hoy.isoformat(),
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al planificar jornadas de vacunación: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
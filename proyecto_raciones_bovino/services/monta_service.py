@@ -0,0 +1,340 @@
+from models import db, Animal, Hacienda
+from services.referencias_service import ReferenciasService
+from services.tareas_pendientes_service import TareasPendientesService
+from services.consanguinidad_service import ConsanguinidadService
+from flask import current_app
+from sqlalchemy import select, or_
+from datetime import date, timedelta
+from collections import deque
+import heapq
+
+class MontaService:
+    """
+    Plan de monta por hacienda
+    Las hembras aptas (mismas reglas de Animal.es_apta_para_monta, como condiciones
+    SQL) y los toros candidatos forman una matriz de puntajes: parentesco de la pareja
+    (consanguinidad esperada de la cría), complementariedad de razas y descarte de
+    las parejas sobre el límite de consanguinidad. La asignación con cupo por toro se
+    resuelve con una subasta (Bertsekas): el puntaje total queda a menos de
+    vacas × EPSILON del óptimo.
+    """
+
+    MAX_VACAS_POR_TORO = 40         # Monta natural: 1 toro por 25 a 40 vacas
+    CONSANGUINIDAD_MAXIMA = 0.0625  # Cría de primos hermanos
+    OBJETIVOS = ('cruce', 'pura')
+
+    # Puntaje de una pareja: 1 + PESO_RAZA * raza - PESO_PARENTESCO * parentesco
+    PESO_RAZA = 0.5
+    PESO_PARENTESCO = 4.0
+    RAZA_DESCONOCIDA = 0.5
+
+    # Incremento mínimo de las pujas: el plan queda a menos de vacas × EPSILON del óptimo.
+    # Con cupos insuficientes se parte de EPSILON_INICIAL y se divide por FACTOR_EPSILON
+    EPSILON = 0.001
+    EPSILON_INICIAL = 0.25
+    FACTOR_EPSILON = 8
+
+    # ===============================
+    # CANDIDATOS (SQL)
+    # ===============================
+
+    @staticmethod
+    def _restar_años(fecha, años):
+        try:
+            return fecha.replace(year=fecha.year - años)
+        except ValueError:
+            # Hoy es 29 de febrero: quien nació el 28 ya cumplió (como Animal.calcular_edad)
+            return date(fecha.year - años, 2, 28)
+
+    @staticmethod
+    def condiciones_apta_monta(hoy=None):
+        """
+        Animal.es_apta_para_monta como condiciones SQL: hembra vacía, de 2 a 15 años
+        cumplidos y con al menos 60 días desde el último parto
+        """
+        hoy = hoy or date.today()
+        edad_minima, edad_maxima = TareasPendientesService.EDAD_MONTA
+
+        return [
+            Animal.sexo == 'Hembra',
+            or_(Animal.preñada == False, Animal.preñada.is_(None)),
+            Animal.fecha_nacimiento <= MontaService._restar_años(hoy, edad_minima),
+            Animal.fecha_nacimiento > MontaService._restar_años(hoy, edad_maxima + 1),
+            or_(
+                Animal.ultimo_parto.is_(None),
+                Animal.ultimo_parto <= hoy - timedelta(days=TareasPendientesService.DIAS_DESCANSO_POSPARTO)
+            )
+        ]
+
+    @staticmethod
+    def _columnas():
+        return select(Animal.idanimal, Animal.hierro, Animal.raza, Animal.idhacienda)
+
+    @staticmethod
+    def hembras_aptas(hacienda_id, hoy=None):
+        return db.session.execute(
+            MontaService._columnas().where(
+                Animal.idhacienda == hacienda_id,
+                Animal.idestado == ReferenciasService.id_estado('Activo'),
+                *MontaService.condiciones_apta_monta(hoy)
+            ).order_by(Animal.idanimal)
+        ).all()
+
+    @staticmethod
+    def toros_candidatos(hacienda_id, adicionales=(), hoy=None):
+        """Machos activos de la hacienda en edad de monta, más los indicados de otras haciendas"""
+        hoy = hoy or date.today()
+        condiciones = [
+            Animal.sexo == 'Macho',
+            Animal.idestado == ReferenciasService.id_estado('Activo')
+        ]
+        edad_minima = MontaService._restar_años(hoy, TareasPendientesService.EDAD_MONTA[0])
+
+        toros = db.session.execute(
+            MontaService._columnas().where(
+                *condiciones,
+                Animal.idhacienda == hacienda_id,
+                Animal.fecha_nacimiento <= edad_minima
+            ).order_by(Animal.idanimal)
+        ).all()
+
+        extra = set(adicionales) - {toro.idanimal for toro in toros}
+        if extra:
+            toros += db.session.execute(
+                MontaService._columnas().where(*condiciones, Animal.idanimal.in_(extra)).order_by(Animal.idanimal)
+            ).all()
+
+        return toros
+
+    # ===============================
+    # PUNTAJES
+    # ===============================
+
+    @staticmethod
+    def _raza(raza):
+        return (raza or '').strip().lower() or None
+
+    @staticmethod
+    def puntaje_raza(raza_vaca, raza_toro, objetivo='cruce'):
+        """1 si la pareja cumple el objetivo (misma raza o cruce), 0 si no, 0.5 si falta la raza"""
+        raza_vaca, raza_toro = MontaService._raza(raza_vaca), MontaService._raza(raza_toro)
+        if not raza_vaca or not raza_toro:
+            return MontaService.RAZA_DESCONOCIDA
+        misma = raza_vaca == raza_toro
+        return 1.0 if misma == (objetivo == 'pura') else 0.0
+
+    @staticmethod
+    def matriz(vacas, toros, objetivo, consanguinidad_maxima):
+        """
+        Opciones de cada vaca: [(índice del toro, puntaje, parentesco)] sin las parejas
+        sobre el límite. El parentesco sale de una fila del motor por toro.
+        """
+        ids_vacas = [vaca.idanimal for vaca in vacas]
+        opciones = [[] for _ in vacas]
+
+        for columna, toro in enumerate(toros):
+            parentescos = ConsanguinidadService.parentescos(toro.idanimal, ids_vacas)
+            raza_toro = MontaService._raza(toro.raza)
+
+            for fila, vaca in enumerate(vacas):
+                parentesco = parentescos[vaca.idanimal]
+                if parentesco > consanguinidad_maxima or vaca.idanimal == toro.idanimal:
+                    continue
+                puntaje = (
+                    1.0
+                    + MontaService.PESO_RAZA * MontaService.puntaje_raza(vaca.raza, raza_toro, objetivo)
+                    - MontaService.PESO_PARENTESCO * parentesco
+                )
+                opciones[fila].append((columna, puntaje, parentesco))
+
+        return opciones
+
+    # ===============================
+    # ASIGNACIÓN
+    # ===============================
+
+    @staticmethod
+    def _pujar(opciones, capacidades, precios, epsilon, obligatoria):
+        """
+        Una fase de la subasta con objetos similares: cada toro tiene 'capacidad' cupos y
+        su precio es la oferta más baja que retiene cuando está lleno. Una vaca puja por
+        el toro con mayor puntaje neto (puntaje - precio); si la asignación no es
+        obligatoria, se queda sin toro cuando ninguno supera 0.
+        """
+        asignacion = [None] * len(opciones)
+        ocupantes = [[] for _ in capacidades]   # montículo (oferta, vaca) por toro
+        base = list(precios)                    # precio de los cupos libres al empezar la fase
+        libres = deque(range(len(opciones)))
+
+        while libres:
+            vaca = libres.popleft()
+            mejor, primero, segundo = None, None, None if obligatoria else 0.0
+            for toro, puntaje, _ in opciones[vaca]:
+                neto = puntaje - precios[toro]
+                if mejor is None or neto > primero:
+                    if mejor is not None and (segundo is None or primero > segundo):
+                        segundo = primero
+                    mejor, primero = toro, neto
+                elif segundo is None or neto > segundo:
+                    segundo = neto
+
+            if mejor is None or (not obligatoria and primero <= 0):
+                continue
+
+            oferta = precios[mejor] + primero - (primero if segundo is None else segundo) + epsilon
+            cupos = ocupantes[mejor]
+            if len(cupos) < capacidades[mejor]:
+                heapq.heappush(cupos, (oferta, vaca))
+            else:
+                _, desplazada = heapq.heapreplace(cupos, (oferta, vaca))
+                asignacion[desplazada] = None
+                libres.append(desplazada)
+            asignacion[vaca] = mejor
+
+            precios[mejor] = cupos[0][0] if len(cupos) == capacidades[mejor] else base[mejor]
+
+        return asignacion
+
+    @staticmethod
+    def subastar(opciones, capacidades, epsilon=None):
+        """
+        Asignación vaca -> toro que maximiza el puntaje total respetando los cupos
+        Retorna el índice de toro de cada vaca (None si queda sin asignar).
+
+        Con cupos de sobra basta una fase con precios en 0. Si faltan cupos, un toro
+        ficticio de puntaje 0 ("sin toro") completa los que faltan: el problema queda
+        cuadrado y se resuelve con escalamiento de épsilon, conservando los precios
+        entre fases para evitar guerras de precios entre vacas empatadas.
+        """
+        epsilon = epsilon or MontaService.EPSILON
+        candidatas = [vaca for vaca, lista in enumerate(opciones) if lista]
+        faltantes = len(candidatas) - sum(capacidades)
+        asignacion = [None] * len(opciones)
+
+        if faltantes <= 0:
+            parcial = MontaService._pujar(
+                [opciones[vaca] for vaca in candidatas], capacidades, [0.0] * len(capacidades), epsilon, False
+            )
+        else:
+            ficticio = len(capacidades)
+            sub_opciones = [opciones[vaca] + [(ficticio, 0.0, None)] for vaca in candidatas]
+            sub_capacidades = list(capacidades) + [faltantes]
+            precios = [0.0] * len(sub_capacidades)
+
+            fase = max(MontaService.EPSILON_INICIAL, epsilon)
+            while True:
+                parcial = MontaService._pujar(sub_opciones, sub_capacidades, precios, fase, True)
+                if fase <= epsilon:
+                    break
+                fase = max(fase / MontaService.FACTOR_EPSILON, epsilon)
+
+            parcial = [None if toro == ficticio else toro for toro in parcial]
+
+        for vaca, toro in zip(candidatas, parcial):
+            asignacion[vaca] = toro
+        return asignacion
+
+    # ===============================
+    # PLAN
+    # ===============================
+
+    @staticmethod
+    def _datos(animal):
+        return {'idanimal': animal.idanimal, 'hierro': animal.hierro, 'raza': animal.raza}
+
+    @staticmethod
+    def planificar(hacienda_id, toros_adicionales=(), maximo_por_toro=None, objetivo='cruce',
+                   consanguinidad_maxima=None):
+        """Plan de monta de las hembras aptas de una hacienda"""
+        try:
+            if not db.session.get(Hacienda, hacienda_id):
+                return {
+                    'error': 'Hacienda no encontrada',
+                    'status': 'error',
+                    'code': 'HACIENDA_NOT_FOUND'
+                }, 404
+
+            if objetivo not in MontaService.OBJETIVOS:
+                return {
+                    'error': f'Objetivo no válido. Opciones: {", ".join(MontaService.OBJETIVOS)}',
+                    'status': 'error',
+                    'code': 'INVALID_OBJECTIVE'
+                }, 400
+
+            configuracion = current_app.config
+            maximo_por_toro = maximo_por_toro or configuracion.get(
+                'MONTA_MAX_VACAS_POR_TORO', MontaService.MAX_VACAS_POR_TORO
+            )
+            if consanguinidad_maxima is None:
+                consanguinidad_maxima = configuracion.get(
+                    'MONTA_CONSANGUINIDAD_MAXIMA', MontaService.CONSANGUINIDAD_MAXIMA
+                )
+
+            hoy = date.today()
+            vacas = MontaService.hembras_aptas(hacienda_id, hoy)
+            toros = MontaService.toros_candidatos(hacienda_id, toros_adicionales, hoy)
+
+            encontrados = {toro.idanimal for toro in toros}
+            invalidos = sorted(set(toros_adicionales) - encontrados)
+            if invalidos:
+                return {
+                    'error': 'Toros no encontrados o no disponibles (deben ser machos activos)',
+                    'status': 'error',
+                    'code': 'INVALID_SIRES',
+                    'details': invalidos
+                }, 400
+
+            opciones = MontaService.matriz(vacas, toros, objetivo, consanguinidad_maxima)
+            asignacion = MontaService.subastar(opciones, [maximo_por_toro] * len(toros))
+
+            parejas = []
+            sin_asignar = []
+            uso = [0] * len(toros)
+            for fila, vaca in enumerate(vacas):
+                columna = asignacion[fila]
+                if columna is None:
+                    sin_asignar.append({
+                        **MontaService._datos(vaca),
+                        'motivo': 'sin_toro_compatible' if not opciones[fila] else 'cupo_de_toros'
+                    })
+                    continue
+
+                _, puntaje, parentesco = next(opcion for opcion in opciones[fila] if opcion[0] == columna)
+                uso[columna] += 1
+                parejas.append({
+                    'vaca': MontaService._datos(vaca),
+                    'toro': MontaService._datos(toros[columna]),
+                    'consanguinidad_esperada': round(parentesco, 6),
+                    'puntaje': round(puntaje, 4)
+                })
+
+            parejas.sort(key=lambda pareja: (pareja['toro']['idanimal'], pareja['vaca']['idanimal']))
+
+            return {
+                'hacienda_id': hacienda_id,
+                'fecha': hoy.isoformat(),
+                'objetivo': objetivo,
+                'maximo_por_toro': maximo_por_toro,
+                'consanguinidad_maxima': consanguinidad_maxima,
+                'total_hembras_aptas': len(vacas),
+                'total_toros': len(toros),
+                'total_asignadas': len(parejas),
+                'puntaje_total': round(sum(pareja['puntaje'] for pareja in parejas), 4),
+                'consanguinidad_esperada_promedio': round(
+                    sum(pareja['consanguinidad_esperada'] for pareja in parejas) / len(parejas), 6
+                ) if parejas else None,
+                'toros': [
+                    {**MontaService._datos(toro), 'idhacienda': toro.idhacienda, 'vacas_asignadas': uso[columna]}
+                    for columna, toro in enumerate(toros)
+                ],
+                'parejas': parejas,
+                'sin_asignar': sin_asignar,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al planificar la monta: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
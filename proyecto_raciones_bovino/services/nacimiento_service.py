@@ -1,4 +1,8 @@
-from models import db, Animal, Nacimiento, Usuario, Hacienda
+from models import db, Animal, Nacimiento, Hacienda, IndiceBusqueda
+from services.cache_service import CacheService
+from services.auth_service import AuthService
+from services.alertas_service import AlertasService
+from services.genealogia_service import GenealogiaService
 from datetime import datetime, date, timedelta
 import re
 
@@ -13,7 +17,7 @@ class NacimientoService:
         """Registra un nuevo nacimiento"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden registrar nacimientos',
@@ -37,6 +41,11 @@ class NacimientoService:
                 datos['idanimal_madre'],
                 datos.get('idanimal_padre')
             )
+            errores_compatibilidad += GenealogiaService.verificar_progenitores(
+                datos['idanimal_cria'],
+                datos['idanimal_madre'],
+                datos.get('idanimal_padre')
+            )
             if errores_compatibilidad:
                 return {
                     'error': 'Errores de compatibilidad',
@@ -168,9 +177,12 @@ class NacimientoService:
                     termino = filtros['buscar']
                     query = query.filter(
                         db.or_(
-                            Nacimiento.numero_registro.ilike(f'%{termino}%'),
-                            Animal.hierro.ilike(f'%{termino}%'),
-                            Nacimiento.observaciones.ilike(f'%{termino}%')
+                            Nacimiento.idnacimiento.in_(IndiceBusqueda.subconsulta_ids(
+                                'nacimiento', termino, campos=['numero_registro', 'observaciones']
+                            )),
+                            Nacimiento.idanimal_cria.in_(IndiceBusqueda.subconsulta_ids(
+                                'animal', termino, campos=['hierro']
+                            ))
                         )
                     )
             
@@ -207,7 +219,7 @@ class NacimientoService:
         """Actualiza un nacimiento existente"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden actualizar nacimientos',
@@ -249,6 +261,11 @@ class NacimientoService:
                         datos.get('idanimal_madre', nacimiento.idanimal_madre),
                         datos.get('idanimal_padre', nacimiento.idanimal_padre)
                     )
+                    errores_compatibilidad += GenealogiaService.verificar_progenitores(
+                        datos.get('idanimal_cria', nacimiento.idanimal_cria),
+                        datos.get('idanimal_madre', nacimiento.idanimal_madre),
+                        datos.get('idanimal_padre', nacimiento.idanimal_padre)
+                    )
                     if errores_compatibilidad:
                         return {
                             'error': 'Errores de compatibilidad',
@@ -316,7 +333,7 @@ class NacimientoService:
         """Elimina un nacimiento (solo administradores)"""
         try:
             # Verificar permisos del usuario (solo administradores)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden eliminar nacimientos',
@@ -427,10 +444,10 @@ class NacimientoService:
     def obtener_crias_sin_vacunar(hacienda_id=None):
         """Obtiene crías que necesitan vacunación inicial"""
         try:
-            crias_sin_vacunar = Nacimiento.obtener_crias_sin_vacunar(hacienda_id)
+            crias_sin_vacunar = AlertasService.crias_sin_vacunar(hacienda_id)
             
             return {
-                'crias_sin_vacunar': [n.to_dict() for n in crias_sin_vacunar],
+                'crias_sin_vacunar': crias_sin_vacunar,
                 'total': len(crias_sin_vacunar),
                 'hacienda_id': hacienda_id,
                 'status': 'success'
@@ -465,6 +482,7 @@ class NacimientoService:
             }, 500
     
     @staticmethod
+    @CacheService.cacheado('estadisticas_nacimientos', tablas=('nacimientos', 'animales'), particion='hacienda_id')
     def obtener_estadisticas_nacimientos(hacienda_id=None):
         """Obtiene estadísticas de nacimientos"""
         try:
@@ -515,7 +533,7 @@ class NacimientoService:
         """Marca las vacunas como aplicadas en un nacimiento"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden marcar vacunas',
@@ -1,5 +1,6 @@
 # services/nrc_service.py
-from models import db, NrcLactanciaBase, NrcProduccionLeche, NrcGestacion, NrcCeba, Usuario
+from models import db, NrcLactanciaBase, NrcProduccionLeche, NrcGestacion, NrcCeba
+from services.auth_service import AuthService
 from datetime import datetime
 
 class NrcService:
@@ -17,7 +18,7 @@ class NrcService:
         """Crea un registro de requerimientos base de lactancia"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden crear registros NRC',
@@ -145,7 +146,7 @@ class NrcService:
         """Crea un registro de requerimientos por producción de leche"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden crear registros NRC',
@@ -1,7 +1,8 @@
 # services/raciones_service.py
 from models import db, Animal, RacionLactancia, RacionCeba, DetalleRacionLactancia, DetalleRacionCeba
-from models import NrcLactanciaBase, NrcProduccionLeche, NrcGestacion, NrcCeba, Ingrediente, Usuario
+from models import NrcLactanciaBase, NrcProduccionLeche, NrcGestacion, NrcCeba, Ingrediente
 from services.nrc_service import NrcService
+from services.auth_service import AuthService
 from datetime import datetime, date
 import json
 
@@ -19,7 +20,7 @@ class RacionesService:
         """Calcula y guarda una ración para vacas en lactancia"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden calcular raciones',
@@ -251,7 +252,7 @@ class RacionesService:
         """Calcula y guarda una ración para animales en ceba"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden calcular raciones',
@@ -654,7 +655,7 @@ class RacionesService:
         """Elimina una ración (solo administradores)"""
         try:
             # Verificar permisos
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden eliminar raciones',
@@ -0,0 +1,242 @@
+from models import db, EstadoAnimal, RolUsuario, CatalogoVacuna, Departamento, Municipio, Nacimiento, VersionTabla
+from services.invalidacion_service import InvalidacionService
+from sqlalchemy import select, inspect
+from types import MappingProxyType
+import threading
+import time
+
+class ReferenciasService:
+    """
+    Registro en memoria de las tablas de referencia (estados, roles, catálogo de
+    vacunas, departamentos y municipios)
+    Cada tabla se carga una vez en dicts inmutables y se recarga al confirmarse una
+    escritura sobre ella; los cambios hechos por otros procesos se detectan con las
+    versiones de tabla, revisadas como mucho cada REFERENCIAS_VERIFICACION_SEGUNDOS.
+    """
+
+    # tabla -> (modelo, columna id, columna nombre)
+    TABLAS = {
+        'estados_animal': (EstadoAnimal, 'idestado', 'nombre_estado'),
+        'rol_usuario': (RolUsuario, 'idrol', 'nombre_rol'),
+        'catalogo_vacunas': (CatalogoVacuna, 'idvacuna', 'nombre_vacuna'),
+        'departamentos': (Departamento, 'iddepartamento', 'nombre_departamento'),
+        'municipios': (Municipio, 'idmunicipio', 'nombre_municipio')
+    }
+
+    # Nombres para mostrar de los tipos de parto (valores del enum de nacimientos)
+    NOMBRES_TIPO_PARTO = {'Cesarea': 'Cesárea'}
+
+    _registros = {}     # tabla -> (generación, filas por id, ids por nombre)
+    _generaciones = {}  # tabla -> generación; el commit la incrementa y vence el registro
+    _versiones = {}     # tabla -> versión de VersionTabla vista en la última verificación
+    _verificado_en = 0
+    _intervalo_verificacion = 60
+    _lock = threading.Lock()
+    _eventos_registrados = False
+
+    @staticmethod
+    def iniciar(app):
+        """Registra los eventos y precarga las tablas"""
+        ReferenciasService._intervalo_verificacion = app.config.get('REFERENCIAS_VERIFICACION_SEGUNDOS', 60)
+        ReferenciasService._registrar_eventos()
+
+        with app.app_context():
+            try:
+                # Sin tablas todavía (primera instalación, antes de create_all o de las
+                # migraciones): se cargan al primer uso
+                if not inspect(db.engine).has_table(VersionTabla.__tablename__):
+                    return
+                ReferenciasService.precargar()
+            except Exception as e:
+                print(f"❌ No se pudieron precargar las tablas de referencia: {e}")
+
+    # ===============================
+    # CARGA E INVALIDACIÓN
+    # ===============================
+
+    @staticmethod
+    def precargar():
+        """Carga todas las tablas de referencia"""
+        ReferenciasService._verificar_versiones(forzar=True)
+        for tabla in ReferenciasService.TABLAS:
+            ReferenciasService._cargar(tabla)
+
+    @staticmethod
+    def _cargar(tabla):
+        modelo, columna_id, columna_nombre = ReferenciasService.TABLAS[tabla]
+        generacion = ReferenciasService._generaciones.get(tabla, 0)
+
+        # Conexión propia: solo datos confirmados, nunca escrituras pendientes de la sesión
+        with db.engine.connect() as conexion:
+            filas = conexion.execute(select(modelo.__table__)).mappings().all()
+
+        por_id = {fila[columna_id]: MappingProxyType(dict(fila)) for fila in filas}
+        por_nombre = {fila[columna_nombre]: fila[columna_id] for fila in filas}
+        registro = (generacion, MappingProxyType(por_id), MappingProxyType(por_nombre))
+
+        with ReferenciasService._lock:
+            # Si hubo un commit durante la carga, el registro queda vencido igualmente
+            ReferenciasService._registros[tabla] = registro
+
+        return registro
+
+    @staticmethod
+    def _registro(tabla):
+        """Registro vigente de la tabla, recargándolo si está vencido"""
+        ReferenciasService._verificar_versiones()
+
+        registro = ReferenciasService._registros.get(tabla)
+        if registro is None or registro[0] != ReferenciasService._generaciones.get(tabla, 0):
+            with ReferenciasService._lock:
+                registro = ReferenciasService._registros.get(tabla)
+                vencido = registro is None or registro[0] != ReferenciasService._generaciones.get(tabla, 0)
+            if vencido:
+                registro = ReferenciasService._cargar(tabla)
+
+        return registro
+
+    @staticmethod
+    def _vencer(tablas):
+        with ReferenciasService._lock:
+            for tabla in tablas:
+                ReferenciasService._generaciones[tabla] = ReferenciasService._generaciones.get(tabla, 0) + 1
+
+    @staticmethod
+    def _verificar_versiones(forzar=False):
+        """Vence las tablas cuya versión cambió en otro proceso (una consulta por intervalo)"""
+        ahora = time.monotonic()
+        if not forzar and ahora - ReferenciasService._verificado_en < ReferenciasService._intervalo_verificacion:
+            return
+        ReferenciasService._verificado_en = ahora
+
+        try:
+            with db.engine.connect() as conexion:
+                filas = conexion.execute(
+                    select(VersionTabla.tabla, VersionTabla.version).where(
+                        VersionTabla.tabla.in_(list(ReferenciasService.TABLAS))
+                    )
+                ).all()
+        except Exception as e:
+            print(f"❌ Error verificando versiones de las tablas de referencia: {e}")
+            return
+
+        versiones = {}
+        for tabla, version in filas:
+            versiones[tabla] = versiones.get(tabla, 0) + version
+
+        cambiadas = [
+            tabla for tabla in ReferenciasService.TABLAS
+            if versiones.get(tabla, 0) != ReferenciasService._versiones.get(tabla, 0)
+        ]
+        ReferenciasService._versiones = versiones
+        if cambiadas and not forzar:
+            ReferenciasService._vencer(cambiadas)
+
+    @staticmethod
+    def _al_confirmar(cambios):
+        """Suscriptor del bus: vence las tablas de referencia escritas"""
+        tablas = cambios['tablas'] & set(ReferenciasService.TABLAS)
+        if tablas:
+            ReferenciasService._vencer(tablas)
+
+    @staticmethod
+    def _registrar_eventos():
+        if ReferenciasService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(ReferenciasService._al_confirmar)
+
+        ReferenciasService._eventos_registrados = True
+
+    # ===============================
+    # CONSULTA
+    # ===============================
+
+    @staticmethod
+    def obtener(tabla, id_registro):
+        """
+        Fila (inmutable) de la tabla por id, o None
+        Un id que no está en el registro (p. ej. creado en la transacción en curso)
+        se busca directamente en la sesión sin guardarlo.
+        """
+        if id_registro is None:
+            return None
+
+        fila = ReferenciasService._registro(tabla)[1].get(id_registro)
+        if fila is not None:
+            return fila
+
+        modelo = ReferenciasService.TABLAS[tabla][0]
+        objeto = db.session.get(modelo, id_registro)
+        if objeto is None:
+            return None
+        return MappingProxyType({
+            columna.key: getattr(objeto, columna.key) for columna in modelo.__table__.columns
+        })
+
+    @staticmethod
+    def nombre(tabla, id_registro):
+        """Nombre del registro (nombre_estado, nombre_rol, ...) o None"""
+        fila = ReferenciasService.obtener(tabla, id_registro)
+        return fila[ReferenciasService.TABLAS[tabla][2]] if fila is not None else None
+
+    @staticmethod
+    def buscar_id(tabla, nombre):
+        """Id del registro con ese nombre exacto, o None"""
+        if nombre is None:
+            return None
+
+        id_registro = ReferenciasService._registro(tabla)[2].get(nombre)
+        if id_registro is not None:
+            return id_registro
+
+        modelo, columna_id, columna_nombre = ReferenciasService.TABLAS[tabla]
+        return db.session.execute(
+            select(getattr(modelo, columna_id)).where(getattr(modelo, columna_nombre) == nombre)
+        ).scalars().first()
+
+    @staticmethod
+    def todos(tabla):
+        """Todas las filas de la tabla (tupla de mappings inmutables)"""
+        return tuple(ReferenciasService._registro(tabla)[1].values())
+
+    @staticmethod
+    def tipos_parto():
+        """Tipos de parto disponibles, tomados del enum del modelo"""
+        return [
+            {'valor': valor, 'nombre': ReferenciasService.NOMBRES_TIPO_PARTO.get(valor, valor)}
+            for valor in Nacimiento.__table__.c.tipo_parto.type.enums
+        ]
+
+    # ===============================
+    # ATAJOS
+    # ===============================
+
+    @staticmethod
+    def nombre_estado(idestado):
+        return ReferenciasService.nombre('estados_animal', idestado)
+
+    @staticmethod
+    def id_estado(nombre_estado):
+        return ReferenciasService.buscar_id('estados_animal', nombre_estado)
+
+    @staticmethod
+    def nombre_rol(idrol):
+        return ReferenciasService.nombre('rol_usuario', idrol)
+
+    @staticmethod
+    def id_rol(nombre_rol):
+        return ReferenciasService.buscar_id('rol_usuario', nombre_rol)
+
+    @staticmethod
+    def vacuna(idvacuna):
+        return ReferenciasService.obtener('catalogo_vacunas', idvacuna)
+
+    @staticmethod
+    def nombre_departamento(iddepartamento):
+        return ReferenciasService.nombre('departamentos', iddepartamento)
+
+    @staticmethod
+    def nombre_municipio(idmunicipio):
+        return ReferenciasService.nombre('municipios', idmunicipio)
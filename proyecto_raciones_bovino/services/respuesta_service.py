@@ -0,0 +1,314 @@
+from flask import request, has_request_context, Request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+from datetime import date, datetime
+from decimal import Decimal
+from types import MappingProxyType
+import gzip
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa el json de la librería estándar
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se negocia gzip
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # opcional: sin msgpack las respuestas son siempre JSON
+    msgpack = None
+
+TIPOS_MSGPACK = ('application/msgpack', 'application/x-msgpack')
+
+# ===============================
+# SERIALIZACIÓN JSON
+# ===============================
+
+def _convertir(obj):
+    """Tipos que el codificador no conoce: Decimal, fechas y filas de SQLAlchemy"""
+    if isinstance(obj, Decimal):
+        # Igual que los to_dict, que ya convertían a float campo por campo
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    if hasattr(obj, '_asdict'):  # Row
+        return obj._asdict()
+    if hasattr(obj, 'keys') and hasattr(obj, '__getitem__'):  # RowMapping
+        return dict(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f'Objeto de tipo {type(obj).__name__} no serializable a JSON')
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Proveedor JSON de la aplicación (jsonify y request.get_json)
+    Usa orjson si está instalado y serializa Decimal, date, datetime y filas de
+    SQLAlchemy sin conversión previa. Las respuestas con listas grandes se envían
+    en streaming, codificando los elementos por lotes.
+    """
+
+    # Elementos de lista a partir de los cuales la respuesta se envía en streaming
+    minimo_streaming = 1000
+    tamaño_lote = 200
+
+    def default(self, obj):
+        return _convertir(obj)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs.get('indent'):
+            return orjson.dumps(obj, default=_convertir, option=self._opciones_orjson()).decode('utf-8')
+
+        kwargs.setdefault('default', _convertir)
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def _opciones_orjson(self):
+        opciones = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        return opciones
+
+    def _codificar(self, obj):
+        """JSON compacto en bytes"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=_convertir, option=self._opciones_orjson())
+        return json.dumps(
+            obj, default=_convertir, ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys, separators=(',', ':')
+        ).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if has_request_context() and request.args.get('tabular') == 'columnas':
+            obj = a_columnas(obj)
+
+        if formato_negociado() == 'msgpack':
+            respuesta = self._app.response_class(
+                msgpack.packb(obj, default=_convertir, use_bin_type=True),
+                mimetype='application/msgpack'
+            )
+        else:
+            legible = (self.compact is None and self._app.debug) or self.compact is False
+            if not legible and ProveedorJSON._contar_elementos(obj) >= self.minimo_streaming:
+                respuesta = self._app.response_class(self._fragmentos(obj), mimetype=self.mimetype)
+            else:
+                respuesta = super().response(obj)
+
+        # La misma URL responde JSON o MessagePack según Accept
+        if msgpack is not None:
+            respuesta.vary.add('Accept')
+        return respuesta
+
+    @staticmethod
+    def _contar_elementos(obj, profundidad=3):
+        """Elementos en las listas de los primeros niveles (para decidir el streaming)"""
+        if profundidad == 0:
+            return 0
+        if isinstance(obj, dict):
+            return sum(ProveedorJSON._contar_elementos(valor, profundidad - 1) for valor in obj.values())
+        if isinstance(obj, list):
+            return len(obj)
+        return 0
+
+    def _fragmentos(self, obj):
+        """Codifica por partes: las listas grandes se emiten en lotes de elementos"""
+        if isinstance(obj, dict) and ProveedorJSON._contar_elementos(obj) >= self.tamaño_lote:
+            claves = sorted(obj, key=str) if self.sort_keys else list(obj)
+            yield b'{'
+            for posicion, clave in enumerate(claves):
+                if posicion:
+                    yield b','
+                yield self._codificar(str(clave)) + b':'
+                yield from self._fragmentos(obj[clave])
+            yield b'}'
+
+        elif isinstance(obj, list) and len(obj) > self.tamaño_lote:
+            yield b'['
+            for inicio in range(0, len(obj), self.tamaño_lote):
+                if inicio:
+                    yield b','
+                # Un lote se codifica como lista y se le quitan los corchetes
+                yield self._codificar(obj[inicio:inicio + self.tamaño_lote])[1:-1]
+            yield b']'
+
+        else:
+            yield self._codificar(obj)
+
+# ===============================
+# NEGOCIACIÓN (JSON / MESSAGEPACK)
+# ===============================
+
+def formato_negociado():
+    """'msgpack' si el cliente lo prefiere en Accept (y está instalado), si no 'json'"""
+    if msgpack is None or not has_request_context():
+        return 'json'
+
+    mejor = request.accept_mimetypes.best_match(('application/json',) + TIPOS_MSGPACK)
+    return 'msgpack' if mejor in TIPOS_MSGPACK else 'json'
+
+def a_columnas(obj):
+    """
+    Codificación por columnas de los datos tabulares (?tabular=columnas)
+    Cada lista de registros con las mismas claves pasa de [{a, b}, {a, b}, ...]
+    a {'columnas': {'a': [...], 'b': [...]}, 'filas': n}: los nombres de campo
+    se envían una sola vez.
+    """
+    if isinstance(obj, dict):
+        return {clave: a_columnas(valor) for clave, valor in obj.items()}
+
+    if isinstance(obj, list):
+        if obj and all(isinstance(fila, dict) for fila in obj):
+            claves = list(obj[0])
+            conjunto = set(claves)
+            if all(fila.keys() == conjunto for fila in obj):
+                return {
+                    'columnas': {clave: [fila[clave] for fila in obj] for clave in claves},
+                    'filas': len(obj)
+                }
+        return [a_columnas(valor) for valor in obj]
+
+    return obj
+
+class PeticionNegociada(Request):
+    """Request que también acepta cuerpos en MessagePack en get_json()"""
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if self.mimetype not in TIPOS_MSGPACK:
+            return super().get_json(force=force, silent=silent, cache=cache)
+
+        if cache and getattr(self, '_msgpack_cache', None) is not None:
+            return self._msgpack_cache
+
+        if msgpack is None:
+            if silent:
+                return None
+            raise UnsupportedMediaType('El servidor no tiene soporte para MessagePack')
+
+        try:
+            datos = msgpack.unpackb(self.get_data(cache=cache), raw=False)
+        except Exception:
+            if silent:
+                return None
+            raise BadRequest('Cuerpo MessagePack inválido')
+
+        if cache:
+            self._msgpack_cache = datos
+        return datos
+
+# ===============================
+# COMPRESIÓN
+# ===============================
+
+class RespuestaService:
+    """
+    Pipeline de respuestas: proveedor JSON rápido, MessagePack y compresión negociados
+    Con Accept: application/msgpack (paquete msgpack opcional) cualquier jsonify se
+    envía en MessagePack, y get_json() acepta cuerpos en ese formato.
+    Comprime con brotli (si está instalado) o gzip según Accept-Encoding, solo
+    respuestas de texto/JSON de al menos RESPUESTAS_COMPRESION_MINIMO_BYTES
+    (las respuestas en streaming se comprimen siempre, por partes).
+    """
+
+    TIPOS_COMPRIMIBLES = ('application/json', 'application/msgpack', 'application/x-ndjson', 'text/')
+
+    _minimo_bytes = 1024
+    _nivel_gzip = 5
+    _calidad_brotli = 4
+
+    @staticmethod
+    def iniciar(app):
+        ProveedorJSON.minimo_streaming = app.config.get('RESPUESTAS_STREAMING_MINIMO_ELEMENTOS', 1000)
+        RespuestaService._minimo_bytes = app.config.get('RESPUESTAS_COMPRESION_MINIMO_BYTES', 1024)
+        RespuestaService._nivel_gzip = app.config.get('RESPUESTAS_NIVEL_GZIP', 5)
+
+        app.json_provider_class = ProveedorJSON
+        app.json = ProveedorJSON(app)
+        app.request_class = PeticionNegociada
+        app.before_request(RespuestaService.validar_cuerpo)
+
+        if app.config.get('RESPUESTAS_COMPRESION_HABILITADA', True):
+            app.after_request(RespuestaService.comprimir)
+
+    @staticmethod
+    def validar_cuerpo():
+        """before_request: un cuerpo MessagePack sin el paquete instalado se rechaza con 415"""
+        if msgpack is None and request.mimetype in TIPOS_MSGPACK and request.content_length:
+            return {
+                'status': 'error',
+                'code': 'UNSUPPORTED_MEDIA_TYPE',
+                'error': 'El servidor no tiene soporte para MessagePack; envíe JSON'
+            }, 415
+
+    @staticmethod
+    def _codificacion_aceptada():
+        aceptadas = request.accept_encodings
+        if brotli is not None and aceptadas['br']:
+            return 'br'
+        if aceptadas['gzip']:
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def comprimir(respuesta):
+        """after_request: comprime la respuesta si el cliente lo acepta y vale la pena"""
+        respuesta.vary.add('Accept-Encoding')
+
+        if (
+            respuesta.status_code < 200 or respuesta.status_code in (204, 206, 304)
+            or 'Content-Encoding' in respuesta.headers
+            or not (respuesta.mimetype or '').startswith(RespuestaService.TIPOS_COMPRIMIBLES)
+            or respuesta.direct_passthrough
+        ):
+            return respuesta
+
+        codificacion = RespuestaService._codificacion_aceptada()
+        if codificacion is None:
+            return respuesta
+
+        if respuesta.is_streamed:
+            respuesta.response = RespuestaService._comprimir_partes(respuesta.response, codificacion)
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < RespuestaService._minimo_bytes:
+                return respuesta
+
+            if codificacion == 'br':
+                datos = brotli.compress(datos, quality=RespuestaService._calidad_brotli)
+            else:
+                datos = gzip.compress(datos, compresslevel=RespuestaService._nivel_gzip)
+            respuesta.set_data(datos)
+
+        respuesta.headers['Content-Encoding'] = codificacion
+        return respuesta
+
+    @staticmethod
+    def _comprimir_partes(partes, codificacion):
+        if codificacion == 'br':
+            compresor = brotli.Compressor(quality=RespuestaService._calidad_brotli)
+            for parte in partes:
+                comprimido = compresor.process(parte)
+                if comprimido:
+                    yield comprimido
+            yield compresor.finish()
+            return
+
+        # wbits 16+MAX_WBITS: formato gzip (cabecera y CRC) en lugar de zlib
+        compresor = zlib.compressobj(RespuestaService._nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for parte in partes:
+            comprimido = compresor.compress(parte)
+            if comprimido:
+                yield comprimido
+        yield compresor.flush()
@@ -0,0 +1,700 @@
+from models import (
+    db, Animal, Hacienda, EstadoAnimal, Nacimiento, VacunacionAnimal,
+    ResumenHaciendaConteo, ResumenHacienda, ResumenHaciendaFecha
+)
+from sqlalchemy import event, inspect, select, delete, update, insert, func, case, and_, literal, union_all
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+
+class ResumenService:
+    """
+    Servicio del resumen materializado por hacienda
+    Mantiene el cubo de conteos de animales, los totales de vacunaciones y nacimientos
+    y los conteos por fecha (lo que depende del día actual) con los eventos de escritura;
+    una tarea periódica lo reconcilia contra las tablas base.
+    """
+
+    # Campos del animal que afectan el cubo
+    CAMPOS_CUBO = ('idhacienda', 'idestado', 'sexo', 'raza', 'preñada', 'peso_actual')
+
+    # Campos de vacunaciones y nacimientos que afectan los conteos por fecha
+    CAMPOS_FECHAS = {
+        VacunacionAnimal: ('idanimal', 'animal', ('idanimal', 'proxima_dosis')),
+        Nacimiento: ('idanimal_cria', 'cria', ('idanimal_cria', 'fecha_nacimiento', 'vacunas_aplicadas'))
+    }
+
+    # Una vacunación sin próxima dosis deja al animal al día indefinidamente
+    FECHA_SIN_VENCIMIENTO = date(9999, 12, 31)
+    DIAS_PROXIMAS_VACUNACIONES = 30
+    DIAS_VACUNACION_CRIAS = 90
+
+    _eventos_registrados = False
+
+    # ===============================
+    # ESCRITURA EN LAS TABLAS DE RESUMEN
+    # ===============================
+
+    @staticmethod
+    def sumar_incrementos(connection, tabla, clave, incrementos):
+        """
+        Suma incrementos a la fila de la clave (la crea si no existe)
+        La suma se hace en la base de datos para que sea atómica entre procesos
+        """
+        dialecto = connection.dialect.name
+        fila = dict(clave, **incrementos)
+
+        if dialecto == 'mysql':
+            from sqlalchemy.dialects.mysql import insert as insert_mysql
+            sentencia = insert_mysql(tabla).values(**fila)
+            connection.execute(sentencia.on_duplicate_key_update({
+                columna: tabla.c[columna] + sentencia.inserted[columna] for columna in incrementos
+            }))
+        elif dialecto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+            sentencia = insert_sqlite(tabla).values(**fila)
+            connection.execute(sentencia.on_conflict_do_update(
+                index_elements=list(clave.keys()),
+                set_={columna: tabla.c[columna] + sentencia.excluded[columna] for columna in incrementos}
+            ))
+        else:
+            resultado = connection.execute(
+                update(tabla).where(
+                    *[tabla.c[columna] == valor for columna, valor in clave.items()]
+                ).values({columna: tabla.c[columna] + valor for columna, valor in incrementos.items()})
+            )
+            if resultado.rowcount == 0:
+                connection.execute(insert(tabla).values(**fila))
+
+    @staticmethod
+    def _valores_animal(objeto, anteriores=False):
+        """Valores del cubo de un animal (los actuales o los previos a la modificación)"""
+        estado = inspect(objeto)
+        valores = {}
+
+        for campo in ResumenService.CAMPOS_CUBO:
+            historial = estado.attrs[campo].history
+            if anteriores and historial.deleted:
+                valores[campo] = historial.deleted[0]
+            else:
+                valores[campo] = getattr(objeto, campo)
+
+        return valores
+
+    @staticmethod
+    def _sumar_animal(connection, valores, signo):
+        """Suma (signo=1) o resta (signo=-1) un animal en el cubo"""
+        if valores['idhacienda'] is None:
+            return
+
+        clave = {
+            'idhacienda': valores['idhacienda'],
+            'idestado': valores['idestado'] or 0,
+            'sexo': valores['sexo'],
+            'raza': valores['raza'] or '',
+            'preñada': bool(valores['preñada'])
+        }
+        peso = valores['peso_actual']
+
+        ResumenService.sumar_incrementos(connection, ResumenHaciendaConteo.__table__, clave, {
+            'cantidad': signo,
+            'suma_peso': signo * peso if peso is not None else 0,
+            'con_peso': signo if peso is not None else 0
+        })
+
+    @staticmethod
+    def sumar_totales(connection, idhacienda, vacunaciones=0, nacimientos=0):
+        """Suma a los totales de vacunaciones y nacimientos de una hacienda"""
+        if idhacienda is None or (vacunaciones == 0 and nacimientos == 0):
+            return
+
+        ResumenService.sumar_incrementos(connection, ResumenHacienda.__table__, {'idhacienda': idhacienda}, {
+            'total_vacunaciones': vacunaciones,
+            'total_nacimientos': nacimientos
+        })
+
+    @staticmethod
+    def _hacienda_animal(connection, idanimal):
+        """Hacienda actual de un animal"""
+        if idanimal is None:
+            return None
+
+        return connection.execute(
+            select(Animal.idhacienda).where(Animal.idanimal == idanimal)
+        ).scalar()
+
+    # ===============================
+    # EVENTOS DE ANIMAL
+    # ===============================
+
+    @staticmethod
+    def _animal_insertado(mapper, connection, objeto):
+        ResumenService._sumar_animal(connection, ResumenService._valores_animal(objeto), 1)
+
+    @staticmethod
+    def _animal_actualizado(mapper, connection, objeto):
+        estado = inspect(objeto)
+        if not any(estado.attrs[campo].history.has_changes() for campo in ResumenService.CAMPOS_CUBO):
+            return
+
+        anteriores = ResumenService._valores_animal(objeto, anteriores=True)
+        ResumenService._sumar_animal(connection, anteriores, -1)
+        ResumenService._sumar_animal(connection, ResumenService._valores_animal(objeto), 1)
+
+        # Un animal trasladado se lleva sus vacunaciones y su nacimiento
+        if anteriores['idhacienda'] != objeto.idhacienda:
+            vacunaciones = connection.execute(
+                select(func.count(VacunacionAnimal.idvacunacion)).where(
+                    VacunacionAnimal.idanimal == objeto.idanimal
+                )
+            ).scalar()
+            nacimientos = connection.execute(
+                select(func.count(Nacimiento.idnacimiento)).where(
+                    Nacimiento.idanimal_cria == objeto.idanimal
+                )
+            ).scalar()
+
+            ResumenService.sumar_totales(connection, anteriores['idhacienda'], -vacunaciones, -nacimientos)
+            ResumenService.sumar_totales(connection, objeto.idhacienda, vacunaciones, nacimientos)
+
+    @staticmethod
+    def _animal_eliminado(mapper, connection, objeto):
+        ResumenService._sumar_animal(connection, ResumenService._valores_animal(objeto, anteriores=True), -1)
+
+    # ===============================
+    # EVENTOS DE NACIMIENTOS Y VACUNACIONES
+    # ===============================
+
+    @staticmethod
+    def _crear_manejadores_totales(atributo_animal, campo_total):
+        """Crea los manejadores que cuentan registros por la hacienda de su animal"""
+
+        def sumar(connection, idanimal, signo):
+            ResumenService.sumar_totales(
+                connection, ResumenService._hacienda_animal(connection, idanimal), **{campo_total: signo}
+            )
+
+        def al_insertar(mapper, connection, objeto):
+            # Una campaña de vacunación suma sus dosis de una vez (sumar_totales)
+            if inspect(objeto).session.info.get('vacunacion_masiva'):
+                return
+            sumar(connection, getattr(objeto, atributo_animal), 1)
+
+        def al_actualizar(mapper, connection, objeto):
+            historial = inspect(objeto).attrs[atributo_animal].history
+            if historial.deleted and historial.added:
+                sumar(connection, historial.deleted[0], -1)
+                sumar(connection, historial.added[0], 1)
+
+        def al_eliminar(mapper, connection, objeto):
+            historial = inspect(objeto).attrs[atributo_animal].history
+            idanimal = historial.deleted[0] if historial.deleted else getattr(objeto, atributo_animal)
+            sumar(connection, idanimal, -1)
+
+        return al_insertar, al_actualizar, al_eliminar
+
+    # ===============================
+    # CONTEOS POR FECHA
+    # ===============================
+
+    @staticmethod
+    def huellas_fechas(connection, animales):
+        """
+        Aporte de cada animal a los conteos por fecha, leído de las tablas base
+        {idanimal: (idhacienda, {(indicador, fecha): cantidad})}
+        """
+        if not animales:
+            return {}
+
+        huellas = {
+            idanimal: (idhacienda, {})
+            for idanimal, idhacienda in connection.execute(
+                select(Animal.idanimal, Animal.idhacienda).where(Animal.idanimal.in_(sorted(animales)))
+            )
+        }
+        if not huellas:
+            return huellas
+
+        coberturas = {}
+        for idanimal, proxima_dosis, cantidad in connection.execute(
+            select(
+                VacunacionAnimal.idanimal,
+                VacunacionAnimal.proxima_dosis,
+                func.count(VacunacionAnimal.idvacunacion)
+            ).where(VacunacionAnimal.idanimal.in_(sorted(huellas))).group_by(
+                VacunacionAnimal.idanimal, VacunacionAnimal.proxima_dosis
+            )
+        ):
+            if proxima_dosis is not None:
+                huellas[idanimal][1][('proxima_dosis', proxima_dosis)] = cantidad
+
+            # El animal está al día hasta la mayor de sus próximas dosis
+            cobertura = proxima_dosis or ResumenService.FECHA_SIN_VENCIMIENTO
+            coberturas[idanimal] = max(coberturas.get(idanimal, cobertura), cobertura)
+
+        # Un animal sin vacunaciones también cuenta como al día (misma regla del tablero)
+        for idanimal, (_, conteos) in huellas.items():
+            conteos[('al_dia_hasta', coberturas.get(idanimal, ResumenService.FECHA_SIN_VENCIMIENTO))] = 1
+
+        for idanimal, fecha, vacunas_aplicadas, cantidad in connection.execute(
+            select(
+                Nacimiento.idanimal_cria,
+                Nacimiento.fecha_nacimiento,
+                Nacimiento.vacunas_aplicadas,
+                func.count(Nacimiento.idnacimiento)
+            ).where(Nacimiento.idanimal_cria.in_(sorted(huellas))).group_by(
+                Nacimiento.idanimal_cria, Nacimiento.fecha_nacimiento, Nacimiento.vacunas_aplicadas
+            )
+        ):
+            conteos = huellas[idanimal][1]
+            conteos[('nacimiento', fecha)] = conteos.get(('nacimiento', fecha), 0) + cantidad
+            if vacunas_aplicadas is not None and not vacunas_aplicadas:
+                conteos[('cria_sin_vacunar', fecha)] = conteos.get(('cria_sin_vacunar', fecha), 0) + cantidad
+
+        return huellas
+
+    @staticmethod
+    def actualizar_fechas(connection, antes, despues, excluidas=()):
+        """Suma a los conteos por fecha la diferencia entre dos huellas de los mismos animales"""
+        diferencias = {}
+        for signo, huellas in ((-1, antes), (1, despues)):
+            for idhacienda, conteos in huellas.values():
+                if idhacienda is None or idhacienda in excluidas:
+                    continue
+                for (indicador, fecha), cantidad in conteos.items():
+                    clave = (idhacienda, indicador, fecha)
+                    diferencias[clave] = diferencias.get(clave, 0) + signo * cantidad
+
+        for (idhacienda, indicador, fecha), cantidad in sorted(diferencias.items()):
+            if cantidad:
+                ResumenService.sumar_incrementos(
+                    connection,
+                    ResumenHaciendaFecha.__table__,
+                    {'idhacienda': idhacienda, 'indicador': indicador, 'fecha': fecha},
+                    {'cantidad': cantidad}
+                )
+
+    @staticmethod
+    def _animales_del_flush(session):
+        """Animales cuyo aporte a los conteos por fecha puede cambiar en el flush en curso"""
+        animales = set()
+        modificados = [objeto for objeto in session.dirty if session.is_modified(objeto, include_collections=False)]
+
+        for objeto in list(session.new) + list(session.deleted) + modificados:
+            estado = inspect(objeto)
+
+            if isinstance(objeto, Animal):
+                # Un traslado se lleva sus conteos a la otra hacienda
+                if objeto in session.new or objeto in session.deleted or (
+                    estado.attrs['idhacienda'].history.has_changes()
+                ):
+                    if estado.dict.get('idanimal') is not None:
+                        animales.add(estado.dict['idanimal'])
+                continue
+
+            campos = ResumenService.CAMPOS_FECHAS.get(type(objeto))
+            if campos is None:
+                continue
+
+            atributo_animal, relacion, vigilados = campos
+            if estado.persistent and objeto not in session.deleted and not any(
+                estado.attrs[campo].history.has_changes() for campo in vigilados
+            ):
+                continue
+
+            historial = estado.attrs[atributo_animal].history
+            animales.update(
+                valor for valor in [*(historial.added or ()), *(historial.unchanged or ()), *(historial.deleted or ())]
+                if valor is not None
+            )
+
+            # Registro nuevo asociado por la relación: el id del animal aún no está en la columna
+            relacionado = estado.dict.get(relacion)
+            if relacionado is not None and inspect(relacionado).dict.get('idanimal') is not None:
+                animales.add(inspect(relacionado).dict['idanimal'])
+
+        return animales
+
+    @staticmethod
+    def _antes_del_flush(session, contexto, instancias):
+        """Toma la huella previa de los animales que el flush va a modificar"""
+        session.info.pop('resumen_fechas', None)
+        animales = ResumenService._animales_del_flush(session)
+        if animales:
+            session.info['resumen_fechas'] = ResumenService.huellas_fechas(session.connection(), animales)
+
+    @staticmethod
+    def _despues_del_flush(session, contexto):
+        """Aplica a los conteos por fecha la diferencia de huellas, dentro de la transacción del flush"""
+        antes = session.info.pop('resumen_fechas', {})
+        animales = set(antes) | ResumenService._animales_del_flush(session)
+        if not animales:
+            return
+
+        # El resumen de una hacienda eliminada ya se borró completo
+        excluidas = {objeto.idhacienda for objeto in session.deleted if isinstance(objeto, Hacienda)}
+
+        connection = session.connection()
+        ResumenService.actualizar_fechas(
+            connection, antes, ResumenService.huellas_fechas(connection, animales), excluidas
+        )
+
+    @staticmethod
+    def _hacienda_eliminada(mapper, connection, objeto):
+        """Borra el resumen de una hacienda eliminada"""
+        for tabla in ResumenService._tablas():
+            connection.execute(delete(tabla).where(tabla.c.idhacienda == objeto.idhacienda))
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos que mantienen el resumen sincronizado"""
+        if ResumenService._eventos_registrados:
+            return
+
+        # Cargar el valor anterior al asignar para poder restarlo del cubo
+        atributos = [getattr(Animal, campo) for campo in ResumenService.CAMPOS_CUBO]
+        atributos += [Nacimiento.idanimal_cria, VacunacionAnimal.idanimal]
+        for atributo in atributos:
+            event.listen(atributo, 'set', ResumenService._al_asignar, active_history=True)
+
+        event.listen(Animal, 'after_insert', ResumenService._animal_insertado)
+        event.listen(Animal, 'after_update', ResumenService._animal_actualizado)
+        event.listen(Animal, 'after_delete', ResumenService._animal_eliminado)
+
+        for modelo, atributo_animal, campo_total in (
+            (VacunacionAnimal, 'idanimal', 'vacunaciones'),
+            (Nacimiento, 'idanimal_cria', 'nacimientos')
+        ):
+            al_insertar, al_actualizar, al_eliminar = ResumenService._crear_manejadores_totales(
+                atributo_animal, campo_total
+            )
+            event.listen(modelo, 'after_insert', al_insertar)
+            event.listen(modelo, 'after_update', al_actualizar)
+            event.listen(modelo, 'after_delete', al_eliminar)
+
+        event.listen(Hacienda, 'after_delete', ResumenService._hacienda_eliminada)
+
+        event.listen(Session, 'before_flush', ResumenService._antes_del_flush)
+        event.listen(Session, 'after_flush', ResumenService._despues_del_flush)
+
+        ResumenService._eventos_registrados = True
+
+    # ===============================
+    # RECONCILIACIÓN
+    # ===============================
+
+    @staticmethod
+    def _tablas():
+        return (ResumenHaciendaConteo.__table__, ResumenHacienda.__table__, ResumenHaciendaFecha.__table__)
+
+    @staticmethod
+    def _bloquear_origen(hacienda_id):
+        """
+        Bloqueo compartido de las filas de origen de una hacienda (MySQL)
+        Se toma antes que las filas del resumen, en el mismo orden que las escrituras:
+        la reconstrucción espera a las transacciones en curso y las siguientes la esperan
+        a ella. SQLite ignora la cláusula y serializa las escrituras por su cuenta.
+        """
+        animal_de_la_hacienda = Animal.idhacienda == hacienda_id
+
+        db.session.execute(select(Animal.idanimal).where(animal_de_la_hacienda).with_for_update(read=True)).all()
+        db.session.execute(
+            select(VacunacionAnimal.idvacunacion).join(
+                Animal, Animal.idanimal == VacunacionAnimal.idanimal
+            ).where(animal_de_la_hacienda).with_for_update(read=True)
+        ).all()
+        db.session.execute(
+            select(Nacimiento.idnacimiento).join(
+                Animal, Animal.idanimal == Nacimiento.idanimal_cria
+            ).where(animal_de_la_hacienda).with_for_update(read=True)
+        ).all()
+
+    @staticmethod
+    def _consulta_conteos(hacienda_id):
+        return select(
+            Animal.idhacienda,
+            func.coalesce(Animal.idestado, 0),
+            Animal.sexo,
+            func.coalesce(Animal.raza, ''),
+            func.coalesce(Animal.preñada, False),
+            func.count(Animal.idanimal),
+            func.coalesce(func.sum(Animal.peso_actual), 0),
+            func.count(Animal.peso_actual)
+        ).where(Animal.idhacienda == hacienda_id).group_by(
+            Animal.idhacienda,
+            func.coalesce(Animal.idestado, 0),
+            Animal.sexo,
+            func.coalesce(Animal.raza, ''),
+            func.coalesce(Animal.preñada, False)
+        )
+
+    @staticmethod
+    def _consulta_totales(hacienda_id, ahora):
+        vacunaciones = select(func.count(VacunacionAnimal.idvacunacion)).join(
+            Animal, Animal.idanimal == VacunacionAnimal.idanimal
+        ).where(Animal.idhacienda == Hacienda.idhacienda).scalar_subquery()
+
+        nacimientos = select(func.count(Nacimiento.idnacimiento)).join(
+            Animal, Animal.idanimal == Nacimiento.idanimal_cria
+        ).where(Animal.idhacienda == Hacienda.idhacienda).scalar_subquery()
+
+        return select(
+            Hacienda.idhacienda, vacunaciones, nacimientos, literal(ahora, db.DateTime)
+        ).where(Hacienda.idhacienda == hacienda_id)
+
+    @staticmethod
+    def _consulta_fechas(hacienda_id):
+        """Los cuatro indicadores por fecha de una hacienda, en una sola consulta"""
+        animal_de_la_hacienda = Animal.idhacienda == hacienda_id
+
+        proximas_dosis = select(
+            Animal.idhacienda,
+            literal('proxima_dosis', db.String),
+            VacunacionAnimal.proxima_dosis,
+            func.count(VacunacionAnimal.idvacunacion)
+        ).join(
+            VacunacionAnimal, VacunacionAnimal.idanimal == Animal.idanimal
+        ).where(
+            animal_de_la_hacienda, VacunacionAnimal.proxima_dosis.isnot(None)
+        ).group_by(Animal.idhacienda, VacunacionAnimal.proxima_dosis)
+
+        coberturas = select(
+            Animal.idhacienda,
+            func.max(func.coalesce(
+                VacunacionAnimal.proxima_dosis, literal(ResumenService.FECHA_SIN_VENCIMIENTO, db.Date)
+            )).label('fecha')
+        ).outerjoin(
+            VacunacionAnimal, VacunacionAnimal.idanimal == Animal.idanimal
+        ).where(animal_de_la_hacienda).group_by(Animal.idhacienda, Animal.idanimal).subquery()
+
+        al_dia = select(
+            coberturas.c.idhacienda,
+            literal('al_dia_hasta', db.String),
+            coberturas.c.fecha,
+            func.count()
+        ).group_by(coberturas.c.idhacienda, coberturas.c.fecha)
+
+        def nacimientos(indicador, *condiciones):
+            return select(
+                Animal.idhacienda,
+                literal(indicador, db.String),
+                Nacimiento.fecha_nacimiento,
+                func.count(Nacimiento.idnacimiento)
+            ).join(
+                Nacimiento, Nacimiento.idanimal_cria == Animal.idanimal
+            ).where(animal_de_la_hacienda, *condiciones).group_by(Animal.idhacienda, Nacimiento.fecha_nacimiento)
+
+        return union_all(
+            proximas_dosis,
+            al_dia,
+            nacimientos('nacimiento'),
+            nacimientos('cria_sin_vacunar', Nacimiento.vacunas_aplicadas == False)
+        )
+
+    @staticmethod
+    def _reconstruir(hacienda_id, ahora):
+        """Reconstruye el resumen de una hacienda en una transacción (INSERT ... SELECT); 0 si no existe"""
+        try:
+            ResumenService._bloquear_origen(hacienda_id)
+
+            for tabla in ResumenService._tablas():
+                db.session.execute(delete(tabla).where(tabla.c.idhacienda == hacienda_id))
+
+            db.session.execute(insert(ResumenHaciendaConteo.__table__).from_select(
+                ['idhacienda', 'idestado', 'sexo', 'raza', 'preñada', 'cantidad', 'suma_peso', 'con_peso'],
+                ResumenService._consulta_conteos(hacienda_id)
+            ))
+            totales = db.session.execute(insert(ResumenHacienda.__table__).from_select(
+                ['idhacienda', 'total_vacunaciones', 'total_nacimientos', 'fecha_reconciliacion'],
+                ResumenService._consulta_totales(hacienda_id, ahora)
+            ))
+            db.session.execute(insert(ResumenHaciendaFecha.__table__).from_select(
+                ['idhacienda', 'indicador', 'fecha', 'cantidad'],
+                ResumenService._consulta_fechas(hacienda_id)
+            ))
+
+            db.session.commit()
+            return totales.rowcount
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def reconciliar(hacienda_id=None):
+        """
+        Recalcula el resumen desde las tablas base (todas las haciendas o una)
+        Corrige cualquier desviación por escrituras hechas por fuera del ORM. Cada hacienda
+        se reconstruye en su propia transacción después de bloquear sus filas de origen,
+        así un incremento concurrente queda incluido en la reconstrucción o se suma
+        después de ella, nunca se pierde.
+        """
+        ahora = datetime.utcnow()
+
+        if hacienda_id:
+            haciendas = [hacienda_id]
+        else:
+            haciendas = db.session.execute(select(Hacienda.idhacienda).order_by(Hacienda.idhacienda)).scalars().all()
+
+            # Filas de haciendas que ya no existen
+            try:
+                for tabla in ResumenService._tablas():
+                    db.session.execute(delete(tabla).where(tabla.c.idhacienda.notin_(select(Hacienda.idhacienda))))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        return sum(ResumenService._reconstruir(idhacienda, ahora) for idhacienda in haciendas)
+
+    @staticmethod
+    def reconciliar_si_vacio():
+        """Construye el resumen si está vacío (bases de datos existentes o recién migradas)"""
+        # Cada animal aporta al menos una fila a los conteos por fecha
+        if db.session.query(ResumenHacienda.idhacienda).first() is not None and (
+            db.session.query(ResumenHaciendaFecha.idhacienda).first() is not None
+            or db.session.query(Animal.idanimal).first() is None
+        ):
+            return 0
+        return ResumenService.reconciliar()
+
+    # ===============================
+    # LECTURA DEL RESUMEN
+    # ===============================
+
+    @staticmethod
+    def _conteos_del_dia(hacienda_id):
+        """Vacunas al día, próximas dosis, nacimientos del año y crías sin vacunar a la fecha de hoy"""
+        hoy = date.today()
+        fechas = ResumenHaciendaFecha
+
+        def sumar_si(indicador, *condiciones):
+            return func.coalesce(func.sum(case(
+                (and_(fechas.indicador == indicador, *condiciones), fechas.cantidad), else_=0
+            )), 0)
+
+        return db.session.execute(
+            select(
+                sumar_si('al_dia_hasta', fechas.fecha >= hoy).label('animales_al_dia'),
+                sumar_si(
+                    'proxima_dosis',
+                    fechas.fecha >= hoy,
+                    fechas.fecha <= hoy + timedelta(days=ResumenService.DIAS_PROXIMAS_VACUNACIONES)
+                ).label('proximas_vacunaciones'),
+                sumar_si('nacimiento', fechas.fecha >= date(hoy.year, 1, 1)).label('nacimientos_este_año'),
+                sumar_si(
+                    'cria_sin_vacunar',
+                    fechas.fecha <= hoy - timedelta(days=ResumenService.DIAS_VACUNACION_CRIAS)
+                ).label('crias_sin_vacunar')
+            ).where(fechas.idhacienda == hacienda_id)
+        ).mappings().one()
+
+    @staticmethod
+    def obtener_resumen(hacienda):
+        """
+        Resumen completo de una hacienda a partir del resumen materializado
+        Los conteos que dependen de la fecha de hoy suman rangos de los conteos por fecha
+        """
+        hacienda_id = hacienda.idhacienda
+
+        filas = db.session.execute(
+            select(
+                ResumenHaciendaConteo.idestado,
+                EstadoAnimal.nombre_estado,
+                ResumenHaciendaConteo.sexo,
+                ResumenHaciendaConteo.raza,
+                ResumenHaciendaConteo.preñada,
+                ResumenHaciendaConteo.cantidad,
+                ResumenHaciendaConteo.suma_peso,
+                ResumenHaciendaConteo.con_peso
+            ).outerjoin(
+                EstadoAnimal, EstadoAnimal.idestado == ResumenHaciendaConteo.idestado
+            ).where(
+                ResumenHaciendaConteo.idhacienda == hacienda_id,
+                ResumenHaciendaConteo.cantidad > 0
+            ).order_by(ResumenHaciendaConteo.idestado)
+        ).mappings().all()
+
+        totales = db.session.get(ResumenHacienda, hacienda_id)
+        datos = ResumenService._conteos_del_dia(hacienda_id)
+
+        total = machos = hembras = preñadas = con_peso = 0
+        suma_peso = 0
+        por_estado = {}
+        animales_por_estado = {}
+        activos = {'total': 0, 'machos': 0, 'hembras': 0, 'preñadas': 0}
+        razas = {}
+
+        for fila in filas:
+            cantidad = fila['cantidad']
+            es_hembra = fila['sexo'] == 'Hembra'
+            esta_preñada = es_hembra and fila['preñada']
+
+            total += cantidad
+            machos += cantidad if fila['sexo'] == 'Macho' else 0
+            hembras += cantidad if es_hembra else 0
+            preñadas += cantidad if esta_preñada else 0
+            suma_peso += fila['suma_peso'] or 0
+            con_peso += fila['con_peso']
+
+            por_estado[fila['idestado']] = por_estado.get(fila['idestado'], 0) + cantidad
+            if fila['nombre_estado'] is not None:
+                animales_por_estado[fila['nombre_estado']] = animales_por_estado.get(fila['nombre_estado'], 0) + cantidad
+
+            if fila['nombre_estado'] == 'Activo':
+                activos['total'] += cantidad
+                activos['machos'] += cantidad if fila['sexo'] == 'Macho' else 0
+                activos['hembras'] += cantidad if es_hembra else 0
+                activos['preñadas'] += cantidad if esta_preñada else 0
+
+                raza = fila['raza'] or 'Sin especificar'
+                razas[raza] = razas.get(raza, 0) + cantidad
+
+        resumen = hacienda.to_dict()
+
+        resumen['estadisticas_animales'] = {
+            'total_animales': total,
+            'machos': machos,
+            'hembras': hembras,
+            'preñadas': preñadas,
+            'peso_promedio': float(suma_peso) / con_peso if con_peso else 0,
+            'por_estado': [
+                {'idestado': estado or None, 'cantidad': cantidad}
+                for estado, cantidad in por_estado.items()
+            ],
+            'vacunacion': {
+                'total_vacunaciones': totales.total_vacunaciones if totales else 0,
+                'animales_al_dia': int(datos['animales_al_dia']),
+                'proximas_vacunaciones': int(datos['proximas_vacunaciones'])
+            },
+            'nacimientos': {
+                'total_nacimientos': totales.total_nacimientos if totales else 0,
+                'nacimientos_este_año': int(datos['nacimientos_este_año']),
+                'crias_pendientes_vacunacion': int(datos['crias_sin_vacunar'])
+            }
+        }
+        resumen['animales_por_estado'] = animales_por_estado
+        resumen['total_animales_activos'] = activos['total']
+
+        resumen['resumen_reproductivo'] = {
+            'machos': activos['machos'],
+            'hembras': activos['hembras'],
+            'hembras_preñadas': activos['preñadas'],
+            'hembras_vacias': activos['hembras'] - activos['preñadas'],
+            'porcentaje_preñez': round((activos['preñadas'] / activos['hembras'] * 100), 1) if activos['hembras'] > 0 else 0
+        }
+
+        resumen['distribucion_razas'] = [
+            {'raza': raza, 'cantidad': cantidad}
+            for raza, cantidad in razas.items()
+        ]
+
+        resumen['fecha_reconciliacion'] = (
+            totales.fecha_reconciliacion.isoformat() if totales and totales.fecha_reconciliacion else None
+        )
+
+        return resumen
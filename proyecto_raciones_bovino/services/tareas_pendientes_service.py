@@ -0,0 +1,489 @@
+from models import db, Animal, EstadoAnimal, Nacimiento, EstadoVacunacionAnimal, TareaPendiente
+from services.referencias_service import ReferenciasService
+from sqlalchemy import event, inspect, select, delete, insert, update, func, literal
+from datetime import date, timedelta
+
+class TareasPendientesService:
+    """
+    Índice de tareas pendientes por hacienda (tareas_pendientes)
+    Cada escritura que cambia un hecho de origen recalcula solo sus tareas en la misma
+    transacción del flush: la última dosis de cada vacuna (desde EstadoVacunacionService),
+    las crías sin vacunas iniciales, el parto esperado de las preñadas y la fecha desde
+    la que una hembra queda apta para monta. La lista de una hacienda es un rango del
+    índice (idhacienda, fecha_vencimiento, prioridad). Solo los animales activos tienen
+    tareas: al cambiar de estado se retiran o se reconstruyen todas las suyas.
+    """
+
+    DIAS_VACUNACION_CRIAS = 90      # Vacunas iniciales a los 3 meses
+    DIAS_GESTACION = 283            # Duración promedio de la gestación bovina
+    DIAS_DESCANSO_POSPARTO = 60     # Mínimo desde el último parto para monta
+    EDAD_MONTA = (2, 15)            # Años de edad reproductiva
+
+    # Campos del animal de los que dependen sus tareas de parto y monta
+    CAMPOS_REPRODUCTIVOS = ('sexo', 'fecha_nacimiento', 'ultimo_parto', 'preñada', 'fecha_preñez', 'idestado')
+    CAMPOS_NACIMIENTO = ('idanimal_cria', 'fecha_nacimiento', 'vacunas_aplicadas')
+
+    _eventos_registrados = False
+
+    # ===============================
+    # REGLAS
+    # ===============================
+
+    @staticmethod
+    def _sumar_años(fecha, años):
+        try:
+            return fecha.replace(year=fecha.year + años)
+        except ValueError:
+            # 29 de febrero en un año no bisiesto: cumple el 1 de marzo (como Animal.calcular_edad)
+            return date(fecha.year + años, 3, 1)
+
+    @staticmethod
+    def fecha_parto_esperado(preñada, fecha_preñez):
+        if not preñada or not fecha_preñez:
+            return None
+        return fecha_preñez + timedelta(days=TareasPendientesService.DIAS_GESTACION)
+
+    @staticmethod
+    def fecha_apta_monta(sexo, preñada, fecha_nacimiento, ultimo_parto, hoy=None):
+        """
+        Fecha desde la que una hembra vacía queda apta para monta (mismas reglas que
+        Animal.es_apta_para_monta), o None si no aplica o ya salió de la edad reproductiva
+        """
+        if sexo != 'Hembra' or preñada or not fecha_nacimiento:
+            return None
+
+        edad_minima, edad_maxima = TareasPendientesService.EDAD_MONTA
+        desde = TareasPendientesService._sumar_años(fecha_nacimiento, edad_minima)
+        hasta = TareasPendientesService._sumar_años(fecha_nacimiento, edad_maxima + 1)
+
+        if ultimo_parto:
+            desde = max(desde, ultimo_parto + timedelta(days=TareasPendientesService.DIAS_DESCANSO_POSPARTO))
+
+        if desde >= hasta or (hoy or date.today()) >= hasta:
+            return None
+        return desde
+
+    @staticmethod
+    def _estado_activo(connection=None):
+        """
+        Id del estado Activo; dentro del flush se consulta con la conexión de la transacción
+        (recargar el registro de referencias abriría otra conexión en medio del flush)
+        """
+        if connection is None:
+            return ReferenciasService.id_estado('Activo')
+        return connection.execute(
+            select(EstadoAnimal.idestado).where(EstadoAnimal.nombre_estado == 'Activo')
+        ).scalar()
+
+    @staticmethod
+    def _fila(idanimal, idhacienda, tipo, fecha, referencia=0):
+        return {
+            'idanimal': idanimal,
+            'idhacienda': idhacienda,
+            'tipo': tipo,
+            'referencia': referencia,
+            'fecha_vencimiento': fecha,
+            'prioridad': TareaPendiente.TIPOS[tipo][0]
+        }
+
+    @staticmethod
+    def _tareas_animal(idanimal, idhacienda, sexo, preñada, fecha_nacimiento, ultimo_parto, fecha_preñez):
+        """Tareas de parto y monta de un animal"""
+        filas = []
+
+        parto = TareasPendientesService.fecha_parto_esperado(preñada, fecha_preñez)
+        if parto:
+            filas.append(TareasPendientesService._fila(idanimal, idhacienda, 'parto_esperado', parto))
+
+        monta = TareasPendientesService.fecha_apta_monta(sexo, preñada, fecha_nacimiento, ultimo_parto)
+        if monta:
+            filas.append(TareasPendientesService._fila(idanimal, idhacienda, 'apta_monta', monta))
+
+        return filas
+
+    # ===============================
+    # MANTENIMIENTO EN ESCRITURA
+    # ===============================
+
+    @staticmethod
+    def _reemplazar(connection, condiciones, filas):
+        tabla = TareaPendiente.__table__
+        connection.execute(delete(tabla).where(*condiciones))
+        if filas:
+            connection.execute(insert(tabla), filas)
+
+    @staticmethod
+    def _hacienda_animal(connection, idanimal):
+        """Hacienda del animal, o None si no existe o no está activo (sin tareas)"""
+        return connection.execute(
+            select(Animal.idhacienda).join(
+                EstadoAnimal, EstadoAnimal.idestado == Animal.idestado
+            ).where(
+                Animal.idanimal == idanimal,
+                EstadoAnimal.nombre_estado == 'Activo'
+            )
+        ).scalar()
+
+    @staticmethod
+    def sincronizar_vacuna(connection, idanimal, idvacuna, proxima_dosis):
+        """Tarea de la próxima dosis de un par (animal, vacuna); la llama EstadoVacunacionService"""
+        tabla = TareaPendiente.__table__
+        filas = []
+
+        if proxima_dosis is not None:
+            idhacienda = TareasPendientesService._hacienda_animal(connection, idanimal)
+            if idhacienda is not None:
+                filas.append(TareasPendientesService._fila(
+                    idanimal, idhacienda, 'dosis_vacuna', proxima_dosis, idvacuna
+                ))
+
+        TareasPendientesService._reemplazar(connection, (
+            tabla.c.idanimal == idanimal,
+            tabla.c.tipo == 'dosis_vacuna',
+            tabla.c.referencia == idvacuna
+        ), filas)
+
+    @staticmethod
+    def sincronizar_vacunas(connection, idanimales, idvacuna):
+        """
+        Tareas de próxima dosis de varios pares de una vacuna, desde su estado de vacunación
+        ya recalculado (EstadoVacunacionService.recalcular_pares): un DELETE y un INSERT ... SELECT
+        """
+        tabla = TareaPendiente.__table__
+
+        connection.execute(delete(tabla).where(
+            tabla.c.tipo == 'dosis_vacuna',
+            tabla.c.referencia == idvacuna,
+            tabla.c.idanimal.in_(idanimales)
+        ))
+        connection.execute(insert(tabla).from_select(
+            ['idanimal', 'idhacienda', 'tipo', 'referencia', 'fecha_vencimiento', 'prioridad'],
+            select(
+                EstadoVacunacionAnimal.idanimal,
+                Animal.idhacienda,
+                literal('dosis_vacuna'),
+                EstadoVacunacionAnimal.idvacuna,
+                EstadoVacunacionAnimal.proxima_dosis,
+                literal(TareaPendiente.TIPOS['dosis_vacuna'][0])
+            ).join(
+                Animal, Animal.idanimal == EstadoVacunacionAnimal.idanimal
+            ).where(
+                EstadoVacunacionAnimal.idvacuna == idvacuna,
+                EstadoVacunacionAnimal.idanimal.in_(idanimales),
+                EstadoVacunacionAnimal.proxima_dosis.isnot(None),
+                Animal.idestado == TareasPendientesService._estado_activo(connection)
+            )
+        ))
+
+    @staticmethod
+    def _sincronizar_cria(connection, nacimiento, eliminado=False):
+        tabla = TareaPendiente.__table__
+        estado = inspect(nacimiento)
+
+        # La cría actual y la anterior (si el nacimiento cambió de cría)
+        historial = estado.attrs['idanimal_cria'].history
+        crias = {nacimiento.idanimal_cria, *(historial.deleted or ())} - {None}
+
+        filas = []
+        if not eliminado and nacimiento.vacunas_aplicadas is False and nacimiento.fecha_nacimiento:
+            idhacienda = TareasPendientesService._hacienda_animal(connection, nacimiento.idanimal_cria)
+            if idhacienda is not None:
+                filas.append(TareasPendientesService._fila(
+                    nacimiento.idanimal_cria,
+                    idhacienda,
+                    'vacuna_cria',
+                    nacimiento.fecha_nacimiento + timedelta(days=TareasPendientesService.DIAS_VACUNACION_CRIAS),
+                    nacimiento.idnacimiento
+                ))
+
+        TareasPendientesService._reemplazar(connection, (
+            tabla.c.idanimal.in_(crias),
+            tabla.c.tipo == 'vacuna_cria',
+            tabla.c.referencia == nacimiento.idnacimiento
+        ), filas)
+
+    @staticmethod
+    def _tareas_vacunas(connection, idanimal, idhacienda):
+        """Próximas dosis y vacunas iniciales pendientes de un animal"""
+        filas = [
+            TareasPendientesService._fila(idanimal, idhacienda, 'dosis_vacuna', proxima_dosis, idvacuna)
+            for idvacuna, proxima_dosis in connection.execute(
+                select(EstadoVacunacionAnimal.idvacuna, EstadoVacunacionAnimal.proxima_dosis).where(
+                    EstadoVacunacionAnimal.idanimal == idanimal,
+                    EstadoVacunacionAnimal.proxima_dosis.isnot(None)
+                )
+            )
+        ]
+
+        filas += [
+            TareasPendientesService._fila(
+                idanimal,
+                idhacienda,
+                'vacuna_cria',
+                fecha_nacimiento + timedelta(days=TareasPendientesService.DIAS_VACUNACION_CRIAS),
+                idnacimiento
+            )
+            for idnacimiento, fecha_nacimiento in connection.execute(
+                select(Nacimiento.idnacimiento, Nacimiento.fecha_nacimiento).where(
+                    Nacimiento.idanimal_cria == idanimal,
+                    Nacimiento.vacunas_aplicadas == False,
+                    Nacimiento.fecha_nacimiento.isnot(None)
+                )
+            )
+        ]
+        return filas
+
+    @staticmethod
+    def _sincronizar_animal(connection, animal, cambio_estado=False):
+        """
+        Tareas de parto y monta del animal; si cambió de estado, todas sus tareas
+        (un animal vendido, muerto o inactivo no tiene ninguna)
+        """
+        tabla = TareaPendiente.__table__
+        filas = []
+
+        if animal.idestado == TareasPendientesService._estado_activo(connection):
+            filas = TareasPendientesService._tareas_animal(
+                animal.idanimal,
+                animal.idhacienda,
+                animal.sexo,
+                animal.preñada,
+                animal.fecha_nacimiento,
+                animal.ultimo_parto,
+                animal.fecha_preñez
+            )
+            if cambio_estado:
+                filas += TareasPendientesService._tareas_vacunas(connection, animal.idanimal, animal.idhacienda)
+
+        condiciones = [tabla.c.idanimal == animal.idanimal]
+        if not cambio_estado:
+            condiciones.append(tabla.c.tipo.in_(('parto_esperado', 'apta_monta')))
+
+        TareasPendientesService._reemplazar(connection, condiciones, filas)
+
+    @staticmethod
+    def _animal_insertado(mapper, connection, objeto):
+        TareasPendientesService._sincronizar_animal(connection, objeto)
+
+    @staticmethod
+    def _animal_actualizado(mapper, connection, objeto):
+        estado = inspect(objeto)
+
+        # Un animal que cambia de hacienda se lleva todas sus tareas
+        if estado.attrs['idhacienda'].history.has_changes():
+            tabla = TareaPendiente.__table__
+            connection.execute(
+                update(tabla).where(tabla.c.idanimal == objeto.idanimal).values(idhacienda=objeto.idhacienda)
+            )
+
+        if any(estado.attrs[campo].history.has_changes() for campo in TareasPendientesService.CAMPOS_REPRODUCTIVOS):
+            TareasPendientesService._sincronizar_animal(
+                connection, objeto, cambio_estado=estado.attrs['idestado'].history.has_changes()
+            )
+
+    @staticmethod
+    def _animal_eliminado(mapper, connection, objeto):
+        tabla = TareaPendiente.__table__
+        connection.execute(delete(tabla).where(tabla.c.idanimal == objeto.idanimal))
+
+    @staticmethod
+    def _nacimiento_escrito(mapper, connection, objeto):
+        TareasPendientesService._sincronizar_cria(connection, objeto)
+
+    @staticmethod
+    def _nacimiento_actualizado(mapper, connection, objeto):
+        estado = inspect(objeto)
+        if any(estado.attrs[campo].history.has_changes() for campo in TareasPendientesService.CAMPOS_NACIMIENTO):
+            TareasPendientesService._sincronizar_cria(connection, objeto)
+
+    @staticmethod
+    def _nacimiento_eliminado(mapper, connection, objeto):
+        TareasPendientesService._sincronizar_cria(connection, objeto, eliminado=True)
+
+    @staticmethod
+    def _al_asignar(objeto, valor, anterior, iniciador):
+        """Solo activa el historial completo del atributo"""
+        return valor
+
+    @staticmethod
+    def registrar_eventos():
+        """Registra los eventos de animales y nacimientos (las vacunas llegan por EstadoVacunacionService)"""
+        if TareasPendientesService._eventos_registrados:
+            return
+
+        event.listen(Nacimiento.idanimal_cria, 'set', TareasPendientesService._al_asignar, active_history=True)
+
+        event.listen(Animal, 'after_insert', TareasPendientesService._animal_insertado)
+        event.listen(Animal, 'after_update', TareasPendientesService._animal_actualizado)
+        event.listen(Animal, 'after_delete', TareasPendientesService._animal_eliminado)
+        event.listen(Nacimiento, 'after_insert', TareasPendientesService._nacimiento_escrito)
+        event.listen(Nacimiento, 'after_update', TareasPendientesService._nacimiento_actualizado)
+        event.listen(Nacimiento, 'after_delete', TareasPendientesService._nacimiento_eliminado)
+
+        TareasPendientesService._eventos_registrados = True
+
+    # ===============================
+    # RECONCILIACIÓN
+    # ===============================
+
+    @staticmethod
+    def reconciliar():
+        """
+        Reconstruye el índice completo desde las tablas de origen
+        Corrige escrituras hechas por fuera del ORM y retira las hembras que salieron
+        de la edad reproductiva (tarea diaria). Solo animales activos.
+        """
+        try:
+            activo = Animal.idestado == TareasPendientesService._estado_activo()
+            filas = [
+                TareasPendientesService._fila(idanimal, idhacienda, 'dosis_vacuna', proxima_dosis, idvacuna)
+                for idanimal, idvacuna, proxima_dosis, idhacienda in db.session.execute(
+                    select(
+                        EstadoVacunacionAnimal.idanimal,
+                        EstadoVacunacionAnimal.idvacuna,
+                        EstadoVacunacionAnimal.proxima_dosis,
+                        Animal.idhacienda
+                    ).join(
+                        Animal, Animal.idanimal == EstadoVacunacionAnimal.idanimal
+                    ).where(EstadoVacunacionAnimal.proxima_dosis.isnot(None), activo)
+                )
+            ]
+
+            filas += [
+                TareasPendientesService._fila(
+                    idanimal_cria,
+                    idhacienda,
+                    'vacuna_cria',
+                    fecha_nacimiento + timedelta(days=TareasPendientesService.DIAS_VACUNACION_CRIAS),
+                    idnacimiento
+                )
+                for idnacimiento, idanimal_cria, fecha_nacimiento, idhacienda in db.session.execute(
+                    select(
+                        Nacimiento.idnacimiento,
+                        Nacimiento.idanimal_cria,
+                        Nacimiento.fecha_nacimiento,
+                        Animal.idhacienda
+                    ).join(
+                        Animal, Animal.idanimal == Nacimiento.idanimal_cria
+                    ).where(Nacimiento.vacunas_aplicadas == False, activo)
+                )
+            ]
+
+            # Parto y monta solo aplican a hembras
+            for fila in db.session.execute(
+                select(
+                    Animal.idanimal,
+                    Animal.idhacienda,
+                    Animal.sexo,
+                    Animal.preñada,
+                    Animal.fecha_nacimiento,
+                    Animal.ultimo_parto,
+                    Animal.fecha_preñez
+                ).where(Animal.sexo == 'Hembra', activo)
+            ):
+                filas += TareasPendientesService._tareas_animal(*fila)
+
+            db.session.execute(delete(TareaPendiente.__table__))
+            if filas:
+                db.session.execute(insert(TareaPendiente.__table__), filas)
+
+            db.session.commit()
+            return len(filas)
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def reconciliar_si_vacio():
+        """Construye el índice si está vacío y ya hay animales (bases de datos existentes)"""
+        if db.session.query(TareaPendiente.idanimal).first() is not None:
+            return 0
+        if db.session.query(Animal.idanimal).first() is None:
+            return 0
+        return TareasPendientesService.reconciliar()
+
+    # ===============================
+    # CONSULTA
+    # ===============================
+
+    @staticmethod
+    def _item(tarea, hierro, sexo):
+        item = tarea.to_dict()
+        item['animal'] = {'hierro': hierro, 'sexo': sexo}
+
+        if tarea.tipo == 'dosis_vacuna':
+            item['vacuna'] = ReferenciasService.nombre('catalogo_vacunas', tarea.referencia)
+
+        return item
+
+    @staticmethod
+    def listar_por_hacienda(hacienda_id, desde=None, hasta=None, tipo=None, pagina=1, por_pagina=50):
+        """
+        Tareas de una hacienda que vencen en una ventana, por fecha y prioridad
+        Sin 'desde' incluye todas las atrasadas; sin 'hasta', los próximos 7 días.
+        """
+        try:
+            if tipo is not None and tipo not in TareaPendiente.TIPOS:
+                return {
+                    'error': f'Tipo de tarea no válido. Opciones: {", ".join(TareaPendiente.TIPOS)}',
+                    'status': 'error',
+                    'code': 'INVALID_TYPE'
+                }, 400
+
+            hoy = date.today()
+            hasta = hasta or hoy + timedelta(days=7)
+            if desde and desde > hasta:
+                return {
+                    'error': 'La fecha inicial no puede ser posterior a la final',
+                    'status': 'error',
+                    'code': 'INVALID_RANGE'
+                }, 400
+
+            condiciones = [
+                TareaPendiente.idhacienda == hacienda_id,
+                TareaPendiente.fecha_vencimiento <= hasta
+            ]
+            if desde:
+                condiciones.append(TareaPendiente.fecha_vencimiento >= desde)
+
+            # Conteo por tipo sobre el mismo rango del índice
+            por_tipo = dict(db.session.execute(
+                select(TareaPendiente.tipo, func.count()).where(*condiciones).group_by(TareaPendiente.tipo)
+            ).all())
+
+            if tipo is not None:
+                condiciones.append(TareaPendiente.tipo == tipo)
+            total = por_tipo.get(tipo, 0) if tipo is not None else sum(por_tipo.values())
+
+            filas = db.session.query(TareaPendiente, Animal.hierro, Animal.sexo).join(
+                Animal, Animal.idanimal == TareaPendiente.idanimal
+            ).filter(*condiciones).order_by(
+                TareaPendiente.fecha_vencimiento,
+                TareaPendiente.prioridad,
+                TareaPendiente.idanimal,
+                TareaPendiente.tipo,
+                TareaPendiente.referencia
+            ).offset((pagina - 1) * por_pagina).limit(por_pagina).all()
+
+            return {
+                'tareas': [TareasPendientesService._item(*fila) for fila in filas],
+                'por_tipo': {nombre: por_tipo.get(nombre, 0) for nombre in TareaPendiente.TIPOS},
+                'hacienda_id': hacienda_id,
+                'desde': desde.isoformat() if desde else None,
+                'hasta': hasta.isoformat(),
+                'total': total,
+                'pagina_actual': pagina,
+                'total_paginas': -(-total // por_pagina),
+                'por_pagina': por_pagina,
+                'tiene_siguiente': pagina * por_pagina < total,
+                'tiene_anterior': pagina > 1,
+                'status': 'success'
+            }, 200
+
+        except Exception as e:
+            return {
+                'error': f'Error al listar tareas pendientes: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
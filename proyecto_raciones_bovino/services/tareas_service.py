@@ -0,0 +1,143 @@
+from models import db, TurnoTarea
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+import threading
+import time
+
+class TareasService:
+    """
+    Planificador de tareas periódicas en segundo plano
+    Cada tarea corre en un hilo daemon dentro del contexto de la aplicación
+    """
+
+    _tareas = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def registrar(app, nombre, intervalo_segundos, funcion, ejecutar_al_iniciar=False, un_proceso=False):
+        """
+        Registra y arranca una tarea periódica
+        un_proceso=True: con varios procesos la ejecuta uno solo por intervalo (turnos_tareas)
+
+        La tarea no se arranca si TAREAS_PERIODICAS_HABILITADAS está desactivado (tests)
+        o si ya existe una con el mismo nombre. create_app tampoco las arranca en los
+        comandos de la CLI distintos de `flask run` ni en el proceso padre del recargador.
+        """
+        if not app.config.get('TAREAS_PERIODICAS_HABILITADAS', True):
+            return False
+
+        with TareasService._lock:
+            if nombre in TareasService._tareas:
+                return False
+
+            detener = threading.Event()
+            estado = {
+                'nombre': nombre,
+                'intervalo_segundos': intervalo_segundos,
+                'ultima_ejecucion': None,
+                'ultima_duracion': None,
+                'ultimo_error': None,
+                'ejecuciones': 0,
+                'un_proceso': un_proceso,
+                'detener': detener
+            }
+
+            hilo = threading.Thread(
+                target=TareasService._ciclo,
+                args=(app, estado, funcion, ejecutar_al_iniciar),
+                name=f'tarea-{nombre}',
+                daemon=True
+            )
+            estado['hilo'] = hilo
+            TareasService._tareas[nombre] = estado
+
+        hilo.start()
+        return True
+
+    @staticmethod
+    def _ciclo(app, estado, funcion, ejecutar_al_iniciar):
+        """Ejecuta la tarea cada intervalo hasta que se detenga"""
+        if not ejecutar_al_iniciar and estado['detener'].wait(estado['intervalo_segundos']):
+            return
+
+        while True:
+            inicio = time.monotonic()
+            ejecutada = False
+            with app.app_context():
+                try:
+                    # Con un_proceso, los procesos sin turno saltan esta ejecución
+                    if not estado['un_proceso'] or TareasService._tomar_turno(estado):
+                        ejecutada = True
+                        funcion()
+                    estado['ultimo_error'] = None
+                except Exception as e:
+                    estado['ultimo_error'] = str(e)
+                    print(f"❌ Error en la tarea periódica {estado['nombre']}: {e}")
+                finally:
+                    # Liberar la conexión del hilo
+                    db.session.remove()
+
+            if ejecutada:
+                estado['ultima_ejecucion'] = time.time()
+                estado['ultima_duracion'] = time.monotonic() - inicio
+                estado['ejecuciones'] += 1
+
+            if estado['detener'].wait(estado['intervalo_segundos']):
+                return
+
+    @staticmethod
+    def _tomar_turno(estado):
+        """
+        True si este proceso ejecuta la tarea en este intervalo
+        Adelanta la marca de turnos_tareas solo si la última ejecución (de cualquier
+        proceso) tiene al menos un intervalo; el UPDATE condicional es atómico.
+        """
+        tabla = TurnoTarea.__table__
+        ahora = time.time()
+
+        try:
+            with db.engine.begin() as conexion:
+                resultado = conexion.execute(
+                    update(tabla).where(
+                        tabla.c.nombre == estado['nombre'],
+                        tabla.c.ejecutada_en <= ahora - estado['intervalo_segundos']
+                    ).values(ejecutada_en=ahora)
+                )
+                if resultado.rowcount:
+                    return True
+
+                if conexion.execute(select(tabla.c.nombre).where(tabla.c.nombre == estado['nombre'])).first():
+                    return False
+
+                conexion.execute(insert(tabla).values(nombre=estado['nombre'], ejecutada_en=ahora))
+                return True
+        except IntegrityError:
+            # Otro proceso creó la marca al mismo tiempo: el turno es suyo
+            return False
+
+    @staticmethod
+    def detener(nombre=None):
+        """Detiene una tarea (o todas)"""
+        with TareasService._lock:
+            nombres = [nombre] if nombre else list(TareasService._tareas.keys())
+            for clave in nombres:
+                estado = TareasService._tareas.pop(clave, None)
+                if estado:
+                    estado['detener'].set()
+
+    @staticmethod
+    def obtener_estado():
+        """Estado de las tareas registradas (para diagnóstico)"""
+        with TareasService._lock:
+            return [
+                {
+                    'nombre': estado['nombre'],
+                    'intervalo_segundos': estado['intervalo_segundos'],
+                    'ultima_ejecucion': estado['ultima_ejecucion'],
+                    'ultima_duracion': estado['ultima_duracion'],
+                    'ultimo_error': estado['ultimo_error'],
+                    'ejecuciones': estado['ejecuciones'],
+                    'activa': estado['hilo'].is_alive()
+                }
+                for estado in TareasService._tareas.values()
+            ]
@@ -1,5 +1,14 @@
-from models import db, Animal, CatalogoVacuna, VacunacionAnimal, Usuario
-from datetime import datetime, date
+from models import db, Animal, Hacienda, CatalogoVacuna, VacunacionAnimal, EstadoVacunacionAnimal, IndiceBusqueda
+from services.cache_service import CacheService
+from services.referencias_service import ReferenciasService
+from services.alertas_service import AlertasService
+from services.auth_service import AuthService
+from services.inventario_vacunas_service import InventarioVacunasService, StockInsuficiente
+from services.estado_vacunacion_service import EstadoVacunacionService
+from services.resumen_service import ResumenService
+from flask import current_app
+from sqlalchemy import select, func, case, and_, literal, exists
+from datetime import datetime, date, timedelta
 import re
 
 class VacunacionService:
@@ -17,7 +26,7 @@ class VacunacionService:
         """Crea una nueva vacuna en el catálogo"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden crear vacunas',
@@ -86,10 +95,7 @@ class VacunacionService:
                 if filtros.get('buscar'):
                     termino = filtros['buscar']
                     query = query.filter(
-                        db.or_(
-                            CatalogoVacuna.nombre_vacuna.ilike(f'%{termino}%'),
-                            CatalogoVacuna.descripcion.ilike(f'%{termino}%')
-                        )
+                        CatalogoVacuna.idvacuna.in_(IndiceBusqueda.subconsulta_ids('vacuna', termino))
                     )
             
             # Ordenar por nombre
@@ -125,7 +131,7 @@ class VacunacionService:
         """Actualiza una vacuna del catálogo"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden actualizar vacunas',
@@ -179,7 +185,7 @@ class VacunacionService:
         """Registra una nueva vacunación"""
         try:
             # Verificar permisos del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
                 return {
                     'error': 'Solo administradores e instructores pueden registrar vacunaciones',
@@ -235,13 +241,30 @@ class VacunacionService:
                     'code': 'DUPLICATE_VACCINATION'
                 }, 409
             
+            # Inventario: la dosis sale del lote que vence primero (o del lote indicado)
+            asignacion = None
+            if datos.get('idlote') or InventarioVacunasService.usa_inventario(animal.idhacienda, vacuna.idvacuna):
+                try:
+                    asignacion = InventarioVacunasService.asignar(
+                        animal.idhacienda, vacuna.idvacuna, 1, fecha_aplicacion, datos.get('idlote')
+                    )[0]
+                except StockInsuficiente as e:
+                    db.session.rollback()
+                    return {
+                        'error': f'No hay dosis vigentes de {vacuna.nombre_vacuna} en el inventario de la hacienda',
+                        'status': 'error',
+                        'code': 'INSUFFICIENT_STOCK',
+                        'disponibles': e.disponibles
+                    }, 409
+            
             # Crear la vacunación
             vacunacion = VacunacionAnimal(
                 idanimal=datos['idanimal'],
                 idvacuna=datos['idvacuna'],
                 fecha_aplicacion=fecha_aplicacion,
                 dosis=str(datos.get('dosis', '')).strip() or None,
-                lote_vacuna=str(datos.get('lote_vacuna', '')).strip() or None,
+                lote_vacuna=asignacion['codigo'] if asignacion else (str(datos.get('lote_vacuna', '')).strip() or None),
+                idlote=asignacion['idlote'] if asignacion else None,
                 veterinario=str(datos.get('veterinario', '')).strip() or None,
                 observaciones=str(datos.get('observaciones', '')).strip() or None
             )
@@ -259,12 +282,16 @@ class VacunacionService:
             db.session.add(vacunacion)
             db.session.commit()
             
-            return {
+            resultado = {
                 'message': f'Vacunación de {animal.hierro} con {vacuna.nombre_vacuna} registrada exitosamente',
                 'status': 'success',
                 'vacunacion': vacunacion.to_dict(),
                 'registrado_por': f'{usuario.nombres} {usuario.apellidos}'
-            }, 201
+            }
+            if asignacion:
+                resultado['alertas_stock'] = InventarioVacunasService.alertas_tras_asignar(animal.idhacienda, vacuna.idvacuna)
+            
+            return resultado, 201
             
         except Exception as e:
             db.session.rollback()
@@ -274,6 +301,196 @@ class VacunacionService:
                 'code': 'INTERNAL_ERROR'
             }, 500
     
+    @staticmethod
+    def registrar_campaña(datos, usuario_id):
+        """
+        Registra una jornada de vacunación masiva en una hacienda
+        Los animales se validan y los duplicados se descartan con una consulta cada uno;
+        las dosis se asignan de los lotes (FEFO) con un solo UPDATE y todo se confirma
+        en una transacción: si no hay stock para todas, no se registra ninguna. Las
+        vacunaciones se insertan en un solo flush sin los eventos por fila; el estado de
+        vacunación, las tareas pendientes y los totales se actualizan después en bloque.
+        """
+        try:
+            usuario = AuthService.usuario_actual(usuario_id)
+            if not usuario or not (usuario.es_administrador() or usuario.es_instructor()):
+                return {
+                    'error': 'Solo administradores e instructores pueden registrar vacunaciones',
+                    'status': 'error',
+                    'code': 'ACCESS_DENIED'
+                }, 403
+            
+            # Los datos comunes se validan como los de una vacunación individual (los animales, aparte)
+            errores = VacunacionAnimal.validar_datos_vacunacion({**datos, 'idanimal': 'campaña'})
+            if not datos.get('idhacienda'):
+                errores.append('Idhacienda es requerido')
+            
+            animales_pedidos = datos.get('animales')
+            if animales_pedidos is not None and (
+                not isinstance(animales_pedidos, list)
+                or not all(isinstance(idanimal, int) for idanimal in animales_pedidos)
+            ):
+                errores.append('Animales debe ser una lista de ids')
+            
+            if errores:
+                return {
+                    'error': 'Errores de validación',
+                    'status': 'error',
+                    'code': 'VALIDATION_ERROR',
+                    'details': errores
+                }, 400
+            
+            hacienda_id = datos['idhacienda']
+            if not db.session.get(Hacienda, hacienda_id):
+                return {
+                    'error': 'Hacienda no encontrada',
+                    'status': 'error',
+                    'code': 'HACIENDA_NOT_FOUND'
+                }, 404
+            
+            vacuna = db.session.get(CatalogoVacuna, datos['idvacuna'])
+            if not vacuna:
+                return {
+                    'error': 'Vacuna no encontrada',
+                    'status': 'error',
+                    'code': 'VACCINE_NOT_FOUND'
+                }, 404
+            
+            if not vacuna.activo:
+                return {
+                    'error': 'La vacuna no está activa',
+                    'status': 'error',
+                    'code': 'VACCINE_INACTIVE'
+                }, 400
+            
+            fecha_aplicacion = datos['fecha_aplicacion']
+            if isinstance(fecha_aplicacion, str):
+                fecha_aplicacion = datetime.strptime(fecha_aplicacion, '%Y-%m-%d').date()
+            
+            # Animales de la hacienda: los indicados o todos los activos
+            condiciones = [Animal.idhacienda == hacienda_id]
+            if animales_pedidos is None:
+                condiciones.append(Animal.idestado == ReferenciasService.id_estado('Activo'))
+            else:
+                condiciones.append(Animal.idanimal.in_(set(animales_pedidos)))
+            
+            animales = dict(db.session.execute(
+                select(Animal.idanimal, Animal.hierro).where(*condiciones).order_by(Animal.idanimal)
+            ).all())
+            no_encontrados = sorted(set(animales_pedidos or ()) - set(animales))
+            
+            maximo = current_app.config.get('VACUNACION_CAMPANA_MAX_ANIMALES', 5000)
+            if len(animales) > maximo:
+                return {
+                    'error': f'Una campaña admite como máximo {maximo} animales',
+                    'status': 'error',
+                    'code': 'TOO_MANY_ANIMALS'
+                }, 400
+            
+            # Misma regla que verificar_duplicado: la vacuna ya aplicada 30 días antes o después
+            duplicados = set(db.session.execute(
+                select(VacunacionAnimal.idanimal).where(
+                    VacunacionAnimal.idanimal.in_(animales),
+                    VacunacionAnimal.idvacuna == vacuna.idvacuna,
+                    VacunacionAnimal.fecha_aplicacion >= fecha_aplicacion - timedelta(days=30),
+                    VacunacionAnimal.fecha_aplicacion <= fecha_aplicacion + timedelta(days=30)
+                ).distinct()
+            ).scalars()) if animales else set()
+            
+            a_vacunar = [idanimal for idanimal in animales if idanimal not in duplicados]
+            if not a_vacunar:
+                return {
+                    'error': 'No hay animales por vacunar en la campaña',
+                    'status': 'error',
+                    'code': 'NO_ANIMALS',
+                    'omitidos_por_duplicado': sorted(duplicados),
+                    'no_encontrados': no_encontrados
+                }, 400
+            
+            # Dosis de los lotes que vencen primero, en un solo UPDATE
+            asignaciones = []
+            if datos.get('idlote') or InventarioVacunasService.usa_inventario(hacienda_id, vacuna.idvacuna):
+                try:
+                    asignaciones = InventarioVacunasService.asignar(
+                        hacienda_id, vacuna.idvacuna, len(a_vacunar), fecha_aplicacion, datos.get('idlote')
+                    )
+                except StockInsuficiente as e:
+                    db.session.rollback()
+                    return {
+                        'error': f'Stock insuficiente de {vacuna.nombre_vacuna}: {e.disponibles} dosis vigentes para {e.solicitadas} animales',
+                        'status': 'error',
+                        'code': 'INSUFFICIENT_STOCK',
+                        'disponibles': e.disponibles
+                    }, 409
+            
+            if datos.get('proxima_dosis'):
+                proxima_dosis = datos['proxima_dosis']
+                if isinstance(proxima_dosis, str):
+                    proxima_dosis = datetime.strptime(proxima_dosis, '%Y-%m-%d').date()
+            else:
+                proxima_dosis = fecha_aplicacion + timedelta(days=vacuna.frecuencia_dias) if vacuna.frecuencia_dias else None
+            
+            dosis = str(datos.get('dosis', '')).strip() or None
+            veterinario = str(datos.get('veterinario', '')).strip() or None
+            observaciones = str(datos.get('observaciones', '')).strip() or None
+            lote_texto = str(datos.get('lote_vacuna', '')).strip() or None
+            
+            # Las vacunaciones pasan por el ORM (bus de invalidación, versiones y resumen por
+            # fecha se calculan por flush), pero con vacunacion_masiva los eventos por fila no
+            # recalculan cada par: se reconstruyen todos juntos después del flush
+            lotes = InventarioVacunasService.por_dosis(asignaciones)
+            vacunaciones = []
+            for idanimal in a_vacunar:
+                asignacion = next(lotes, None)
+                vacunaciones.append(VacunacionAnimal(
+                    idanimal=idanimal,
+                    idvacuna=vacuna.idvacuna,
+                    fecha_aplicacion=fecha_aplicacion,
+                    dosis=dosis,
+                    lote_vacuna=asignacion['codigo'] if asignacion else lote_texto,
+                    idlote=asignacion['idlote'] if asignacion else None,
+                    veterinario=veterinario,
+                    observaciones=observaciones,
+                    proxima_dosis=proxima_dosis
+                ))
+            
+            db.session.info['vacunacion_masiva'] = True
+            try:
+                db.session.add_all(vacunaciones)
+                db.session.flush()
+            finally:
+                db.session.info.pop('vacunacion_masiva', None)
+            
+            connection = db.session.connection()
+            EstadoVacunacionService.recalcular_pares(connection, a_vacunar, vacuna.idvacuna)
+            ResumenService.sumar_totales(connection, hacienda_id, vacunaciones=len(a_vacunar))
+            
+            db.session.commit()
+            
+            return {
+                'message': f'Campaña de {vacuna.nombre_vacuna}: {len(a_vacunar)} animales vacunados',
+                'status': 'success',
+                'total_vacunados': len(a_vacunar),
+                'omitidos_por_duplicado': sorted(duplicados),
+                'no_encontrados': no_encontrados,
+                'lotes': [
+                    {**asignacion, 'fecha_vencimiento': asignacion['fecha_vencimiento'].isoformat()}
+                    for asignacion in asignaciones
+                ],
+                'alertas_stock': (
+                    InventarioVacunasService.alertas_tras_asignar(hacienda_id, vacuna.idvacuna) if asignaciones else []
+                ),
+                'registrado_por': f'{usuario.nombres} {usuario.apellidos}'
+            }, 201
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'error': f'Error al registrar la campaña de vacunación: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+    
     @staticmethod
     def listar_vacunaciones(filtros=None, pagina=1, por_pagina=50):
         """Lista vacunaciones con filtros y paginación"""
@@ -306,10 +523,15 @@ class VacunacionService:
                     termino = filtros['buscar']
                     query = query.filter(
                         db.or_(
-                            Animal.hierro.ilike(f'%{termino}%'),
-                            CatalogoVacuna.nombre_vacuna.ilike(f'%{termino}%'),
-                            VacunacionAnimal.veterinario.ilike(f'%{termino}%'),
-                            VacunacionAnimal.lote_vacuna.ilike(f'%{termino}%')
+                            VacunacionAnimal.idvacunacion.in_(IndiceBusqueda.subconsulta_ids(
+                                'vacunacion', termino, campos=['veterinario', 'lote_vacuna']
+                            )),
+                            VacunacionAnimal.idanimal.in_(IndiceBusqueda.subconsulta_ids(
+                                'animal', termino, campos=['hierro']
+                            )),
+                            VacunacionAnimal.idvacuna.in_(IndiceBusqueda.subconsulta_ids(
+                                'vacuna', termino, campos=['nombre_vacuna']
+                            ))
                         )
                     )
             
@@ -380,10 +602,11 @@ class VacunacionService:
     def obtener_proximas_dosis(dias_adelante=30, hacienda_id=None):
         """Obtiene animales que necesitan próximas dosis"""
         try:
-            proximas = VacunacionAnimal.obtener_proximas_dosis(dias_adelante, hacienda_id)
+            # Instantánea de alertas: última aplicación de cada vacuna por animal
+            proximas = AlertasService.proximas_dosis(dias_adelante, hacienda_id)
             
             return {
-                'proximas_dosis': [v.to_dict() for v in proximas],
+                'proximas_dosis': proximas,
                 'total': len(proximas),
                 'dias_adelante': dias_adelante,
                 'hacienda_id': hacienda_id,
@@ -401,10 +624,10 @@ class VacunacionService:
     def obtener_vencidas(hacienda_id=None):
         """Obtiene vacunaciones con dosis vencidas"""
         try:
-            vencidas = VacunacionAnimal.obtener_vencidas(hacienda_id)
+            vencidas = AlertasService.dosis_vencidas(hacienda_id)
             
             return {
-                'dosis_vencidas': [v.to_dict() for v in vencidas],
+                'dosis_vencidas': vencidas,
                 'total': len(vencidas),
                 'hacienda_id': hacienda_id,
                 'status': 'success'
@@ -418,6 +641,11 @@ class VacunacionService:
             }, 500
     
     @staticmethod
+    @CacheService.cacheado(
+        'estadisticas_vacunacion',
+        tablas=('vacunacion_animales', 'animales', 'catalogo_vacunas'),
+        particion='hacienda_id'
+    )
     def obtener_estadisticas_vacunacion(hacienda_id=None):
         """Obtiene estadísticas de vacunación"""
         try:
@@ -441,7 +669,7 @@ class VacunacionService:
         """Elimina una vacunación (solo administradores)"""
         try:
             # Verificar permisos del usuario (solo administradores)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = AuthService.usuario_actual(usuario_id)
             if not usuario or not usuario.es_administrador():
                 return {
                     'error': 'Solo administradores pueden eliminar vacunaciones',
@@ -459,7 +687,11 @@ class VacunacionService:
                 }, 404
             
             animal_hierro = vacunacion.animal.hierro if vacunacion.animal else "N/A"
-            vacuna_nombre = vacunacion.vacuna.nombre_vacuna if vacunacion.vacuna else "N/A"
+            vacuna_nombre = ReferenciasService.nombre('catalogo_vacunas', vacunacion.idvacuna) or "N/A"
+            
+            # La dosis vuelve al lote del que salió
+            if vacunacion.idlote:
+                InventarioVacunasService.devolver(vacunacion.idlote)
             
             db.session.delete(vacunacion)
             db.session.commit()
@@ -478,6 +710,237 @@ class VacunacionService:
                 'code': 'INTERNAL_ERROR'
             }, 500
     
+    # ===============================
+    # CALENDARIO DE VACUNACIÓN
+    # ===============================
+    
+    # Grupos del calendario: días hasta la próxima dosis (las vencidas son urgentes)
+    GRUPOS_CALENDARIO = {
+        'urgentes': 7,
+        'cercanas': 30,
+        'programadas': 60
+    }
+    GRUPO_SIN_VACUNAR = 'sin_vacunar'
+    
+    @staticmethod
+    def _filtro_animales(hacienda_id):
+        """Animales del calendario: activos, de la hacienda si se indica"""
+        condiciones = [Animal.idestado == ReferenciasService.id_estado('Activo')]
+        if hacienda_id:
+            condiciones.append(Animal.idhacienda == hacienda_id)
+        return condiciones
+    
+    @staticmethod
+    def _grupo_calendario(hoy):
+        """CASE con el grupo de urgencia de la próxima dosis (NULL: vigente o sin programar)"""
+        return case(
+            *[
+                (EstadoVacunacionAnimal.proxima_dosis <= hoy + timedelta(days=dias), literal(nombre))
+                for nombre, dias in VacunacionService.GRUPOS_CALENDARIO.items()
+            ],
+            else_=None
+        ).label('grupo')
+    
+    @staticmethod
+    def _rango_grupo(grupo, hoy):
+        """Condición de rango sobre proxima_dosis de un grupo (aprovecha su índice)"""
+        proxima = EstadoVacunacionAnimal.proxima_dosis
+        desde = None
+        for nombre, dias in VacunacionService.GRUPOS_CALENDARIO.items():
+            hasta = hoy + timedelta(days=dias)
+            if nombre == grupo:
+                return and_(proxima > desde, proxima <= hasta) if desde else proxima <= hasta
+            desde = hasta
+    
+    @staticmethod
+    def _pagina_programadas(grupo, hacienda_id, vacunas, hoy, pagina, por_pagina):
+        """Página de un grupo de dosis programadas, en orden de fecha"""
+        estado = EstadoVacunacionAnimal
+        consulta = select(
+            estado.idanimal,
+            estado.idvacuna,
+            estado.idvacunacion,
+            estado.fecha_ultima_aplicacion,
+            estado.proxima_dosis,
+            VacunacionAnimal.dosis,
+            VacunacionAnimal.lote_vacuna,
+            VacunacionAnimal.veterinario,
+            VacunacionAnimal.observaciones,
+            Animal.hierro,
+            Animal.sexo,
+            Animal.raza,
+            Hacienda.nombre.label('hacienda_nombre')
+        ).select_from(estado).join(
+            Animal, Animal.idanimal == estado.idanimal
+        ).join(
+            Hacienda, Hacienda.idhacienda == Animal.idhacienda
+        ).outerjoin(
+            VacunacionAnimal, VacunacionAnimal.idvacunacion == estado.idvacunacion
+        ).where(
+            VacunacionService._rango_grupo(grupo, hoy),
+            estado.idvacuna.in_(vacunas),
+            *VacunacionService._filtro_animales(hacienda_id)
+        ).order_by(
+            estado.proxima_dosis, estado.idanimal, estado.idvacuna
+        ).offset((pagina - 1) * por_pagina).limit(por_pagina)
+        
+        return db.session.execute(consulta).mappings().all()
+    
+    @staticmethod
+    def _pagina_sin_vacunar(hacienda_id, hoy, pagina, por_pagina):
+        """Página de combinaciones animal × vacuna activa sin ninguna aplicación (anti-join)"""
+        estado = EstadoVacunacionAnimal
+        consulta = select(
+            Animal.idanimal,
+            CatalogoVacuna.idvacuna,
+            Animal.hierro,
+            Animal.sexo,
+            Animal.raza,
+            Hacienda.nombre.label('hacienda_nombre')
+        ).select_from(Animal).join(
+            Hacienda, Hacienda.idhacienda == Animal.idhacienda
+        ).join(
+            CatalogoVacuna, CatalogoVacuna.activo == True
+        ).where(
+            ~exists().where(and_(
+                estado.idanimal == Animal.idanimal,
+                estado.idvacuna == CatalogoVacuna.idvacuna
+            )),
+            *VacunacionService._filtro_animales(hacienda_id)
+        ).order_by(
+            Animal.idanimal, CatalogoVacuna.idvacuna
+        ).offset((pagina - 1) * por_pagina).limit(por_pagina)
+        
+        return db.session.execute(consulta).mappings().all()
+    
+    @staticmethod
+    def _totales_calendario(hacienda_id, vacunas, hoy):
+        """
+        Totales por grupo: un GROUP BY sobre el CASE de urgencia
+        Las combinaciones sin vacunar se obtienen por diferencia: animales × vacunas
+        activas menos las combinaciones que tienen fila de estado.
+        """
+        grupo = VacunacionService._grupo_calendario(hoy)
+        filas = db.session.execute(
+            select(grupo, func.count()).select_from(EstadoVacunacionAnimal).join(
+                Animal, Animal.idanimal == EstadoVacunacionAnimal.idanimal
+            ).where(
+                EstadoVacunacionAnimal.idvacuna.in_(vacunas),
+                *VacunacionService._filtro_animales(hacienda_id)
+            ).group_by(grupo)
+        ).all()
+        
+        animales = db.session.execute(
+            select(func.count(Animal.idanimal)).where(*VacunacionService._filtro_animales(hacienda_id))
+        ).scalar()
+        
+        totales = dict.fromkeys(VacunacionService.GRUPOS_CALENDARIO, 0)
+        con_registro = 0
+        for nombre, cantidad in filas:
+            con_registro += cantidad
+            if nombre is not None:
+                totales[nombre] = cantidad
+        totales[VacunacionService.GRUPO_SIN_VACUNAR] = animales * len(vacunas) - con_registro
+        
+        return totales
+    
+    @staticmethod
+    def _item_calendario(fila, hoy):
+        """Elemento del calendario con los campos del registro de vacunación que usa el cliente"""
+        vacuna = ReferenciasService.vacuna(fila['idvacuna'])
+        proxima = fila.get('proxima_dosis')
+        aplicacion = fila.get('fecha_ultima_aplicacion')
+        
+        item = {
+            'idvacunacion': fila.get('idvacunacion'),
+            'idanimal': fila['idanimal'],
+            'idvacuna': fila['idvacuna'],
+            'fecha_aplicacion': aplicacion.isoformat() if aplicacion else None,
+            'dosis': fila.get('dosis'),
+            'lote_vacuna': fila.get('lote_vacuna'),
+            'veterinario': fila.get('veterinario'),
+            'observaciones': fila.get('observaciones'),
+            'proxima_dosis': proxima.isoformat() if proxima else None,
+            'animal': {
+                'hierro': fila['hierro'],
+                'sexo': fila['sexo'],
+                'raza': fila['raza'],
+                'hacienda_nombre': fila['hacienda_nombre']
+            },
+            'vacuna': {
+                'nombre_vacuna': vacuna['nombre_vacuna'],
+                'descripcion': vacuna['descripcion'],
+                'frecuencia_dias': vacuna['frecuencia_dias']
+            } if vacuna else None,
+            'dias_desde_aplicacion': (hoy - aplicacion).days if aplicacion else None,
+            'dias_para_proxima': (proxima - hoy).days if proxima else None
+        }
+        item['estado_proxima_dosis'] = EstadoVacunacionAnimal.estado_de(proxima, hoy=hoy) if proxima else 'nunca'
+        return item
+    
+    @staticmethod
+    @CacheService.cacheado(
+        'calendario_vacunacion',
+        tablas=('vacunacion_animales', 'animales', 'catalogo_vacunas', 'haciendas'),
+        particion='hacienda_id'
+    )
+    def obtener_calendario_vacunacion(hacienda_id=None, grupo=None, pagina=1, por_pagina=50):
+        """
+        Calendario de vacunación del hato: la última aplicación de cada animal y vacuna
+        (tabla de estado), agrupada por urgencia en SQL, más las combinaciones nunca vacunadas.
+        Sin grupo retorna la primera página de cada grupo; con grupo, la página pedida.
+        """
+        try:
+            grupos = list(VacunacionService.GRUPOS_CALENDARIO) + [VacunacionService.GRUPO_SIN_VACUNAR]
+            if grupo is not None and grupo not in grupos:
+                return {
+                    'error': f'Grupo no válido. Opciones: {", ".join(grupos)}',
+                    'status': 'error',
+                    'code': 'INVALID_GROUP'
+                }, 400
+            
+            hoy = date.today()
+            vacunas = [vacuna['idvacuna'] for vacuna in ReferenciasService.todos('catalogo_vacunas') if vacuna['activo']]
+            totales = VacunacionService._totales_calendario(hacienda_id, vacunas, hoy)
+            
+            # Cada grupo se pagina con su propio rango de índice
+            pagina_actual = pagina if grupo else 1
+            calendario = {}
+            for nombre in ([grupo] if grupo else grupos):
+                if totales[nombre] <= (pagina_actual - 1) * por_pagina:
+                    filas = []
+                elif nombre == VacunacionService.GRUPO_SIN_VACUNAR:
+                    filas = VacunacionService._pagina_sin_vacunar(hacienda_id, hoy, pagina_actual, por_pagina)
+                else:
+                    filas = VacunacionService._pagina_programadas(
+                        nombre, hacienda_id, vacunas, hoy, pagina_actual, por_pagina
+                    )
+                calendario[nombre] = [VacunacionService._item_calendario(fila, hoy) for fila in filas]
+            
+            return {
+                'calendario': calendario,
+                'resumen': {f'total_{nombre}': totales[nombre] for nombre in grupos},
+                'paginacion': {
+                    nombre: {
+                        'pagina_actual': pagina_actual,
+                        'por_pagina': por_pagina,
+                        'total_paginas': -(-totales[nombre] // por_pagina),
+                        'tiene_siguiente': pagina_actual * por_pagina < totales[nombre]
+                    }
+                    for nombre in calendario
+                },
+                'hacienda_id': hacienda_id,
+                'fecha_consulta': hoy.isoformat(),
+                'status': 'success'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'error': f'Error al obtener calendario de vacunación: {str(e)}',
+                'status': 'error',
+                'code': 'INTERNAL_ERROR'
+            }, 500
+    
     # ===============================
     # MÉTODOS DE VALIDACIÓN
     # ===============================
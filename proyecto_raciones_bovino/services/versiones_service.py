@@ -0,0 +1,166 @@
+from models import db, VersionTabla
+from services.resumen_service import ResumenService
+from services.invalidacion_service import InvalidacionService
+from services.respuesta_service import formato_negociado
+from flask import request, make_response
+from sqlalchemy import select, and_, or_, func
+from functools import wraps
+from datetime import date
+import hashlib
+
+class VersionesService:
+    """
+    Registro de versiones de cambios por tabla y por hacienda
+    Cada flush incrementa la versión de las particiones que toca (la hacienda, o '*' si
+    no se conoce): escrituras en haciendas distintas no compiten por la misma fila. La
+    versión de la tabla completa (partición '') es la suma de sus particiones. Los GET
+    condicionales derivan su ETag de esas versiones y responden 304 sin ejecutar la consulta.
+    """
+
+    _eventos_registrados = False
+
+    # ===============================
+    # INCREMENTO DE VERSIONES
+    # ===============================
+
+    @staticmethod
+    def _al_hacer_flush(session, cambios):
+        """Incrementa las versiones de las particiones (haciendas) escritas en el flush"""
+        claves = set()
+        for tabla, haciendas in cambios['haciendas'].items():
+            claves.update((tabla, str(idhacienda)) for idhacienda in haciendas)
+
+        # Escrituras sin hacienda conocida (o tablas sin particiones) invalidan todas las
+        # particiones de la tabla
+        claves.update((tabla, '*') for tabla in cambios['tablas_globales'])
+        claves.update(
+            (tabla, '*') for tabla in cambios['tablas']
+            if tabla not in cambios['haciendas'] and tabla not in cambios['tablas_globales']
+        )
+
+        connection = session.connection()
+        for tabla, particion in sorted(claves):
+            ResumenService.sumar_incrementos(
+                connection,
+                VersionTabla.__table__,
+                {'tabla': tabla, 'particion': particion},
+                {'version': 1}
+            )
+
+    @staticmethod
+    def registrar_eventos():
+        """Se suscribe al bus de invalidación (fase de flush, dentro de la transacción)"""
+        if VersionesService._eventos_registrados:
+            return
+
+        InvalidacionService.registrar_eventos()
+        InvalidacionService.suscribir(VersionesService._al_hacer_flush, al_confirmar=False)
+
+        VersionesService._eventos_registrados = True
+
+    # ===============================
+    # CONSULTA DE VERSIONES
+    # ===============================
+
+    @staticmethod
+    def obtener_versiones(claves):
+        """
+        Versiones actuales de las claves (tabla, partición); 0 si nunca cambió
+        La partición '' es la tabla completa: suma de todas sus particiones.
+        """
+        if not claves:
+            return {}
+
+        versiones = {clave: 0 for clave in claves}
+        particiones = [(tabla, particion) for tabla, particion in claves if particion != '']
+        completas = sorted({tabla for tabla, particion in claves if particion == ''})
+
+        if particiones:
+            filas = db.session.execute(
+                select(VersionTabla.tabla, VersionTabla.particion, VersionTabla.version).where(
+                    or_(*[
+                        and_(VersionTabla.tabla == tabla, VersionTabla.particion == particion)
+                        for tabla, particion in particiones
+                    ])
+                )
+            ).all()
+            versiones.update({(tabla, particion): version for tabla, particion, version in filas})
+
+        if completas:
+            filas = db.session.execute(
+                select(VersionTabla.tabla, func.sum(VersionTabla.version)).where(
+                    VersionTabla.tabla.in_(completas)
+                ).group_by(VersionTabla.tabla)
+            ).all()
+            versiones.update({(tabla, ''): int(version or 0) for tabla, version in filas})
+
+        return versiones
+
+    @staticmethod
+    def calcular_etag(claves):
+        """ETag de la petición actual según las versiones de sus dependencias"""
+        versiones = VersionesService.obtener_versiones(claves)
+
+        # La fecha entra en el ETag porque algunos campos (edad, días) dependen de hoy;
+        # el formato porque la misma URL puede responder JSON o MessagePack
+        partes = [date.today().isoformat(), request.full_path, formato_negociado()]
+        partes += [f'{tabla}[{particion}]={versiones[(tabla, particion)]}' for tabla, particion in claves]
+
+        return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _resolver_dependencia(dependencia, argumentos):
+        """
+        'tabla' -> [(tabla, '')]
+        'tabla:argumento' -> [(tabla, valor del argumento de la ruta), (tabla, '*')]
+        """
+        tabla, _, argumento = dependencia.partition(':')
+        if not argumento:
+            return [(tabla, '')]
+        return [(tabla, str(argumentos[argumento])), (tabla, '*')]
+
+    # ===============================
+    # GET CONDICIONAL
+    # ===============================
+
+    @staticmethod
+    def condicional(*dependencias):
+        """
+        Decorador de GET condicional (ETag / If-None-Match)
+
+        Uso: @VersionesService.condicional('catalogo_vacunas') o
+        @VersionesService.condicional('animales:hacienda_id') para una partición
+        tomada de los argumentos de la ruta. Va debajo de @jwt_required().
+        """
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                claves = [
+                    clave
+                    for dependencia in dependencias
+                    for clave in VersionesService._resolver_dependencia(dependencia, kwargs)
+                ]
+
+                try:
+                    etag = VersionesService.calcular_etag(claves)
+                except Exception:
+                    # Sin registro de versiones se responde normalmente, sin ETag
+                    db.session.rollback()
+                    return vista(*args, **kwargs)
+
+                if request.if_none_match.contains_weak(etag):
+                    respuesta = make_response('', 304)
+                    respuesta.set_etag(etag, weak=True)
+                    return respuesta
+
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code == 200:
+                    respuesta.set_etag(etag, weak=True)
+                    # El cliente puede guardar la respuesta pero debe revalidarla siempre
+                    respuesta.headers['Cache-Control'] = 'private, no-cache'
+
+                return respuesta
+
+            return envoltura
+
+        return decorador
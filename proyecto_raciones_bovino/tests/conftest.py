@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Aplicación sobre una base SQLite en archivo (el fallback de config.py), sin tareas ni cache"""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'pruebas.db'}")
+    monkeypatch.setattr(Config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    monkeypatch.setattr(Config, 'TAREAS_PERIODICAS_HABILITADAS', False)
+    monkeypatch.setattr(Config, 'CACHE_TYPE', 'null')
+
+    from app import create_app
+    from models import db, RolUsuario, EstadoAnimal
+
+    aplicacion = create_app()
+    with aplicacion.app_context():
+        db.create_all()
+        RolUsuario.crear_roles_por_defecto()
+        EstadoAnimal.crear_estados_por_defecto()
+
+    yield aplicacion
+
+    with aplicacion.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def encabezados(app):
+    """Authorization de un administrador activo"""
+    from flask_jwt_extended import create_access_token
+    from models import db, Usuario
+    from services.auth_service import AuthService
+
+    with app.app_context():
+        usuario = Usuario(
+            idrol=1, nombres='Ana', apellidos='Paz', documento='1111111', email='admin@pruebas.co', activo=True
+        )
+        usuario.set_password('secreto1')
+        db.session.add(usuario)
+        db.session.commit()
+
+        token = create_access_token(
+            identity=str(usuario.idusuario),
+            additional_claims=AuthService.claims_usuario(usuario)
+        )
+
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,59 @@
+from models import db, Animal, Hacienda
+
+
+def _hacienda(app):
+    with app.app_context():
+        hacienda = Hacienda(nit='900000001-1', nombre='Hacienda Prueba', propietario='Ana Paz')
+        db.session.add(hacienda)
+        db.session.commit()
+        return hacienda.idhacienda
+
+
+def _crear_animal(id_operacion, hacienda_id, hierro):
+    return {
+        'id': id_operacion,
+        'metodo': 'POST',
+        'ruta': '/api/animales/',
+        'cuerpo': {'idhacienda': hacienda_id, 'hierro': hierro, 'sexo': 'Macho'}
+    }
+
+
+def _hierros(app):
+    with app.app_context():
+        return sorted(hierro for (hierro,) in db.session.query(Animal.hierro))
+
+
+def test_batch_atomico_revertido_no_deja_cambios(app, encabezados):
+    hacienda_id = _hacienda(app)
+    cliente = app.test_client()
+
+    respuesta = cliente.post('/api/batch', headers=encabezados, json={
+        'atomico': True,
+        'operaciones': [
+            _crear_animal('primero', hacienda_id, 'BT-2'),
+            _crear_animal('repetido', hacienda_id, 'BT-2')
+        ]
+    })
+
+    cuerpo = respuesta.get_json()
+    assert respuesta.status_code == 409
+    assert cuerpo['confirmado'] is False
+    assert [resultado['status'] for resultado in cuerpo['resultados']] == [201, 400]
+    assert _hierros(app) == []
+
+
+def test_batch_atomico_confirmado(app, encabezados):
+    hacienda_id = _hacienda(app)
+    cliente = app.test_client()
+
+    respuesta = cliente.post('/api/batch', headers=encabezados, json={
+        'atomico': True,
+        'operaciones': [
+            _crear_animal('primero', hacienda_id, 'BT-1'),
+            _crear_animal('segundo', hacienda_id, 'BT-2')
+        ]
+    })
+
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['confirmado'] is True
+    assert _hierros(app) == ['BT-1', 'BT-2']
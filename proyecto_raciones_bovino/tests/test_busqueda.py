@@ -0,0 +1,27 @@
+from models import db, Animal, Hacienda
+
+
+def _hierros(cliente, encabezados, termino):
+    respuesta = cliente.get('/api/animales/buscar', headers=encabezados, query_string={'q': termino})
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return sorted(animal['hierro'] for animal in respuesta.get_json()['animales'])
+
+
+def test_busqueda_encuentra_cualquier_parte_del_hierro(app, encabezados):
+    with app.app_context():
+        hacienda = Hacienda(nit='900000001-1', nombre='Norte', propietario='Ana Paz')
+        db.session.add(hacienda)
+        db.session.flush()
+        db.session.add_all([
+            Animal(idhacienda=hacienda.idhacienda, hierro=hierro, sexo='Hembra', raza='Brahman')
+            for hierro in ('LE-001', 'LE-010', 'MX-2001')
+        ])
+        db.session.commit()
+
+    cliente = app.test_client()
+    assert _hierros(cliente, encabezados, '001') == ['LE-001', 'MX-2001']
+    assert _hierros(cliente, encabezados, 'e01') == ['LE-010']
+    assert _hierros(cliente, encabezados, 'le-0') == ['LE-001', 'LE-010']
+    assert _hierros(cliente, encabezados, 'brah') == ['LE-001', 'LE-010', 'MX-2001']
+    # Los campos de texto siguen buscando por prefijo de palabra
+    assert _hierros(cliente, encabezados, 'rahman') == []
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import insert
+
+from models import db, Hacienda, VersionTabla
+from services.cache_service import CacheService, CacheMemoria
+from services.hacienda_service import HaciendaService
+
+
+@pytest.fixture
+def cache_memoria(app, monkeypatch):
+    """Cache en memoria del proceso, con las versiones aún sin leer"""
+    monkeypatch.setattr(CacheService, '_backend', CacheMemoria())
+    monkeypatch.setattr(CacheService, '_versiones', {})
+    monkeypatch.setattr(CacheService, '_verificado_en', None)
+    return app
+
+
+def _escritura_de_otro_proceso(app):
+    """Inserta una hacienda sin pasar por el bus de este proceso, como lo haría otro worker"""
+    with app.app_context(), db.engine.begin() as conexion:
+        conexion.execute(insert(Hacienda.__table__).values(
+            nit='900000002-2', nombre='Hacienda Vecina', propietario='Luis Gil', activo=True
+        ))
+        conexion.execute(insert(VersionTabla.__table__).values(tabla='haciendas', particion='*', version=1))
+
+
+def _total_haciendas():
+    resultado, codigo = HaciendaService.obtener_estadisticas()
+    assert codigo == 200
+    return resultado['estadisticas']['total_haciendas']
+
+
+def test_cache_memoria_ve_escrituras_de_otros_procesos(cache_memoria):
+    with cache_memoria.app_context():
+        assert _total_haciendas() == 0
+
+    _escritura_de_otro_proceso(cache_memoria)
+
+    with cache_memoria.app_context():
+        # Dentro del intervalo de verificación se sigue sirviendo la entrada guardada
+        assert _total_haciendas() == 0
+
+        CacheService._verificado_en = None
+        assert _total_haciendas() == 1
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+
+from models import db, Animal, Hacienda, CatalogoVacuna, VacunacionAnimal, Nacimiento, ResumenHaciendaFecha
+from services.estadisticas_service import EstadisticasService
+from services.resumen_service import ResumenService
+from services.tareas_service import TareasService
+
+
+def _hacienda(nit, nombre):
+    hacienda = Hacienda(nit=nit, nombre=nombre, propietario='Ana Paz')
+    db.session.add(hacienda)
+    db.session.flush()
+    return hacienda
+
+
+def _animal(hacienda, hierro, sexo='Hembra'):
+    animal = Animal(idhacienda=hacienda.idhacienda, hierro=hierro, sexo=sexo)
+    db.session.add(animal)
+    db.session.flush()
+    return animal
+
+
+def _bloques_del_dia(hacienda):
+    """Lo que el resumen materializado debe coincidir con las tablas base"""
+    resumen = ResumenService.obtener_resumen(hacienda)['estadisticas_animales']
+    base = EstadisticasService.estadisticas_hacienda(hacienda.idhacienda)
+    return (resumen['vacunacion'], resumen['nacimientos']), (base['vacunacion'], base['nacimientos'])
+
+
+def _poblar():
+    hoy = date.today()
+    vacuna = db.session.query(CatalogoVacuna.idvacuna).first()[0]
+    norte, sur = _hacienda('900000001-1', 'Norte'), _hacienda('900000002-2', 'Sur')
+
+    madre = _animal(norte, 'LE-001')
+    cria = _animal(norte, 'LE-002', 'Macho')
+    viajera = _animal(norte, 'LE-003')
+    _animal(norte, 'LE-004', 'Macho')  # sin vacunaciones
+
+    # Varias dosis del mismo animal en un flush: vencida, próxima y sin próxima dosis
+    db.session.add_all([
+        VacunacionAnimal(idanimal=madre.idanimal, idvacuna=vacuna, fecha_aplicacion=hoy, proxima_dosis=hoy - timedelta(days=5)),
+        VacunacionAnimal(idanimal=madre.idanimal, idvacuna=vacuna, fecha_aplicacion=hoy, proxima_dosis=hoy + timedelta(days=10)),
+        VacunacionAnimal(animal=viajera, idvacuna=vacuna, fecha_aplicacion=hoy, proxima_dosis=None),
+        VacunacionAnimal(animal=cria, idvacuna=vacuna, fecha_aplicacion=hoy, proxima_dosis=hoy - timedelta(days=1)),
+        Nacimiento(
+            idanimal_cria=cria.idanimal, idanimal_madre=madre.idanimal,
+            fecha_nacimiento=hoy - timedelta(days=120), vacunas_aplicadas=False
+        )
+    ])
+    db.session.commit()
+    return norte, sur, madre, cria, viajera
+
+
+def test_resumen_del_dia_coincide_con_las_tablas_base(app):
+    with app.app_context():
+        CatalogoVacuna.crear_vacunas_por_defecto()
+        norte, sur, madre, cria, viajera = _poblar()
+
+        for hacienda in (norte, sur):
+            resumen, base = _bloques_del_dia(hacienda)
+            assert resumen == base
+
+        # Traslado, cambio de próxima dosis, borrado y vacunación de la cría
+        viajera.idhacienda = sur.idhacienda
+        vacunacion = db.session.query(VacunacionAnimal).filter_by(idanimal=cria.idanimal).one()
+        vacunacion.proxima_dosis = date.today() + timedelta(days=20)
+        db.session.delete(db.session.query(VacunacionAnimal).filter_by(idanimal=madre.idanimal).first())
+        db.session.query(Nacimiento).one().vacunas_aplicadas = True
+        db.session.commit()
+
+        for hacienda in (norte, sur):
+            resumen, base = _bloques_del_dia(hacienda)
+            assert resumen == base
+
+        # Borrar un animal descuenta sus dosis; borrar la hacienda borra su resumen
+        db.session.delete(viajera)
+        db.session.commit()
+        resumen, base = _bloques_del_dia(sur)
+        assert resumen == base
+
+        db.session.delete(norte)
+        db.session.commit()
+        assert db.session.query(ResumenHaciendaFecha).filter_by(idhacienda=norte.idhacienda).count() == 0
+
+
+def test_reconciliar_reconstruye_los_conteos_por_fecha(app):
+    with app.app_context():
+        CatalogoVacuna.crear_vacunas_por_defecto()
+        norte, sur, *_ = _poblar()
+        esperado = {h.idhacienda: _bloques_del_dia(h)[0] for h in (norte, sur)}
+
+        db.session.query(ResumenHaciendaFecha).delete()
+        db.session.commit()
+
+        assert ResumenService.reconciliar() == 2
+        for hacienda in (norte, sur):
+            resumen, base = _bloques_del_dia(hacienda)
+            assert resumen == base == esperado[hacienda.idhacienda]
+
+
+def test_turno_de_tarea_para_un_solo_proceso(app):
+    estado = {'nombre': 'reconciliar-resumen', 'intervalo_segundos': 3600}
+
+    with app.app_context():
+        assert TareasService._tomar_turno(estado)
+        # Los demás procesos saltan la tarea hasta el siguiente intervalo
+        assert not TareasService._tomar_turno(estado)
+        assert TareasService._tomar_turno(dict(estado, intervalo_segundos=0))
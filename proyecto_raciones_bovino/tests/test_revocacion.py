@@ -0,0 +1,46 @@
+import pytest
+
+from models import db, Usuario, TokenRevocado
+from services.auth_service import AuthService
+
+
+@pytest.fixture(autouse=True)
+def revocaciones_limpias(monkeypatch):
+    """Las revocaciones son estado del proceso: cada prueba empieza sin ninguna"""
+    monkeypatch.setattr(AuthService, '_denegados', {})
+    monkeypatch.setattr(AuthService, '_verificado_en', None)
+
+
+def _simular_otro_proceso():
+    """Olvida lo revocado en este proceso y fuerza la próxima verificación de la tabla"""
+    AuthService._denegados = {}
+    AuthService._verificado_en = None
+
+
+def test_revocacion_llega_a_otro_proceso(app, encabezados):
+    cliente = app.test_client()
+    assert cliente.get('/api/usuarios/perfil', headers=encabezados).status_code == 200
+
+    with app.app_context():
+        usuario_id = db.session.query(Usuario.idusuario).scalar()
+        AuthService.revocar_tokens(usuario_id)
+        assert db.session.get(TokenRevocado, usuario_id) is not None
+
+    _simular_otro_proceso()
+    assert cliente.get('/api/usuarios/perfil', headers=encabezados).status_code == 401
+
+
+def test_revocacion_se_relee_solo_por_intervalo(app, encabezados):
+    cliente = app.test_client()
+    assert cliente.get('/api/usuarios/perfil', headers=encabezados).status_code == 200
+
+    with app.app_context():
+        usuario_id = db.session.query(Usuario.idusuario).scalar()
+        AuthService.revocar_tokens(usuario_id)
+
+    # Otro proceso que acaba de verificar no vuelve a consultar la tabla hasta el siguiente intervalo
+    AuthService._denegados = {}
+    assert cliente.get('/api/usuarios/perfil', headers=encabezados).status_code == 200
+
+    AuthService._verificado_en = None
+    assert cliente.get('/api/usuarios/perfil', headers=encabezados).status_code == 401
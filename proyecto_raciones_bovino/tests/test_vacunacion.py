@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from models import db, Animal, Hacienda, CatalogoVacuna, VacunacionAnimal, EstadoVacunacionAnimal, TareaPendiente
+from services.estadisticas_service import EstadisticasService
+from services.estado_vacunacion_service import EstadoVacunacionService
+from services.resumen_service import ResumenService
+from services.tareas_pendientes_service import TareasPendientesService
+
+
+def _filas(modelo):
+    return sorted(tuple(fila) for fila in db.session.execute(select(*modelo.__table__.columns)).all())
+
+
+def test_campana_deja_estado_y_tareas_como_la_reconciliacion(app, encabezados):
+    hoy = date.today()
+
+    with app.app_context():
+        CatalogoVacuna.crear_vacunas_por_defecto()
+        vacuna, otra = db.session.execute(select(CatalogoVacuna.idvacuna).limit(2)).scalars().all()
+        hacienda = Hacienda(nit='900000001-1', nombre='Norte', propietario='Ana Paz')
+        db.session.add(hacienda)
+        db.session.flush()
+        animales = [Animal(idhacienda=hacienda.idhacienda, hierro=f'LE-00{i}', sexo='Hembra') for i in range(1, 5)]
+        db.session.add_all(animales)
+        db.session.flush()
+
+        # Dosis anteriores: una de la misma vacuna fuera de la ventana de duplicados y una de otra vacuna
+        db.session.add_all([
+            VacunacionAnimal(
+                idanimal=animales[0].idanimal, idvacuna=vacuna,
+                fecha_aplicacion=hoy - timedelta(days=90), proxima_dosis=hoy - timedelta(days=3)
+            ),
+            VacunacionAnimal(
+                idanimal=animales[1].idanimal, idvacuna=otra,
+                fecha_aplicacion=hoy - timedelta(days=10), proxima_dosis=hoy + timedelta(days=5)
+            )
+        ])
+        db.session.commit()
+        hacienda_id = hacienda.idhacienda
+
+    respuesta = app.test_client().post('/api/vacunacion/campanas', headers=encabezados, json={
+        'idhacienda': hacienda_id, 'idvacuna': vacuna, 'fecha_aplicacion': hoy.isoformat(),
+        'proxima_dosis': (hoy + timedelta(days=180)).isoformat()
+    })
+    assert respuesta.status_code == 201, respuesta.get_json()
+
+    with app.app_context():
+        assert db.session.query(VacunacionAnimal).filter_by(idvacuna=vacuna).count() == 5
+        estado, tareas = _filas(EstadoVacunacionAnimal), _filas(TareaPendiente)
+
+        EstadoVacunacionService.reconciliar()
+        TareasPendientesService.reconciliar()
+        assert _filas(EstadoVacunacionAnimal) == estado
+        assert _filas(TareaPendiente) == tareas
+
+        hacienda = db.session.get(Hacienda, hacienda_id)
+        resumen = ResumenService.obtener_resumen(hacienda)['estadisticas_animales']
+        base = EstadisticasService.estadisticas_hacienda(hacienda_id)
+        assert resumen['vacunacion'] == base['vacunacion']
+        assert resumen['vacunacion']['total_vacunaciones'] == 6